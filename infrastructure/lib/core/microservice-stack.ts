@@ -10,6 +10,8 @@ import * as lambda from "aws-cdk-lib/aws-lambda";
 import * as pylambda from "@aws-cdk/aws-lambda-python-alpha";
 import * as ddb from "aws-cdk-lib/aws-dynamodb";
 import * as cloudwatch from "aws-cdk-lib/aws-cloudwatch";
+import * as events from "aws-cdk-lib/aws-events";
+import * as targets from "aws-cdk-lib/aws-events-targets";
 
 import { jsonSchema } from "../shared/common-utils";
 import { IObservabilityContributor, ObservabilityHelper } from "../shared/common-observability";
@@ -58,8 +60,13 @@ interface ResponseModels {
  * Core Zoorl logic for managing the creation of URL hashes and their retrieval through
  * a RESTful API.
  *
- * It provides a new resource "/u" and two endpoints:
+ * It provides a new resource "/u" and the following endpoints:
  *  * POST /u - creates a new URL hash
+ *  * POST /u/batch - creates many URL hashes at once
+ *  * POST /u/resolve - looks up many URL hashes at once, returning found and missing ones
+ *  * PUT /u/{alias} - creates a URL hash under a custom alias, unless another URL has taken it
+ *
+ * Expired URL hashes are also purged periodically, since DynamoDB TTL deletion may lag behind.
  *  * GET /u/{hash} - Lookup a URL hash and, if found, returns an HTTP 301 Permanently Moved
  *    to trigger browser redirection.
  */
@@ -72,11 +79,20 @@ export class CoreMicroserviceStack extends cdk.NestedStack implements IObservabi
   private readonly defaultFunctionSettings: DefaultLambdaSettings;
 
   private readonly createUrlHashFunction: lambda.IFunction;
+  private readonly createUrlHashesFunction: lambda.IFunction;
   private readonly readUrlHashFunction: lambda.IFunction;
+  private readonly readUrlHashesFunction: lambda.IFunction;
+  private readonly createUrlAliasFunction: lambda.IFunction;
   private readonly redirectToUrlFunction: lambda.IFunction;
+  private readonly purgeExpiredUrlHashesFunction: lambda.IFunction;
+  private readonly recordClicksFunction: lambda.IFunction;
+
+  private readonly migrateUrlHashesFunction: lambda.IFunction;
 
   private readonly responseModels: ResponseModels;
 
+  private readonly requestValidator: apigateway.RequestValidator;
+
   constructor(scope: constructs.Construct, id: string, props: CoreMicroserviceStackProps) {
     super(scope, id, props);
 
@@ -108,6 +124,14 @@ export class CoreMicroserviceStack extends cdk.NestedStack implements IObservabi
         URL_HASHES_TABLE: this.urlHashesTable.tableName,
         POWERTOOLS_SERVICE_NAME: "zoorl",
         POWERTOOLS_LOGGER_LOG_EVENT: "true",
+        // Active tracing is not enabled on the functions, so skip loading the X-Ray SDK at cold start
+        POWERTOOLS_TRACE_DISABLED: "true",
+        // Set to "true" for per-stage timings (resolver, use cases, DynamoDB calls) as EMF metrics
+        INSTRUMENTATION_ENABLED: "false",
+        // Equivalent spellings of a URL share one hash (and one item) once canonicalized. Query parameters are
+        // all kept: link owners rely on tracking ones (e.g., "utm_*") at the destination, so stripping them with
+        // URL_STRIP_QUERY_PARAMS is left to deployments that opt in
+        URL_CANONICALIZATION_ENABLED: "true",
         LOG_LEVEL: "INFO",
       },
       // Functions are pretty quick, so this is quite conservative
@@ -119,11 +143,30 @@ export class CoreMicroserviceStack extends cdk.NestedStack implements IObservabi
     this.urlHashesResource = props.restApi.root.addResource("u");
     this.redirectResource = props.restApi.root.addResource("r");
 
+    this.requestValidator = new apigateway.RequestValidator(this, "ZoorlRequestValidator", {
+      restApi: props.restApi,
+      requestValidatorName: "Validate Payload and parameters",
+      validateRequestBody: true,
+      validateRequestParameters: true,
+    });
+
     this.createUrlHashFunction = this.bindCreateUrlHashFunction(props);
 
+    this.createUrlHashesFunction = this.bindCreateUrlHashesFunction(props);
+
     this.readUrlHashFunction = this.bindReadUrlHashFunction(props);
 
+    this.readUrlHashesFunction = this.bindReadUrlHashesFunction(props);
+
+    this.createUrlAliasFunction = this.bindCreateUrlAliasFunction(props);
+
+    this.recordClicksFunction = this.bindRecordClicksFunction();
+
     this.redirectToUrlFunction = this.bindRedirectToUrlFunction(props);
+
+    this.purgeExpiredUrlHashesFunction = this.bindPurgeExpiredUrlHashesFunction();
+
+    this.migrateUrlHashesFunction = this.bindMigrateUrlHashesFunction();
   }
 
   public contributeWidgets(dashboard: cloudwatch.Dashboard): void {
@@ -134,16 +177,41 @@ export class CoreMicroserviceStack extends cdk.NestedStack implements IObservabi
       descriptiveName: "Create URL Hash",
     });
 
+    observabilityHelper.createLambdaFunctionSection({
+      function: this.createUrlHashesFunction,
+      descriptiveName: "Create URL Hashes (batch)",
+    });
+
     observabilityHelper.createLambdaFunctionSection({
       function: this.readUrlHashFunction,
       descriptiveName: "Read URL Hash",
     });
 
+    observabilityHelper.createLambdaFunctionSection({
+      function: this.readUrlHashesFunction,
+      descriptiveName: "Read URL Hashes (batch)",
+    });
+
+    observabilityHelper.createLambdaFunctionSection({
+      function: this.createUrlAliasFunction,
+      descriptiveName: "Create URL Alias",
+    });
+
     observabilityHelper.createLambdaFunctionSection({
       function: this.redirectToUrlFunction,
       descriptiveName: "Redirect to URL",
     });
 
+    observabilityHelper.createLambdaFunctionSection({
+      function: this.purgeExpiredUrlHashesFunction,
+      descriptiveName: "Purge expired URL Hashes",
+    });
+
+    observabilityHelper.createLambdaFunctionSection({
+      function: this.migrateUrlHashesFunction,
+      descriptiveName: "Migrate URL Hashes",
+    });
+
     observabilityHelper.createDynamoDBTableSection({
       table: this.urlHashesTable,
       descriptiveName: "URL hashes table",
@@ -159,6 +227,8 @@ export class CoreMicroserviceStack extends cdk.NestedStack implements IObservabi
           url_hash: { type: apigateway.JsonSchemaType.STRING },
           url: { type: apigateway.JsonSchemaType.STRING },
           ttl: { type: apigateway.JsonSchemaType.INTEGER },
+          // Only returned when creating a URL hash
+          reused: { type: apigateway.JsonSchemaType.BOOLEAN },
         },
         requiredProperties: ["url_hash", "url", "ttl"],
       })
@@ -196,18 +266,13 @@ export class CoreMicroserviceStack extends cdk.NestedStack implements IObservabi
         properties: {
           url: { type: apigateway.JsonSchemaType.STRING },
           ttl: { type: apigateway.JsonSchemaType.INTEGER },
+          // Return an unexpired URL hash for the same URL, instead of writing it again
+          reuse: { type: apigateway.JsonSchemaType.BOOLEAN },
         },
         requiredProperties: ["url"],
       })
     );
 
-    const requestValidator = new apigateway.RequestValidator(this, "ZoorlRequestValidator", {
-      restApi: props.restApi,
-      requestValidatorName: "Validate Payload and parameters",
-      validateRequestBody: true,
-      validateRequestParameters: true,
-    });
-
     this.urlHashesResource.addMethod("POST", new apigateway.LambdaIntegration(createUrlHashFunction, { proxy: true }), {
       authorizationType: apigateway.AuthorizationType.COGNITO,
       authorizer: props.authorizer,
@@ -215,7 +280,7 @@ export class CoreMicroserviceStack extends cdk.NestedStack implements IObservabi
       requestModels: {
         "application/json": requestModel,
       },
-      requestValidator: requestValidator,
+      requestValidator: this.requestValidator,
       methodResponses: [
         {
           statusCode: "200",
@@ -229,10 +294,63 @@ export class CoreMicroserviceStack extends cdk.NestedStack implements IObservabi
     return createUrlHashFunction;
   }
 
+  private bindCreateUrlHashesFunction(props: CoreMicroserviceStackProps): lambda.Function {
+    const createUrlHashesFunction = new pylambda.PythonFunction(this, "create-url-hashes-function", {
+      ...this.defaultFunctionSettings,
+      index: "zoorl/adapters/create_url_hashes_handler.py",
+      // Batches of up to 1000 URLs need more time than single writes
+      timeout: cdk.Duration.seconds(30),
+    });
+    this.urlHashesTable.grantWriteData(createUrlHashesFunction);
+
+    // POST /u/batch
+    const requestModel = props.restApi.addModel(
+      "CreateUrlHashesRequestModel",
+      jsonSchema({
+        modelName: "CreateUrlHashesRequestModel",
+        properties: {
+          items: {
+            type: apigateway.JsonSchemaType.ARRAY,
+            maxItems: 1000,
+            items: {
+              type: apigateway.JsonSchemaType.OBJECT,
+              properties: {
+                url: { type: apigateway.JsonSchemaType.STRING },
+                ttl: { type: apigateway.JsonSchemaType.INTEGER },
+              },
+              required: ["url"],
+            },
+          },
+        },
+        requiredProperties: ["items"],
+      })
+    );
+
+    this.urlHashesResource
+      .addResource("batch")
+      .addMethod("POST", new apigateway.LambdaIntegration(createUrlHashesFunction, { proxy: true }), {
+        authorizationType: apigateway.AuthorizationType.COGNITO,
+        authorizer: props.authorizer,
+
+        requestModels: {
+          "application/json": requestModel,
+        },
+        requestValidator: this.requestValidator,
+      });
+
+    return createUrlHashesFunction;
+  }
+
   private bindReadUrlHashFunction(props: CoreMicroserviceStackProps): lambda.Function {
     const readUrlHashFunction = new pylambda.PythonFunction(this, "read-url-hash-function", {
       ...this.defaultFunctionSettings,
       index: "zoorl/adapters/read_url_hash_handler.py",
+      environment: {
+        ...this.defaultFunctionSettings.environment,
+        // Hot path: one invocation out of a hundred is logged, and never the whole event
+        POWERTOOLS_LOGGER_LOG_EVENT: "false",
+        REQUEST_LOG_SAMPLE_RATE: "0.01",
+      },
     });
     this.urlHashesTable.grantReadData(readUrlHashFunction);
 
@@ -261,12 +379,105 @@ export class CoreMicroserviceStack extends cdk.NestedStack implements IObservabi
     return readUrlHashFunction;
   }
 
+  private bindReadUrlHashesFunction(props: CoreMicroserviceStackProps): lambda.Function {
+    const readUrlHashesFunction = new pylambda.PythonFunction(this, "read-url-hashes-function", {
+      ...this.defaultFunctionSettings,
+      index: "zoorl/adapters/read_url_hashes_handler.py",
+    });
+    this.urlHashesTable.grantReadData(readUrlHashesFunction);
+
+    // POST /u/resolve
+    const requestModel = props.restApi.addModel(
+      "ReadUrlHashesRequestModel",
+      jsonSchema({
+        modelName: "ReadUrlHashesRequestModel",
+        properties: {
+          hashes: {
+            type: apigateway.JsonSchemaType.ARRAY,
+            maxItems: 500,
+            items: { type: apigateway.JsonSchemaType.STRING },
+          },
+        },
+        requiredProperties: ["hashes"],
+      })
+    );
+
+    this.urlHashesResource
+      .addResource("resolve")
+      .addMethod("POST", new apigateway.LambdaIntegration(readUrlHashesFunction, { proxy: true }), {
+        authorizationType: apigateway.AuthorizationType.NONE,
+
+        requestModels: {
+          "application/json": requestModel,
+        },
+        requestValidator: this.requestValidator,
+      });
+
+    return readUrlHashesFunction;
+  }
+
+  private bindCreateUrlAliasFunction(props: CoreMicroserviceStackProps): lambda.Function {
+    const createUrlAliasFunction = new pylambda.PythonFunction(this, "create-url-alias-function", {
+      ...this.defaultFunctionSettings,
+      index: "zoorl/adapters/create_url_alias_handler.py",
+    });
+    this.urlHashesTable.grantWriteData(createUrlAliasFunction);
+
+    // PUT /u/{url_hash}: aliases are hashes, so they share the resource of GET /u/{url_hash}
+    const requestModel = props.restApi.addModel(
+      "CreateUrlAliasRequestModel",
+      jsonSchema({
+        modelName: "CreateUrlAliasRequestModel",
+        properties: {
+          url: { type: apigateway.JsonSchemaType.STRING },
+          ttl: { type: apigateway.JsonSchemaType.INTEGER },
+        },
+        requiredProperties: ["url"],
+      })
+    );
+
+    (this.urlHashesResource.getResource("{url_hash}") ?? this.urlHashesResource.addResource("{url_hash}"))
+      .addMethod("PUT", new apigateway.LambdaIntegration(createUrlAliasFunction, { proxy: true }), {
+        authorizationType: apigateway.AuthorizationType.COGNITO,
+        authorizer: props.authorizer,
+
+        requestModels: {
+          "application/json": requestModel,
+        },
+        requestValidator: this.requestValidator,
+        methodResponses: [
+          {
+            statusCode: "200",
+            responseModels: {
+              "application/json": this.responseModels.urlHashResponseModel,
+            },
+          },
+        ],
+      });
+
+    return createUrlAliasFunction;
+  }
+
   private bindRedirectToUrlFunction(props: CoreMicroserviceStackProps): lambda.Function {
     const readUrlHashFunction = new pylambda.PythonFunction(this, "redirect-to-url-hash-function", {
       ...this.defaultFunctionSettings,
       index: "zoorl/adapters/redirect_handler.py",
+      // Single route: serves GET /r/{url_hash} without the Powertools resolver
+      handler: "handle_fast",
+      environment: {
+        ...this.defaultFunctionSettings.environment,
+        // Clicks per minute as metrics, and per hash totals for ranking the redirect snapshot: the totals
+        // are handed to another function with one asynchronous invocation, rather than written here
+        CLICK_ANALYTICS_SINKS: "emf,function",
+        CLICK_ANALYTICS_FUNCTION: this.recordClicksFunction.functionName,
+        // Hot path: one invocation out of a hundred is logged, and never the whole event
+        POWERTOOLS_LOGGER_LOG_EVENT: "false",
+        REQUEST_LOG_SAMPLE_RATE: "0.01",
+      },
     });
     this.urlHashesTable.grantReadData(readUrlHashFunction);
+    // Hands the access counts of the redirected hashes to the function writing them
+    this.recordClicksFunction.grantInvoke(readUrlHashFunction);
     // GET /r/{url_hash}
     this.redirectResource
       .addResource("{url_hash}")
@@ -291,4 +502,57 @@ export class CoreMicroserviceStack extends cdk.NestedStack implements IObservabi
 
     return readUrlHashFunction;
   }
+
+  private bindRecordClicksFunction(): lambda.Function {
+    const recordClicksFunction = new pylambda.PythonFunction(this, "record-clicks-function", {
+      ...this.defaultFunctionSettings,
+      index: "zoorl/adapters/record_clicks_handler.py",
+      // Each invocation writes up to CLICK_ANALYTICS_SHIPMENT_SIZE (1000) counts, one at a time
+      timeout: cdk.Duration.minutes(1),
+      // Adding counts is not idempotent: a retry after a partial failure would count some clicks twice
+      retryAttempts: 0,
+    });
+    // Adds the access counts of the redirected hashes
+    this.urlHashesTable.grantReadWriteData(recordClicksFunction);
+
+    return recordClicksFunction;
+  }
+
+  private bindPurgeExpiredUrlHashesFunction(): lambda.Function {
+    const purgeExpiredUrlHashesFunction = new pylambda.PythonFunction(this, "purge-expired-url-hashes-function", {
+      ...this.defaultFunctionSettings,
+      index: "zoorl/adapters/purge_expired_url_hashes_handler.py",
+      timeout: cdk.Duration.minutes(5),
+      environment: {
+        ...this.defaultFunctionSettings.environment,
+        // Keep each run well within the function timeout
+        PURGE_MAX_ITEMS: "50000",
+      },
+    });
+    this.urlHashesTable.grantReadWriteData(purgeExpiredUrlHashesFunction);
+
+    new events.Rule(this, "PurgeExpiredUrlHashesSchedule", {
+      schedule: events.Schedule.rate(cdk.Duration.hours(6)),
+      targets: [new targets.LambdaFunction(purgeExpiredUrlHashesFunction)],
+    });
+
+    return purgeExpiredUrlHashesFunction;
+  }
+
+  private bindMigrateUrlHashesFunction(): lambda.Function {
+    // Not scheduled: invoked by hand after deploying a new item layout
+    const migrateUrlHashesFunction = new pylambda.PythonFunction(this, "migrate-url-hashes-function", {
+      ...this.defaultFunctionSettings,
+      index: "zoorl/adapters/migrate_url_hashes_handler.py",
+      timeout: cdk.Duration.minutes(15),
+      environment: {
+        ...this.defaultFunctionSettings.environment,
+        MIGRATION_TOTAL_SEGMENTS: "4",
+        MIGRATION_MAX_ITEMS_PER_SEGMENT: "100000",
+      },
+    });
+    this.urlHashesTable.grantReadWriteData(migrateUrlHashesFunction);
+
+    return migrateUrlHashesFunction;
+  }
 }
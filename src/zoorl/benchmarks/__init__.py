@@ -0,0 +1 @@
+"""Micro and load benchmarks for Zoorl (run as modules, e.g. 'python -m benchmarks.bench_hashing')."""
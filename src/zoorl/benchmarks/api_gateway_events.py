@@ -0,0 +1,70 @@
+"""Synthetic API Gateway (REST, proxy integration) events for driving the Lambda handlers in-process."""
+
+import json
+
+from typing import Any, Dict, Optional
+
+
+class FakeLambdaContext:
+    """The attributes of the Lambda context the Powertools decorators read."""
+    function_name = "zoorl-benchmark"
+    function_version = "$LATEST"
+    memory_limit_in_mb = 128
+    invoked_function_arn = "arn:aws:lambda:us-east-1:123456789012:function:zoorl-benchmark"
+    aws_request_id = "00000000-0000-0000-0000-000000000000"
+
+
+def api_gateway_event(
+    method: str,
+    resource: str,
+    path: str,
+    path_parameters: Optional[Dict[str, str]] = None,
+    body: Optional[Any] = None
+) -> Dict[str, Any]:
+    """Returns an API Gateway proxy event.
+
+    Args:
+        method: the HTTP method
+        resource: the resource template, e.g. "/r/{url_hash}"
+        path: the actual path
+        path_parameters: the values of the path parameters, if any
+        body: the request payload, serialized as JSON if specified
+
+    Returns:
+        the event, as received by a handler
+    """
+    return {
+        "resource": resource,
+        "path": path,
+        "httpMethod": method,
+        "headers": {"Content-Type": "application/json"},
+        "multiValueHeaders": {},
+        "queryStringParameters": None,
+        "multiValueQueryStringParameters": None,
+        "pathParameters": path_parameters,
+        "stageVariables": None,
+        "requestContext": {
+            "requestId": "c6af9ac6-7b61-11e6-9a41-93e8deadbeef",
+            "resourcePath": resource,
+            "httpMethod": method,
+            "path": f"/prod{path}",
+            "stage": "prod"
+        },
+        "body": json.dumps(body) if body is not None else None,
+        "isBase64Encoded": False
+    }
+
+
+def create_event(url: str, **fields: Any) -> Dict[str, Any]:
+    """Returns the event of 'POST /u' creating a hash for the URL, with the other payload fields (e.g., 'reuse')."""
+    return api_gateway_event("POST", "/u", "/u", body={"url": url, **fields})
+
+
+def read_event(url_hash: str) -> Dict[str, Any]:
+    """Returns the event of 'GET /u/{url_hash}'."""
+    return api_gateway_event("GET", "/u/{url_hash}", f"/u/{url_hash}", {"url_hash": url_hash})
+
+
+def redirect_event(url_hash: str) -> Dict[str, Any]:
+    """Returns the event of 'GET /r/{url_hash}'."""
+    return api_gateway_event("GET", "/r/{url_hash}", f"/r/{url_hash}", {"url_hash": url_hash})
@@ -0,0 +1,137 @@
+"""Per-call CPU time of the DynamoDB repositories, against moto.
+
+Compares the resource-based 'DynamoDBUrlHashRepository' with the low-level
+'DynamoDBClientUrlHashRepository' on the same in-memory table. Moto emulates
+DynamoDB in-process, so its own work is included in both numbers: the
+difference between the two is the client-side cost of the resource layer
+(serialization, deserialization and object wrapping).
+
+Since moto's emulation can dwarf that difference, '--stub' replaces moto with
+a botocore Stubber that returns canned responses, so that only the client-side
+CPU time (request building, validation and response handling) is measured.
+
+Usage:
+    python -m benchmarks.bench_dynamodb_repositories [--items 1000] [--calls 2000] [--stub]
+"""
+
+import argparse
+import copy
+import os
+import random
+import time
+
+from typing import Callable
+
+import boto3
+
+from botocore.stub import Stubber
+from moto import mock_dynamodb
+
+from zoorl.adapters.dynamodb_client_model import DynamoDBClientUrlHashRepository, client_config
+from zoorl.adapters.dynamodb_model import DynamoDBUrlHashRepository
+from zoorl.core.model import UrlHash
+
+TABLE_NAME = "UrlHashes"
+
+
+def create_table() -> None:
+    boto3.resource("dynamodb").create_table(
+        TableName=TABLE_NAME,
+        KeySchema=[
+            {"AttributeName": "PK", "KeyType": "HASH"},
+            {"AttributeName": "SK", "KeyType": "RANGE"}
+        ],
+        AttributeDefinitions=[
+            {"AttributeName": "PK", "AttributeType": "S"},
+            {"AttributeName": "SK", "AttributeType": "S"}
+        ],
+        BillingMode="PAY_PER_REQUEST"
+    )
+
+
+def cpu_time_per_call(function: Callable[[int], None], calls: int) -> float:
+    """Returns the average process CPU time of a call, in microseconds."""
+    start = time.process_time()
+    for i in range(calls):
+        function(i)
+    return (time.process_time() - start) / calls * 1e6
+
+
+def stubbed_cpu_time_per_call(client, operation_name: str, response: dict, function: Callable[[int], None], calls: int) -> float:
+    """Same as 'cpu_time_per_call', but the client returns canned responses queued before the measurement."""
+    with Stubber(client) as stubber:
+        for _ in range(calls):
+            # The resource layer deserializes responses in place, so each call needs its own copy
+            stubber.add_response(operation_name, copy.deepcopy(response))
+        return cpu_time_per_call(function, calls)
+
+
+def run_stubbed(calls: int) -> None:
+    ttl = int(time.time()) + 3600
+    resource_table = boto3.resource("dynamodb", config=client_config()).Table(TABLE_NAME)
+    client = boto3.client("dynamodb", config=client_config())
+
+    repositories = {
+        "resource": (DynamoDBUrlHashRepository(resource_table), resource_table.meta.client),
+        "client": (DynamoDBClientUrlHashRepository(client, TABLE_NAME), client),
+    }
+    item = {"PK": {"S": "hash0"}, "SK": {"S": "hash0"}, "url": {"S": "https://www.example.com/0"}, "ttl": {"S": str(ttl)}}
+
+    print(f"{'operation':<14} {'resource':>12} {'client':>12}  (client-side CPU us/call, stubbed)")
+    operations = {
+        "get_by_hash": ("get_item", {"Item": item}, lambda repository: lambda i: repository.get_by_hash("hash0")),
+        "get (miss)": ("get_item", {}, lambda repository: lambda i: repository.get_by_hash("missing")),
+        "save": ("put_item", {}, lambda repository: lambda i: repository.save(UrlHash(f"new{i}", f"https://www.example.com/new/{i}", ttl))),
+    }
+    for name, (operation_name, response, operation) in operations.items():
+        timings = [
+            stubbed_cpu_time_per_call(stub_client, operation_name, response, operation(repository), calls)
+            for repository, stub_client in repositories.values()
+        ]
+        print(f"{name:<14} {timings[0]:12.1f} {timings[1]:12.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=1000, help="number of items in the table")
+    parser.add_argument("--calls", type=int, default=2000, help="number of calls per operation")
+    parser.add_argument("--stub", action="store_true", help="measure client-side cost only, with canned responses")
+    args = parser.parse_args()
+
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+
+    if args.stub:
+        run_stubbed(args.calls)
+        return
+
+    with mock_dynamodb():
+        create_table()
+
+        repositories = {
+            "resource": DynamoDBUrlHashRepository(
+                boto3.resource("dynamodb", config=client_config()).Table(TABLE_NAME)
+            ),
+            "client": DynamoDBClientUrlHashRepository(
+                boto3.client("dynamodb", config=client_config()), TABLE_NAME
+            ),
+        }
+
+        ttl = int(time.time()) + 3600
+        repositories["client"].save_many([UrlHash(f"hash{i}", f"https://www.example.com/{i}", ttl) for i in range(args.items)])
+        keys = [f"hash{random.randrange(args.items)}" for _ in range(args.calls)]
+
+        print(f"{'operation':<14} {'resource':>12} {'client':>12}  (CPU us/call)")
+        operations = {
+            "get_by_hash": lambda repository: lambda i: repository.get_by_hash(keys[i]),
+            "get (miss)": lambda repository: lambda i: repository.get_by_hash(f"missing{i}"),
+            "save": lambda repository: lambda i: repository.save(UrlHash(f"new{i}", f"https://www.example.com/new/{i}", ttl)),
+        }
+        for name, operation in operations.items():
+            timings = [cpu_time_per_call(operation(repository), args.calls) for repository in repositories.values()]
+            print(f"{name:<14} {timings[0]:12.1f} {timings[1]:12.1f}")
+
+
+if __name__ == "__main__":
+    main()
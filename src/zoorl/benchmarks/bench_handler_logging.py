@@ -0,0 +1,80 @@
+"""CPU time of the read and redirect handlers, per log level and request log sample rate.
+
+Invokes the Lambda entry points in-process with synthetic API Gateway events, on
+a SQLite in-memory repository loaded with a few URL hashes, and reports the
+process CPU time per invocation: the handlers do little else than resolving the
+route and logging, so logging is most of what varies between the configurations.
+
+The logs are written to /dev/null, so their formatting and serialization are
+measured, but not the terminal.
+
+Usage:
+    python -m benchmarks.bench_handler_logging [--invocations 20000] [--sample-rates 1,0.01]
+"""
+
+import argparse
+import logging
+import os
+import time
+
+from typing import Any, Callable, Dict, List
+
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+os.environ.setdefault("POWERTOOLS_TRACE_DISABLED", "true")
+os.environ.setdefault("URL_HASHES_BACKEND", "sqlite")
+os.environ.setdefault("URL_HASHES_SQLITE_PATH", ":memory:")
+
+from benchmarks.api_gateway_events import FakeLambdaContext, read_event, redirect_event
+from zoorl.adapters import read_url_hash_handler, redirect_handler
+from zoorl.adapters.lambda_support import get_url_hash_repository, logger, request_log
+from zoorl.core.model import UrlHash
+
+LEVELS = ["DEBUG", "INFO", "WARNING"]
+
+
+def measure(handle: Callable[[Dict[str, Any], Any], Dict[str, Any]], events: List[Dict[str, Any]], invocations: int) -> float:
+    """Returns the CPU time (microseconds) per invocation of the handler, cycling over the events."""
+    context = FakeLambdaContext()
+    for event in events:
+        handle(event, context)
+
+    start = time.process_time()
+    for index in range(invocations):
+        handle(events[index % len(events)], context)
+    return (time.process_time() - start) / invocations * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--invocations", type=int, default=20000)
+    parser.add_argument("--sample-rates", default="1,0.01", help="comma-separated REQUEST_LOG_SAMPLE_RATE values")
+    args = parser.parse_args()
+
+    hashes = [f"hash{index:03}" for index in range(100)]
+    repository = get_url_hash_repository()
+    repository.save_many([UrlHash(hash=hash, url=f"https://example.com/{hash}", ttl=4102444800) for hash in hashes])
+
+    # Redirects would be counted otherwise, and shipped to the repository on the way
+    redirect_handler.click_analytics.repository_factory = None
+
+    devnull = open(os.devnull, "w")
+    logger.registered_handler.setStream(devnull)
+
+    handlers = {
+        "read": (read_url_hash_handler.handle, [read_event(hash) for hash in hashes]),
+        "redirect": (redirect_handler.handle, [redirect_event(hash) for hash in hashes])
+    }
+
+    print(f"{'level':<8} {'sample rate':>11} " + " ".join(f"{name + ' (µs)':>15}" for name in handlers))
+    for level in LEVELS:
+        logger.setLevel(getattr(logging, level))
+        for sample_rate in [float(rate) for rate in args.sample_rates.split(",")]:
+            request_log.sample_rate = sample_rate
+            timings = [measure(handle, events, args.invocations) for handle, events in handlers.values()]
+            print(f"{level:<8} {sample_rate:>11g} " + " ".join(f"{timing:>15.1f}" for timing in timings))
+
+    devnull.close()
+
+
+if __name__ == "__main__":
+    main()
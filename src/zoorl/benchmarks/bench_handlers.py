@@ -0,0 +1,300 @@
+"""Throughput, latency and memory of the create, read and redirect Lambda entry points.
+
+Drives 'create_url_hash_handler.handle', 'read_url_hash_handler.handle' and
+'redirect_handler.handle' in-process with synthetic API Gateway events, as the
+Lambda runtime would, against either moto's DynamoDB or a SQLite in-memory
+repository. The repositories are built as in Lambda (see 'lambda_support'), so
+the URL hash cache is part of what is measured.
+
+Keys are drawn before the measurement from a fixed population (URLs to create,
+stored hashes to read and to redirect), either uniformly or with a Zipfian
+distribution, where the key of rank k is drawn with a weight of 1 / k^s: the
+latter is closer to actual short link traffic, where a few links get most
+of the clicks, and favors the cache.
+
+Every invocation is timed with a monotonic clock (ops/s, p50, p90, p99 and max
+latency). Memory is measured on a separate, shorter pass under tracemalloc, which
+slows the invocations down: for each request, the peak of memory allocated while
+handling it and the memory still allocated afterwards (e.g., cache entries).
+
+The report is written as JSON (to stdout, or to '--output'), with the commit
+measured, so that the results of two commits can be compared: '--baseline'
+prints the changes from a previous report.
+
+Usage:
+    python -m benchmarks.bench_handlers [--backend sqlite|moto] [--keys 1000] [--requests 5000]
+                                        [--memory-requests 500] [--zipf-exponent 1.1] [--seed 42]
+                                        [--output report.json] [--baseline previous.json]
+"""
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from contextlib import nullcontext
+from typing import Any, Callable, Dict, List, Optional
+
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+os.environ.setdefault("POWERTOOLS_TRACE_DISABLED", "true")
+os.environ.setdefault("POWERTOOLS_LOGGER_LOG_EVENT", "false")
+# Clicks would be shipped to the repository on the way, and measured with the redirects
+os.environ.setdefault("CLICK_ANALYTICS_SINKS", "")
+# As deployed for the read and redirect functions
+os.environ.setdefault("REQUEST_LOG_SAMPLE_RATE", "0.01")
+
+from benchmarks.api_gateway_events import create_event, read_event, redirect_event, FakeLambdaContext
+
+TABLE_NAME = "UrlHashesHandlersBench"
+
+Handler = Callable[[Dict[str, Any], Any], Dict[str, Any]]
+
+
+def uniform_keys(population: List[str], count: int, rng: random.Random) -> List[str]:
+    """Returns 'count' keys drawn uniformly from the population."""
+    return rng.choices(population, k=count)
+
+
+def zipf_keys(population: List[str], count: int, rng: random.Random, exponent: float) -> List[str]:
+    """Returns 'count' keys drawn from the population, the key of rank k with a weight of 1 / k^exponent."""
+    # The ranks are shuffled, so that the most drawn keys are not the first ones written
+    ranked = rng.sample(population, len(population))
+    cumulative_weights = list(itertools.accumulate(1 / rank ** exponent for rank in range(1, len(ranked) + 1)))
+    return rng.choices(ranked, cum_weights=cumulative_weights, k=count)
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Returns the value below which the fraction of the (sorted) values falls (nearest rank)."""
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def measure_latency(handle: Handler, events: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Invokes the handler with each event, and returns the throughput and latency figures."""
+    context = FakeLambdaContext()
+    latencies = []
+    status_codes: Dict[str, int] = {}
+
+    start = time.perf_counter()
+    for event in events:
+        invocation_start = time.perf_counter()
+        response = handle(event, context)
+        latencies.append(time.perf_counter() - invocation_start)
+
+        status_code = str(response["statusCode"])
+        status_codes[status_code] = status_codes.get(status_code, 0) + 1
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests": len(events),
+        "ops_per_sec": round(len(events) / elapsed, 1),
+        "latency_ms": {
+            "mean": round(statistics.fmean(latencies) * 1e3, 4),
+            "p50": round(percentile(latencies, 0.50) * 1e3, 4),
+            "p90": round(percentile(latencies, 0.90) * 1e3, 4),
+            "p99": round(percentile(latencies, 0.99) * 1e3, 4),
+            "max": round(latencies[-1] * 1e3, 4)
+        },
+        "status_codes": status_codes
+    }
+
+
+def measure_memory(handle: Handler, events: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Invokes the handler with each event under tracemalloc, and returns the memory figures (bytes per request)."""
+    context = FakeLambdaContext()
+    peaks = []
+    retained = []
+
+    tracemalloc.start()
+    try:
+        for event in events:
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            handle(event, context)
+            after, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - before)
+            retained.append(after - before)
+    finally:
+        tracemalloc.stop()
+
+    peaks.sort()
+    return {
+        "requests": len(events),
+        "peak_bytes_mean": round(statistics.fmean(peaks)),
+        "peak_bytes_p99": percentile(peaks, 0.99),
+        "retained_bytes_mean": round(statistics.fmean(retained), 1)
+    }
+
+
+def print_changes(baseline: Dict[str, Any], report: Dict[str, Any]) -> None:
+    """Prints the relative changes of throughput, p99 latency and peak memory from the baseline report."""
+    previous = {(result["handler"], result["distribution"]): result for result in baseline["results"]}
+    print(f"changes from {baseline.get('commit') or 'the baseline'}:", file=sys.stderr)
+
+    for result in report["results"]:
+        before = previous.get((result["handler"], result["distribution"]))
+        if before is None:
+            continue
+
+        changes = [
+            (label, (after_value - before_value) / before_value * 100 if before_value else 0.0)
+            for label, before_value, after_value in [
+                ("ops/s", before["ops_per_sec"], result["ops_per_sec"]),
+                ("p99", before["latency_ms"]["p99"], result["latency_ms"]["p99"]),
+                ("peak", before["memory"]["peak_bytes_mean"], result["memory"]["peak_bytes_mean"])
+            ]
+        ]
+        print(
+            f"{result['handler']:<9}{result['distribution']:<8}" + "  ".join(f"{label} {change:+7.1f}%" for label, change in changes),
+            file=sys.stderr
+        )
+
+
+def create_table() -> None:
+    import boto3
+
+    boto3.resource("dynamodb").create_table(
+        TableName=TABLE_NAME,
+        KeySchema=[
+            {"AttributeName": "PK", "KeyType": "HASH"},
+            {"AttributeName": "SK", "KeyType": "RANGE"}
+        ],
+        AttributeDefinitions=[
+            {"AttributeName": "PK", "AttributeType": "S"},
+            {"AttributeName": "SK", "AttributeType": "S"}
+        ],
+        BillingMode="PAY_PER_REQUEST"
+    )
+
+
+def current_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    # The handlers build their repository (and cache) once, as in Lambda, so the backend is set first
+    from zoorl.adapters import create_url_hash_handler, read_url_hash_handler, redirect_handler
+    from zoorl.adapters.lambda_support import get_url_hash_repository, logger, url_hash_cache
+    from zoorl.core.model import UrlHash
+    from zoorl.core.utils import compute_hashes
+
+    if args.backend == "moto":
+        create_table()
+
+    # Logs are part of each invocation, but the terminal is not
+    devnull = open(os.devnull, "w")
+    logger.registered_handler.setStream(devnull)
+
+    rng = random.Random(args.seed)
+    stored_urls = [f"https://www.example.com/stored/{index}" for index in range(args.keys)]
+    stored_hashes = compute_hashes(stored_urls)
+    get_url_hash_repository().save_many([
+        UrlHash(hash=hash, url=url, ttl=4102444800) for hash, url in zip(stored_hashes, stored_urls)
+    ])
+
+    distributions = {
+        "uniform": lambda population, count: uniform_keys(population, count, rng),
+        "zipf": lambda population, count: zipf_keys(population, count, rng, args.zipf_exponent)
+    }
+
+    results = []
+    for distribution, draw in distributions.items():
+        # Created URLs are reused when drawn again, as the create function does with 'reuse'
+        new_urls = [f"https://www.example.com/{distribution}/{index}" for index in range(args.keys)]
+        handlers = {
+            "create": (create_url_hash_handler.handle, new_urls, lambda url: create_event(url, reuse=True)),
+            "read": (read_url_hash_handler.handle, stored_hashes, read_event),
+            "redirect": (redirect_handler.handle, stored_hashes, redirect_event)
+        }
+
+        for name, (handle, population, build_event) in handlers.items():
+            # Each run starts cold: the cache and the reuse memo only hold what the run itself put there
+            url_hash_cache.clear()
+            create_url_hash_handler.get_usecase.cache_clear()
+
+            # One draw for both passes, so that they share the same ranking of the keys
+            events = [build_event(key) for key in draw(population, args.requests + args.memory_requests)]
+            events, memory_events = events[:args.requests], events[args.requests:]
+
+            result = {"handler": name, "distribution": distribution}
+            result.update(measure_latency(handle, events))
+            result["memory"] = measure_memory(handle, memory_events)
+            results.append(result)
+            print(
+                f"{name:<9}{distribution:<8}{result['ops_per_sec']:>10,.0f} ops/s  "
+                f"p50 {result['latency_ms']['p50']:7.3f} ms  p99 {result['latency_ms']['p99']:7.3f} ms  "
+                f"peak {result['memory']['peak_bytes_mean']:>8,} B/request",
+                file=sys.stderr
+            )
+
+    devnull.close()
+
+    return {
+        "benchmark": "handlers",
+        "commit": current_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": {
+            "backend": args.backend,
+            "keys": args.keys,
+            "requests": args.requests,
+            "memory_requests": args.memory_requests,
+            "zipf_exponent": args.zipf_exponent,
+            "seed": args.seed
+        },
+        "results": results
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", choices=["sqlite", "moto"], default="sqlite")
+    parser.add_argument("--keys", type=int, default=1000, help="number of distinct URLs and hashes")
+    parser.add_argument("--requests", type=int, default=5000, help="timed invocations per handler and distribution")
+    parser.add_argument("--memory-requests", type=int, default=500, help="invocations measured under tracemalloc")
+    parser.add_argument("--zipf-exponent", type=float, default=1.1)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="the JSON report file (default: stdout)")
+    parser.add_argument("--baseline", help="a previous JSON report, to print the changes from")
+    args = parser.parse_args()
+
+    if args.backend == "moto":
+        from moto import mock_dynamodb
+
+        os.environ["URL_HASHES_BACKEND"] = "dynamodb"
+        os.environ["URL_HASHES_TABLE"] = TABLE_NAME
+    else:
+        os.environ["URL_HASHES_BACKEND"] = "sqlite"
+        os.environ["URL_HASHES_SQLITE_PATH"] = ":memory:"
+
+    with mock_dynamodb() if args.backend == "moto" else nullcontext():
+        report = run(args)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            print_changes(json.load(file), report)
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Microbenchmark for URL hash generation.
+
+Compares the original hex-string based hashing (SHA-256 hex digest parsed back
+into an int, then Base62-encoded one character at a time) with the raw-digest,
+fixed-width engine in 'zoorl.core.utils', both one URL at a time and batched.
+
+Usage:
+    python -m benchmarks.bench_hashing [--urls 1000000]
+"""
+
+import argparse
+import hashlib
+import time
+
+from typing import Callable, List
+
+from zoorl.core.utils import compute_hash, compute_hashes, to_base_62
+
+
+def legacy_compute_hash(url: str) -> str:
+    """The original 'compute_hash' implementation, kept here as baseline."""
+    hash = int(hashlib.sha256(url.encode('utf-8')).hexdigest(), 16) % 10**12
+
+    return to_base_62(hash)
+
+
+def measure(name: str, function: Callable[[List[str]], List[str]], urls: List[str]) -> List[str]:
+    start = time.perf_counter()
+    hashes = function(urls)
+    elapsed = time.perf_counter() - start
+
+    print(f"{name:<28} {elapsed:8.3f} s  {len(urls) / elapsed:12,.0f} URLs/s  {elapsed / len(urls) * 1e9:8.0f} ns/URL")
+    return hashes
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--urls", type=int, default=1_000_000, help="number of synthetic URLs to hash")
+    args = parser.parse_args()
+
+    urls = [f"https://www.example.com/articles/{i}?utm_source=newsletter" for i in range(args.urls)]
+
+    legacy = measure("legacy compute_hash", lambda urls: [legacy_compute_hash(url) for url in urls], urls)
+    single = measure("compute_hash", lambda urls: [compute_hash(url) for url in urls], urls)
+    batched = measure("compute_hashes (batched)", compute_hashes, urls)
+
+    assert single == batched
+    # The new engine only differs by left-padding short hashes to a fixed width
+    assert all(new == old.rjust(len(new), "0") for new, old in zip(batched, legacy))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Cold-start import cost of each Lambda handler.
+
+Every handler module is imported in a fresh interpreter with 'python -X importtime',
+which is what AWS Lambda pays during the init phase of a new container. The
+cumulative import time of the handler module and its heaviest dependencies are
+reported, so that regressions (e.g., a new eager boto3 call or a type-stub
+import) show up when comparing runs.
+
+Usage:
+    python -m benchmarks.bench_import_time [--repeat 5] [--top 5] [--json] [--max-ms 400]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+from typing import Dict, List, Tuple
+
+HANDLERS = [
+    "zoorl.adapters.create_url_hash_handler",
+    "zoorl.adapters.create_url_hashes_handler",
+    "zoorl.adapters.read_url_hash_handler",
+    "zoorl.adapters.read_url_hashes_handler",
+    "zoorl.adapters.redirect_handler",
+]
+
+# Same settings as the deployed functions (see the CDK microservice stack)
+LAMBDA_ENVIRONMENT = {
+    "AWS_DEFAULT_REGION": "us-east-1",
+    "URL_HASHES_TABLE": "UrlHashes",
+    "POWERTOOLS_SERVICE_NAME": "zoorl",
+    "POWERTOOLS_TRACE_DISABLED": "true",
+}
+
+
+def import_times(module: str) -> List[Tuple[str, int]]:
+    """Returns the (module, cumulative microseconds) pairs reported by 'python -X importtime'."""
+    environment = {**os.environ, **LAMBDA_ENVIRONMENT}
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        env=environment, capture_output=True, text=True, check=True
+    )
+
+    times = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        times.append((name.strip(), int(cumulative)))
+    return times
+
+
+def measure(module: str, repeat: int, top: int) -> Dict:
+    runs = [dict(import_times(module)) for _ in range(repeat)]
+
+    # The best run is the least affected by noise (e.g., a cold filesystem cache)
+    best = min(runs, key=lambda run: run[module])
+    heaviest = sorted(
+        ((name, cumulative) for name, cumulative in best.items() if name != module and "." not in name),
+        key=lambda entry: entry[1], reverse=True
+    )[:top]
+
+    return {
+        "module": module,
+        "import_ms": best[module] / 1000,
+        "heaviest": [{"module": name, "import_ms": cumulative / 1000} for name, cumulative in heaviest],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="fresh interpreters per handler (best run is kept)")
+    parser.add_argument("--top", type=int, default=5, help="number of heaviest top-level packages to report")
+    parser.add_argument("--json", action="store_true", help="print machine-readable JSON")
+    parser.add_argument("--max-ms", type=float, default=None, help="exit with an error if any handler is slower")
+    args = parser.parse_args()
+
+    results = [measure(module, args.repeat, args.top) for module in HANDLERS]
+
+    if args.json:
+        print(json.dumps({"python": sys.version.split()[0], "handlers": results}, indent=2))
+    else:
+        for result in results:
+            heaviest = ", ".join(f"{entry['module']} {entry['import_ms']:.1f}" for entry in result["heaviest"])
+            print(f"{result['module']:<45} {result['import_ms']:8.1f} ms  ({heaviest})")
+
+    if args.max_ms is not None and any(result["import_ms"] > args.max_ms for result in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
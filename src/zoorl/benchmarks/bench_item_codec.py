@@ -0,0 +1,65 @@
+"""Microbenchmark for encoding and decoding DynamoDB items.
+
+Compares, for the same UrlHash entities:
+  * the boto3 TypeSerializer/TypeDeserializer, as used by the resource layer,
+    on the legacy layout (string TTL);
+  * the hand-written codec in 'zoorl.adapters.dynamodb_codec', both on the
+    current layout (numeric TTL) and on legacy items.
+
+Usage:
+    python -m benchmarks.bench_item_codec [--items 200000]
+"""
+
+import argparse
+import time
+
+from typing import Any, Callable, List
+
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+
+from zoorl.adapters.dynamodb_codec import decode, decode_plain, encode
+from zoorl.core.model import UrlHash
+
+
+def measure(name: str, function: Callable[[List[Any]], List[Any]], values: List[Any]) -> List[Any]:
+    start = time.perf_counter()
+    results = function(values)
+    elapsed = time.perf_counter() - start
+
+    print(f"{name:<36} {elapsed:8.3f} s  {len(values) / elapsed:12,.0f} items/s  {elapsed / len(values) * 1e9:8.0f} ns/item")
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=200_000, help="number of synthetic items to encode and decode")
+    args = parser.parse_args()
+
+    url_hashes = [UrlHash(f"{i:07d}", f"https://www.example.com/articles/{i}", 4102444800 + i) for i in range(args.items)]
+
+    serializer = TypeSerializer()
+    deserializer = TypeDeserializer()
+
+    def serialize_legacy(url_hash: UrlHash) -> dict:
+        return {
+            key: serializer.serialize(value)
+            for key, value in {"PK": url_hash.hash, "SK": url_hash.hash, "url": url_hash.url, "ttl": str(url_hash.ttl)}.items()
+        }
+
+    legacy_items = measure("encode: TypeSerializer (v1)", lambda values: [serialize_legacy(value) for value in values], url_hashes)
+    items = measure("encode: codec (v2)", lambda values: [encode(value) for value in values], url_hashes)
+
+    deserialized = measure(
+        "decode: TypeDeserializer (v1)",
+        lambda values: [{key: deserializer.deserialize(value) for key, value in item.items()} for item in values],
+        legacy_items
+    )
+    legacy_decoded = measure("decode: codec (v1)", lambda values: [decode(value) for value in values], legacy_items)
+    decoded = measure("decode: codec (v2)", lambda values: [decode(value) for value in values], items)
+
+    assert decoded == legacy_decoded == url_hashes
+    assert [decode_plain(item) for item in deserialized] == url_hashes
+
+
+if __name__ == "__main__":
+    main()
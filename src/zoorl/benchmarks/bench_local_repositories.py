@@ -0,0 +1,66 @@
+"""Lookup throughput of the local (non-DynamoDB) repositories.
+
+Compares 'get_by_hash' on the SQLite repository and on the memory-mapped hash
+table file, loaded with the same synthetic URL hashes, and reports the time
+taken to open each store.
+
+Usage:
+    python -m benchmarks.bench_local_repositories [--items 100000] [--lookups 200000]
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from typing import Callable, List
+
+from zoorl.adapters.mmap_model import write_hash_table, MmapUrlHashRepository
+from zoorl.adapters.sqlite_model import SQLiteUrlHashRepository
+from zoorl.core.model import UrlHash
+from zoorl.core.utils import compute_hashes
+from zoorl.ports.repository import UrlHashRepository
+
+
+def measure_lookups(name: str, open_repository: Callable[[], UrlHashRepository], hashes: List[str]) -> None:
+    start = time.perf_counter()
+    repository = open_repository()
+    opened = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for hash in hashes:
+        repository.get_by_hash(hash)
+    elapsed = time.perf_counter() - start
+
+    repository.close()
+    print(f"{name:<8} open {opened * 1e3:8.2f} ms  {len(hashes) / elapsed:12,.0f} lookups/s  {elapsed / len(hashes) * 1e9:8.0f} ns/lookup")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=100_000, help="number of URL hashes in each store")
+    parser.add_argument("--lookups", type=int, default=200_000, help="number of lookups (90%% hits)")
+    args = parser.parse_args()
+
+    urls = [f"https://www.example.com/articles/{i}" for i in range(args.items)]
+    url_hashes = [UrlHash(hash, url, 4102444800) for hash, url in zip(compute_hashes(urls), urls)]
+
+    hashes = [random.choice(url_hashes).hash if random.random() < 0.9 else "missing" for _ in range(args.lookups)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        sqlite_path = os.path.join(directory, "url_hashes.db")
+        mmap_path = os.path.join(directory, "url_hashes.zht")
+
+        repository = SQLiteUrlHashRepository.open(sqlite_path)
+        repository.save_many(url_hashes)
+        repository.close()
+
+        write_hash_table(mmap_path, url_hashes)
+
+        measure_lookups("sqlite", lambda: SQLiteUrlHashRepository.open(sqlite_path), hashes)
+        measure_lookups("mmap", lambda: MmapUrlHashRepository(mmap_path), hashes)
+
+
+if __name__ == "__main__":
+    main()
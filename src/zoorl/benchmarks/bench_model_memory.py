@@ -0,0 +1,96 @@
+"""Memory of the model objects, and allocations of the read path from UrlHash to HTTP body.
+
+Reports the memory taken by a million URL hashes held in memory (as a cache or a
+snapshot would), for 'UrlHash' and for the same fields in a plain dataclass with
+a '__dict__', as the model used to be. The strings are built before measuring,
+so the figures are those of the objects alone (and of the list holding them).
+
+Then, for the read path of a warm function (the URL hash is already in memory),
+reports the time and the peak of memory allocated per request, from the 'UrlHash'
+to the HTTP body: through a dict serialized by 'json.dumps()' (what the Powertools
+resolver does with a route returning a dict) or built with 'url_hash_body()'.
+
+Usage:
+    python -m benchmarks.bench_model_memory [--entries 1000000] [--requests 100000]
+"""
+
+import argparse
+import json
+import time
+import tracemalloc
+
+from dataclasses import dataclass
+from typing import Callable, List
+
+from zoorl.adapters.http_bodies import url_hash_body
+from zoorl.core.model import UrlHash
+from zoorl.core.usecases.read_url_hash import ReadUrlHashUseCaseResponse
+
+
+@dataclass
+class PlainUrlHash:
+    """The layout of 'UrlHash' without slots."""
+    hash: str
+    url: str
+    ttl: int
+
+
+def measure_entries(name: str, build: Callable[[str, str, int], object], hashes: List[str], urls: List[str]) -> None:
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    entries = [build(hash, url, 4102444800) for hash, url in zip(hashes, urls)]
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    per_million = (after - before) / len(entries) * 1e6
+    print(f"{name:<14} {per_million / 2 ** 20:8.1f} MiB per million entries")
+
+
+def measure_request(name: str, to_body: Callable[[UrlHash], str], url_hash: UrlHash, requests: int) -> None:
+    # The memory pass is separate, since tracing slows allocations down
+    start = time.perf_counter()
+    for _ in range(requests):
+        to_body(url_hash)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    before, _ = tracemalloc.get_traced_memory()
+    to_body(url_hash)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"{name:<14} {elapsed / requests * 1e9:8.0f} ns/request  {peak - before:6} B allocated at peak")
+
+
+def dict_body(url_hash: UrlHash) -> str:
+    response = ReadUrlHashUseCaseResponse(url_hash=url_hash.hash, url=url_hash.url, ttl=url_hash.ttl)
+    return json.dumps({"url_hash": response.url_hash, "url": response.url, "ttl": response.ttl}, separators=(",", ":"))
+
+
+def direct_body(url_hash: UrlHash) -> str:
+    response = ReadUrlHashUseCaseResponse(url_hash=url_hash.hash, url=url_hash.url, ttl=url_hash.ttl)
+    return url_hash_body(response.url_hash, response.url, response.ttl)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, default=1000000)
+    parser.add_argument("--requests", type=int, default=100000)
+    args = parser.parse_args()
+
+    hashes = [f"{index:08x}" for index in range(args.entries)]
+    urls = [f"https://www.example.com/{index}" for index in range(args.entries)]
+
+    measure_entries("dataclass", PlainUrlHash, hashes, urls)
+    measure_entries("UrlHash", UrlHash, hashes, urls)
+    measure_entries("tuple", lambda *fields: fields, hashes, urls)
+    print()
+
+    url_hash = UrlHash(hash=hashes[0], url=urls[0], ttl=4102444800)
+    measure_request("dict + dumps", dict_body, url_hash, args.requests)
+    measure_request("url_hash_body", direct_body, url_hash, args.requests)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""CPU time of the redirect function, through the resolver ('handle') and the fast path ('handle_fast').
+
+Invokes both Lambda entry points in-process with synthetic 'GET /r/{url_hash}'
+events, on a SQLite in-memory repository loaded with a few URL hashes (which
+end up in the URL hash cache, as on a warm container), and reports the process
+CPU time per invocation: for existing hashes, for missing ones (404), and for
+events that do not have the shape of the route (which the fast path hands over
+to the resolver).
+
+Before measuring, the responses of both entry points are checked to be the same.
+
+The logs are written to /dev/null, with the request log sample rate deployed
+for the function.
+
+Usage:
+    python -m benchmarks.bench_redirect_fast_path [--invocations 50000] [--sample-rate 0.01]
+"""
+
+import argparse
+import os
+import time
+
+from typing import Any, Callable, Dict, List
+
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+os.environ.setdefault("POWERTOOLS_TRACE_DISABLED", "true")
+os.environ.setdefault("POWERTOOLS_LOGGER_LOG_EVENT", "false")
+os.environ.setdefault("URL_HASHES_BACKEND", "sqlite")
+os.environ.setdefault("URL_HASHES_SQLITE_PATH", ":memory:")
+# Clicks would be shipped to the repository on the way, and measured with the redirects
+os.environ.setdefault("CLICK_ANALYTICS_SINKS", "")
+
+from benchmarks.api_gateway_events import FakeLambdaContext, api_gateway_event, redirect_event
+from zoorl.adapters import redirect_handler
+from zoorl.adapters.lambda_support import get_url_hash_repository, logger, request_log
+from zoorl.core.model import UrlHash
+
+Handler = Callable[[Dict[str, Any], Any], Dict[str, Any]]
+
+
+def measure(handle: Handler, events: List[Dict[str, Any]], invocations: int) -> float:
+    """Returns the CPU time (microseconds) per invocation of the handler, cycling over the events."""
+    context = FakeLambdaContext()
+    for event in events:
+        handle(event, context)
+
+    start = time.process_time()
+    for index in range(invocations):
+        handle(events[index % len(events)], context)
+    return (time.process_time() - start) / invocations * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--invocations", type=int, default=50000)
+    parser.add_argument("--sample-rate", type=float, default=0.01, help="the REQUEST_LOG_SAMPLE_RATE")
+    args = parser.parse_args()
+
+    hashes = [f"hash{index:03}" for index in range(100)]
+    get_url_hash_repository().save_many([UrlHash(hash=hash, url=f"https://example.com/{hash}", ttl=4102444800) for hash in hashes])
+
+    devnull = open(os.devnull, "w")
+    logger.registered_handler.setStream(devnull)
+    request_log.sample_rate = args.sample_rate
+
+    scenarios = {
+        "found": [redirect_event(hash) for hash in hashes],
+        "missing": [redirect_event(f"missing{index:03}") for index in range(100)],
+        # e.g., a test invocation from the console, without path parameters
+        "fallback": [api_gateway_event("GET", "/r/{url_hash}", f"/r/{hash}") for hash in hashes[:10]]
+    }
+
+    context = FakeLambdaContext()
+    for name, events in scenarios.items():
+        for event in events:
+            resolved, fast = redirect_handler.handle(event, context), redirect_handler.handle_fast(event, context)
+            if resolved != fast:
+                raise AssertionError(f"The responses differ for \"{name}\": {resolved} != {fast}")
+
+    print(f"{'event':<10} {'handle (µs)':>12} {'handle_fast (µs)':>17} {'saved':>7}")
+    for name, events in scenarios.items():
+        resolved = measure(redirect_handler.handle, events, args.invocations)
+        fast = measure(redirect_handler.handle_fast, events, args.invocations)
+        print(f"{name:<10} {resolved:>12.1f} {fast:>17.1f} {(resolved - fast) / resolved:>7.0%}")
+
+    devnull.close()
+
+
+if __name__ == "__main__":
+    main()
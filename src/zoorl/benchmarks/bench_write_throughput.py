@@ -0,0 +1,169 @@
+"""Write throughput and throttling of the create path, at several concurrency levels.
+
+Each level writes URL hashes from a pool of threads, with 'save_if_absent()' as
+the create use case does, first straight to the repository ("raw") and then
+through 'ThrottledUrlHashRepository' ("paced"), and reports the successful
+writes per second, the writes given up and the requests DynamoDB throttled.
+
+The table runs on moto, or on DynamoDB Local (or a real table) with '--endpoint-url'.
+Neither moto nor DynamoDB Local enforce any capacity, so '--capacity' emulates a
+provisioned table on the client: requests beyond that many item writes per second
+are rejected with ProvisionedThroughputExceededException before being sent.
+botocore's own retries are disabled, so that throttles are all visible here.
+
+Usage:
+    python -m benchmarks.bench_write_throughput [--writes 2000] [--concurrency 1,4,16,64] [--capacity 500]
+                                                [--endpoint-url http://localhost:8000]
+"""
+
+import argparse
+import os
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from threading import Lock
+from typing import Any, Dict, List, Tuple
+
+import boto3
+
+from botocore.exceptions import ClientError
+from moto import mock_dynamodb
+
+from zoorl.adapters.dynamodb_client_model import DynamoDBClientUrlHashRepository, client_config
+from zoorl.adapters.throttling_model import is_throttling_error, ThrottledUrlHashRepository
+from zoorl.core.model import UrlHash
+from zoorl.core.token_bucket import TokenBucket
+from zoorl.ports.repository import UrlHashRepository
+
+TABLE_NAME = "UrlHashesWriteBench"
+
+_WRITE_OPERATIONS = {"PutItem": None, "UpdateItem": None, "DeleteItem": None, "BatchWriteItem": "RequestItems"}
+
+
+class _Response:
+    """The part of an HTTP response botocore looks at for a short-circuited call."""
+    status_code = 400
+    headers: Dict[str, str] = {}
+
+
+class SimulatedCapacity:
+    """Rejects the write requests of a client beyond a number of item writes per second."""
+
+    def __init__(self, client: Any, capacity: float) -> None:
+        # A second worth of burst, as DynamoDB keeps up to 5 minutes of unused capacity
+        self.bucket = TokenBucket(rate=capacity, capacity=capacity)
+        self.throttled = 0
+        self._lock = Lock()
+        client.meta.events.register("before-call.dynamodb.*", self._before_call)
+
+    def _before_call(self, model: Any, params: Dict[str, Any], **kwargs: Any) -> Any:
+        if model.name not in _WRITE_OPERATIONS:
+            return None
+
+        items = 1
+        if model.name == "BatchWriteItem":
+            items = sum(len(requests) for requests in params["body"]["RequestItems"].values())
+
+        if self.bucket.try_acquire(items):
+            return None
+
+        with self._lock:
+            self.throttled += 1
+        return _Response(), {
+            "Error": {"Code": "ProvisionedThroughputExceededException", "Message": "Simulated throttling"},
+            "ResponseMetadata": {"HTTPStatusCode": 400}
+        }
+
+
+def create_table(client: Any) -> None:
+    client.create_table(
+        TableName=TABLE_NAME,
+        KeySchema=[
+            {"AttributeName": "PK", "KeyType": "HASH"},
+            {"AttributeName": "SK", "KeyType": "RANGE"}
+        ],
+        AttributeDefinitions=[
+            {"AttributeName": "PK", "AttributeType": "S"},
+            {"AttributeName": "SK", "AttributeType": "S"}
+        ],
+        BillingMode="PAY_PER_REQUEST"
+    )
+
+
+def run_level(repository: UrlHashRepository, url_hashes: List[UrlHash], concurrency: int) -> Tuple[float, int]:
+    """Writes the URL hashes from 'concurrency' threads, and returns (writes per second, writes given up)."""
+    failed = 0
+    lock = Lock()
+
+    def write(url_hash: UrlHash) -> None:
+        nonlocal failed
+        try:
+            repository.save_if_absent(url_hash)
+        except ClientError as ex:
+            if not is_throttling_error(ex):
+                raise
+            with lock:
+                failed += 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(write, url_hashes))
+    elapsed = time.perf_counter() - start
+
+    return (len(url_hashes) - failed) / elapsed, failed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--writes", type=int, default=2000, help="number of writes per run")
+    parser.add_argument("--concurrency", default="1,4,16,64", help="comma-separated thread counts")
+    parser.add_argument("--capacity", type=float, default=500, help="emulated table capacity, in item writes per second (0 for none)")
+    parser.add_argument("--max-in-flight", type=int, default=16, help="max in-flight writes of the paced repository")
+    parser.add_argument("--endpoint-url", help="DynamoDB endpoint (e.g., DynamoDB Local) instead of moto")
+    args = parser.parse_args()
+
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+    # Throttled requests must reach the repositories, not be retried by botocore
+    os.environ["DYNAMODB_MAX_ATTEMPTS"] = "1"
+
+    with (nullcontext() if args.endpoint_url else mock_dynamodb()):
+        client = boto3.client("dynamodb", config=client_config(), endpoint_url=args.endpoint_url)
+        create_table(client)
+        client.get_waiter("table_exists").wait(TableName=TABLE_NAME)
+
+        try:
+            simulated = SimulatedCapacity(client, args.capacity) if args.capacity > 0 else None
+            ttl = int(time.time()) + 3600
+            run = 0
+
+            print(f"{'concurrency':>11} {'mode':>6} {'writes/s':>10} {'given up':>9} {'throttles':>10}")
+            for concurrency in [int(level) for level in args.concurrency.split(",")]:
+                for mode in ("raw", "paced"):
+                    repository: UrlHashRepository = DynamoDBClientUrlHashRepository(client, TABLE_NAME)
+                    if mode == "paced":
+                        repository = ThrottledUrlHashRepository(
+                            repository,
+                            # Stay a little under the capacity, with no initial burst
+                            TokenBucket(rate=args.capacity * 0.9, capacity=1) if simulated else TokenBucket(rate=1e9, capacity=1e9),
+                            max_in_flight=args.max_in_flight
+                        )
+
+                    run += 1
+                    url_hashes = [UrlHash(f"r{run}h{i}", f"https://www.example.com/{run}/{i}", ttl) for i in range(args.writes)]
+
+                    throttled_before = simulated.throttled if simulated else 0
+                    # Start every run with the emulated table at rest
+                    time.sleep(1)
+                    throughput, failed = run_level(repository, url_hashes, concurrency)
+                    throttles = (simulated.throttled if simulated else 0) - throttled_before
+
+                    print(f"{concurrency:>11} {mode:>6} {throughput:>10.0f} {failed:>9} {throttles:>10}")
+        finally:
+            client.delete_table(TableName=TABLE_NAME)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Shared fixtures for adapter tests."""
+import pytest
+
+import os
+import boto3
+
+from moto import mock_dynamodb
+
+from mypy_boto3_dynamodb.service_resource import DynamoDBServiceResource
+from mypy_boto3_dynamodb.service_resource import Table
+
+
+@pytest.fixture
+def aws_credentials():
+    """Mocked AWS Credentials for moto."""
+    os.environ["AWS_ACCESS_KEY_ID"] = "testing"
+    os.environ["AWS_SECRET_ACCESS_KEY"] = "testing"
+    os.environ["AWS_SECURITY_TOKEN"] = "testing"
+    os.environ["AWS_SESSION_TOKEN"] = "testing"
+
+
+@pytest.fixture
+def mock_dynamodb_resource(aws_credentials) -> DynamoDBServiceResource:
+    """Mocked DynamoDB Resource """
+    with mock_dynamodb():
+        yield boto3.resource('dynamodb', region_name='us-east-1')
+
+
+@pytest.fixture
+def mock_url_hash_table(mock_dynamodb_resource: DynamoDBServiceResource) -> Table:
+    """Ensure that we have a table for performing our tests."""
+
+    test_table_name = "TestUrlHashes"
+    
+    return mock_dynamodb_resource.create_table(
+        TableName=test_table_name,
+        KeySchema=[
+            {'AttributeName': 'PK','KeyType': 'HASH'},
+            {'AttributeName': 'SK','KeyType': 'RANGE'}
+        ],
+        AttributeDefinitions=[
+            {'AttributeName': 'PK','AttributeType': 'S'},
+            {'AttributeName': 'SK','AttributeType': 'S'}
+        ],
+        ProvisionedThroughput={
+            'ReadCapacityUnits': 1,
+            'WriteCapacityUnits': 1
+        }
+    )
@@ -0,0 +1,126 @@
+import asyncio
+import json
+
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Tuple
+
+import pytest
+
+from pytest_mock import MockerFixture
+from unittest.mock import AsyncMock
+
+from zoorl.adapters.asgi_app import ZoorlAsgiApp, MAX_BODY_SIZE
+from zoorl.core.model import UrlHash
+from zoorl.ports.async_repository import AsyncUrlHashRepository
+
+
+@pytest.fixture
+def repository(mocker: MockerFixture) -> AsyncMock:
+    """Mock asynchronous repository."""
+
+    return mocker.AsyncMock(spec=AsyncUrlHashRepository)
+
+
+@pytest.fixture
+def app(repository: AsyncMock) -> ZoorlAsgiApp:
+    """The SUT is the ASGI application, started on the mock repository."""
+
+    @asynccontextmanager
+    async def repository_factory() -> AsyncIterator[AsyncUrlHashRepository]:
+        yield repository
+
+    app = ZoorlAsgiApp(repository_factory)
+    asyncio.run(app.startup())
+    return app
+
+
+def request(app: ZoorlAsgiApp, method: str, path: str, body: bytes = b"") -> Tuple[int, Dict[bytes, bytes], bytes]:
+    """Sends a request to the application, and returns the status, headers and body of the response."""
+    sent: List[Dict[str, Any]] = []
+
+    async def receive() -> Dict[str, Any]:
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message: Dict[str, Any]) -> None:
+        sent.append(message)
+
+    asyncio.run(app({"type": "http", "method": method, "path": path}, receive, send))
+
+    start, response_body = sent
+    return start["status"], dict(start["headers"]), response_body["body"]
+
+
+def test_redirect(app: ZoorlAsgiApp, repository: AsyncMock) -> None:
+    repository.get_by_hash.return_value = UrlHash("test_hash", "http://www.test.com", 4102444800)
+
+    assert request(app, "GET", "/r/test_hash") == (301, {b"location": b"http://www.test.com", b"content-type": b"text/html"}, b"")
+
+    # The response is cached, and shared with the read route
+    status, _, body = request(app, "GET", "/u/test_hash")
+    assert status == 200
+    assert json.loads(body) == {"url_hash": "test_hash", "url": "http://www.test.com", "ttl": 4102444800}
+    repository.get_by_hash.assert_called_once_with("test_hash")
+
+
+def test_missing_hash(app: ZoorlAsgiApp, repository: AsyncMock) -> None:
+    repository.get_by_hash.return_value = None
+
+    for path in ("/r/missing_hash", "/u/missing_hash", "/r/"):
+        status, _, body = request(app, "GET", path)
+        assert status == 404
+        assert json.loads(body) == {"message": "The specified URL hash is invalid or expired!"}
+
+    repository.get_by_hash.assert_called_once_with("missing_hash")
+    assert request(app, "GET", "/other")[0] == 404
+
+
+def test_create(app: ZoorlAsgiApp, repository: AsyncMock) -> None:
+    repository.save_if_absent.return_value = None
+    repository.get_by_hash.return_value = None
+
+    # A miss is cached...
+    assert request(app, "GET", "/r/W1S24Yv")[0] == 404
+
+    status, _, body = request(app, "POST", "/u", json.dumps({"url": "http://www.test.com", "reuse": True}).encode())
+    assert status == 200
+    payload = json.loads(body)
+    assert payload["url"] == "http://www.test.com"
+    assert payload["reused"] is False
+
+    # ...but it is forgotten once the hash is created
+    repository.get_by_hash.return_value = UrlHash(payload["url_hash"], "http://www.test.com", payload["ttl"])
+    assert request(app, "GET", "/r/" + payload["url_hash"])[0] == 301
+
+
+@pytest.mark.parametrize("body", [b"not json", b"[]", b'{"ttl": 1}', b'{"url": "http://www.test.com", "ttl": true}'])
+def test_create_rejects_invalid_payload(app: ZoorlAsgiApp, repository: AsyncMock, body: bytes) -> None:
+    assert request(app, "POST", "/u", body)[0] == 400
+    repository.save_if_available.assert_not_called()
+
+
+def test_create_rejects_large_payload(app: ZoorlAsgiApp) -> None:
+    assert request(app, "POST", "/u", b" " * (MAX_BODY_SIZE + 1))[0] == 413
+
+
+def test_lifespan_closes_repository(repository: AsyncMock) -> None:
+    closed = []
+
+    @asynccontextmanager
+    async def repository_factory() -> AsyncIterator[AsyncUrlHashRepository]:
+        yield repository
+        closed.append(True)
+
+    app = ZoorlAsgiApp(repository_factory)
+    messages = iter([{"type": "lifespan.startup"}, {"type": "lifespan.shutdown"}])
+    sent = []
+
+    async def receive() -> Dict[str, Any]:
+        return next(messages)
+
+    async def send(message: Dict[str, Any]) -> None:
+        sent.append(message["type"])
+
+    asyncio.run(app({"type": "lifespan"}, receive, send))
+
+    assert sent == ["lifespan.startup.complete", "lifespan.shutdown.complete"]
+    assert closed == [True]
@@ -0,0 +1,91 @@
+import gzip
+import json
+
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+
+from zoorl.adapters import bulk_export
+from zoorl.adapters.bulk_export import open_export_writer, read_export, ExportWriter, InvalidExportFileError
+from zoorl.adapters.bulk_import import import_file
+from zoorl.adapters.sqlite_model import SQLiteUrlHashRepository
+from zoorl.core.model import UrlHash
+from zoorl.core.usecases.export_url_hashes import ExportUrlHashesUseCase, ExportUrlHashesUseCaseRequest
+
+
+@pytest.fixture
+def repository() -> Iterator[SQLiteUrlHashRepository]:
+    repository = SQLiteUrlHashRepository.open(":memory:")
+    repository.save_many([UrlHash(f"hash_{i}", f"http://www.test.com/{i}?q=é", 4102444800 + i) for i in range(25)])
+    repository.save(UrlHash("expired_hash", "http://www.expired.com", 1663519832))
+    yield repository
+    repository.close()
+
+
+def export(repository: SQLiteUrlHashRepository, path: Path, format: str) -> int:
+    with open_export_writer(str(path), format) as writer:
+        response = ExportUrlHashesUseCase(repository, total_segments=3, page_size=4).export(ExportUrlHashesUseCaseRequest(), writer.write)
+    return response.exported
+
+
+@pytest.mark.parametrize("name", ["url_hashes.jsonl.gz", "url_hashes.zuc"])
+def test_export_round_trip_through_bulk_import(tmp_path: Path, repository: SQLiteUrlHashRepository, monkeypatch: pytest.MonkeyPatch, name: str) -> None:
+    # Several blocks for the columnar format
+    monkeypatch.setattr(bulk_export, "BLOCK_RECORDS", 10)
+    path = tmp_path / name
+
+    assert export(repository, path, None) == 25
+    assert not (tmp_path / f"{name}.tmp").exists()
+    assert sorted(read_export(str(path)), key=lambda url_hash: url_hash.ttl) == [
+        UrlHash(f"hash_{i}", f"http://www.test.com/{i}?q=é", 4102444800 + i) for i in range(25)
+    ]
+
+    target = SQLiteUrlHashRepository.open(":memory:")
+    stats = import_file(target, str(path), batch_size=7)
+
+    assert (stats.read, stats.imported, stats.rejected) == (25, 25, 0)
+    assert target.get_by_hash("hash_3") == UrlHash("hash_3", "http://www.test.com/3?q=é", 4102444803)
+    assert target.get_by_hash("expired_hash") is None
+
+
+def test_jsonl_export_is_gzip_compressed_json_lines(tmp_path: Path, repository: SQLiteUrlHashRepository) -> None:
+    path = tmp_path / "url_hashes.out"
+    export(repository, path, "jsonl")
+
+    with gzip.open(path, "rt") as lines:
+        records = [json.loads(line) for line in lines]
+
+    assert {"hash": "hash_0", "url": "http://www.test.com/0?q=é", "expires_at": 4102444800} in records
+    assert len(records) == 25
+
+
+def test_failed_export_leaves_no_file(tmp_path: Path, repository: SQLiteUrlHashRepository) -> None:
+    path = tmp_path / "url_hashes.zuc"
+
+    with pytest.raises(IOError):
+        with open_export_writer(str(path)) as writer:
+            writer.write([UrlHash("hash", "http://www.test.com", 4102444800)])
+            raise IOError("scan failed")
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_truncated_columnar_export_is_rejected(tmp_path: Path, repository: SQLiteUrlHashRepository) -> None:
+    path = tmp_path / "url_hashes.zuc"
+    export(repository, path, "columnar")
+    path.write_bytes(path.read_bytes()[:-1])
+
+    with pytest.raises(InvalidExportFileError):
+        list(read_export(str(path)))
+
+
+def test_incomplete_writer_cannot_be_created(tmp_path: Path) -> None:
+    class OpenOnlyExportWriter(ExportWriter):
+        def _open(self, path: str):
+            return open(path, "wb")
+
+    with pytest.raises(TypeError):
+        OpenOnlyExportWriter(str(tmp_path / "export.bin"))
+
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,122 @@
+import json
+
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+
+from zoorl.adapters.bulk_import import (
+    import_file,
+    read_records,
+    CheckpointMismatchError,
+    InvalidImportFileError
+)
+from zoorl.adapters.sqlite_model import SQLiteUrlHashRepository
+from zoorl.core.canonical_url import UrlCanonicalizer
+from zoorl.core.model import UrlHash
+from zoorl.core.utils import compute_hash
+
+
+@pytest.fixture
+def repository() -> Iterator[SQLiteUrlHashRepository]:
+    repository = SQLiteUrlHashRepository.open(":memory:")
+    yield repository
+    repository.close()
+
+
+def test_import_csv_file_with_api_hashes(tmp_path: Path, repository: SQLiteUrlHashRepository) -> None:
+    source = tmp_path / "links.csv"
+    source.write_text("url,ttl\nhttp://www.test.com/1,\n  http://www.test.com/2 ,48\n,1\nhttp://www.test.com/3,not a number\n")
+
+    stats = import_file(repository, str(source), batch_size=1)
+
+    assert (stats.read, stats.imported, stats.rejected) == (4, 2, 2)
+    assert repository.get_by_hash(compute_hash("http://www.test.com/1")).url == "http://www.test.com/1"
+    assert repository.get_by_hash(compute_hash("http://www.test.com/2")).url == "http://www.test.com/2"
+
+
+def test_import_jsonl_file_with_given_hashes(tmp_path: Path, repository: SQLiteUrlHashRepository) -> None:
+    source = tmp_path / "links.jsonl"
+    source.write_text(
+        '{"hash": "custom1", "url": "http://www.test.com/1", "expires_at": 4102444800}\n'
+        "\n"
+        "not json\n"
+        '{"url": "http://www.test.com/2", "expires_at": 1663519832}\n'
+    )
+
+    stats = import_file(repository, str(source))
+
+    assert (stats.read, stats.imported, stats.rejected) == (3, 1, 2)
+    assert repository.get_by_hash("custom1") == UrlHash(hash="custom1", url="http://www.test.com/1", ttl=4102444800)
+
+
+def test_import_canonicalizes_urls_to_hash(tmp_path: Path, repository: SQLiteUrlHashRepository) -> None:
+    source = tmp_path / "links.jsonl"
+    source.write_text(
+        '{"url": "HTTP://www.Test.com/1?b=1&utm_source=x&a=2"}\n'
+        '{"url": "http://www.test.com/1?a=2&b=1"}\n'
+        '{"hash": "custom1", "url": "HTTP://www.Test.com/2", "expires_at": 4102444800}\n'
+    )
+
+    stats = import_file(repository, str(source), canonicalizer=UrlCanonicalizer(["utm_*"]))
+
+    assert (stats.read, stats.imported) == (3, 2)
+    assert repository.get_by_hash(compute_hash("http://www.test.com/1?a=2&b=1")).url == "http://www.test.com/1?a=2&b=1"
+    # Given hashes keep the URL they were exported with
+    assert repository.get_by_hash("custom1").url == "HTTP://www.Test.com/2"
+
+
+def test_import_salts_hashes_taken_by_other_urls(tmp_path: Path, repository: SQLiteUrlHashRepository) -> None:
+    url = "http://www.test.com/1"
+    repository.save(UrlHash(hash=compute_hash(url), url="http://www.other.com", ttl=4102444800))
+    repository.save(UrlHash(hash="custom1", url="http://www.other.com", ttl=4102444800))
+    source = tmp_path / "links.jsonl"
+    source.write_text(json.dumps({"url": url}) + "\n" + json.dumps({"hash": "custom1", "url": url}) + "\n")
+
+    stats = import_file(repository, str(source))
+
+    assert (stats.imported, stats.salted, stats.conflicts) == (1, 1, 1)
+    assert repository.get_by_hash(compute_hash(url, 1)).url == url
+    assert repository.get_by_hash(compute_hash(url)).url == "http://www.other.com"
+
+
+def test_import_resumes_from_checkpoint(tmp_path: Path, repository: SQLiteUrlHashRepository) -> None:
+    source = tmp_path / "links.csv"
+    source.write_text("url\n" + "".join(f"http://www.test.com/{index}\n" for index in range(5)))
+    checkpoint = tmp_path / "links.checkpoint"
+
+    def failing_save_many(url_hashes):
+        if any(url_hash.url.endswith("/3") for url_hash in url_hashes):
+            raise IOError("write failed")
+        SQLiteUrlHashRepository.save_many(repository, url_hashes)
+
+    repository.save_many = failing_save_many
+    with pytest.raises(IOError):
+        import_file(repository, str(source), batch_size=2, checkpoint_path=str(checkpoint))
+
+    offset = json.loads(checkpoint.read_text())["offset"]
+    assert [record["url"] for _, record in read_records(str(source), "csv", offset)] == ["http://www.test.com/2", "http://www.test.com/3", "http://www.test.com/4"]
+
+    del repository.save_many
+    stats = import_file(repository, str(source), batch_size=2, checkpoint_path=str(checkpoint))
+
+    assert (stats.read, stats.imported) == (5, 5)
+    assert all(repository.get_by_hash(compute_hash(f"http://www.test.com/{index}")) for index in range(5))
+
+
+def test_import_rejects_checkpoint_of_another_file(tmp_path: Path, repository: SQLiteUrlHashRepository) -> None:
+    checkpoint = tmp_path / "links.checkpoint"
+    checkpoint.write_text(json.dumps({"source": "/elsewhere.csv", "offset": 10, "stats": {}}))
+    source = tmp_path / "links.csv"
+    source.write_text("url\nhttp://www.test.com\n")
+
+    with pytest.raises(CheckpointMismatchError):
+        import_file(repository, str(source), checkpoint_path=str(checkpoint))
+
+
+def test_import_requires_url_column(tmp_path: Path, repository: SQLiteUrlHashRepository) -> None:
+    source = tmp_path / "links.csv"
+    source.write_text("link\nhttp://www.test.com\n")
+
+    with pytest.raises(InvalidImportFileError):
+        import_file(repository, str(source))
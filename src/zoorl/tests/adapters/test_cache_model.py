@@ -0,0 +1,125 @@
+"""Unit tests for the caching repository decorator."""
+
+import pytest
+from pytest_mock import MockerFixture
+from unittest.mock import Mock
+
+from zoorl.adapters.cache_model import CachedUrlHashRepository, LruCache
+from zoorl.core.model import UrlHash
+from zoorl.ports.repository import UrlHashRepository
+
+
+class FakeClock:
+    """Controllable replacement for 'time.time'."""
+    def __init__(self, now: float) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock(1000)
+
+
+@pytest.fixture
+def mock_url_hash_repository(mocker: MockerFixture) -> Mock:
+    """Mock repository."""
+
+    return mocker.Mock(spec=UrlHashRepository)
+
+
+@pytest.fixture
+def repository(mock_url_hash_repository: Mock, clock: FakeClock) -> CachedUrlHashRepository:
+    """The SUT is the caching decorator around the mock repository."""
+
+    return CachedUrlHashRepository(
+        mock_url_hash_repository, cache=LruCache(max_size=2, clock=clock), negative_ttl=5
+    )
+
+
+def test_hit_does_not_call_delegate(repository: CachedUrlHashRepository, mock_url_hash_repository: Mock) -> None:
+    """Verify that a cached hash is served from memory."""
+    mock_url_hash_repository.get_by_hash.return_value = UrlHash("123", "http://www.test.com", 2000)
+
+    assert repository.get_by_hash("123") == UrlHash("123", "http://www.test.com", 2000)
+    assert repository.get_by_hash("123") == UrlHash("123", "http://www.test.com", 2000)
+
+    mock_url_hash_repository.get_by_hash.assert_called_once_with("123")
+
+
+def test_expired_entry_is_reloaded(repository: CachedUrlHashRepository, mock_url_hash_repository: Mock, clock: FakeClock) -> None:
+    """Verify that entries are not served past their own TTL."""
+    mock_url_hash_repository.get_by_hash.return_value = UrlHash("123", "http://www.test.com", 2000)
+
+    repository.get_by_hash("123")
+    clock.now = 2000
+    repository.get_by_hash("123")
+
+    assert mock_url_hash_repository.get_by_hash.call_count == 2
+
+
+def test_miss_is_cached_for_negative_ttl(repository: CachedUrlHashRepository, mock_url_hash_repository: Mock, clock: FakeClock) -> None:
+    """Verify that a missing hash is remembered only for the negative TTL window."""
+    mock_url_hash_repository.get_by_hash.return_value = None
+
+    assert repository.get_by_hash("404") is None
+    assert repository.get_by_hash("404") is None
+    assert mock_url_hash_repository.get_by_hash.call_count == 1
+
+    clock.now += 5
+    assert repository.get_by_hash("404") is None
+    assert mock_url_hash_repository.get_by_hash.call_count == 2
+
+
+def test_save_replaces_cached_miss(repository: CachedUrlHashRepository, mock_url_hash_repository: Mock) -> None:
+    """Verify that saving a hash writes through the cache."""
+    mock_url_hash_repository.get_by_hash.return_value = None
+    repository.get_by_hash("123")
+
+    repository.save(UrlHash("123", "http://www.test.com", 2000))
+
+    assert repository.get_by_hash("123") == UrlHash("123", "http://www.test.com", 2000)
+    mock_url_hash_repository.save.assert_called_once()
+    mock_url_hash_repository.get_by_hash.assert_called_once()
+
+
+def test_least_recently_used_is_evicted(clock: FakeClock) -> None:
+    """Verify that the cache is bounded."""
+    cache = LruCache(max_size=2, clock=clock)
+
+    cache.put("a", UrlHash("a", "http://a", 2000), 2000)
+    cache.put("b", UrlHash("b", "http://b", 2000), 2000)
+    cache.get("a")
+    cache.put("c", UrlHash("c", "http://c", 2000), 2000)
+
+    assert len(cache) == 2
+    assert cache.get("a")[0]
+    assert not cache.get("b")[0]
+    assert cache.get("c")[0]
+
+
+def test_get_by_hashes_fetches_only_uncached(repository: CachedUrlHashRepository, mock_url_hash_repository: Mock) -> None:
+    """Verify that bulk lookups only go to the delegate for hashes that are not cached."""
+    mock_url_hash_repository.get_by_hash.return_value = UrlHash("123", "http://www.test.com", 2000)
+    repository.get_by_hash("123")
+
+    mock_url_hash_repository.get_by_hashes.return_value = {"456": UrlHash("456", "http://www.other.com", 2000)}
+
+    found = repository.get_by_hashes(["123", "456", "404"])
+
+    mock_url_hash_repository.get_by_hashes.assert_called_once_with(["456", "404"])
+    assert sorted(found.keys()) == ["123", "456"]
+    assert repository.get_by_hash("404") is None
+    mock_url_hash_repository.get_by_hash.assert_called_once()
+
+
+def test_save_if_absent_is_answered_by_cache(repository: CachedUrlHashRepository, mock_url_hash_repository: Mock) -> None:
+    """Verify that a cached hash is known to be taken, without trying the conditional write."""
+    mock_url_hash_repository.save_if_absent.return_value = None
+
+    assert repository.save_if_absent(UrlHash("123", "http://www.test.com", 2000)) is None
+    assert repository.save_if_absent(UrlHash("123", "http://www.test.com", 3000)) == UrlHash("123", "http://www.test.com", 2000)
+
+    mock_url_hash_repository.save_if_absent.assert_called_once()
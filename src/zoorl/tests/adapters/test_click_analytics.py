@@ -0,0 +1,115 @@
+import json
+
+from pytest_mock import MockerFixture
+from unittest.mock import call
+
+from zoorl.adapters.click_analytics import emf_lines, invoke_click_recorder, shipments, totals_by_hash, ClickAnalytics
+from zoorl.core.access_counter import AccessCounter
+from zoorl.ports.repository import UrlHashRepository
+
+
+def test_emf_lines() -> None:
+    lines = [json.loads(line) for line in emf_lines({("hash_1", 960): 2, ("hash_2", 1020): 1}, "zoorl")]
+
+    assert lines[0]["_aws"]["Timestamp"] == 960000
+    assert lines[0]["_aws"]["CloudWatchMetrics"][0]["Metrics"] == [{"Name": "Clicks", "Unit": "Count"}]
+    assert [(line["url_hash"], line["Clicks"], line["service"]) for line in lines] == [("hash_1", 2, "zoorl"), ("hash_2", 1, "zoorl")]
+
+
+def test_totals_by_hash() -> None:
+    assert totals_by_hash({("hash_1", 960): 2, ("hash_2", 960): 1, ("hash_1", 1020): 3}) == {"hash_1": 5, "hash_2": 1}
+
+
+def test_shipments() -> None:
+    assert shipments({"hash_1": 1, "hash_2": 3, "hash_3": 2}, 2) == [{"hash_2": 3, "hash_3": 2}, {"hash_1": 1}]
+    assert shipments({}, 2) == []
+
+
+def test_flush_ships_to_all_sinks(mocker: MockerFixture) -> None:
+    repository = mocker.Mock(spec=UrlHashRepository)
+    emitted = []
+    analytics = ClickAnalytics(
+        AccessCounter(max_events=3, clock=lambda: 1000.0),
+        mocker.Mock(),
+        repository_factory=lambda: repository,
+        emit=lambda lines: emitted.extend(lines),
+        shipment_size=1
+    )
+
+    analytics.record("hash_1")
+    analytics.record("hash_2")
+    analytics.flush_if_due()
+    repository.add_access_counts.assert_not_called()
+
+    analytics.record("hash_1")
+    analytics.flush_if_due()
+
+    # Every total is written, one shipment at a time
+    assert repository.add_access_counts.call_args_list == [call({"hash_1": 2}), call({"hash_2": 1})]
+    assert len(emitted) == 2
+    assert len(analytics.counter) == 0
+
+
+def test_flush_forwards_every_total(mocker: MockerFixture) -> None:
+    forward = mocker.Mock()
+    analytics = ClickAnalytics(AccessCounter(), mocker.Mock(), shipment_size=2, forward=forward)
+
+    for hash in ("hash_1", "hash_2", "hash_1", "hash_3", "hash_4", "hash_4", "hash_4"):
+        analytics.record(hash)
+    analytics.flush()
+
+    assert analytics.enabled
+    # The totals beyond the shipment size are shipped too, not discarded
+    assert forward.call_args_list == [call({"hash_4": 3, "hash_1": 2}), call({"hash_2": 1, "hash_3": 1})]
+
+
+def test_invoke_click_recorder(mocker: MockerFixture) -> None:
+    create_client = mocker.patch("boto3.client")
+    client = create_client.return_value
+    forward = invoke_click_recorder("record-clicks")
+
+    forward({"hash_1": 2})
+    forward({"hash_2": 1})
+
+    # One client per container, and one asynchronous invocation per flush
+    create_client.assert_called_once_with("lambda")
+    assert client.invoke.call_count == 2
+    assert client.invoke.call_args.kwargs == {
+        "FunctionName": "record-clicks", "InvocationType": "Event", "Payload": b'{"counts":{"hash_2":1}}'
+    }
+
+
+def test_failing_shipment_only_drops_its_counts(mocker: MockerFixture) -> None:
+    forward = mocker.Mock(side_effect=[RuntimeError("throttled"), None])
+    logger = mocker.Mock()
+    analytics = ClickAnalytics(AccessCounter(), logger, shipment_size=1, forward=forward)
+
+    analytics.record("hash_1")
+    analytics.record("hash_1")
+    analytics.record("hash_2")
+    analytics.flush()
+
+    assert forward.call_args_list == [call({"hash_1": 2}), call({"hash_2": 1})]
+    logger.warning.assert_called_once_with("Dropped the click counts of 1 hashes: throttled")
+
+
+def test_failing_sinks_drop_the_counts(mocker: MockerFixture) -> None:
+    repository = mocker.Mock(spec=UrlHashRepository)
+    repository.add_access_counts.side_effect = RuntimeError("throttled")
+    logger = mocker.Mock()
+    analytics = ClickAnalytics(AccessCounter(), logger, repository_factory=lambda: repository)
+
+    analytics.record("hash_1")
+    analytics.flush()
+
+    logger.warning.assert_called_once()
+    assert len(analytics.counter) == 0
+
+
+def test_disabled_analytics_count_nothing(mocker: MockerFixture) -> None:
+    analytics = ClickAnalytics(AccessCounter(), mocker.Mock())
+
+    analytics.record("hash_1")
+
+    assert not analytics.enabled
+    assert len(analytics.counter) == 0
@@ -0,0 +1,65 @@
+import asyncio
+
+import pytest
+
+from botocore.exceptions import ClientError
+from pytest_mock import MockerFixture
+from unittest.mock import AsyncMock
+
+from zoorl.adapters import dynamodb_async_model
+from zoorl.adapters.dynamodb_async_model import AsyncDynamoDBUrlHashRepository
+from zoorl.adapters.dynamodb_codec import encode
+from zoorl.core.model import UrlHash
+
+
+@pytest.fixture
+def client(mocker: MockerFixture) -> AsyncMock:
+    """Stands in for the aiobotocore client, which has the same methods as the low-level client."""
+    return mocker.AsyncMock()
+
+
+@pytest.fixture
+def repository(client: AsyncMock) -> AsyncDynamoDBUrlHashRepository:
+    """The SUT is the repository implementing DynamoDB operations with coroutines."""
+
+    return AsyncDynamoDBUrlHashRepository(client, "TestUrlHashes", max_concurrency=2)
+
+
+def test_get_by_hash(repository: AsyncDynamoDBUrlHashRepository, client: AsyncMock) -> None:
+    client.query.side_effect = [{"Items": [encode(UrlHash("test_hash", "http://www.test.com", 4102444800))]}, {"Items": []}]
+
+    assert asyncio.run(repository.get_by_hash("test_hash")) == UrlHash("test_hash", "http://www.test.com", 4102444800)
+    assert asyncio.run(repository.get_by_hash("missing_hash")) is None
+
+
+def test_save_if_absent_returns_owner(repository: AsyncDynamoDBUrlHashRepository, client: AsyncMock) -> None:
+    owner = UrlHash("test_hash", "http://www.other.com", 4102444800)
+    client.put_item.side_effect = ClientError(
+        {"Error": {"Code": "ConditionalCheckFailedException"}, "Item": encode(owner)}, "PutItem"
+    )
+
+    assert asyncio.run(repository.save_if_absent(UrlHash("test_hash", "http://www.test.com", 4102444800))) == owner
+    assert not asyncio.run(repository.save_if_available(UrlHash("test_hash", "http://www.test.com", 4102444800)))
+
+
+def test_save_many_fans_out_chunks(repository: AsyncDynamoDBUrlHashRepository, client: AsyncMock, mocker: MockerFixture) -> None:
+    mocker.patch.object(dynamodb_async_model.asyncio, "sleep", mocker.AsyncMock())
+    # The first chunk is partially unprocessed once
+    client.batch_write_item.side_effect = [
+        {"UnprocessedItems": {"TestUrlHashes": [{"PutRequest": {"Item": {}}}]}}, {}, {}, {}
+    ]
+
+    asyncio.run(repository.save_many([UrlHash(f"hash_{i}", f"http://www.test{i}.com", 4102444800) for i in range(60)]))
+
+    chunk_sizes = sorted(len(call.kwargs["RequestItems"]["TestUrlHashes"]) for call in client.batch_write_item.call_args_list)
+    assert chunk_sizes == [1, 10, 25, 25]
+
+
+def test_get_by_hashes_drops_expired(repository: AsyncDynamoDBUrlHashRepository, client: AsyncMock) -> None:
+    client.batch_get_item.return_value = {"Responses": {"TestUrlHashes": [
+        encode(UrlHash("valid_hash", "http://www.valid.com", 4102444800)),
+        encode(UrlHash("expired_hash", "http://www.expired.com", 1663519832))
+    ]}}
+
+    assert list(asyncio.run(repository.get_by_hashes(["valid_hash", "expired_hash", "valid_hash"]))) == ["valid_hash"]
+    assert client.batch_get_item.call_count == 1
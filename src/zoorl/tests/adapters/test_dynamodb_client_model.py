@@ -0,0 +1,148 @@
+import pytest
+
+import boto3
+
+from mypy_boto3_dynamodb.service_resource import Table
+
+from zoorl.adapters.dynamodb_client_model import DynamoDBClientUrlHashRepository
+from zoorl.adapters.dynamodb_model import DynamoDBUrlHashRepository
+from zoorl.core.model import UrlHash
+
+
+@pytest.fixture
+def repository(mock_url_hash_table: Table) -> DynamoDBClientUrlHashRepository:
+    """The SUT is the repository implementing DynamoDB operations on the low-level client."""
+
+    # The Table client is not usable here, since the resource layer injects its own (de)serialization
+    return DynamoDBClientUrlHashRepository(boto3.client("dynamodb", region_name="us-east-1"), mock_url_hash_table.name)
+
+
+@pytest.fixture
+def resource_repository(mock_url_hash_table: Table) -> DynamoDBUrlHashRepository:
+    """The resource-based repository, for checking that both share the same item layout."""
+
+    return DynamoDBUrlHashRepository(mock_url_hash_table)
+
+
+def test_save_and_get_by_hash(repository: DynamoDBClientUrlHashRepository) -> None:
+    repository.save(UrlHash("test_hash", "http://www.test.com", 4102444800))
+
+    assert repository.get_by_hash("test_hash") == UrlHash("test_hash", "http://www.test.com", 4102444800)
+    assert repository.get_by_hash("missing_hash") is None
+
+
+def test_same_layout_as_resource_repository(repository: DynamoDBClientUrlHashRepository, resource_repository: DynamoDBUrlHashRepository) -> None:
+    resource_repository.save(UrlHash("resource_hash", "http://www.resource.com", 4102444800))
+    repository.save(UrlHash("client_hash", "http://www.client.com", 4102444801))
+
+    assert repository.get_by_hash("resource_hash") == UrlHash("resource_hash", "http://www.resource.com", 4102444800)
+    assert resource_repository.get_by_hash("client_hash") == UrlHash("client_hash", "http://www.client.com", 4102444801)
+
+
+def test_save_if_available(repository: DynamoDBClientUrlHashRepository) -> None:
+    assert repository.save_if_available(UrlHash("test_hash", "http://www.test.com", 4102444800))
+    assert repository.save_if_available(UrlHash("test_hash", "http://www.test.com", 4102444801))
+    assert not repository.save_if_available(UrlHash("test_hash", "http://www.other.com", 4102444800))
+
+    assert repository.get_by_hash("test_hash") == UrlHash("test_hash", "http://www.test.com", 4102444801)
+
+
+def test_save_many_and_get_by_hashes(repository: DynamoDBClientUrlHashRepository) -> None:
+    test_ttl = 4102444800
+    repository.save_many([UrlHash(f"hash_{i}", f"http://www.test{i}.com", test_ttl) for i in range(150)])
+
+    found = repository.get_by_hashes([f"hash_{i}" for i in range(140, 160)] + ["hash_0", "hash_0"])
+
+    assert sorted(found.keys()) == sorted(["hash_0"] + [f"hash_{i}" for i in range(140, 150)])
+    assert found["hash_0"] == UrlHash("hash_0", "http://www.test0.com", test_ttl)
+
+
+def test_expired_items_are_not_returned(repository: DynamoDBClientUrlHashRepository) -> None:
+    repository.save(UrlHash("expired_hash", "http://www.expired.com", 1663519832))
+    repository.save(UrlHash("valid_hash", "http://www.valid.com", 4102444800))
+
+    assert repository.get_by_hash("expired_hash") is None
+    assert list(repository.get_by_hashes(["expired_hash", "valid_hash"]).keys()) == ["valid_hash"]
+    assert repository.save_if_available(UrlHash("expired_hash", "http://www.other.com", 4102444800))
+
+
+def test_find_expired_and_delete_many(repository: DynamoDBClientUrlHashRepository) -> None:
+    repository.save_many([UrlHash(f"expired_{i}", f"http://www.expired{i}.com", 1663519832) for i in range(30)])
+    repository.save(UrlHash("valid_hash", "http://www.valid.com", 4102444800))
+
+    expired = [hash for page in repository.find_expired_hashes(now=1663519832, page_size=10) for hash in page]
+    assert sorted(expired) == sorted(f"expired_{i}" for i in range(30))
+
+    repository.delete_many(expired)
+
+    assert list(repository.find_expired_hashes(now=1663519832)) == []
+    assert repository.get_by_hash("valid_hash") is not None
+
+
+def test_delete_expired_skips_refreshed_hashes(repository: DynamoDBClientUrlHashRepository) -> None:
+    repository.save_many([UrlHash(f"expired_{i}", f"http://www.expired{i}.com", 1663519832) for i in range(3)])
+    expired = [hash for page in repository.find_expired_hashes(now=1663519832) for hash in page]
+
+    # Refreshed between the scan and the delete
+    repository.save(UrlHash("expired_1", "http://www.expired1.com", 4102444800))
+
+    assert repository.delete_expired(expired, now=1663519832) == 2
+    assert list(repository.find_expired_hashes(now=1663519832)) == []
+    assert repository.get_by_hash("expired_1") == UrlHash("expired_1", "http://www.expired1.com", 4102444800)
+
+
+def test_legacy_items_are_read_and_migrated(repository: DynamoDBClientUrlHashRepository) -> None:
+    for hash, ttl in (("legacy_hash", "4102444800"), ("expired_hash", "1663519832")):
+        repository.client.put_item(TableName=repository.table_name, Item={
+            "PK": {"S": hash}, "SK": {"S": hash}, "url": {"S": f"http://www.{hash}.com"}, "ttl": {"S": ttl}
+        })
+
+    assert repository.get_by_hash("legacy_hash") == UrlHash("legacy_hash", "http://www.legacy_hash.com", 4102444800)
+    assert repository.get_by_hash("expired_hash") is None
+    assert list(repository.find_expired_hashes(now=1663519832)) == [["expired_hash"]]
+    assert not repository.save_if_available(UrlHash("legacy_hash", "http://www.other.com", 4102444800))
+
+    outdated = [url_hash for page in repository.find_outdated(0, 1) for url_hash in page]
+    assert repository.migrate_many(outdated) == 2
+    assert list(repository.find_outdated(0, 1)) == []
+    assert repository.migrate_many(outdated) == 0
+
+    item = repository.client.get_item(TableName=repository.table_name, Key={"PK": {"S": "legacy_hash"}, "SK": {"S": "legacy_hash"}})["Item"]
+    assert item == {
+        "PK": {"S": "legacy_hash"}, "SK": {"S": "legacy_hash"}, "v": {"N": "2"}, "u": {"S": "http://www.legacy_hash.com"}, "ttl": {"N": "4102444800"}
+    }
+
+
+def test_find_all(repository: DynamoDBClientUrlHashRepository) -> None:
+    repository.save_many([UrlHash(f"hash_{i}", f"http://www.test{i}.com", 4102444800) for i in range(10)])
+    repository.save(UrlHash("expired_hash", "http://www.expired.com", 1663519832))
+
+    # moto ignores the segments of a parallel Scan, so a single one is read
+    found = [url_hash for page in repository.find_all(0, 1, page_size=3) for url_hash in page]
+
+    assert sorted(url_hash.hash for url_hash in found) == sorted([f"hash_{i}" for i in range(10)] + ["expired_hash"])
+    assert UrlHash("hash_0", "http://www.test0.com", 4102444800) in found
+
+
+def test_save_if_absent(repository: DynamoDBClientUrlHashRepository) -> None:
+    assert repository.save_if_absent(UrlHash("test_hash", "http://www.test.com", 4102444800)) is None
+    assert repository.save_if_absent(UrlHash("test_hash", "http://www.other.com", 4102444801)) == UrlHash("test_hash", "http://www.test.com", 4102444800)
+
+    repository.save(UrlHash("expired_hash", "http://www.expired.com", 1663519832))
+    assert repository.save_if_absent(UrlHash("expired_hash", "http://www.other.com", 4102444800)) is None
+
+
+def test_add_access_counts_and_find_most_accessed(repository: DynamoDBClientUrlHashRepository) -> None:
+    repository.save_many([
+        UrlHash("cold_hash", "http://www.cold.com", 4102444800),
+        UrlHash("hot_hash", "http://www.hot.com", 4102444800),
+        UrlHash("expired_hash", "http://www.expired.com", 1663519832)
+    ])
+
+    repository.add_access_counts({"cold_hash": 1, "hot_hash": 3, "expired_hash": 100, "missing_hash": 100})
+    repository.add_access_counts({"cold_hash": 1})
+
+    assert repository.find_most_accessed(10, 1663519832) == [
+        UrlHash("hot_hash", "http://www.hot.com", 4102444800), UrlHash("cold_hash", "http://www.cold.com", 4102444800)
+    ]
+    assert repository.get_by_hash("missing_hash") is None
@@ -0,0 +1,43 @@
+from decimal import Decimal
+
+from zoorl.adapters.dynamodb_codec import (
+    attribute_names,
+    decode,
+    decode_plain,
+    encode,
+    encode_plain,
+    EXPIRED_FILTER,
+    PROJECTION_EXPRESSION
+)
+from zoorl.core.model import UrlHash
+
+TEST_URL_HASH = UrlHash("test_hash", "http://www.test.com", 4102444800)
+
+
+def test_encode_and_decode() -> None:
+    item = encode(TEST_URL_HASH)
+
+    assert item == {
+        "PK": {"S": "test_hash"}, "SK": {"S": "test_hash"}, "v": {"N": "2"}, "u": {"S": "http://www.test.com"}, "ttl": {"N": "4102444800"}
+    }
+    assert decode(item) == TEST_URL_HASH
+
+
+def test_decode_legacy_item() -> None:
+    assert decode({
+        "PK": {"S": "test_hash"}, "SK": {"S": "test_hash"}, "url": {"S": "http://www.test.com"}, "ttl": {"S": "4102444800"}
+    }) == TEST_URL_HASH
+
+
+def test_encode_and_decode_plain() -> None:
+    item = encode_plain(TEST_URL_HASH)
+
+    assert item == {"PK": "test_hash", "SK": "test_hash", "v": 2, "u": "http://www.test.com", "ttl": 4102444800}
+    # The resource layer returns numbers as Decimal
+    assert decode_plain({**item, "v": Decimal(2), "ttl": Decimal(4102444800)}) == TEST_URL_HASH
+    assert decode_plain({"PK": "test_hash", "SK": "test_hash", "url": "http://www.test.com", "ttl": "4102444800"}) == TEST_URL_HASH
+
+
+def test_attribute_names_only_include_used_placeholders() -> None:
+    assert attribute_names(EXPIRED_FILTER) == {"#ttl": "ttl"}
+    assert attribute_names(PROJECTION_EXPRESSION) == {"#u": "u", "#url": "url", "#ttl": "ttl"}
@@ -1,57 +1,15 @@
 from typing import Any, Dict, Optional
 import pytest
 
-import os
-import boto3
+from pytest_mock import MockerFixture
 
-from moto import mock_dynamodb
-
-from mypy_boto3_dynamodb.service_resource import DynamoDBServiceResource
 from mypy_boto3_dynamodb.service_resource import Table
 
-from zoorl.adapters.dynamodb_model import DynamoDBUrlHashRepository
+from zoorl.adapters import dynamodb_model
+from zoorl.adapters.dynamodb_model import DynamoDBUrlHashRepository, UnprocessedItemsError
 from zoorl.core.model import UrlHash
 
 
-@pytest.fixture
-def aws_credentials():
-    """Mocked AWS Credentials for moto."""
-    os.environ["AWS_ACCESS_KEY_ID"] = "testing"
-    os.environ["AWS_SECRET_ACCESS_KEY"] = "testing"
-    os.environ["AWS_SECURITY_TOKEN"] = "testing"
-    os.environ["AWS_SESSION_TOKEN"] = "testing"
-
-
-@pytest.fixture
-def mock_dynamodb_resource(aws_credentials) -> DynamoDBServiceResource:
-    """Mocked DynamoDB Resource """
-    with mock_dynamodb():
-        yield boto3.resource('dynamodb', region_name='us-east-1')
-
-
-@pytest.fixture
-def mock_url_hash_table(mock_dynamodb_resource: DynamoDBServiceResource) -> Table:
-    """Ensure that we have a table for performing our tests."""
-
-    test_table_name = "TestUrlHashes"
-    
-    return mock_dynamodb_resource.create_table(
-        TableName=test_table_name,
-        KeySchema=[
-            {'AttributeName': 'PK','KeyType': 'HASH'},
-            {'AttributeName': 'SK','KeyType': 'RANGE'}
-        ],
-        AttributeDefinitions=[
-            {'AttributeName': 'PK','AttributeType': 'S'},
-            {'AttributeName': 'SK','AttributeType': 'S'}
-        ],
-        ProvisionedThroughput={
-            'ReadCapacityUnits': 1,
-            'WriteCapacityUnits': 1
-        }
-    )
-
-
 @pytest.fixture
 def repository(mock_url_hash_table: Table) -> DynamoDBUrlHashRepository:
     """The SUT is the repository implementing DynamoDB operations."""
@@ -97,21 +55,22 @@ def test_helper(mock_url_hash_table: Table) -> DynamoDBTestHelper:
 def test_save(repository: DynamoDBUrlHashRepository, test_helper: DynamoDBTestHelper) -> None:
     url_hash = "test_hash"
     url = "http://www.test.com"
-    ttl = 1663519832
+    ttl = 4102444800
 
     repository.save(UrlHash(url_hash, url, ttl))
 
     test_helper.assert_item_is_present(url_hash, url_hash, {
         "PK": url_hash, 
         "SK": url_hash,
-        "url": url,
-        "ttl": str(ttl)
+        "v": 2,
+        "u": url,
+        "ttl": ttl
     })
 
 def test_get_by_hash(repository: DynamoDBUrlHashRepository, test_helper: DynamoDBTestHelper) -> None:
     test_url_hash = "test_hash"
     test_url = "http://www.test.com"
-    test_ttl = 1663519832
+    test_ttl = 4102444800
 
     repository.save(UrlHash(test_url_hash, test_url, test_ttl))
 
@@ -120,3 +79,180 @@ def test_get_by_hash(repository: DynamoDBUrlHashRepository, test_helper: DynamoD
     assert url_hash.hash == test_url_hash
     assert url_hash.url == test_url
     assert url_hash.ttl == test_ttl
+
+def test_save_if_available(repository: DynamoDBUrlHashRepository, test_helper: DynamoDBTestHelper) -> None:
+    test_ttl = 4102444800
+
+    assert repository.save_if_available(UrlHash("test_hash", "http://www.test.com", test_ttl))
+    # Same URL is fine (e.g., a retry), while a different URL is a collision
+    assert repository.save_if_available(UrlHash("test_hash", "http://www.test.com", test_ttl + 1))
+    assert not repository.save_if_available(UrlHash("test_hash", "http://www.other.com", test_ttl))
+
+    assert test_helper.get_item_by_pk("test_hash", "test_hash")["u"] == "http://www.test.com"
+
+def test_save_many(repository: DynamoDBUrlHashRepository, test_helper: DynamoDBTestHelper) -> None:
+    test_ttl = 4102444800
+    url_hashes = [UrlHash(f"hash_{i}", f"http://www.test{i}.com", test_ttl) for i in range(60)]
+
+    # Duplicated keys within the same batch are collapsed, with the last one winning
+    url_hashes.append(UrlHash("hash_0", "http://www.last.com", test_ttl))
+
+    repository.save_many(url_hashes)
+
+    for i in range(1, 60):
+        test_helper.assert_item_is_present(f"hash_{i}", f"hash_{i}")
+    assert test_helper.get_item_by_pk("hash_0", "hash_0")["u"] == "http://www.last.com"
+
+
+def test_save_many_retries_unprocessed_items(mocker: MockerFixture) -> None:
+    mocker.patch.object(dynamodb_model.time, "sleep")
+    table = mocker.Mock()
+    table.name = "TestUrlHashes"
+    unprocessed = {"UnprocessedItems": {"TestUrlHashes": [{"PutRequest": {"Item": {"PK": "hash_1"}}}]}}
+    table.meta.client.batch_write_item.side_effect = [unprocessed, {"UnprocessedItems": {}}]
+
+    DynamoDBUrlHashRepository(table).save_many([UrlHash("hash_1", "http://www.test.com", 4102444800)])
+
+    assert table.meta.client.batch_write_item.call_count == 2
+    assert table.meta.client.batch_write_item.call_args.kwargs["RequestItems"] == unprocessed["UnprocessedItems"]
+
+
+def test_save_many_gives_up_on_unprocessed_items(mocker: MockerFixture) -> None:
+    mocker.patch.object(dynamodb_model.time, "sleep")
+    table = mocker.Mock()
+    table.name = "TestUrlHashes"
+    table.meta.client.batch_write_item.return_value = {
+        "UnprocessedItems": {"TestUrlHashes": [{"PutRequest": {"Item": {"PK": "hash_1"}}}]}
+    }
+
+    with pytest.raises(UnprocessedItemsError):
+        DynamoDBUrlHashRepository(table).save_many([UrlHash("hash_1", "http://www.test.com", 4102444800)])
+
+
+def test_get_by_hashes(repository: DynamoDBUrlHashRepository) -> None:
+    test_ttl = 4102444800
+    repository.save_many([UrlHash(f"hash_{i}", f"http://www.test{i}.com", test_ttl) for i in range(150)])
+
+    found = repository.get_by_hashes([f"hash_{i}" for i in range(140, 160)] + ["hash_0", "hash_0"])
+
+    assert sorted(found.keys()) == sorted(["hash_0"] + [f"hash_{i}" for i in range(140, 150)])
+    assert found["hash_0"] == UrlHash("hash_0", "http://www.test0.com", test_ttl)
+
+
+def test_expired_items_are_not_returned(repository: DynamoDBUrlHashRepository) -> None:
+    expired_ttl = 1663519832
+    repository.save(UrlHash("expired_hash", "http://www.expired.com", expired_ttl))
+    repository.save(UrlHash("valid_hash", "http://www.valid.com", 4102444800))
+
+    assert repository.get_by_hash("expired_hash") is None
+    assert list(repository.get_by_hashes(["expired_hash", "valid_hash"]).keys()) == ["valid_hash"]
+
+    # The hash of an expired item can be taken by a different URL
+    assert repository.save_if_available(UrlHash("expired_hash", "http://www.other.com", 4102444800))
+
+
+def test_find_expired_and_delete_many(repository: DynamoDBUrlHashRepository, test_helper: DynamoDBTestHelper) -> None:
+    repository.save_many([UrlHash(f"expired_{i}", f"http://www.expired{i}.com", 1663519832) for i in range(30)])
+    repository.save(UrlHash("valid_hash", "http://www.valid.com", 4102444800))
+
+    pages = list(repository.find_expired_hashes(now=1663519832, page_size=10))
+    expired = [hash for page in pages for hash in page]
+    assert sorted(expired) == sorted(f"expired_{i}" for i in range(30))
+
+    repository.delete_many(expired)
+
+    assert test_helper.get_item_by_pk("expired_0", "expired_0") is None
+    test_helper.assert_item_is_present("valid_hash", "valid_hash")
+
+
+def test_delete_expired_skips_refreshed_hashes(repository: DynamoDBUrlHashRepository, test_helper: DynamoDBTestHelper) -> None:
+    repository.save_many([UrlHash(f"expired_{i}", f"http://www.expired{i}.com", 1663519832) for i in range(3)])
+    expired = [hash for page in repository.find_expired_hashes(now=1663519832) for hash in page]
+
+    # Taken again between the scan and the delete
+    repository.save(UrlHash("expired_1", "http://www.other.com", 4102444800))
+
+    assert repository.delete_expired(expired + ["missing_hash"], now=1663519832) == 2
+    assert test_helper.get_item_by_pk("expired_0", "expired_0") is None
+    assert repository.get_by_hash("expired_1") == UrlHash("expired_1", "http://www.other.com", 4102444800)
+
+
+def test_legacy_items_are_read(repository: DynamoDBUrlHashRepository, test_helper: DynamoDBTestHelper) -> None:
+    test_helper.table.put_item(Item={"PK": "legacy_hash", "SK": "legacy_hash", "url": "http://www.legacy.com", "ttl": "4102444800"})
+    test_helper.table.put_item(Item={"PK": "expired_hash", "SK": "expired_hash", "url": "http://www.expired.com", "ttl": "1663519832"})
+
+    assert repository.get_by_hash("legacy_hash") == UrlHash("legacy_hash", "http://www.legacy.com", 4102444800)
+    assert repository.get_by_hash("expired_hash") is None
+    assert list(repository.get_by_hashes(["legacy_hash", "expired_hash"]).keys()) == ["legacy_hash"]
+    assert list(repository.find_expired_hashes(now=1663519832)) == [["expired_hash"]]
+
+    # A legacy item keeps its hash for the same URL only
+    assert not repository.save_if_available(UrlHash("legacy_hash", "http://www.other.com", 4102444800))
+    assert repository.save_if_available(UrlHash("legacy_hash", "http://www.legacy.com", 4102444801))
+
+
+def test_find_outdated_and_migrate_many(repository: DynamoDBUrlHashRepository, test_helper: DynamoDBTestHelper) -> None:
+    for i in range(10):
+        test_helper.table.put_item(Item={"PK": f"legacy_{i}", "SK": f"legacy_{i}", "url": f"http://www.legacy{i}.com", "ttl": "4102444800"})
+    repository.save(UrlHash("current_hash", "http://www.current.com", 4102444800))
+
+    outdated = [url_hash for page in repository.find_outdated(page_size=3) for url_hash in page]
+    assert sorted(url_hash.hash for url_hash in outdated) == sorted(f"legacy_{i}" for i in range(10))
+
+    # Items deleted since they were read are not resurrected
+    repository.delete_many(["legacy_0"])
+
+    assert repository.migrate_many(outdated) == 9
+    assert test_helper.get_item_by_pk("legacy_0", "legacy_0") is None
+    test_helper.assert_item_is_present("legacy_1", "legacy_1", {
+        "PK": "legacy_1", "SK": "legacy_1", "v": 2, "u": "http://www.legacy1.com", "ttl": 4102444800
+    })
+    assert list(repository.find_outdated()) == []
+
+
+def test_find_all_reads_every_layout(repository: DynamoDBUrlHashRepository, test_helper: DynamoDBTestHelper) -> None:
+    test_helper.table.put_item(Item={"PK": "legacy_hash", "SK": "legacy_hash", "url": "http://www.legacy.com", "ttl": "4102444800"})
+    repository.save_many([UrlHash(f"hash_{i}", f"http://www.test{i}.com", 4102444800) for i in range(10)])
+    repository.save(UrlHash("expired_hash", "http://www.expired.com", 1663519832))
+
+    # moto ignores the segments of a parallel Scan, so a single one is read
+    found = [url_hash for page in repository.find_all(0, 1, page_size=3) for url_hash in page]
+
+    assert len(found) == 12
+    assert UrlHash("legacy_hash", "http://www.legacy.com", 4102444800) in found
+    assert UrlHash("expired_hash", "http://www.expired.com", 1663519832) in found
+
+
+def test_save_if_absent(repository: DynamoDBUrlHashRepository, test_helper: DynamoDBTestHelper) -> None:
+    assert repository.save_if_absent(UrlHash("test_hash", "http://www.test.com", 4102444800)) is None
+
+    # The existing item is returned, and not overwritten, whatever its URL
+    assert repository.save_if_absent(UrlHash("test_hash", "http://www.test.com", 4102444801)) == UrlHash("test_hash", "http://www.test.com", 4102444800)
+    assert repository.save_if_absent(UrlHash("test_hash", "http://www.other.com", 4102444801)) == UrlHash("test_hash", "http://www.test.com", 4102444800)
+    assert test_helper.get_item_by_pk("test_hash", "test_hash")["ttl"] == 4102444800
+
+    # Expired items are replaced
+    repository.save(UrlHash("expired_hash", "http://www.expired.com", 1663519832))
+    assert repository.save_if_absent(UrlHash("expired_hash", "http://www.other.com", 4102444800)) is None
+
+
+def test_add_access_counts_and_find_most_accessed(repository: DynamoDBUrlHashRepository, test_helper: DynamoDBTestHelper) -> None:
+    repository.save_many([
+        UrlHash("cold_hash", "http://www.cold.com", 4102444800),
+        UrlHash("warm_hash", "http://www.warm.com", 4102444800),
+        UrlHash("hot_hash", "http://www.hot.com", 4102444800),
+        UrlHash("never_hash", "http://www.never.com", 4102444800),
+        UrlHash("expired_hash", "http://www.expired.com", 1663519832)
+    ])
+
+    repository.add_access_counts({"cold_hash": 1, "warm_hash": 5, "hot_hash": 3, "expired_hash": 100, "missing_hash": 100})
+    repository.add_access_counts({"hot_hash": 7})
+
+    assert test_helper.get_item_by_pk("hot_hash", "hot_hash")["h"] == 10
+    # Counting does not create items
+    assert "Item" not in test_helper.table.get_item(Key={"PK": "missing_hash", "SK": "missing_hash"})
+
+    assert repository.find_most_accessed(2, 1663519832) == [
+        UrlHash("hot_hash", "http://www.hot.com", 4102444800), UrlHash("warm_hash", "http://www.warm.com", 4102444800)
+    ]
+    assert [url_hash.hash for url_hash in repository.find_most_accessed(10, 1663519832)] == ["hot_hash", "warm_hash", "cold_hash"]
@@ -0,0 +1,55 @@
+import json
+
+from zoorl.adapters.emf import count_lines, timing_lines
+from zoorl.core.instrumentation import MAX_SAMPLES_PER_STAGE
+
+
+def test_timing_lines() -> None:
+    lines = [json.loads(line) for line in timing_lines({"Resolver": [1.5, 2.5], "ReadUrlHash": [0.5]}, "zoorl", timestamp=1000)]
+
+    assert lines == [{
+        "_aws": {
+            "Timestamp": 1000000,
+            "CloudWatchMetrics": [{
+                "Namespace": "zoorl",
+                "Dimensions": [["service"]],
+                "Metrics": [{"Name": "Resolver", "Unit": "Milliseconds"}, {"Name": "ReadUrlHash", "Unit": "Milliseconds"}]
+            }]
+        },
+        "service": "zoorl",
+        "Resolver": [1.5, 2.5],
+        "ReadUrlHash": [0.5]
+    }]
+
+
+def test_timing_lines_are_split() -> None:
+    samples = {"Resolver": [1.0] * (MAX_SAMPLES_PER_STAGE + 1), "ReadUrlHash": [0.5]}
+
+    lines = [json.loads(line) for line in timing_lines(samples, "zoorl")]
+
+    assert [len(line["Resolver"]) for line in lines] == [MAX_SAMPLES_PER_STAGE, 1]
+    assert "ReadUrlHash" not in lines[1]
+    assert lines[1]["_aws"]["CloudWatchMetrics"][0]["Metrics"] == [{"Name": "Resolver", "Unit": "Milliseconds"}]
+
+
+def test_no_samples() -> None:
+    assert list(timing_lines({}, "zoorl")) == []
+
+
+def test_count_lines() -> None:
+    lines = [json.loads(line) for line in count_lines({"SingleFlight.calls": 10, "SingleFlight.coalesced": 7}, "zoorl", timestamp=1000)]
+
+    assert lines == [{
+        "_aws": {
+            "Timestamp": 1000000,
+            "CloudWatchMetrics": [{
+                "Namespace": "zoorl",
+                "Dimensions": [["service"]],
+                "Metrics": [{"Name": "SingleFlight.calls", "Unit": "Count"}, {"Name": "SingleFlight.coalesced", "Unit": "Count"}]
+            }]
+        },
+        "service": "zoorl",
+        "SingleFlight.calls": 10,
+        "SingleFlight.coalesced": 7
+    }]
+    assert list(count_lines({}, "zoorl")) == []
@@ -0,0 +1,25 @@
+import json
+
+import pytest
+
+from zoorl.adapters.http_bodies import resolved_url_hashes_body, url_hash_body
+
+
+@pytest.mark.parametrize("url", ["http://www.test.com", "http://www.test.com/?q=\"a\\b\"", "http://www.tést.com/ü "])
+def test_url_hash_body_matches_json_dumps(url: str) -> None:
+    expected = json.dumps({"url_hash": "test_hash", "url": url, "ttl": 4102444800}, separators=(",", ":"))
+
+    assert url_hash_body("test_hash", url, 4102444800) == expected
+
+
+def test_resolved_url_hashes_body_matches_json_dumps() -> None:
+    found = [url_hash_body("hash_1", "http://www.test.com/1", 4102444800), url_hash_body("hash_2", "http://www.test.com/2", 1)]
+
+    assert json.loads(resolved_url_hashes_body(found, ["hash_3"])) == {
+        "found": [
+            {"url_hash": "hash_1", "url": "http://www.test.com/1", "ttl": 4102444800},
+            {"url_hash": "hash_2", "url": "http://www.test.com/2", "ttl": 1}
+        ],
+        "missing": ["hash_3"]
+    }
+    assert resolved_url_hashes_body([], []) == '{"found":[],"missing":[]}'
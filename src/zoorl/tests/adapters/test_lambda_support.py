@@ -0,0 +1,53 @@
+import logging
+import os
+import subprocess
+import sys
+
+from pytest_mock import MockerFixture
+
+from zoorl.adapters.lambda_support import SampledRequestLog
+
+
+def test_sampled_request_log_writes_sampled_invocations(mocker: MockerFixture) -> None:
+    logger = mocker.Mock()
+    logger.isEnabledFor.return_value = True
+    request_log = SampledRequestLog(logger, sample_rate=0.25, draw=mocker.Mock(side_effect=[0.1, 0.5]))
+
+    request_log.start()
+    request_log.info("Redirecting", url_hash="hash_1")
+    request_log.start()
+    request_log.info("Redirecting", url_hash="hash_2")
+
+    logger.isEnabledFor.assert_called_with(logging.INFO)
+    logger.info.assert_called_once_with("Redirecting", extra={"url_hash": "hash_1"}, stacklevel=2)
+
+
+def test_sampled_request_log_is_silent_above_info(mocker: MockerFixture) -> None:
+    logger = mocker.Mock()
+    logger.isEnabledFor.return_value = False
+    draw = mocker.Mock(return_value=0.0)
+    request_log = SampledRequestLog(logger, sample_rate=1, draw=draw)
+
+    request_log.start()
+    request_log.info("Redirecting", url_hash="hash_1")
+
+    logger.info.assert_not_called()
+    draw.assert_not_called()
+
+
+def test_lambda_functions_do_not_import_asyncio() -> None:
+    """Importing asyncio takes a while on cold start, and only the ASGI app needs it."""
+    handlers = [
+        "create_url_alias_handler", "create_url_hash_handler", "create_url_hashes_handler", "migrate_url_hashes_handler",
+        "purge_expired_url_hashes_handler", "read_url_hash_handler", "read_url_hashes_handler", "record_clicks_handler",
+        "redirect_handler"
+    ]
+    script = "; ".join(
+        [f"import zoorl.adapters.{handler}" for handler in handlers] + ["import sys", "assert 'asyncio' not in sys.modules"]
+    )
+
+    subprocess.run(
+        [sys.executable, "-c", script],
+        env={**os.environ, "AWS_DEFAULT_REGION": "us-east-1", "POWERTOOLS_TRACE_DISABLED": "true"},
+        check=True
+    )
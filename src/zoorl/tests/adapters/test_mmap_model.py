@@ -0,0 +1,66 @@
+import io
+import json
+
+import pytest
+
+from zoorl.adapters.dynamodb_codec import encode
+from zoorl.adapters.mmap_model import (
+    read_dynamodb_export,
+    write_hash_table,
+    InvalidHashTableFileError,
+    MmapUrlHashRepository,
+    ReadOnlyRepositoryError
+)
+from zoorl.core.model import UrlHash
+
+
+def test_write_and_lookup(tmp_path) -> None:
+    path = str(tmp_path / "url_hashes.zht")
+    url_hashes = [UrlHash(f"{i:07d}", f"https://www.example.com/ü/{i}", 4102444800 + i) for i in range(1000)]
+    url_hashes.append(UrlHash("expired", "http://www.expired.com", 1663519832))
+
+    assert write_hash_table(path, url_hashes) == 1001
+
+    repository = MmapUrlHashRepository(path)
+
+    assert len(repository) == 1001
+    for url_hash in url_hashes[:1000]:
+        assert repository.get_by_hash(url_hash.hash) == url_hash
+    assert repository.get_by_hash("expired") is None
+    assert repository.get_by_hash("missing") is None
+
+    with pytest.raises(ReadOnlyRepositoryError):
+        repository.save(url_hashes[0])
+
+    repository.close()
+
+
+def test_expired_url_hashes_are_skipped_on_build(tmp_path) -> None:
+    path = str(tmp_path / "url_hashes.zht")
+
+    assert write_hash_table(path, [
+        UrlHash("valid", "http://www.valid.com", 4102444800), UrlHash("expired", "http://www.expired.com", 1663519832)
+    ], now=1663519832) == 1
+
+
+def test_empty_table(tmp_path) -> None:
+    path = str(tmp_path / "url_hashes.zht")
+    write_hash_table(path, [])
+
+    assert MmapUrlHashRepository(path).get_by_hash("missing") is None
+
+
+def test_invalid_file(tmp_path) -> None:
+    path = tmp_path / "invalid.zht"
+    path.write_bytes(b"not a hash table")
+
+    with pytest.raises(InvalidHashTableFileError):
+        MmapUrlHashRepository(str(path))
+
+
+def test_read_dynamodb_export() -> None:
+    url_hash = UrlHash("test_hash", "http://www.test.com", 4102444800)
+    legacy_item = {"PK": {"S": "legacy"}, "SK": {"S": "legacy"}, "url": {"S": "http://www.legacy.com"}, "ttl": {"S": "4102444800"}}
+    export = io.StringIO(f'{json.dumps({"Item": encode(url_hash)})}\n{json.dumps({"Item": legacy_item})}\n\n')
+
+    assert list(read_dynamodb_export(export)) == [url_hash, UrlHash("legacy", "http://www.legacy.com", 4102444800)]
@@ -0,0 +1,78 @@
+import random
+
+import pytest
+
+from zoorl.adapters.redirect_snapshot import (
+    open_redirect_snapshot,
+    write_redirect_snapshot,
+    InvalidSnapshotFileError,
+    RedirectSnapshot
+)
+from zoorl.core.model import UrlHash
+from zoorl.core.utils import BASE62_ENCODING_CHARS
+
+
+def test_write_and_lookup(tmp_path) -> None:
+    path = str(tmp_path / "snapshot.zrs")
+    url_hashes = [UrlHash(f"{i:07d}", f"https://www.example.com/ü/{i}", 4102444800 + i) for i in range(5000)]
+    url_hashes.append(UrlHash("expired", "http://www.expired.com", 1663519832))
+
+    assert write_redirect_snapshot(path, url_hashes) == 5001
+
+    snapshot = open_redirect_snapshot(path)
+
+    assert len(snapshot) == 5001
+    for url_hash in url_hashes[:5000]:
+        assert snapshot.get_by_hash(url_hash.hash) == url_hash
+    assert snapshot.get_by_hash("expired") is None
+    # Missing keys land on the slot of another key
+    for i in range(5000, 6000):
+        assert snapshot.get_by_hash(f"{i:07d}") is None
+
+    snapshot.close()
+
+
+def test_expired_url_hashes_are_skipped_on_build(tmp_path) -> None:
+    path = str(tmp_path / "snapshot.zrs")
+
+    assert write_redirect_snapshot(path, [
+        UrlHash("valid", "http://www.valid.com", 4102444800), UrlHash("expired", "http://www.expired.com", 1663519832)
+    ], now=1663519832) == 1
+
+
+@pytest.mark.parametrize("count", [0, 1, 2])
+def test_tiny_snapshots(tmp_path, count: int) -> None:
+    path = str(tmp_path / "snapshot.zrs")
+    url_hashes = [UrlHash(f"hash_{i}", f"http://www.test.com/{i}", 4102444800) for i in range(count)]
+    write_redirect_snapshot(path, url_hashes)
+
+    snapshot = RedirectSnapshot(path)
+
+    for url_hash in url_hashes:
+        assert snapshot.get_by_hash(url_hash.hash) == url_hash
+    assert snapshot.get_by_hash("missing") is None
+
+
+def test_random_snapshots_always_build(tmp_path) -> None:
+    """Small snapshots of random hashes, as built by the API, used to miss a perfect hash function."""
+    path = str(tmp_path / "snapshot.zrs")
+    rng = random.Random(42)
+
+    for count in range(1, 51):
+        for _ in range(20):
+            hashes = {"".join(rng.choices(BASE62_ENCODING_CHARS, k=7)) for _ in range(count)}
+            url_hashes = [UrlHash(hash, f"http://www.test.com/{hash}", 4102444800) for hash in hashes]
+            write_redirect_snapshot(path, url_hashes)
+
+            snapshot = RedirectSnapshot(path)
+            for url_hash in url_hashes:
+                assert snapshot.get_by_hash(url_hash.hash) == url_hash
+            snapshot.close()
+
+
+def test_invalid_file(tmp_path) -> None:
+    path = tmp_path / "invalid.zrs"
+    path.write_bytes(b"not a redirect snapshot")
+
+    with pytest.raises(InvalidSnapshotFileError):
+        RedirectSnapshot(str(path))
@@ -0,0 +1,26 @@
+import asyncio
+
+from pytest_mock import MockerFixture
+
+from zoorl.adapters.single_flight_async_model import AsyncSingleFlightUrlHashRepository
+from zoorl.core.model import UrlHash
+from zoorl.ports.async_repository import AsyncUrlHashRepository
+
+
+def test_async_concurrent_reads_are_coalesced(mocker: MockerFixture) -> None:
+    delegate = mocker.AsyncMock(spec=AsyncUrlHashRepository)
+    url_hash = UrlHash("test_hash", "http://www.test.com", 4102444800)
+
+    async def slow_read(hash: str) -> UrlHash:
+        await asyncio.sleep(0.01)
+        return url_hash
+
+    delegate.get_by_hash.side_effect = slow_read
+    repository = AsyncSingleFlightUrlHashRepository(delegate)
+
+    async def main() -> list:
+        return await asyncio.gather(*(repository.get_by_hash("test_hash") for _ in range(5)))
+
+    assert asyncio.run(main()) == [url_hash] * 5
+    delegate.get_by_hash.assert_awaited_once_with("test_hash")
+    assert repository.flight.drain() == {"calls": 5, "coalesced": 4}
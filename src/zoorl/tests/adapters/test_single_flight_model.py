@@ -0,0 +1,23 @@
+from pytest_mock import MockerFixture
+
+from zoorl.adapters.single_flight_model import SingleFlightUrlHashRepository
+from zoorl.core.model import UrlHash
+from zoorl.ports.repository import UrlHashRepository
+
+
+def test_writes_detach_the_read_in_flight(mocker: MockerFixture) -> None:
+    delegate = mocker.Mock(spec=UrlHashRepository)
+    repository = SingleFlightUrlHashRepository(delegate)
+    url_hash = UrlHash("test_hash", "http://www.test.com", 4102444800)
+
+    def read_then_write(hash: str) -> None:
+        # A write completing while the read is in flight: the next read does not share it
+        repository.save(url_hash)
+        delegate.get_by_hash.side_effect = lambda hash: url_hash
+        assert repository.get_by_hash(hash) == url_hash
+
+    delegate.get_by_hash.side_effect = read_then_write
+
+    assert repository.get_by_hash("test_hash") is None
+    delegate.save.assert_called_once_with(url_hash)
+    assert repository.flight.drain() == {"calls": 2, "coalesced": 0}
@@ -0,0 +1,106 @@
+from typing import Iterator
+
+import pytest
+
+from zoorl.adapters.sqlite_model import SQLiteUrlHashRepository, MAX_PARAMETERS
+from zoorl.core.model import UrlHash
+
+
+@pytest.fixture
+def repository(tmp_path) -> Iterator[SQLiteUrlHashRepository]:
+    """The SUT is the repository on a database file."""
+
+    repository = SQLiteUrlHashRepository.open(str(tmp_path / "url_hashes.db"))
+    yield repository
+    repository.close()
+
+
+def test_wal_mode(repository: SQLiteUrlHashRepository) -> None:
+    assert repository.connection.execute("PRAGMA journal_mode").fetchone() == ("wal",)
+
+
+def test_save_and_get_by_hash(repository: SQLiteUrlHashRepository) -> None:
+    repository.save(UrlHash("test_hash", "http://www.test.com", 4102444800))
+    repository.save(UrlHash("expired_hash", "http://www.expired.com", 1663519832))
+
+    assert repository.get_by_hash("test_hash") == UrlHash("test_hash", "http://www.test.com", 4102444800)
+    assert repository.get_by_hash("expired_hash") is None
+    assert repository.get_by_hash("missing_hash") is None
+
+
+def test_conditional_saves(repository: SQLiteUrlHashRepository) -> None:
+    repository.save(UrlHash("test_hash", "http://www.test.com", 4102444800))
+    repository.save(UrlHash("expired_hash", "http://www.expired.com", 1663519832))
+
+    assert not repository.save_if_available(UrlHash("test_hash", "http://www.other.com", 4102444800))
+    assert repository.save_if_available(UrlHash("test_hash", "http://www.test.com", 4102444801))
+    assert repository.save_if_available(UrlHash("expired_hash", "http://www.other.com", 4102444800))
+
+    assert repository.save_if_absent(UrlHash("test_hash", "http://www.other.com", 4102444802)) == UrlHash("test_hash", "http://www.test.com", 4102444801)
+    assert repository.save_if_absent(UrlHash("new_hash", "http://www.new.com", 4102444800)) is None
+    assert repository.get_by_hash("new_hash") is not None
+
+
+def test_save_many_and_get_by_hashes(repository: SQLiteUrlHashRepository) -> None:
+    count = MAX_PARAMETERS + 10
+    repository.save_many([UrlHash(f"hash_{i}", f"http://www.test{i}.com", 4102444800) for i in range(count)])
+    repository.save(UrlHash("expired_hash", "http://www.expired.com", 1663519832))
+
+    found = repository.get_by_hashes([f"hash_{i}" for i in range(count)] + ["expired_hash", "missing_hash"])
+
+    assert len(found) == count
+    assert found["hash_0"] == UrlHash("hash_0", "http://www.test0.com", 4102444800)
+
+
+def test_find_expired_and_delete_many(repository: SQLiteUrlHashRepository) -> None:
+    repository.save_many([UrlHash(f"expired_{i}", f"http://www.expired{i}.com", 1663519800 + i % 3) for i in range(30)])
+    repository.save(UrlHash("valid_hash", "http://www.valid.com", 4102444800))
+
+    # Pages stay consistent while the previous ones are deleted
+    expired = []
+    for page in repository.find_expired_hashes(now=1663519832, page_size=7):
+        repository.delete_many(page)
+        expired.extend(page)
+
+    assert sorted(expired) == sorted(f"expired_{i}" for i in range(30))
+    assert list(repository.find_expired_hashes(now=1663519832)) == []
+    assert repository.get_by_hash("valid_hash") is not None
+
+
+def test_delete_expired_skips_refreshed_hashes(repository: SQLiteUrlHashRepository) -> None:
+    repository.save_many([UrlHash(f"expired_{i}", f"http://www.expired{i}.com", 1663519832) for i in range(3)])
+    expired = [hash for page in repository.find_expired_hashes(now=1663519832) for hash in page]
+
+    # Taken again between the scan and the delete
+    repository.save(UrlHash("expired_1", "http://www.other.com", 4102444800))
+
+    assert repository.delete_expired(expired, now=1663519832) == 2
+    assert list(repository.find_expired_hashes(now=1663519832)) == []
+    assert repository.get_by_hash("expired_1") == UrlHash("expired_1", "http://www.other.com", 4102444800)
+
+
+def test_add_access_counts_and_find_most_accessed(repository: SQLiteUrlHashRepository) -> None:
+    repository.save_many([
+        UrlHash("cold_hash", "http://www.cold.com", 4102444800),
+        UrlHash("hot_hash", "http://www.hot.com", 4102444800),
+        UrlHash("never_hash", "http://www.never.com", 4102444800),
+        UrlHash("expired_hash", "http://www.expired.com", 1663519832)
+    ])
+
+    repository.add_access_counts({"cold_hash": 1, "hot_hash": 3, "expired_hash": 100, "missing_hash": 100})
+    repository.add_access_counts({"cold_hash": 1})
+
+    assert repository.find_most_accessed(10, 1663519832) == [
+        UrlHash("hot_hash", "http://www.hot.com", 4102444800), UrlHash("cold_hash", "http://www.cold.com", 4102444800)
+    ]
+    assert repository.find_most_accessed(1, 1663519832) == [UrlHash("hot_hash", "http://www.hot.com", 4102444800)]
+
+
+def test_find_all_by_segments(repository: SQLiteUrlHashRepository) -> None:
+    repository.save_many([UrlHash(f"hash_{i}", f"http://www.test{i}.com", 4102444800) for i in range(20)])
+    repository.save(UrlHash("expired_hash", "http://www.expired.com", 1663519832))
+
+    segments = [[url_hash.hash for page in repository.find_all(segment, 3, page_size=4) for url_hash in page] for segment in range(3)]
+
+    assert sorted(hash for segment in segments for hash in segment) == sorted([f"hash_{i}" for i in range(20)] + ["expired_hash"])
+    assert all(segments)
@@ -0,0 +1,122 @@
+import pytest
+
+from botocore.exceptions import ClientError
+from pytest_mock import MockerFixture
+
+from zoorl.adapters import throttling_model
+from zoorl.adapters.throttling_model import is_throttling_error, ThrottledUrlHashRepository
+from zoorl.core.model import UrlHash
+from zoorl.core.token_bucket import TokenBucket
+from zoorl.ports.repository import UrlHashRepository
+
+
+def client_error(code: str) -> ClientError:
+    return ClientError({"Error": {"Code": code, "Message": code}}, "PutItem")
+
+
+@pytest.fixture
+def delegate(mocker: MockerFixture):
+    return mocker.Mock(spec=UrlHashRepository)
+
+
+@pytest.fixture
+def token_bucket(mocker: MockerFixture):
+    return mocker.Mock(spec=TokenBucket)
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(mocker: MockerFixture):
+    return mocker.patch.object(throttling_model.time, "sleep")
+
+
+def test_is_throttling_error() -> None:
+    assert is_throttling_error(client_error("ProvisionedThroughputExceededException"))
+    assert is_throttling_error(client_error("ThrottlingException"))
+    assert not is_throttling_error(client_error("ConditionalCheckFailedException"))
+    assert not is_throttling_error(ValueError())
+
+
+def test_throttled_writes_are_retried(delegate, token_bucket, no_sleep) -> None:
+    delegate.save_if_absent.side_effect = [
+        client_error("ProvisionedThroughputExceededException"), client_error("ThrottlingException"), None
+    ]
+    repository = ThrottledUrlHashRepository(delegate, token_bucket)
+
+    assert repository.save_if_absent(UrlHash("test_hash", "http://www.test.com", 4102444800)) is None
+
+    assert delegate.save_if_absent.call_count == 3
+    assert token_bucket.acquire.call_count == 3
+    assert repository.throttled == 2
+    assert no_sleep.call_count == 2
+
+
+def test_throttled_writes_give_up(delegate, token_bucket) -> None:
+    delegate.save.side_effect = client_error("ProvisionedThroughputExceededException")
+    repository = ThrottledUrlHashRepository(delegate, token_bucket, max_attempts=3)
+
+    with pytest.raises(ClientError):
+        repository.save(UrlHash("test_hash", "http://www.test.com", 4102444800))
+
+    assert delegate.save.call_count == 3
+    assert repository.throttled == 3
+
+
+def test_sdk_retries_count_towards_the_attempts(delegate, token_bucket) -> None:
+    delegate.save.side_effect = client_error("ProvisionedThroughputExceededException")
+    # Each call is already retried twice by the SDK client
+    repository = ThrottledUrlHashRepository(delegate, token_bucket, max_attempts=6, sdk_attempts=3)
+
+    with pytest.raises(ClientError):
+        repository.save(UrlHash("test_hash", "http://www.test.com", 4102444800))
+
+    assert delegate.save.call_count == 2
+
+
+def test_other_errors_are_not_retried(delegate, token_bucket) -> None:
+    delegate.save.side_effect = client_error("ValidationException")
+    repository = ThrottledUrlHashRepository(delegate, token_bucket)
+
+    with pytest.raises(ClientError):
+        repository.save(UrlHash("test_hash", "http://www.test.com", 4102444800))
+
+    assert delegate.save.call_count == 1
+
+
+def test_batches_are_split_and_paced(delegate, token_bucket) -> None:
+    repository = ThrottledUrlHashRepository(delegate, token_bucket)
+    url_hashes = [UrlHash(f"hash_{i}", f"http://www.test.com/{i}", 4102444800) for i in range(60)]
+
+    repository.save_many(url_hashes)
+
+    assert [call.args[0] for call in delegate.save_many.call_args_list] == [url_hashes[:25], url_hashes[25:50], url_hashes[50:]]
+    assert [call.args[0] for call in token_bucket.acquire.call_args_list] == [25, 25, 10]
+
+
+def test_access_counts_applied_before_a_throttle_are_not_added_again(delegate, token_bucket) -> None:
+    delegate.add_access_counts.side_effect = [None, client_error("ProvisionedThroughputExceededException"), None, None]
+    repository = ThrottledUrlHashRepository(delegate, token_bucket)
+
+    repository.add_access_counts({"hash_1": 3, "hash_2": 2, "hash_3": 1})
+
+    assert [call.args[0] for call in delegate.add_access_counts.call_args_list] == [
+        {"hash_1": 3}, {"hash_2": 2}, {"hash_2": 2}, {"hash_3": 1}
+    ]
+    assert repository.throttled == 1
+
+
+def test_migrations_are_retried_one_item_at_a_time(delegate, token_bucket) -> None:
+    delegate.migrate_many.side_effect = [1, client_error("ThrottlingException"), 1]
+    repository = ThrottledUrlHashRepository(delegate, token_bucket)
+    url_hashes = [UrlHash(f"hash_{i}", f"http://www.test.com/{i}", 4102444800) for i in range(2)]
+
+    assert repository.migrate_many(url_hashes) == 2
+
+    assert [call.args[0] for call in delegate.migrate_many.call_args_list] == [url_hashes[:1], url_hashes[1:], url_hashes[1:]]
+
+
+def test_reads_are_not_paced(delegate, token_bucket) -> None:
+    delegate.get_by_hash.return_value = None
+    repository = ThrottledUrlHashRepository(delegate, token_bucket)
+
+    assert repository.get_by_hash("test_hash") is None
+    token_bucket.acquire.assert_not_called()
@@ -0,0 +1,41 @@
+from zoorl.core.access_counter import AccessCounter
+
+
+def test_counts_are_drained_once_due() -> None:
+    now = [1000.0]
+    counter = AccessCounter(flush_interval=60, bucket_size=60, clock=lambda: now[0])
+
+    assert not counter.is_due()
+
+    counter.record("hash_1")
+    counter.record("hash_2")
+    counter.record("hash_1")
+
+    assert not counter.is_due()
+    now[0] += 60
+    assert counter.is_due()
+    counter.record("hash_1")
+
+    assert counter.drain() == {("hash_1", 960): 2, ("hash_2", 960): 1, ("hash_1", 1020): 1}
+    assert len(counter) == 0
+    assert not counter.is_due()
+
+
+def test_too_many_events_are_due() -> None:
+    counter = AccessCounter(flush_interval=60, max_events=2, clock=lambda: 1000.0)
+
+    counter.record("hash_1")
+    assert not counter.is_due()
+
+    counter.record("hash_1")
+    assert counter.is_due()
+
+
+def test_interval_starts_with_the_first_event() -> None:
+    now = [1000.0]
+    counter = AccessCounter(flush_interval=60, clock=lambda: now[0])
+
+    now[0] += 120
+    counter.record("hash_1")
+
+    assert not counter.is_due()
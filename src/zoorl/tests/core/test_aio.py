@@ -0,0 +1,20 @@
+import asyncio
+
+from zoorl.core.aio import gather_bounded
+
+
+def test_gather_bounded_keeps_order_and_bounds_concurrency() -> None:
+    in_flight = 0
+    max_in_flight = 0
+
+    async def double(value: int) -> int:
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        # Later items complete first
+        await asyncio.sleep(0.001 * (10 - value))
+        in_flight -= 1
+        return value * 2
+
+    assert asyncio.run(gather_bounded(double, range(10), max_concurrency=3)) == [value * 2 for value in range(10)]
+    assert max_in_flight == 3
@@ -0,0 +1,54 @@
+import asyncio
+
+import pytest
+
+from zoorl.core.async_single_flight import AsyncSingleFlight
+
+
+def test_async_concurrent_calls_share_one_call() -> None:
+    flight: AsyncSingleFlight[str] = AsyncSingleFlight()
+    calls = []
+
+    async def fetch() -> str:
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "value"
+
+    async def main() -> list:
+        return await asyncio.gather(*(flight.do("key", fetch) for _ in range(8)), flight.do("other", fetch))
+
+    assert asyncio.run(main()) == ["value"] * 9
+    assert len(calls) == 2
+    assert flight.drain() == {"calls": 9, "coalesced": 7}
+
+
+def test_async_errors_are_shared() -> None:
+    flight: AsyncSingleFlight[str] = AsyncSingleFlight()
+
+    async def failing_fetch() -> str:
+        await asyncio.sleep(0.01)
+        raise IOError("read failed")
+
+    async def main() -> list:
+        return await asyncio.gather(*(flight.do("key", failing_fetch) for _ in range(3)), return_exceptions=True)
+
+    assert [type(error) for error in asyncio.run(main())] == [IOError] * 3
+
+
+def test_async_cancelled_caller_does_not_cancel_the_others() -> None:
+    flight: AsyncSingleFlight[str] = AsyncSingleFlight()
+
+    async def fetch() -> str:
+        await asyncio.sleep(0.02)
+        return "value"
+
+    async def main() -> str:
+        first = asyncio.ensure_future(flight.do("key", fetch))
+        second = asyncio.ensure_future(flight.do("key", fetch))
+        await asyncio.sleep(0)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(main()) == "value"
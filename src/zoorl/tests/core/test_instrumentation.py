@@ -0,0 +1,71 @@
+import asyncio
+
+import pytest
+
+from zoorl.core import instrumentation as instrumentation_module
+from zoorl.core.instrumentation import timed, Instrumentation, MAX_SAMPLES_PER_STAGE
+
+
+@pytest.fixture
+def recorder(monkeypatch) -> Instrumentation:
+    """A fresh, enabled recorder in place of the process-wide one."""
+    recorder = Instrumentation(enabled=True)
+    monkeypatch.setattr(instrumentation_module, "instrumentation", recorder)
+    return recorder
+
+
+@timed("Test.add")
+def add(a: int, b: int) -> int:
+    return a + b
+
+
+@timed("Test.fail")
+def fail() -> None:
+    raise ValueError()
+
+
+@timed("Test.add_async")
+async def add_async(a: int, b: int) -> int:
+    return a + b
+
+
+def test_calls_are_timed(recorder: Instrumentation) -> None:
+    assert add(1, 2) == 3
+    assert add(2, 3) == 5
+    with pytest.raises(ValueError):
+        fail()
+    assert asyncio.run(add_async(1, 2)) == 3
+
+    samples = recorder.drain()
+
+    assert len(samples["Test.add"]) == 2
+    assert len(samples["Test.fail"]) == 1
+    assert len(samples["Test.add_async"]) == 1
+    assert all(duration >= 0 for durations in samples.values() for duration in durations)
+    assert recorder.drain() == {}
+
+
+def test_disabled_calls_are_not_timed(recorder: Instrumentation) -> None:
+    recorder.enabled = False
+
+    assert add(1, 2) == 3
+    assert asyncio.run(add_async(1, 2)) == 3
+
+    assert not recorder.is_due()
+    assert recorder.drain() == {}
+
+
+def test_drain_is_due() -> None:
+    now = [1000.0]
+    recorder = Instrumentation(enabled=True, flush_interval=60, clock=lambda: now[0])
+
+    recorder.record("Test.add", 1.0)
+    assert not recorder.is_due()
+
+    now[0] += 60
+    assert recorder.is_due()
+    recorder.drain()
+
+    for _ in range(MAX_SAMPLES_PER_STAGE):
+        recorder.record("Test.add", 1.0)
+    assert recorder.is_due()
@@ -0,0 +1,23 @@
+import copy
+import dataclasses
+import pickle
+
+import pytest
+
+from zoorl.core.model import UrlHash
+
+
+def test_url_hash_is_compact_and_immutable() -> None:
+    url_hash = UrlHash(hash="test_hash", url="http://www.test.com", ttl=4102444800)
+
+    assert not hasattr(url_hash, "__dict__")
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        url_hash.ttl = 1  # type: ignore
+
+
+def test_url_hash_copies_and_pickles() -> None:
+    url_hash = UrlHash(hash="test_hash", url="http://www.test.com", ttl=4102444800)
+
+    assert copy.copy(url_hash) == url_hash
+    assert pickle.loads(pickle.dumps(url_hash)) == url_hash
+    assert len({url_hash, copy.copy(url_hash)}) == 1
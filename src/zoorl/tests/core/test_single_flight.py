@@ -0,0 +1,77 @@
+import threading
+
+from zoorl.core.single_flight import SingleFlight
+
+
+def test_concurrent_calls_share_one_call() -> None:
+    flight: SingleFlight[str] = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def fetch() -> str:
+        calls.append(1)
+        release.wait(5)
+        return "value"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flight.do("key", fetch))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    # Every thread has joined the call in flight once they are all counted
+    while flight.calls < len(threads):
+        pass
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert results == ["value"] * 8
+    assert len(calls) == 1
+    assert flight.drain() == {"calls": 8, "coalesced": 7}
+    assert flight.drain() == {"calls": 0, "coalesced": 0}
+
+    # The call is not cached once completed
+    assert flight.do("key", lambda: "new value") == "new value"
+
+
+def test_errors_are_shared_and_not_cached() -> None:
+    flight: SingleFlight[str] = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    errors = []
+
+    def failing_fetch() -> str:
+        started.set()
+        release.wait(5)
+        raise IOError("read failed")
+
+    def call() -> None:
+        try:
+            flight.do("key", failing_fetch)
+        except IOError as ex:
+            errors.append(ex)
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    started.wait(5)
+    follower = threading.Thread(target=call)
+    follower.start()
+    while flight.calls < 2:
+        pass
+    release.set()
+    leader.join()
+    follower.join()
+
+    assert len(errors) == 2
+    assert flight.do("key", lambda: "value") == "value"
+
+
+def test_forgotten_calls_are_not_shared() -> None:
+    flight: SingleFlight[str] = SingleFlight()
+
+    def fetch_then_forget() -> str:
+        flight.forget("key")
+        # A caller arriving now starts its own call
+        assert flight.do("key", lambda: "after") == "after"
+        return "before"
+
+    assert flight.do("key", fetch_then_forget) == "before"
+    assert flight.drain() == {"calls": 2, "coalesced": 0}
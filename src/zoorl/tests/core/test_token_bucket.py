@@ -0,0 +1,40 @@
+from zoorl.core.token_bucket import TokenBucket
+
+
+class FakeClock:
+    """Clock advanced by the sleeps of the bucket."""
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+def test_acquire_waits_for_the_refill() -> None:
+    clock = FakeClock()
+    bucket = TokenBucket(rate=4, capacity=2, clock=clock, sleep=clock.sleep)
+
+    # The bucket starts full
+    for _ in range(2):
+        assert bucket.acquire() == 0
+
+    assert bucket.acquire() == 0.25
+    # Larger than the capacity: goes into debt rather than waiting forever
+    assert bucket.acquire(8) == 2.0
+    assert clock.now == 1002.25
+
+
+def test_refill_is_capped() -> None:
+    clock = FakeClock()
+    bucket = TokenBucket(rate=4, capacity=2, clock=clock, sleep=clock.sleep)
+
+    clock.now += 60
+
+    assert bucket.try_acquire(2)
+    assert not bucket.try_acquire(1)
+
+    clock.now += 0.25
+    assert bucket.try_acquire(1)
@@ -18,6 +18,33 @@ def test_compute_hash(url, expected_hash) -> None:
     assert hash == expected_hash
 
 
+def test_compute_hash_with_salt() -> None:
+    url = "http://www.google.com"
+
+    assert utils.compute_hash(url, 0) == utils.compute_hash(url)
+    assert utils.compute_hash(url, 1) != utils.compute_hash(url)
+    assert utils.compute_hash(url, 1) == utils.compute_hash(url, 1)
+
+
+def test_compute_hashes_matches_compute_hash() -> None:
+    urls = [f"http://www.test.com/{i}" for i in range(1000)]
+
+    hashes = utils.compute_hashes(urls)
+
+    assert hashes == [utils.compute_hash(url) for url in urls]
+    assert all(len(hash) == utils.HASH_LENGTH for hash in hashes)
+
+
+@pytest.mark.parametrize("number,width,expected", [
+    (0, 7, "0000000"),
+    (61, 3, "00Z"),
+    (62, 2, "10"),
+    (10**12 - 1, 7, utils.to_base_62(10**12 - 1))
+])
+def test_to_base_62_fixed(number: int, width: int, expected: str) -> None:
+    assert utils.to_base_62_fixed(number, width) == expected
+
+
 compute_epoch_time_from_ttl_test_data = [
     (datetime(2021, 7, 24, 17, 30), 1, datetime(2021, 7, 24, 18, 30)),
     (datetime(2021, 7, 1, 17, 30), 24, datetime(2021, 7, 2, 17, 30))
@@ -0,0 +1,103 @@
+"""Unit tests for the create URL alias use case."""
+import pytest
+from pytest_mock import MockerFixture
+from unittest.mock import Mock
+
+from zoorl.core.model import UrlHash
+from zoorl.core.usecases.create_url_alias import (
+    AliasTakenError,
+    CreateUrlAliasesUseCaseRequest,
+    CreateUrlAliasUseCase,
+    CreateUrlAliasUseCaseRequest,
+    InvalidAliasError
+)
+from zoorl.core.usecases.create_url_hash import CreateUrlHashUseCaseResponse, DEFAULT_TTL
+from zoorl.ports.repository import UrlHashRepository
+
+# Shortcut for the package that contains a few functions we want to mock
+ZOORL_PACKAGE = "zoorl.core.usecases.create_url_alias"
+
+
+@pytest.fixture(autouse=True)
+def mock_compute_epoch_time_from_ttl(module_mocker: MockerFixture) -> Mock:
+    """Mock 'compute_epoch_time_from_ttl' function to return always return the same TTL specified as input value."""
+    return module_mocker.patch(
+        ZOORL_PACKAGE + ".compute_epoch_time_from_ttl", side_effect=lambda ttl: ttl
+    )
+
+
+@pytest.fixture
+def mock_url_hash_repository(mocker: MockerFixture) -> Mock:
+    """Mock repository."""
+
+    return mocker.Mock(spec=UrlHashRepository)
+
+
+@pytest.fixture
+def usecase(mock_url_hash_repository: UrlHashRepository) -> CreateUrlAliasUseCase:
+    """Use case fixture."""
+
+    return CreateUrlAliasUseCase(mock_url_hash_repository)
+
+
+def test_create_takes_the_alias_with_a_conditional_write(usecase: CreateUrlAliasUseCase, mock_url_hash_repository: Mock) -> None:
+    mock_url_hash_repository.save_if_absent.return_value = None
+
+    response = usecase.create(CreateUrlAliasUseCaseRequest(alias="my-link", url="http://www.test.com"))
+
+    assert response == CreateUrlHashUseCaseResponse(url_hash="my-link", url="http://www.test.com", ttl=DEFAULT_TTL)
+    mock_url_hash_repository.save_if_absent.assert_called_once_with(UrlHash(hash="my-link", url="http://www.test.com", ttl=DEFAULT_TTL))
+    mock_url_hash_repository.get_by_hash.assert_not_called()
+
+
+def test_create_reuses_the_alias_of_the_same_url(usecase: CreateUrlAliasUseCase, mock_url_hash_repository: Mock) -> None:
+    mock_url_hash_repository.save_if_absent.return_value = UrlHash(hash="my-link", url="http://www.test.com", ttl=4102444800)
+
+    response = usecase.create(CreateUrlAliasUseCaseRequest(alias="my-link", url="http://www.test.com", ttl=1))
+
+    assert response == CreateUrlHashUseCaseResponse(url_hash="my-link", url="http://www.test.com", ttl=4102444800, reused=True)
+
+
+def test_create_rejects_an_alias_taken_by_another_url(usecase: CreateUrlAliasUseCase, mock_url_hash_repository: Mock) -> None:
+    mock_url_hash_repository.save_if_absent.return_value = UrlHash(hash="my-link", url="http://www.other.com", ttl=4102444800)
+
+    with pytest.raises(AliasTakenError):
+        usecase.create(CreateUrlAliasUseCaseRequest(alias="my-link", url="http://www.test.com"))
+
+
+@pytest.mark.parametrize("alias", ["ab", "a" * 65, "my link", "my/link", "résumé", "resolve", "batch"])
+def test_create_rejects_invalid_aliases(usecase: CreateUrlAliasUseCase, mock_url_hash_repository: Mock, alias: str) -> None:
+    with pytest.raises(InvalidAliasError):
+        usecase.create(CreateUrlAliasUseCaseRequest(alias=alias, url="http://www.test.com"))
+
+    mock_url_hash_repository.save_if_absent.assert_not_called()
+
+
+def test_create_many_reports_taken_aliases(usecase: CreateUrlAliasUseCase, mock_url_hash_repository: Mock) -> None:
+    mock_url_hash_repository.save_if_absent.side_effect = [
+        None,
+        UrlHash(hash="taken", url="http://www.other.com", ttl=4102444800),
+        None
+    ]
+
+    response = usecase.create_many(CreateUrlAliasesUseCaseRequest(items=[
+        CreateUrlAliasUseCaseRequest(alias="first", url="http://www.test.com/1"),
+        CreateUrlAliasUseCaseRequest(alias="taken", url="http://www.test.com/2"),
+        CreateUrlAliasUseCaseRequest(alias="third", url="http://www.test.com/3", ttl=48)
+    ]))
+
+    assert [item.url_hash for item in response.created] == ["first", "third"]
+    assert response.created[1].ttl == 48
+    assert response.taken == ["taken"]
+    mock_url_hash_repository.get_by_hash.assert_not_called()
+    mock_url_hash_repository.get_by_hashes.assert_not_called()
+
+
+def test_create_many_validates_every_alias_before_writing(usecase: CreateUrlAliasUseCase, mock_url_hash_repository: Mock) -> None:
+    with pytest.raises(InvalidAliasError):
+        usecase.create_many(CreateUrlAliasesUseCaseRequest(items=[
+            CreateUrlAliasUseCaseRequest(alias="first", url="http://www.test.com/1"),
+            CreateUrlAliasUseCaseRequest(alias="no way", url="http://www.test.com/2")
+        ]))
+
+    mock_url_hash_repository.save_if_absent.assert_not_called()
@@ -1,15 +1,24 @@
 """Unit tests for create url usecase."""
+import asyncio
+
 import pytest
 from pytest_mock import MockerFixture
 from unittest.mock import Mock
 
+from zoorl.core.cache import LruCache
+from zoorl.core.canonical_url import UrlCanonicalizer
+from zoorl.core.model import UrlHash
 from zoorl.core.usecases.create_url_hash import (
+    AsyncCreateUrlHashUseCase,
     CreateUrlHashUseCase,
     CreateUrlHashUseCaseRequest,
     CreateUrlHashUseCaseResponse,
-    DEFAULT_TTL
+    HashCollisionError,
+    DEFAULT_TTL,
+    MAX_SALT_ATTEMPTS
 )
 
+from zoorl.ports.async_repository import AsyncUrlHashRepository
 from zoorl.ports.repository import UrlHashRepository
 
 # Shortcut for the package that contains a few functions we want to mock
@@ -62,3 +71,118 @@ def test_create_url_hash(usecase: CreateUrlHashUseCase, uc_request: CreateUrlHas
     response = usecase.create(uc_request)
 
     assert response == expected_uc_response
+
+
+def test_collision_is_resolved_with_salt(usecase: CreateUrlHashUseCase, mock_url_hash_repository: Mock, mocker: MockerFixture) -> None:
+    """Verify that a hash owned by a different URL is re-salted."""
+    compute_hash = mocker.patch(ZOORL_PACKAGE + ".compute_hash", side_effect=lambda url, salt: f"hash{salt}")
+    mock_url_hash_repository.save_if_available.side_effect = [False, True]
+
+    response = usecase.create(CreateUrlHashUseCaseRequest(url = "http://www.test.com", ttl = 1))
+
+    assert response == CreateUrlHashUseCaseResponse(url_hash = "hash1", url = "http://www.test.com", ttl = 1)
+    assert compute_hash.call_count == 2
+
+
+def test_unresolvable_collision_throws_exception(usecase: CreateUrlHashUseCase, mock_url_hash_repository: Mock, mocker: MockerFixture) -> None:
+    """Verify that we give up after MAX_SALT_ATTEMPTS collisions."""
+    mocker.patch(ZOORL_PACKAGE + ".compute_hash", side_effect=lambda url, salt: f"hash{salt}")
+    mock_url_hash_repository.save_if_available.return_value = False
+
+    with pytest.raises(HashCollisionError):
+        usecase.create(CreateUrlHashUseCaseRequest(url = "http://www.test.com"))
+
+    assert mock_url_hash_repository.save_if_available.call_count == MAX_SALT_ATTEMPTS
+
+
+def test_reuse_creates_missing_url_hash(usecase: CreateUrlHashUseCase, mock_url_hash_repository: Mock) -> None:
+    """Verify that reuse mode writes the URL hash if its hash is free."""
+    mock_url_hash_repository.save_if_absent.return_value = None
+
+    response = usecase.create(CreateUrlHashUseCaseRequest(url = "http://www.test.com", ttl = 1, reuse = True))
+
+    assert response == CreateUrlHashUseCaseResponse(url_hash = "123", url = "http://www.test.com", ttl = 1, reused = False)
+    mock_url_hash_repository.save_if_absent.assert_called_once_with(UrlHash("123", "http://www.test.com", 1))
+    mock_url_hash_repository.save_if_available.assert_not_called()
+
+
+def test_reuse_returns_existing_url_hash(usecase: CreateUrlHashUseCase, mock_url_hash_repository: Mock) -> None:
+    """Verify that reuse mode returns the existing URL hash for the same URL, with its own TTL."""
+    mock_url_hash_repository.save_if_absent.return_value = UrlHash("123", "http://www.test.com", 100)
+
+    response = usecase.create(CreateUrlHashUseCaseRequest(url = "http://www.test.com", ttl = 1, reuse = True))
+
+    assert response == CreateUrlHashUseCaseResponse(url_hash = "123", url = "http://www.test.com", ttl = 100, reused = True)
+
+
+def test_reuse_resolves_collision_with_salt(usecase: CreateUrlHashUseCase, mock_url_hash_repository: Mock, mocker: MockerFixture) -> None:
+    """Verify that reuse mode re-salts a hash owned by a different URL."""
+    mocker.patch(ZOORL_PACKAGE + ".compute_hash", side_effect=lambda url, salt: f"hash{salt}")
+    mock_url_hash_repository.save_if_absent.side_effect = [UrlHash("hash0", "http://www.other.com", 100), None]
+
+    response = usecase.create(CreateUrlHashUseCaseRequest(url = "http://www.test.com", ttl = 1, reuse = True))
+
+    assert response == CreateUrlHashUseCaseResponse(url_hash = "hash1", url = "http://www.test.com", ttl = 1, reused = False)
+
+
+def test_reuse_is_answered_by_memo(mock_url_hash_repository: Mock) -> None:
+    """Verify that URL hashes created by the same use case are reused without any repository call."""
+    usecase = CreateUrlHashUseCase(mock_url_hash_repository, url_hash_memo=LruCache(clock=lambda: 0))
+    mock_url_hash_repository.save_if_available.return_value = True
+
+    created = usecase.create(CreateUrlHashUseCaseRequest(url = "http://www.test.com", ttl = 1))
+    reused = usecase.create(CreateUrlHashUseCaseRequest(url = "http://www.test.com", ttl = 1, reuse = True))
+
+    assert reused == CreateUrlHashUseCaseResponse(url_hash = created.url_hash, url = "http://www.test.com", ttl = 1, reused = True)
+    mock_url_hash_repository.save_if_available.assert_called_once()
+    mock_url_hash_repository.save_if_absent.assert_not_called()
+
+
+def test_equivalent_urls_share_the_canonical_url_hash(mock_url_hash_repository: Mock, mocker: MockerFixture) -> None:
+    """Verify that URLs are canonicalized before being hashed, stored and memoized."""
+    compute_hash = mocker.patch(ZOORL_PACKAGE + ".compute_hash", side_effect=lambda url, salt: f"hash-{url}")
+    usecase = CreateUrlHashUseCase(
+        mock_url_hash_repository, url_hash_memo=LruCache(clock=lambda: 0), url_canonicalizer=UrlCanonicalizer(["utm_*"])
+    )
+    mock_url_hash_repository.save_if_available.return_value = True
+
+    created = usecase.create(CreateUrlHashUseCaseRequest(url = "HTTP://Example.com:80/a?b=1&a=2", ttl = 1))
+    reused = usecase.create(CreateUrlHashUseCaseRequest(url = "http://example.com/a?a=2&utm_source=x&b=1", ttl = 1, reuse = True))
+
+    assert created == CreateUrlHashUseCaseResponse(url_hash = "hash-http://example.com/a?a=2&b=1", url = "http://example.com/a?a=2&b=1", ttl = 1)
+    assert reused == CreateUrlHashUseCaseResponse(url_hash = created.url_hash, url = created.url, ttl = 1, reused = True)
+    compute_hash.assert_called_once_with("http://example.com/a?a=2&b=1", 0)
+    mock_url_hash_repository.save_if_available.assert_called_once_with(UrlHash(created.url_hash, created.url, 1))
+
+
+def test_async_create_url_hash(mocker: MockerFixture) -> None:
+    """Verify that the asynchronous use case awaits the repository."""
+    mocker.patch(ZOORL_PACKAGE + ".compute_hash", side_effect=lambda url, salt: f"hash{salt}")
+    repository = mocker.AsyncMock(spec=AsyncUrlHashRepository)
+    repository.save_if_available.side_effect = [False, True]
+    repository.save_if_absent.return_value = UrlHash("hash0", "http://www.test.com", 100)
+
+    usecase = AsyncCreateUrlHashUseCase(repository)
+
+    created = asyncio.run(usecase.create(CreateUrlHashUseCaseRequest(url = "http://www.test.com", ttl = 1)))
+    reused = asyncio.run(usecase.create(CreateUrlHashUseCaseRequest(url = "http://www.test.com", ttl = 1, reuse = True)))
+
+    assert created == CreateUrlHashUseCaseResponse(url_hash = "hash1", url = "http://www.test.com", ttl = 1)
+    assert reused == CreateUrlHashUseCaseResponse(url_hash = "hash0", url = "http://www.test.com", ttl = 100, reused = True)
+
+
+def test_async_create_url_hash_shares_memo_and_canonicalization(mocker: MockerFixture) -> None:
+    """Verify that the asynchronous use case canonicalizes and memoizes as the synchronous one does."""
+    mocker.patch(ZOORL_PACKAGE + ".compute_hash", side_effect=lambda url, salt: f"hash-{url}")
+    repository = mocker.AsyncMock(spec=AsyncUrlHashRepository)
+    repository.save_if_available.return_value = True
+    usecase = AsyncCreateUrlHashUseCase(repository, url_hash_memo=LruCache(clock=lambda: 0), url_canonicalizer=UrlCanonicalizer())
+
+    created = asyncio.run(usecase.create(CreateUrlHashUseCaseRequest(url = "HTTP://Example.com/a?b=1&a=2", ttl = 1)))
+    reused = asyncio.run(usecase.create(CreateUrlHashUseCaseRequest(url = "http://example.com/a?a=2&b=1", ttl = 1, reuse = True)))
+
+    assert created == CreateUrlHashUseCaseResponse(url_hash = "hash-http://example.com/a?a=2&b=1", url = "http://example.com/a?a=2&b=1", ttl = 1)
+    assert reused == CreateUrlHashUseCaseResponse(url_hash = created.url_hash, url = created.url, ttl = 1, reused = True)
+    repository.save_if_available.assert_awaited_once()
+    repository.save_if_absent.assert_not_called()
+    assert not isinstance(usecase, CreateUrlHashUseCase)
@@ -0,0 +1,191 @@
+"""Unit tests for create url hashes usecase."""
+import pytest
+from pytest_mock import MockerFixture
+from unittest.mock import Mock
+
+from zoorl.core.canonical_url import UrlCanonicalizer
+from zoorl.core.model import UrlHash
+from zoorl.core.usecases.create_url_hash import (
+    CreateUrlHashUseCaseRequest,
+    CreateUrlHashUseCaseResponse,
+    DEFAULT_TTL,
+    HashCollisionError,
+    MAX_SALT_ATTEMPTS
+)
+from zoorl.core.usecases.create_url_hashes import (
+    CreateUrlHashesUseCase,
+    CreateUrlHashesUseCaseRequest,
+    TooManyUrlsError,
+    MAX_BATCH_SIZE
+)
+
+from zoorl.ports.repository import UrlHashRepository
+
+# Shortcut for the package that contains a few functions we want to mock
+ZOORL_PACKAGE = "zoorl.core.usecases.create_url_hashes"
+
+# ... and the one that salts the hashes of colliding URLs
+SALTING_PACKAGE = "zoorl.core.usecases.create_url_hash"
+
+
+@pytest.fixture(autouse=True)
+def mock_compute_epoch_time_from_ttl(mocker: MockerFixture) -> Mock:
+    """Mock 'compute_epoch_time_from_ttl' function to return always return the same TTL specified as input value."""
+    return mocker.patch(
+        ZOORL_PACKAGE + ".compute_epoch_time_from_ttl", side_effect=lambda ttl: ttl
+    )
+
+
+@pytest.fixture(autouse=True)
+def mock_compute_hashes(mocker: MockerFixture) -> Mock:
+    """Mock 'compute_hashes' function to return values from a predictable sequence."""
+    return mocker.patch(
+        ZOORL_PACKAGE + ".compute_hashes", side_effect=lambda urls: ["123", "456", "789"][:len(list(urls))]
+    )
+
+
+@pytest.fixture(autouse=True)
+def mock_salting(mocker: MockerFixture) -> None:
+    """Mock the functions used for the salted hashes: the hash is "<url>#<salt>", and the TTL is kept as it is."""
+    mocker.patch(SALTING_PACKAGE + ".compute_hash", side_effect=lambda url, salt = 0: f"{url}#{salt}")
+    mocker.patch(SALTING_PACKAGE + ".compute_epoch_time_from_ttl", side_effect=lambda ttl: ttl)
+
+
+@pytest.fixture
+def mock_url_hash_repository(mocker: MockerFixture) -> Mock:
+    """Mock repository."""
+
+    repository = mocker.Mock(spec=UrlHashRepository)
+    repository.get_by_hashes.return_value = {}
+    return repository
+
+
+@pytest.fixture
+def usecase(mock_url_hash_repository: UrlHashRepository) -> CreateUrlHashesUseCase:
+    """Use case fixture."""
+
+    return CreateUrlHashesUseCase(mock_url_hash_repository)
+
+
+def test_create_url_hashes(usecase: CreateUrlHashesUseCase, mock_url_hash_repository: Mock) -> None:
+    """Verify that results come back in request order and are saved with a single bulk call."""
+
+    response = usecase.create(CreateUrlHashesUseCaseRequest(items=[
+        CreateUrlHashUseCaseRequest(url = "http://www.first.com"),
+        CreateUrlHashUseCaseRequest(url = "http://www.second.com", ttl = 48)
+    ]))
+
+    assert response.items == [
+        CreateUrlHashUseCaseResponse(url_hash = "123", url = "http://www.first.com", ttl = DEFAULT_TTL),
+        CreateUrlHashUseCaseResponse(url_hash = "456", url = "http://www.second.com", ttl = 48)
+    ]
+    mock_url_hash_repository.save_many.assert_called_once_with([
+        UrlHash("123", "http://www.first.com", DEFAULT_TTL),
+        UrlHash("456", "http://www.second.com", 48)
+    ])
+
+
+def test_create_url_hashes_with_canonical_urls(mock_url_hash_repository: Mock, mock_compute_hashes: Mock) -> None:
+    """Verify that URLs are canonicalized in one batch before being hashed."""
+    usecase = CreateUrlHashesUseCase(mock_url_hash_repository, url_canonicalizer=UrlCanonicalizer())
+
+    response = usecase.create(CreateUrlHashesUseCaseRequest(items=[
+        CreateUrlHashUseCaseRequest(url = "HTTP://WWW.First.com:80"),
+        CreateUrlHashUseCaseRequest(url = "http://www.second.com/?b=1&a=2", ttl = 48)
+    ]))
+
+    assert [item.url for item in response.items] == ["http://www.first.com/", "http://www.second.com/?a=2&b=1"]
+    mock_compute_hashes.assert_called_once_with(["http://www.first.com/", "http://www.second.com/?a=2&b=1"])
+
+
+def test_too_many_urls_throws_exception(usecase: CreateUrlHashesUseCase, mock_url_hash_repository: Mock) -> None:
+    """Verify that oversized requests are rejected without writing anything."""
+
+    with pytest.raises(TooManyUrlsError):
+        usecase.create(CreateUrlHashesUseCaseRequest(items=[
+            CreateUrlHashUseCaseRequest(url = "http://www.test.com")
+        ] * (MAX_BATCH_SIZE + 1)))
+
+    mock_url_hash_repository.save_many.assert_not_called()
+
+
+
+def test_hash_taken_by_another_url_is_salted(usecase: CreateUrlHashesUseCase, mock_url_hash_repository: Mock) -> None:
+    """Verify that a hash taken by another URL is not overwritten, and that the URL gets a salted hash instead."""
+    mock_url_hash_repository.get_by_hashes.return_value = {"456": UrlHash("456", "http://www.other.com", 100)}
+    mock_url_hash_repository.save_if_available.side_effect = lambda url_hash: not url_hash.hash.endswith("#0")
+
+    response = usecase.create(CreateUrlHashesUseCaseRequest(items=[
+        CreateUrlHashUseCaseRequest(url = "http://www.first.com"),
+        CreateUrlHashUseCaseRequest(url = "http://www.second.com", ttl = 48)
+    ]))
+
+    assert response.items == [
+        CreateUrlHashUseCaseResponse(url_hash = "123", url = "http://www.first.com", ttl = DEFAULT_TTL),
+        CreateUrlHashUseCaseResponse(url_hash = "http://www.second.com#1", url = "http://www.second.com", ttl = 48)
+    ]
+    mock_url_hash_repository.get_by_hashes.assert_called_once_with(["123", "456"])
+    mock_url_hash_repository.save_many.assert_called_once_with([UrlHash("123", "http://www.first.com", DEFAULT_TTL)])
+
+
+def test_hash_taken_by_an_alias_is_not_overwritten(usecase: CreateUrlHashesUseCase, mock_url_hash_repository: Mock) -> None:
+    """Verify that a URL whose hash is taken by an alias is saved with a salted hash, with a conditional write."""
+    mock_url_hash_repository.get_by_hashes.return_value = {"123": UrlHash("123", "http://www.aliased.com", 100)}
+    mock_url_hash_repository.save_if_available.return_value = True
+
+    response = usecase.create(CreateUrlHashesUseCaseRequest(items=[
+        CreateUrlHashUseCaseRequest(url = "http://www.first.com")
+    ]))
+
+    assert response.items == [
+        CreateUrlHashUseCaseResponse(url_hash = "http://www.first.com#0", url = "http://www.first.com", ttl = DEFAULT_TTL)
+    ]
+    mock_url_hash_repository.save_many.assert_called_once_with([])
+    mock_url_hash_repository.save_if_available.assert_called_once_with(
+        UrlHash("http://www.first.com#0", "http://www.first.com", DEFAULT_TTL)
+    )
+
+
+def test_existing_hash_of_the_same_url(usecase: CreateUrlHashesUseCase, mock_url_hash_repository: Mock) -> None:
+    """Verify that a hash taken by the same URL is saved again, unless it can be reused as it is."""
+    mock_url_hash_repository.get_by_hashes.return_value = {
+        "123": UrlHash("123", "http://www.first.com", 100),
+        "456": UrlHash("456", "http://www.second.com", 200)
+    }
+
+    response = usecase.create(CreateUrlHashesUseCaseRequest(items=[
+        CreateUrlHashUseCaseRequest(url = "http://www.first.com"),
+        CreateUrlHashUseCaseRequest(url = "http://www.second.com", reuse = True)
+    ]))
+
+    assert response.items == [
+        CreateUrlHashUseCaseResponse(url_hash = "123", url = "http://www.first.com", ttl = DEFAULT_TTL),
+        CreateUrlHashUseCaseResponse(url_hash = "456", url = "http://www.second.com", ttl = 200, reused = True)
+    ]
+    mock_url_hash_repository.save_many.assert_called_once_with([UrlHash("123", "http://www.first.com", DEFAULT_TTL)])
+    mock_url_hash_repository.save_if_available.assert_not_called()
+
+
+def test_colliding_urls_within_the_batch(usecase: CreateUrlHashesUseCase, mock_url_hash_repository: Mock, mock_compute_hashes: Mock) -> None:
+    """Verify that when two URLs of the batch share a hash, the second one is salted."""
+    mock_compute_hashes.side_effect = lambda urls: ["123"] * len(urls)
+    mock_url_hash_repository.save_if_available.side_effect = lambda url_hash: not url_hash.hash.endswith("#0")
+
+    response = usecase.create(CreateUrlHashesUseCaseRequest(items=[
+        CreateUrlHashUseCaseRequest(url = "http://www.first.com"),
+        CreateUrlHashUseCaseRequest(url = "http://www.second.com")
+    ]))
+
+    assert [item.url_hash for item in response.items] == ["123", "http://www.second.com#1"]
+    mock_url_hash_repository.save_many.assert_called_once_with([UrlHash("123", "http://www.first.com", DEFAULT_TTL)])
+
+
+def test_no_free_hash_throws_exception(usecase: CreateUrlHashesUseCase, mock_url_hash_repository: Mock) -> None:
+    """Verify that a URL whose salted hashes are all taken fails the request."""
+    mock_url_hash_repository.get_by_hashes.return_value = {"123": UrlHash("123", "http://www.other.com", 100)}
+    mock_url_hash_repository.save_if_available.return_value = False
+
+    with pytest.raises(HashCollisionError):
+        usecase.create(CreateUrlHashesUseCaseRequest(items=[CreateUrlHashUseCaseRequest(url = "http://www.first.com")]))
+
+    assert mock_url_hash_repository.save_if_available.call_count == MAX_SALT_ATTEMPTS
@@ -0,0 +1,84 @@
+"""Unit tests for export url hashes usecase."""
+
+from typing import Iterator, List
+
+import pytest
+from pytest_mock import MockerFixture
+from unittest.mock import Mock, call
+
+from zoorl.core.model import UrlHash
+from zoorl.core.usecases.export_url_hashes import (
+    ExportUrlHashesUseCase,
+    ExportUrlHashesUseCaseRequest
+)
+
+from zoorl.ports.repository import UrlHashRepository
+
+
+def segment_pages(segment: int, total_segments: int, page_size: int) -> Iterator[List[UrlHash]]:
+    """Two pages per segment, the last URL hash of each segment being expired."""
+    yield [UrlHash(f"{segment}-1", "http://www.test.com", 4102444800), UrlHash(f"{segment}-2", "http://www.test.com", 4102444800)]
+    yield [UrlHash(f"{segment}-3", "http://www.test.com", 1663519832)]
+
+
+@pytest.fixture
+def mock_url_hash_repository(mocker: MockerFixture) -> Mock:
+    """Mock repository with three URL hashes per segment."""
+
+    repository = mocker.Mock(spec=UrlHashRepository)
+    repository.find_all.side_effect = segment_pages
+    return repository
+
+
+@pytest.fixture
+def usecase(mock_url_hash_repository: UrlHashRepository) -> ExportUrlHashesUseCase:
+    """Use case fixture."""
+
+    return ExportUrlHashesUseCase(mock_url_hash_repository, total_segments=3, page_size=2)
+
+
+def test_export_all_segments(usecase: ExportUrlHashesUseCase, mock_url_hash_repository: Mock) -> None:
+    """Verify that every segment is read, and that expired URL hashes are skipped."""
+
+    exported = []
+    response = usecase.export(ExportUrlHashesUseCaseRequest(), exported.extend)
+
+    assert (response.exported, response.expired) == (6, 3)
+    assert sorted(url_hash.hash for url_hash in exported) == ["0-1", "0-2", "1-1", "1-2", "2-1", "2-2"]
+    assert sorted(mock_url_hash_repository.find_all.call_args_list) == [call(0, 3, 2), call(1, 3, 2), call(2, 3, 2)]
+
+
+def test_export_including_expired(usecase: ExportUrlHashesUseCase) -> None:
+    """Verify that expired URL hashes are exported when requested."""
+
+    exported = []
+    response = usecase.export(ExportUrlHashesUseCaseRequest(include_expired=True), exported.extend)
+
+    assert (response.exported, response.expired) == (9, 0)
+    assert len(exported) == 9
+
+
+def test_export_raises_read_errors(usecase: ExportUrlHashesUseCase, mock_url_hash_repository: Mock) -> None:
+    """Verify that a failing segment fails the export, and that the other readers stop."""
+
+    def failing_pages(segment: int, total_segments: int, page_size: int) -> Iterator[List[UrlHash]]:
+        if segment == 1:
+            raise IOError("scan failed")
+        # More pages than the queue holds, so the reader must give up waiting for room
+        for index in range(100):
+            yield [UrlHash(f"{segment}-{index}", "http://www.test.com", 4102444800)]
+
+    mock_url_hash_repository.find_all.side_effect = failing_pages
+
+    with pytest.raises(IOError):
+        usecase.export(ExportUrlHashesUseCaseRequest(), lambda page: None)
+
+
+def test_export_raises_sink_errors(usecase: ExportUrlHashesUseCase) -> None:
+    """Verify that a failing sink fails the export."""
+
+    def failing_sink(page: List[UrlHash]) -> None:
+        raise IOError("disk full")
+
+    with pytest.raises(IOError):
+        usecase.export(ExportUrlHashesUseCaseRequest(), failing_sink)
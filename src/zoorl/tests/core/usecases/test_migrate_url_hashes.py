@@ -0,0 +1,57 @@
+"""Unit tests for migrate url hashes usecase."""
+
+from typing import Iterator, List
+
+import pytest
+from pytest_mock import MockerFixture
+from unittest.mock import Mock, call
+
+from zoorl.core.model import UrlHash
+from zoorl.core.usecases.migrate_url_hashes import (
+    MigrateUrlHashesUseCase,
+    MigrateUrlHashesUseCaseRequest
+)
+
+from zoorl.ports.repository import UrlHashRepository
+
+
+def outdated_pages(segment: int, total_segments: int, page_size: int) -> Iterator[List[UrlHash]]:
+    """Two pages of outdated URL hashes per segment."""
+    yield [UrlHash(f"{segment}-1", "http://www.test.com", 1), UrlHash(f"{segment}-2", "http://www.test.com", 1)]
+    yield [UrlHash(f"{segment}-3", "http://www.test.com", 1)]
+
+
+@pytest.fixture
+def mock_url_hash_repository(mocker: MockerFixture) -> Mock:
+    """Mock repository migrating every URL hash it is given."""
+
+    repository = mocker.Mock(spec=UrlHashRepository)
+    repository.find_outdated.side_effect = outdated_pages
+    repository.migrate_many.side_effect = len
+    return repository
+
+
+@pytest.fixture
+def usecase(mock_url_hash_repository: UrlHashRepository) -> MigrateUrlHashesUseCase:
+    """Use case fixture."""
+
+    return MigrateUrlHashesUseCase(mock_url_hash_repository, total_segments=3, page_size=2)
+
+
+def test_migrate_all_segments(usecase: MigrateUrlHashesUseCase, mock_url_hash_repository: Mock) -> None:
+    """Verify that every segment is read and every page is migrated."""
+
+    response = usecase.migrate(MigrateUrlHashesUseCaseRequest())
+
+    assert response.migrated == 9
+    assert sorted(mock_url_hash_repository.find_outdated.call_args_list) == [call(0, 3, 2), call(1, 3, 2), call(2, 3, 2)]
+    assert mock_url_hash_repository.migrate_many.call_count == 6
+
+
+def test_migrate_is_bounded_per_segment(usecase: MigrateUrlHashesUseCase, mock_url_hash_repository: Mock) -> None:
+    """Verify that no more than 'max_items_per_segment' hashes are migrated by each segment."""
+
+    response = usecase.migrate(MigrateUrlHashesUseCaseRequest(max_items_per_segment=1))
+
+    assert response.migrated == 3
+    assert sorted(url_hash.hash for args in mock_url_hash_repository.migrate_many.call_args_list for url_hash in args[0][0]) == ["0-1", "1-1", "2-1"]
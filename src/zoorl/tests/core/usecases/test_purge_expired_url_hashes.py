@@ -0,0 +1,72 @@
+"""Unit tests for purge expired url hashes usecase."""
+
+import pytest
+from pytest_mock import MockerFixture
+from unittest.mock import Mock, call
+
+from zoorl.core.usecases.purge_expired_url_hashes import (
+    PurgeExpiredUrlHashesUseCase,
+    PurgeExpiredUrlHashesUseCaseRequest
+)
+
+from zoorl.ports.repository import UrlHashRepository
+
+# Shortcut for the package that contains a few functions we want to mock
+ZOORL_PACKAGE = "zoorl.core.usecases.purge_expired_url_hashes"
+
+TEST_NOW = 50
+
+
+@pytest.fixture(autouse=True)
+def mock_compute_epoch_now(mocker: MockerFixture) -> Mock:
+    """Mock 'compute_epoch_now' function so that the current time is always TEST_NOW."""
+    return mocker.patch(
+        ZOORL_PACKAGE + ".compute_epoch_now", return_value=TEST_NOW
+    )
+
+
+@pytest.fixture
+def mock_url_hash_repository(mocker: MockerFixture) -> Mock:
+    """Mock repository returning two pages of expired hashes."""
+
+    repository = mocker.Mock(spec=UrlHashRepository)
+    repository.find_expired_hashes.return_value = iter([["1", "2", "3"], ["4", "5"]])
+    repository.delete_expired.side_effect = lambda hashes, now: len(hashes)
+    return repository
+
+
+@pytest.fixture
+def usecase(mock_url_hash_repository: UrlHashRepository) -> PurgeExpiredUrlHashesUseCase:
+    """Use case fixture."""
+
+    return PurgeExpiredUrlHashesUseCase(mock_url_hash_repository, page_size=3)
+
+
+def test_purge_all(usecase: PurgeExpiredUrlHashesUseCase, mock_url_hash_repository: Mock) -> None:
+    """Verify that every page of expired hashes is deleted."""
+
+    response = usecase.purge(PurgeExpiredUrlHashesUseCaseRequest())
+
+    assert response.deleted == 5
+    mock_url_hash_repository.find_expired_hashes.assert_called_once_with(TEST_NOW, 3)
+    assert mock_url_hash_repository.delete_expired.call_args_list == [call(["1", "2", "3"], TEST_NOW), call(["4", "5"], TEST_NOW)]
+
+
+def test_purge_is_bounded(usecase: PurgeExpiredUrlHashesUseCase, mock_url_hash_repository: Mock) -> None:
+    """Verify that no more than 'max_items' hashes are deleted."""
+
+    response = usecase.purge(PurgeExpiredUrlHashesUseCaseRequest(max_items=4))
+
+    assert response.deleted == 4
+    assert mock_url_hash_repository.delete_expired.call_args_list == [call(["1", "2", "3"], TEST_NOW), call(["4"], TEST_NOW)]
+
+
+
+def test_refreshed_hashes_are_not_counted(usecase: PurgeExpiredUrlHashesUseCase, mock_url_hash_repository: Mock) -> None:
+    """Verify that hashes refreshed after being found expired (and so not deleted) are not counted."""
+    mock_url_hash_repository.delete_expired.side_effect = lambda hashes, now: len([hash for hash in hashes if hash != "2"])
+
+    response = usecase.purge(PurgeExpiredUrlHashesUseCaseRequest())
+
+    assert response.deleted == 4
+    mock_url_hash_repository.delete_many.assert_not_called()
@@ -1,19 +1,38 @@
 """Unit tests for read url hash usecase."""
 
+import asyncio
+
 import pytest
 from pytest_mock import MockerFixture
 from unittest.mock import Mock
 
 from zoorl.core.usecases.read_url_hash import (
+    AsyncReadUrlHashUseCase,
     ReadUrlHashUseCase,
     ReadUrlHashUseCaseRequest,
     UrlHashNotFoundError
 )
 
+from zoorl.ports.async_repository import AsyncUrlHashRepository
 from zoorl.ports.repository import UrlHashRepository
 from zoorl.core.model import UrlHash
 
 
+# Shortcut for the package that contains a few functions we want to mock
+ZOORL_PACKAGE = "zoorl.core.usecases.read_url_hash"
+
+# Every TTL greater than this is not expired yet
+TEST_NOW = 50
+
+
+@pytest.fixture(autouse=True)
+def mock_compute_epoch_now(mocker: MockerFixture) -> Mock:
+    """Mock 'compute_epoch_now' function so that the current time is always TEST_NOW."""
+    return mocker.patch(
+        ZOORL_PACKAGE + ".compute_epoch_now", return_value=TEST_NOW
+    )
+
+
 @pytest.fixture
 def mock_url_hash_repository(mocker: MockerFixture) -> Mock:
     """Mock repository."""
@@ -61,3 +80,31 @@ def test_url_hash_not_found_throws_exception(usecase: ReadUrlHashUseCase, mock_u
 
     assert exception_info.type == UrlHashNotFoundError
     assert str(exception_info.value) == "The specified URL hash is invalid or expired!"
+
+
+def test_expired_url_hash_throws_exception(usecase: ReadUrlHashUseCase, mock_url_hash_repository: Mock) -> None:
+    """Verify that an expired hash not yet deleted by DynamoDB TTL is treated as not found."""
+    mock_url_hash_repository.get_by_hash.return_value = UrlHash(
+        hash = "12345", url = "https://www.test.com", ttl = TEST_NOW
+    )
+
+    with pytest.raises(UrlHashNotFoundError):
+        usecase.read_url(
+            ReadUrlHashUseCaseRequest(hash="12345")
+        )
+
+
+def test_async_read_url(mocker: MockerFixture) -> None:
+    """Verify that the asynchronous use case awaits the repository, and treats expired hashes as not found."""
+    repository = mocker.AsyncMock(spec=AsyncUrlHashRepository)
+    repository.get_by_hash.side_effect = [
+        UrlHash(hash = "12345", url = "https://www.test.com", ttl = 100),
+        UrlHash(hash = "12345", url = "https://www.test.com", ttl = TEST_NOW)
+    ]
+    usecase = AsyncReadUrlHashUseCase(repository)
+
+    response = asyncio.run(usecase.read_url(ReadUrlHashUseCaseRequest(hash="12345")))
+    assert response.url == "https://www.test.com"
+
+    with pytest.raises(UrlHashNotFoundError):
+        asyncio.run(usecase.read_url(ReadUrlHashUseCaseRequest(hash="12345")))
@@ -0,0 +1,77 @@
+"""Unit tests for read url hashes usecase."""
+
+import pytest
+from pytest_mock import MockerFixture
+from unittest.mock import Mock
+
+from zoorl.core.usecases.read_url_hash import ReadUrlHashUseCaseResponse
+from zoorl.core.usecases.read_url_hashes import (
+    ReadUrlHashesUseCase,
+    ReadUrlHashesUseCaseRequest,
+    TooManyHashesError,
+    MAX_BATCH_SIZE
+)
+
+from zoorl.ports.repository import UrlHashRepository
+from zoorl.core.model import UrlHash
+
+
+# Shortcut for the package that contains a few functions we want to mock
+ZOORL_PACKAGE = "zoorl.core.usecases.read_url_hashes"
+
+# Every TTL greater than this is not expired yet
+TEST_NOW = 50
+
+
+@pytest.fixture(autouse=True)
+def mock_compute_epoch_now(mocker: MockerFixture) -> Mock:
+    """Mock 'compute_epoch_now' function so that the current time is always TEST_NOW."""
+    return mocker.patch(
+        ZOORL_PACKAGE + ".compute_epoch_now", return_value=TEST_NOW
+    )
+
+
+@pytest.fixture
+def mock_url_hash_repository(mocker: MockerFixture) -> Mock:
+    """Mock repository."""
+
+    return mocker.Mock(spec=UrlHashRepository)
+
+
+@pytest.fixture
+def usecase(mock_url_hash_repository: UrlHashRepository) -> ReadUrlHashesUseCase:
+    """Use case fixture."""
+
+    return ReadUrlHashesUseCase(mock_url_hash_repository)
+
+
+def test_found_and_missing(usecase: ReadUrlHashesUseCase, mock_url_hash_repository: Mock) -> None:
+    """Verify that found hashes keep request order and missing ones are reported separately."""
+
+    mock_url_hash_repository.get_by_hashes.return_value = {
+        "123": UrlHash("123", "http://www.first.com", 100),
+        "789": UrlHash("789", "http://www.third.com", 300),
+        "000": UrlHash("000", "http://www.expired.com", TEST_NOW)
+    }
+
+    response = usecase.read_urls(
+        ReadUrlHashesUseCaseRequest(hashes=["789", "456", "123", "789", "000"])
+    )
+
+    mock_url_hash_repository.get_by_hashes.assert_called_once_with(["789", "456", "123", "000"])
+    assert response.found == [
+        ReadUrlHashUseCaseResponse(url_hash="789", url="http://www.third.com", ttl=300),
+        ReadUrlHashUseCaseResponse(url_hash="123", url="http://www.first.com", ttl=100)
+    ]
+    assert response.missing == ["456", "000"]
+
+
+def test_too_many_hashes_throws_exception(usecase: ReadUrlHashesUseCase, mock_url_hash_repository: Mock) -> None:
+    """Verify that oversized requests are rejected without reading anything."""
+
+    with pytest.raises(TooManyHashesError):
+        usecase.read_urls(
+            ReadUrlHashesUseCaseRequest(hashes=[str(i) for i in range(MAX_BATCH_SIZE + 1)])
+        )
+
+    mock_url_hash_repository.get_by_hashes.assert_not_called()
@@ -0,0 +1,324 @@
+"""ASGI adapter for self-hosting Zoorl outside AWS Lambda.
+
+The application exposes the same routes as the Lambda functions, over the
+asynchronous use cases:
+  * POST /u - creates a URL hash (the payload is the same as for the Lambda function)
+  * GET /u/<url_hash> - returns the URL hash information
+  * GET /r/<url_hash> - redirects to the URL, with an HTTP 301
+
+There is no API Gateway in front of it, so the payload is validated here, and
+authentication (Cognito for POST /u) is left to the reverse proxy.
+
+Responses are served as pre-built ASGI messages: the constant ones are built at
+import time, while the ones for a given hash are kept in an LRU cache until the
+hash expires. Serving a cached redirect only takes a cache lookup and two 'send()'.
+Concurrent requests missing the cache for the same hash share a single repository
+read (see 'single_flight_async_model'): the counts of reads and of coalesced ones are
+written as an EMF line when the worker shuts down.
+
+It is a plain ASGI callable, so it runs on any ASGI server: 'main()' launches it
+on uvicorn (not part of the AWS Lambda runtime, so it is imported lazily), e.g.:
+
+    python -m zoorl.adapters.asgi_app --port 8080 --workers 4
+"""
+
+import argparse
+import json
+import os
+
+from contextlib import AsyncExitStack
+from typing import Any, AsyncContextManager, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from zoorl.adapters import http_response_codes
+from zoorl.adapters.cache_model import DEFAULT_NEGATIVE_TTL
+from zoorl.adapters.emf import count_lines, write_lines
+from zoorl.adapters.http_bodies import url_hash_body
+from zoorl.adapters.single_flight_async_model import AsyncSingleFlightUrlHashRepository
+from zoorl.core.cache import LruCache, DEFAULT_MAX_SIZE
+from zoorl.core.canonical_url import UrlCanonicalizer, split_patterns
+from zoorl.core.async_single_flight import AsyncSingleFlight
+from zoorl.core.usecases.create_url_hash import (
+    AsyncCreateUrlHashUseCase,
+    CreateUrlHashUseCaseRequest,
+    HashCollisionError
+)
+from zoorl.core.usecases.read_url_hash import (
+    AsyncReadUrlHashUseCase,
+    ReadUrlHashUseCaseRequest,
+    UrlHashNotFoundError
+)
+from zoorl.core.utils import compute_epoch_now
+from zoorl.ports.async_repository import AsyncUrlHashRepository
+
+Scope = Dict[str, Any]
+Message = Dict[str, Any]
+Receive = Callable[[], Awaitable[Message]]
+Send = Callable[[Message], Awaitable[None]]
+
+# Upper bound for the size of a request body
+MAX_BODY_SIZE = 16 * 1024
+
+_JSON_HEADERS = [(b"content-type", b"application/json")]
+_REDIRECT_CONTENT_TYPE = (b"content-type", b"text/html")
+
+# Redirections have no body, so every one of them sends this very same message
+_EMPTY_BODY = {"type": "http.response.body", "body": b""}
+
+
+def _start(status: int, headers: List[Tuple[bytes, bytes]]) -> Message:
+    return {"type": "http.response.start", "status": status, "headers": headers}
+
+
+def _json_body(payload: Dict[str, Any]) -> Message:
+    return {"type": "http.response.body", "body": json.dumps(payload).encode("utf-8")}
+
+
+def _error(status: int, message: str) -> Tuple[Message, Message]:
+    return _start(status, _JSON_HEADERS), _json_body({"message": message})
+
+
+_OK = _start(http_response_codes.OK, _JSON_HEADERS)
+# Same message as 'UrlHashNotFoundError', as returned by the Lambda functions
+_NOT_FOUND = _error(http_response_codes.NOT_FOUND, "The specified URL hash is invalid or expired!")
+_NO_ROUTE = _error(http_response_codes.NOT_FOUND, "Not found")
+_PAYLOAD_TOO_LARGE = _error(http_response_codes.PAYLOAD_TOO_LARGE, f"The request body exceeds {MAX_BODY_SIZE} bytes")
+
+
+class InvalidPayloadError(Exception):
+    """Exception thrown if the payload of a request is malformed."""
+    pass
+
+
+class PayloadTooLargeError(Exception):
+    """Exception thrown if the request body exceeds MAX_BODY_SIZE."""
+    pass
+
+
+class ZoorlAsgiApp:
+    """ASGI application serving the Zoorl routes.
+
+    The repository is opened on the 'lifespan' startup event and closed on the
+    shutdown one, after the server has stopped accepting requests and drained
+    the in-flight ones.
+    """
+
+    def __init__(
+        self,
+        repository_factory: Callable[[], AsyncContextManager[AsyncUrlHashRepository]],
+        cache_size: int = DEFAULT_MAX_SIZE,
+        negative_ttl: int = DEFAULT_NEGATIVE_TTL,
+        url_canonicalizer: Optional[UrlCanonicalizer] = None
+    ) -> None:
+        self.repository_factory = repository_factory
+        self.negative_ttl = negative_ttl
+        self.url_canonicalizer = url_canonicalizer
+        # Pre-built (redirect start, read body) messages, by hash: None for missing hashes
+        self.responses: LruCache[Tuple[Message, Message]] = LruCache(max_size=cache_size)
+        self.url_hash_memo: LruCache = LruCache(max_size=cache_size)
+        self.read_flight: AsyncSingleFlight = AsyncSingleFlight()
+        self.create_usecase: Optional[AsyncCreateUrlHashUseCase] = None
+        self.read_usecase: Optional[AsyncReadUrlHashUseCase] = None
+        self._exit_stack: Optional[AsyncExitStack] = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            await self._handle_http(scope, receive, send)
+        elif scope["type"] == "lifespan":
+            await self._handle_lifespan(receive, send)
+
+    async def startup(self) -> None:
+        """Opens the repository and builds the use cases on it."""
+        self._exit_stack = AsyncExitStack()
+        repository = AsyncSingleFlightUrlHashRepository(
+            await self._exit_stack.enter_async_context(self.repository_factory()), self.read_flight
+        )
+
+        self.create_usecase = AsyncCreateUrlHashUseCase(
+            repository, url_hash_memo=self.url_hash_memo, url_canonicalizer=self.url_canonicalizer
+        )
+        self.read_usecase = AsyncReadUrlHashUseCase(repository)
+
+    async def shutdown(self) -> None:
+        """Closes the repository (e.g., the DynamoDB client and its connections), and writes the read counts."""
+        if self._exit_stack:
+            await self._exit_stack.aclose()
+            self._exit_stack = None
+
+        counts = self.read_flight.drain()
+        if counts["calls"]:
+            write_lines(count_lines(
+                {"SingleFlight.calls": counts["calls"], "SingleFlight.coalesced": counts["coalesced"]},
+                os.getenv("POWERTOOLS_SERVICE_NAME", "zoorl")
+            ))
+
+    async def _handle_lifespan(self, receive: Receive, send: Send) -> None:
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                try:
+                    await self.startup()
+                except Exception as ex:
+                    await send({"type": "lifespan.startup.failed", "message": str(ex)})
+                    return
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await self.shutdown()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _handle_http(self, scope: Scope, receive: Receive, send: Send) -> None:
+        path: str = scope["path"]
+        method: str = scope["method"]
+
+        # Redirections come first, since they are the bulk of the traffic
+        if method == "GET" and path.startswith("/r/"):
+            start, body = await self._lookup(path[3:])
+            if start is None:
+                start, body = _NOT_FOUND
+            else:
+                body = _EMPTY_BODY
+        elif method == "GET" and path.startswith("/u/"):
+            start, body = await self._lookup(path[3:])
+            if start is None:
+                start, body = _NOT_FOUND
+            else:
+                start = _OK
+        elif method == "POST" and path == "/u":
+            start, body = await self._create(receive)
+        else:
+            start, body = _NO_ROUTE
+
+        await send(start)
+        await send(body)
+
+    async def _lookup(self, hash: str) -> Tuple[Optional[Message], Optional[Message]]:
+        """Returns the pre-built (redirect start, read body) messages for the hash, or (None, None) if missing."""
+        if not hash or "/" in hash:
+            return None, None
+
+        hit, responses = self.responses.get(hash)
+        if hit:
+            return responses or (None, None)
+
+        try:
+            response = await self.read_usecase.read_url(ReadUrlHashUseCaseRequest(hash = hash))
+        except UrlHashNotFoundError:
+            self.responses.put(hash, None, compute_epoch_now() + self.negative_ttl)
+            return None, None
+
+        responses = (
+            _start(http_response_codes.MOVED_PERMANENTLY, [(b"location", response.url.encode("utf-8")), _REDIRECT_CONTENT_TYPE]),
+            {"type": "http.response.body", "body": url_hash_body(response.url_hash, response.url, response.ttl).encode("ascii")}
+        )
+        self.responses.put(hash, responses, response.ttl)
+        return responses
+
+    async def _create(self, receive: Receive) -> Tuple[Message, Message]:
+        try:
+            request = self._parse_create_request(await self._read_body(receive))
+            response = await self.create_usecase.create(request)
+        except InvalidPayloadError as ex:
+            return _error(http_response_codes.BAD_REQUEST, str(ex))
+        except PayloadTooLargeError:
+            return _PAYLOAD_TOO_LARGE
+        except HashCollisionError as ex:
+            return _error(http_response_codes.CONFLICT, str(ex))
+
+        # The hash may have been cached as missing
+        self.responses.invalidate(response.url_hash)
+
+        return _OK, _json_body({
+            "url_hash": response.url_hash,
+            "url": response.url,
+            "ttl": response.ttl,
+            "reused": response.reused
+        })
+
+    async def _read_body(self, receive: Receive) -> bytes:
+        chunks = []
+        size = 0
+        while True:
+            message = await receive()
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            if size > MAX_BODY_SIZE:
+                raise PayloadTooLargeError()
+            chunks.append(chunk)
+            if not message.get("more_body", False):
+                return b"".join(chunks)
+
+    def _parse_create_request(self, body: bytes) -> CreateUrlHashUseCaseRequest:
+        """Validates the payload as the 'CreateUrlHashRequestModel' API Gateway model does."""
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            raise InvalidPayloadError("The request body is not valid JSON")
+
+        if not isinstance(payload, dict):
+            raise InvalidPayloadError("The request body must be a JSON object")
+
+        url, ttl, reuse = payload.get("url"), payload.get("ttl"), payload.get("reuse", False)
+        if not isinstance(url, str) or not url:
+            raise InvalidPayloadError("\"url\" must be a non-empty string")
+        # bool is a subclass of int, but 'true' is not a valid TTL
+        if ttl is not None and (not isinstance(ttl, int) or isinstance(ttl, bool)):
+            raise InvalidPayloadError("\"ttl\" must be an integer")
+        if not isinstance(reuse, bool):
+            raise InvalidPayloadError("\"reuse\" must be a boolean")
+
+        return CreateUrlHashUseCaseRequest(url = url, ttl = ttl, reuse = reuse)
+
+
+def create_app() -> ZoorlAsgiApp:
+    """Creates the application on DynamoDB, configured through environment variables.
+
+    Besides the ones of the DynamoDB client (see 'client_config()'), the variables are:
+      * URL_HASHES_TABLE - the table name
+      * URL_HASH_CACHE_SIZE - number of hashes whose responses are cached per worker
+      * URL_HASH_CACHE_NEGATIVE_TTL - seconds a missing hash is remembered as missing
+      * URL_CANONICALIZATION_ENABLED - whether URLs are canonicalized before being hashed
+      * URL_STRIP_QUERY_PARAMS - patterns of the query parameters removed by the canonicalization
+    """
+    from zoorl.adapters.dynamodb_async_model import open_async_dynamodb_repository
+
+    return ZoorlAsgiApp(
+        open_async_dynamodb_repository,
+        cache_size=int(os.getenv("URL_HASH_CACHE_SIZE", DEFAULT_MAX_SIZE)),
+        negative_ttl=int(os.getenv("URL_HASH_CACHE_NEGATIVE_TTL", DEFAULT_NEGATIVE_TTL)),
+        url_canonicalizer=(
+            UrlCanonicalizer(split_patterns(os.getenv("URL_STRIP_QUERY_PARAMS", "")))
+            if os.getenv("URL_CANONICALIZATION_ENABLED", "false").lower() in ("1", "true") else None
+        )
+    )
+
+
+def main() -> None:
+    """Launches the application on uvicorn, with one process per worker.
+
+    On SIGTERM/SIGINT each worker stops accepting connections, waits for the in-flight
+    requests (up to the graceful timeout) and then closes the DynamoDB client.
+    """
+    parser = argparse.ArgumentParser(description="Serves Zoorl over HTTP.")
+    parser.add_argument("--host", default="0.0.0.0", help="the address to bind")
+    parser.add_argument("--port", type=int, default=8080, help="the port to bind")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="number of worker processes")
+    parser.add_argument("--graceful-timeout", type=int, default=30, help="seconds to wait for in-flight requests on shutdown")
+    args = parser.parse_args()
+
+    import uvicorn
+
+    uvicorn.run(
+        "zoorl.adapters.asgi_app:create_app",
+        factory=True,
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        lifespan="on",
+        timeout_graceful_shutdown=args.graceful_timeout,
+        # Access logs cost more than serving a cached redirect
+        access_log=False
+    )
+
+
+if __name__ == "__main__":
+    main()
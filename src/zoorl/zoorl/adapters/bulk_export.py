@@ -0,0 +1,278 @@
+"""Streaming export of the stored URL hashes to a compressed file.
+
+The store is read in parallel segments (see 'ExportUrlHashesUseCase'): on DynamoDB,
+each segment is a parallel Scan paginated by its LastEvaluatedKey, projecting only
+the attributes a UrlHash is decoded from. Pages are written as they come, so that
+memory stays flat whatever the table size.
+
+Two formats are written:
+  * "jsonl" - gzip-compressed JSON Lines, one '{"hash", "url", "expires_at"}' object
+    per line: the bulk importer reads it back as is (see 'bulk_import')
+  * "columnar" - blocks of BLOCK_RECORDS URL hashes, each compressed on its own,
+    where every field is stored contiguously: TTLs close to each other, and
+    URLs sharing prefixes, compress much better this way
+
+Columnar file layout (little endian):
+  * header - magic b"ZUC1"
+  * blocks - record count (4 bytes), compressed payload length (4 bytes), then the
+    zlib-compressed payload: TTLs (8 bytes each), hash lengths (1 byte each), URL
+    lengths (4 bytes each), then the hashes and the URLs, all UTF-8 encoded
+
+Both files are written under a temporary name and renamed once complete. Records
+are in no particular order. Exports load back into a local backend too, e.g. into
+a hash table file: 'write_hash_table(path, read_export(export_path))'.
+
+Usage:
+    python -m zoorl.adapters.bulk_export url_hashes.jsonl.gz [--format jsonl|columnar] [--segments 4]
+"""
+
+import gzip
+import json
+import os
+import struct
+import sys
+import zlib
+
+from abc import ABC, abstractmethod
+from json.encoder import encode_basestring_ascii
+from typing import BinaryIO, Iterator, List, Optional, Tuple
+
+from zoorl.core.model import UrlHash
+
+MAGIC = b"ZUC1"
+
+# URL hashes per block of a columnar file: larger blocks compress better, and take more memory
+BLOCK_RECORDS = 4096
+
+# Compression level of both formats: higher levels take much longer, for a few percents
+COMPRESS_LEVEL = 6
+
+_BLOCK = struct.Struct("<II")
+
+
+class InvalidExportFileError(Exception):
+    """Exception thrown if a file is not an export file, or is truncated."""
+    pass
+
+
+def detect_export_format(path: str) -> str:
+    """Returns "jsonl" or "columnar", from the extension of the file."""
+    if path.endswith(".zuc"):
+        return "columnar"
+    if path.endswith((".jsonl.gz", ".ndjson.gz")):
+        return "jsonl"
+    raise InvalidExportFileError(f"Cannot tell the format of \"{path}\": use a .jsonl.gz or .zuc extension, or --format")
+
+
+class ExportWriter(ABC):
+    """Base class of the export file writers, as context managers: 'write()' is the sink of 'ExportUrlHashesUseCase'.
+
+    The file is written under a temporary name, which replaces the target file on
+    a clean exit from the context, and which is removed on errors. Writers define
+    how the file is opened, and how a page is written.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.temporary_path = f"{path}.tmp"
+        self._file = self._open(self.temporary_path)
+
+    def __enter__(self) -> "ExportWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self._file.close()
+            os.remove(self.temporary_path)
+
+    def close(self) -> None:
+        """Completes the file, and renames it to its final name."""
+        self._file.close()
+        os.replace(self.temporary_path, self.path)
+
+    @abstractmethod
+    def _open(self, path: str) -> BinaryIO:
+        """Opens the (temporary) file for writing."""
+        pass
+
+    @abstractmethod
+    def write(self, url_hashes: List[UrlHash]) -> None:
+        """Writes a page of URL hashes."""
+        pass
+
+
+class JsonLinesExportWriter(ExportWriter):
+    """Writes gzip-compressed JSON Lines, in the record format of the bulk importer."""
+
+    def _open(self, path: str) -> BinaryIO:
+        return gzip.open(path, "wb", compresslevel=COMPRESS_LEVEL)
+
+    def write(self, url_hashes: List[UrlHash]) -> None:
+        # One write per page, with the C string encoder 'json.dumps()' uses
+        self._file.write("".join([
+            f'{{"hash":{encode_basestring_ascii(url_hash.hash)},"url":{encode_basestring_ascii(url_hash.url)},"expires_at":{url_hash.ttl}}}\n'
+            for url_hash in url_hashes
+        ]).encode("ascii"))
+
+
+class ColumnarExportWriter(ExportWriter):
+    """Writes blocks of BLOCK_RECORDS URL hashes, field by field."""
+
+    def __init__(self, path: str) -> None:
+        super().__init__(path)
+        self._pending: List[UrlHash] = []
+        self._file.write(MAGIC)
+
+    def _open(self, path: str) -> BinaryIO:
+        return open(path, "wb")
+
+    def write(self, url_hashes: List[UrlHash]) -> None:
+        self._pending.extend(url_hashes)
+        while len(self._pending) >= BLOCK_RECORDS:
+            self._write_block(self._pending[:BLOCK_RECORDS])
+            del self._pending[:BLOCK_RECORDS]
+
+    def close(self) -> None:
+        if self._pending:
+            self._write_block(self._pending)
+            self._pending = []
+        super().close()
+
+    def _write_block(self, url_hashes: List[UrlHash]) -> None:
+        count = len(url_hashes)
+        hashes = [url_hash.hash.encode("utf-8") for url_hash in url_hashes]
+        urls = [url_hash.url.encode("utf-8") for url_hash in url_hashes]
+
+        payload = zlib.compress(b"".join([
+            struct.pack(f"<{count}q", *[url_hash.ttl for url_hash in url_hashes]),
+            struct.pack(f"<{count}B", *map(len, hashes)),
+            struct.pack(f"<{count}I", *map(len, urls)),
+            *hashes,
+            *urls
+        ]), COMPRESS_LEVEL)
+
+        self._file.write(_BLOCK.pack(count, len(payload)))
+        self._file.write(payload)
+
+
+def open_export_writer(path: str, format: Optional[str] = None) -> ExportWriter:
+    """Returns the writer of the format ("jsonl" or "columnar", or None for telling from the file extension)."""
+    format = format or detect_export_format(path)
+    if format == "jsonl":
+        return JsonLinesExportWriter(path)
+    if format == "columnar":
+        return ColumnarExportWriter(path)
+    raise InvalidExportFileError(f"Unsupported export format: \"{format}\"")
+
+
+def read_columnar_blocks(file: BinaryIO, offset: int = 0) -> Iterator[Tuple[int, List[UrlHash]]]:
+    """Returns the blocks of a columnar file, with the offset right after each of them.
+
+    Args:
+        file: the columnar file, opened in binary mode
+        offset: the offset to start reading from, as returned for a previous block (0 for the beginning)
+
+    Returns:
+        an iterator over (offset after the block, URL hashes of the block) pairs
+
+    Raises:
+        InvalidExportFileError: if the file is not a columnar export file, or is truncated
+    """
+    if file.read(len(MAGIC)) != MAGIC:
+        raise InvalidExportFileError(f"\"{getattr(file, 'name', file)}\" is not a columnar export file")
+    offset = max(offset, len(MAGIC))
+    file.seek(offset)
+
+    while True:
+        header = file.read(_BLOCK.size)
+        if not header:
+            return
+        if len(header) < _BLOCK.size:
+            raise InvalidExportFileError("Truncated columnar export file")
+
+        count, length = _BLOCK.unpack(header)
+        compressed = file.read(length)
+        if len(compressed) < length:
+            raise InvalidExportFileError("Truncated columnar export file")
+        offset += _BLOCK.size + length
+
+        payload = memoryview(zlib.decompress(compressed))
+        ttls = struct.unpack_from(f"<{count}q", payload, 0)
+        hash_lengths = struct.unpack_from(f"<{count}B", payload, 8 * count)
+        url_lengths = struct.unpack_from(f"<{count}I", payload, 9 * count)
+
+        hash_start = 13 * count
+        url_start = hash_start + sum(hash_lengths)
+        url_hashes = []
+        for ttl, hash_length, url_length in zip(ttls, hash_lengths, url_lengths):
+            url_hashes.append(UrlHash(
+                hash=str(payload[hash_start:hash_start + hash_length], "utf-8"),
+                url=str(payload[url_start:url_start + url_length], "utf-8"),
+                ttl=ttl
+            ))
+            hash_start += hash_length
+            url_start += url_length
+
+        yield offset, url_hashes
+
+
+def read_export(path: str, format: Optional[str] = None) -> Iterator[UrlHash]:
+    """Returns the URL hashes of an export file, one at a time.
+
+    Args:
+        path: the export file
+        format: "jsonl" or "columnar", or None for telling from the file extension
+
+    Returns:
+        an iterator over the exported URL hashes
+    """
+    format = format or detect_export_format(path)
+    if format == "columnar":
+        with open(path, "rb") as file:
+            for _, url_hashes in read_columnar_blocks(file):
+                yield from url_hashes
+    elif format == "jsonl":
+        with gzip.open(path, "rb") as file:
+            for line in file:
+                if line.strip():
+                    record = json.loads(line)
+                    yield UrlHash(hash=record["hash"], url=record["url"], ttl=record["expires_at"])
+    else:
+        raise InvalidExportFileError(f"Unsupported export format: \"{format}\"")
+
+
+def main() -> None:
+    """Exports the URL hashes of the configured repository to a compressed file."""
+    import argparse
+
+    from zoorl.adapters.lambda_support import build_repository
+    from zoorl.core.usecases.export_url_hashes import (
+        ExportUrlHashesUseCase,
+        ExportUrlHashesUseCaseRequest,
+        DEFAULT_PAGE_SIZE,
+        DEFAULT_TOTAL_SEGMENTS
+    )
+
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("output", help="the export file to write")
+    parser.add_argument("--format", choices=["jsonl", "columnar"], help="the file format (default: from the extension)")
+    parser.add_argument("--segments", type=int, default=DEFAULT_TOTAL_SEGMENTS, help="segments read in parallel")
+    parser.add_argument("--page-size", type=int, default=DEFAULT_PAGE_SIZE)
+    parser.add_argument("--include-expired", action="store_true", help="export expired URL hashes not yet deleted")
+    parser.add_argument(
+        "--backend", default=os.getenv("URL_HASHES_BACKEND", "dynamodb-client"),
+        help="the repository backend (see 'build_repository()'), configured by the same environment variables"
+    )
+    args = parser.parse_args()
+
+    usecase = ExportUrlHashesUseCase(build_repository(args.backend), total_segments=args.segments, page_size=args.page_size)
+    with open_export_writer(args.output, args.format) as writer:
+        response = usecase.export(ExportUrlHashesUseCaseRequest(include_expired=args.include_expired), writer.write)
+
+    print(f"Exported {response.exported} URL hashes to \"{args.output}\" ({response.expired} expired skipped)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,446 @@
+"""Streaming bulk import of URLs from CSV or JSON Lines files.
+
+Each record is a URL, with optional fields:
+  * "ttl" - hours from now, as for the API (DEFAULT_TTL when missing)
+  * "expires_at" - UNIX epoch time, instead of "ttl" (e.g., when re-importing an export)
+  * "hash" - the hash to store the URL under, instead of computing it (e.g., when
+    re-importing an export): the record is rejected if another URL owns the hash
+
+CSV files have a header row naming the columns (at least "url"), while each line
+of a JSON Lines file is an object with the same fields. Files ending with ".gz"
+are decompressed on the fly, and exports of the columnar format are read too (see
+'bulk_export'): exports keep their hashes and expiration times.
+
+The file goes through a pipeline of generators, so that memory stays flat whatever
+the file size:
+
+    read -> normalize -> batch -> canonicalize -> hash (process pool) -> write (bounded batches)
+
+URLs can be canonicalized as the API does (see 'zoorl.core.canonical_url'), one
+batch at a time: records carrying their hash keep their URL as it is.
+
+Hashes are computed as the API does ('compute_hashes()' is the batch form of
+'compute_hash()'), in a pool of processes with a bounded number of batches in
+flight. Before a batch is written, its hashes are looked up with one bulk read:
+a hash already taken by another (unexpired) URL gets the next salted hash, as
+'CreateUrlHashUseCase' does, and the rest of the batch is written in bulk.
+Collisions with URL hashes created through the API while the import runs are
+not detected.
+
+After each batch is written, the position in the file is saved to the checkpoint
+file (if any), so that a failed run resumes after the last written batch instead
+of starting over: records of the batch in progress may be written twice, which
+is harmless.
+
+Usage:
+    python -m zoorl.adapters.bulk_import links.csv --checkpoint links.checkpoint [--backend dynamodb-client]
+"""
+
+import csv
+import gzip
+import io
+import json
+import os
+import sys
+import time
+
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from zoorl.adapters.bulk_export import read_columnar_blocks
+from zoorl.core.canonical_url import UrlCanonicalizer, split_patterns
+from zoorl.core.model import UrlHash
+from zoorl.core.usecases.create_url_hash import DEFAULT_TTL, MAX_SALT_ATTEMPTS
+from zoorl.core.utils import compute_epoch_now, compute_epoch_time_from_ttl, compute_hash, compute_hashes
+from zoorl.ports.repository import UrlHashRepository
+
+# Records written per batch: one bulk read and one bulk write each
+DEFAULT_BATCH_SIZE = 500
+
+# Batches being hashed at the same time, per worker process
+PENDING_BATCHES_PER_WORKER = 2
+
+# Records normalized with the same clock read: TTLs drift by the time they take, at most
+TTL_REFRESH_RECORDS = 10000
+
+# Default amount of seconds between two progress reports
+DEFAULT_REPORT_INTERVAL = 10
+
+
+class InvalidImportFileError(Exception):
+    """Exception thrown if a file cannot be imported (e.g., unknown format or missing "url" column)."""
+    pass
+
+
+class CheckpointMismatchError(Exception):
+    """Exception thrown if a checkpoint file was written for another source file."""
+    pass
+
+
+@dataclass
+class ImportRecord:
+    """A normalized record: 'hash' is None until computed, unless the file specifies it."""
+    url: str
+    ttl: int
+    hash: Optional[str] = None
+
+
+@dataclass
+class ImportBatch:
+    """Records to write, and the file offset right after the last of them."""
+    records: List[ImportRecord]
+    offset: int
+
+
+@dataclass
+class ImportStats:
+    """Counters of an import run (the ones of previous runs are restored from the checkpoint)."""
+    read: int = 0
+    imported: int = 0
+    salted: int = 0
+    rejected: int = 0
+    conflicts: int = 0
+    started_at: float = field(default_factory=time.monotonic)
+
+    def to_dict(self) -> Dict[str, int]:
+        return {"read": self.read, "imported": self.imported, "salted": self.salted, "rejected": self.rejected, "conflicts": self.conflicts}
+
+
+def detect_format(path: str) -> str:
+    """Returns "csv", "jsonl" or "columnar", from the extension of the file (ignoring a ".gz" one)."""
+    root, extension = os.path.splitext(path.lower())
+    if extension == ".gz":
+        extension = os.path.splitext(root)[1]
+    if extension == ".csv":
+        return "csv"
+    if extension in (".jsonl", ".ndjson"):
+        return "jsonl"
+    if extension == ".zuc":
+        return "columnar"
+    raise InvalidImportFileError(f"Cannot tell the format of \"{path}\": use a .csv, .jsonl or .zuc extension, or --format")
+
+
+def _open(path: str) -> io.BufferedIOBase:
+    # Offsets are positions in the decompressed stream, which gzip files can seek to (by decompressing up to them)
+    return gzip.open(path, "rb") if path.lower().endswith(".gz") else open(path, "rb")
+
+
+def _lines(file: io.BufferedReader, position: List[int]) -> Iterator[str]:
+    # The offset of the next line is kept in 'position', so that readers know where each record ends
+    for line in file:
+        position[0] += len(line)
+        yield line.decode("utf-8")
+
+
+def read_records(path: str, format: str, offset: int = 0) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """Returns the records of the file, with the offset right after each of them.
+
+    Args:
+        path: the CSV, JSON Lines or columnar file
+        format: "csv", "jsonl" or "columnar"
+        offset: the offset to start reading from, as returned for a previous record (0 for the beginning)
+
+    Returns:
+        an iterator over (offset after the record, record) pairs: JSON lines that cannot be parsed are None
+    """
+    with _open(path) as file:
+        if format == "csv":
+            header_line = file.readline()
+            columns = next(csv.reader([header_line.decode("utf-8-sig")]), [])
+            if "url" not in columns:
+                raise InvalidImportFileError(f"The header of \"{path}\" has no \"url\" column")
+            offset = max(offset, len(header_line))
+            file.seek(offset)
+
+            position = [offset]
+            for row in csv.reader(_lines(file, position)):
+                if row:
+                    yield position[0], dict(zip(columns, row))
+        elif format == "jsonl":
+            file.seek(offset)
+
+            position = [offset]
+            for line in _lines(file, position):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    record = None
+                yield position[0], record if isinstance(record, dict) else None
+        elif format == "columnar":
+            # Blocks are read whole: records before the last one of a block resume from its start
+            for block_offset, url_hashes in read_columnar_blocks(file, offset):
+                for index, url_hash in enumerate(url_hashes, 1):
+                    yield (block_offset if index == len(url_hashes) else offset), {
+                        "hash": url_hash.hash, "url": url_hash.url, "expires_at": url_hash.ttl
+                    }
+                offset = block_offset
+        else:
+            raise InvalidImportFileError(f"Unsupported import format: \"{format}\"")
+
+
+def normalize_records(records: Iterable[Tuple[int, Optional[Dict[str, Any]]]], stats: ImportStats) -> Iterator[Tuple[int, ImportRecord]]:
+    """Returns the valid records as ImportRecords, with absolute TTLs: others are counted as rejected.
+
+    Expired records are rejected as well, since they would not be served anyway.
+    """
+    now = compute_epoch_now()
+    # Most records share a few TTLs, and computing one takes a clock read
+    ttls: Dict[int, int] = {}
+
+    for offset, record in records:
+        stats.read += 1
+        if stats.read % TTL_REFRESH_RECORDS == 0:
+            now, ttls = compute_epoch_now(), {}
+
+        try:
+            url = str(record["url"]).strip()
+            if record.get("expires_at") not in (None, ""):
+                ttl = int(record["expires_at"])
+            else:
+                hours = int(record.get("ttl") or DEFAULT_TTL)
+                ttl = ttls.get(hours) or ttls.setdefault(hours, compute_epoch_time_from_ttl(hours))
+            hash = str(record.get("hash") or "").strip() or None
+        except (TypeError, KeyError, ValueError):
+            stats.rejected += 1
+            continue
+
+        if not url or ttl <= now:
+            stats.rejected += 1
+            continue
+
+        yield offset, ImportRecord(url=url, ttl=ttl, hash=hash)
+
+
+def batch_records(records: Iterable[Tuple[int, ImportRecord]], batch_size: int) -> Iterator[ImportBatch]:
+    """Groups the records in batches of at most 'batch_size'."""
+    batch: List[ImportRecord] = []
+    offset = 0
+    for offset, record in records:
+        batch.append(record)
+        if len(batch) >= batch_size:
+            yield ImportBatch(batch, offset)
+            batch = []
+    if batch:
+        yield ImportBatch(batch, offset)
+
+
+def canonicalize_batches(batches: Iterable[ImportBatch], canonicalizer: UrlCanonicalizer) -> Iterator[ImportBatch]:
+    """Canonicalizes the URLs of the records to hash, one batch at a time."""
+    for batch in batches:
+        records = [record for record in batch.records if record.hash is None]
+        for record, url in zip(records, canonicalizer.canonicalize_many(record.url for record in records)):
+            record.url = url
+        yield batch
+
+
+def _apply_hashes(batch: ImportBatch, hashes: List[str]) -> ImportBatch:
+    missing = (record for record in batch.records if record.hash is None)
+    for record, hash in zip(missing, hashes):
+        record.hash = hash
+    return batch
+
+
+def hash_batches(batches: Iterable[ImportBatch], executor: Optional[Executor], max_pending: int) -> Iterator[ImportBatch]:
+    """Computes the missing hashes of the batches, in order, with at most 'max_pending' batches in flight.
+
+    Args:
+        batches: the batches to hash
+        executor: the (process) pool computing the hashes, or None for hashing in this process
+        max_pending: the maximum number of batches submitted and not yet returned
+
+    Returns:
+        an iterator over the batches, with all their hashes set
+    """
+    if executor is None:
+        for batch in batches:
+            yield _apply_hashes(batch, compute_hashes(record.url for record in batch.records if record.hash is None))
+        return
+
+    # Unlike 'Executor.map()', which would submit the whole file upfront
+    pending: Deque[Tuple[ImportBatch, Future]] = deque()
+    for batch in batches:
+        pending.append((batch, executor.submit(compute_hashes, [record.url for record in batch.records if record.hash is None])))
+        if len(pending) >= max_pending:
+            done, future = pending.popleft()
+            yield _apply_hashes(done, future.result())
+
+    while pending:
+        done, future = pending.popleft()
+        yield _apply_hashes(done, future.result())
+
+
+def write_batch(repository: UrlHashRepository, batch: ImportBatch, stats: ImportStats) -> None:
+    """Writes the batch: in bulk for the free hashes, with conditional writes for the salted ones."""
+    url_hashes: Dict[str, UrlHash] = {}
+    collisions: List[ImportRecord] = []
+
+    existing = repository.get_by_hashes(list(dict.fromkeys(record.hash for record in batch.records)))
+
+    for record in batch.records:
+        owner = url_hashes.get(record.hash) or existing.get(record.hash)
+        if owner is not None and owner.url != record.url:
+            collisions.append(record)
+        else:
+            url_hashes[record.hash] = UrlHash(hash=record.hash, url=record.url, ttl=record.ttl)
+
+    repository.save_many(list(url_hashes.values()))
+    stats.imported += len(url_hashes)
+
+    for record in collisions:
+        if record.hash != compute_hash(record.url):
+            # The hash was given by the file, so there is no other one to try
+            stats.conflicts += 1
+            continue
+
+        for salt in range(1, MAX_SALT_ATTEMPTS):
+            if repository.save_if_available(UrlHash(hash=compute_hash(record.url, salt), url=record.url, ttl=record.ttl)):
+                stats.imported += 1
+                stats.salted += 1
+                break
+        else:
+            stats.conflicts += 1
+
+
+def load_checkpoint(path: str, source: str) -> Tuple[int, ImportStats]:
+    """Returns the offset to resume from and the counters of the previous runs (0 and new counters if none).
+
+    Raises:
+        CheckpointMismatchError: if the checkpoint was written for another source file
+    """
+    if not os.path.exists(path):
+        return 0, ImportStats()
+
+    with open(path) as file:
+        checkpoint = json.load(file)
+
+    if checkpoint["source"] != os.path.abspath(source):
+        raise CheckpointMismatchError(f"\"{path}\" is the checkpoint of \"{checkpoint['source']}\", not of \"{source}\"")
+
+    return checkpoint["offset"], ImportStats(**checkpoint["stats"])
+
+
+def save_checkpoint(path: str, source: str, offset: int, stats: ImportStats) -> None:
+    """Saves the offset and the counters, replacing the checkpoint file atomically."""
+    temporary_path = f"{path}.tmp"
+    with open(temporary_path, "w") as file:
+        json.dump({"source": os.path.abspath(source), "offset": offset, "stats": stats.to_dict()}, file)
+    os.replace(temporary_path, path)
+
+
+def format_progress(stats: ImportStats, records_this_run: int) -> str:
+    elapsed = time.monotonic() - stats.started_at
+    rate = records_this_run / elapsed if elapsed else 0.0
+    return (
+        f"{stats.read:,} read, {stats.imported:,} imported ({stats.salted:,} salted), "
+        f"{stats.rejected:,} rejected, {stats.conflicts:,} conflicts - {rate:,.0f} records/s"
+    )
+
+
+def import_file(
+    repository: UrlHashRepository,
+    path: str,
+    format: Optional[str] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    workers: int = 0,
+    checkpoint_path: Optional[str] = None,
+    report: Optional[Callable[[str], None]] = None,
+    report_interval: float = DEFAULT_REPORT_INTERVAL,
+    canonicalizer: Optional[UrlCanonicalizer] = None
+) -> ImportStats:
+    """Imports the URLs of a CSV, JSON Lines or columnar file into the repository.
+
+    Args:
+        repository: the repository to write to
+        path: the file to import
+        format: "csv", "jsonl" or "columnar", or None for telling from the file extension
+        batch_size: the number of records per batch
+        workers: the number of hashing processes, or 0 for hashing in this process
+        checkpoint_path: the file recording the progress, for resuming a failed import (None for no checkpoints)
+        report: called with a progress line every 'report_interval' seconds, and at the end
+        report_interval: the amount of seconds between two progress reports
+        canonicalizer: canonicalizes the URLs to hash, as the API does (None for hashing them as they are)
+
+    Returns:
+        the counters of the import, including the previous runs resumed from the checkpoint
+
+    Raises:
+        InvalidImportFileError: if the format is not supported, or a CSV file has no "url" column
+        CheckpointMismatchError: if the checkpoint was written for another source file
+    """
+    format = format or detect_format(path)
+    offset, stats = load_checkpoint(checkpoint_path, path) if checkpoint_path else (0, ImportStats())
+    read_before = stats.read
+
+    executor = ProcessPoolExecutor(max_workers=workers) if workers else None
+    try:
+        records = normalize_records(read_records(path, format, offset), stats)
+        batches = batch_records(records, batch_size)
+        if canonicalizer is not None:
+            batches = canonicalize_batches(batches, canonicalizer)
+        batches = hash_batches(batches, executor, max(1, workers) * PENDING_BATCHES_PER_WORKER)
+
+        last_report = time.monotonic()
+        for batch in batches:
+            write_batch(repository, batch, stats)
+            if checkpoint_path:
+                save_checkpoint(checkpoint_path, path, batch.offset, stats)
+
+            if report and time.monotonic() - last_report >= report_interval:
+                report(format_progress(stats, stats.read - read_before))
+                last_report = time.monotonic()
+    finally:
+        if executor:
+            executor.shutdown(cancel_futures=True)
+
+    if report:
+        report(format_progress(stats, stats.read - read_before))
+
+    return stats
+
+
+def main() -> None:
+    """Imports the URLs of a CSV, JSON Lines or columnar file into the configured repository."""
+    import argparse
+
+    from zoorl.adapters.lambda_support import build_repository, build_throttled_repository
+
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("source", help="the CSV, JSON Lines or columnar file to import")
+    parser.add_argument("--format", choices=["csv", "jsonl", "columnar"], help="the file format (default: from the extension)")
+    parser.add_argument("--checkpoint", help="the file recording the progress: an existing one is resumed")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="hashing processes (0 for none)")
+    parser.add_argument("--write-rate", type=float, help="item writes per second, for sharing the table capacity")
+    parser.add_argument("--canonicalize", action="store_true", help="canonicalize the URLs before hashing them, as the API does")
+    parser.add_argument(
+        "--strip-params", default=os.getenv("URL_STRIP_QUERY_PARAMS", ""),
+        help="comma-separated patterns of the query parameters removed by --canonicalize (e.g., \"utm_*,fbclid\")"
+    )
+    parser.add_argument(
+        "--backend", default=os.getenv("URL_HASHES_BACKEND", "dynamodb-client"),
+        help="the repository backend (see 'build_repository()'), configured by the same environment variables"
+    )
+    args = parser.parse_args()
+
+    repository = build_repository(args.backend)
+    if args.write_rate:
+        repository = build_throttled_repository(repository, args.write_rate)
+
+    import_file(
+        repository,
+        args.source,
+        format=args.format,
+        batch_size=args.batch_size,
+        workers=args.workers,
+        checkpoint_path=args.checkpoint,
+        report=lambda line: print(line, file=sys.stderr),
+        canonicalizer=UrlCanonicalizer(split_patterns(args.strip_params)) if args.canonicalize else None
+    )
+
+
+if __name__ == "__main__":
+    main()
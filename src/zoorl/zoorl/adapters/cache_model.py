@@ -0,0 +1,142 @@
+"""In-process caching decorator for the UrlHash repository.
+
+Warm AWS Lambda containers are reused across invocations, so anything kept in
+module scope survives between requests. Popular ("viral") hashes are requested
+far more often than the rest, so a small LRU cache in front of the repository
+avoids most of the DynamoDB round-trips for skewed traffic.
+
+Cached entries are never served past their own 'ttl' epoch, while misses are
+remembered only for a short window so that newly created hashes become visible
+quickly.
+"""
+
+from typing import Dict, Iterator, List, Optional
+
+from zoorl.core.cache import LruCache, DEFAULT_MAX_SIZE
+from zoorl.core.model import UrlHash
+from zoorl.ports.repository import UrlHashRepository
+
+# Default amount of seconds a missing hash is remembered as missing
+DEFAULT_NEGATIVE_TTL = 5
+
+
+class CachedUrlHashRepository(UrlHashRepository):
+    """Caching decorator for any UrlHash repository implementation."""
+
+    def __init__(self, delegate: UrlHashRepository, cache: LruCache, negative_ttl: int = DEFAULT_NEGATIVE_TTL) -> None:
+        self.delegate = delegate
+        self.cache = cache
+        self.negative_ttl = negative_ttl
+
+    def save(self, url_hash: UrlHash) -> None:
+        self.delegate.save(url_hash)
+
+        # Write-through, so that a previously cached miss is not served anymore
+        self.cache.invalidate(url_hash.hash)
+        self.cache.put(url_hash.hash, url_hash, url_hash.ttl)
+
+    def save_if_available(self, url_hash: UrlHash) -> bool:
+        saved = self.delegate.save_if_available(url_hash)
+
+        if saved:
+            self.cache.invalidate(url_hash.hash)
+            self.cache.put(url_hash.hash, url_hash, url_hash.ttl)
+        else:
+            # Somebody else owns this hash, so whatever we cached may be stale
+            self.cache.invalidate(url_hash.hash)
+
+        return saved
+
+    def save_if_absent(self, url_hash: UrlHash) -> Optional[UrlHash]:
+        # A cached URL hash is unexpired, so the conditional write would fail anyway
+        hit, cached = self.cache.get(url_hash.hash)
+        if hit and cached:
+            return cached
+
+        existing = self.delegate.save_if_absent(url_hash)
+
+        # Either way, we now know the current value for this hash
+        current = existing or url_hash
+        self.cache.invalidate(url_hash.hash)
+        self.cache.put(url_hash.hash, current, current.ttl)
+
+        return existing
+
+    def save_many(self, url_hashes: List[UrlHash]) -> None:
+        self.delegate.save_many(url_hashes)
+
+        for url_hash in url_hashes:
+            self.cache.invalidate(url_hash.hash)
+            self.cache.put(url_hash.hash, url_hash, url_hash.ttl)
+
+    def get_by_hash(self, hash: str) -> Optional[UrlHash]:
+        hit, url_hash = self.cache.get(hash)
+        if hit:
+            return url_hash
+
+        url_hash = self.delegate.get_by_hash(hash)
+
+        if url_hash:
+            self.cache.put(hash, url_hash, url_hash.ttl)
+        elif self.negative_ttl > 0:
+            self.cache.put(hash, None, self.cache.clock() + self.negative_ttl)
+
+        return url_hash
+
+    def get_by_hashes(self, hashes: List[str]) -> Dict[str, UrlHash]:
+        found = {}
+        to_fetch = []
+        for hash in hashes:
+            hit, url_hash = self.cache.get(hash)
+            if not hit:
+                to_fetch.append(hash)
+            elif url_hash:
+                found[hash] = url_hash
+
+        if not to_fetch:
+            return found
+
+        fetched = self.delegate.get_by_hashes(to_fetch)
+
+        for hash in to_fetch:
+            url_hash = fetched.get(hash)
+            if url_hash:
+                self.cache.put(hash, url_hash, url_hash.ttl)
+                found[hash] = url_hash
+            elif self.negative_ttl > 0:
+                self.cache.put(hash, None, self.cache.clock() + self.negative_ttl)
+
+        return found
+
+    def delete_many(self, hashes: List[str]) -> None:
+        self.delegate.delete_many(hashes)
+
+        for hash in hashes:
+            self.cache.invalidate(hash)
+
+    def delete_expired(self, hashes: List[str], now: int) -> int:
+        deleted = self.delegate.delete_expired(hashes, now)
+
+        # The hashes that were not deleted may have been taken again: their cached value is stale too
+        for hash in hashes:
+            self.cache.invalidate(hash)
+        return deleted
+
+    def find_expired_hashes(self, now: int, page_size: int = 100) -> Iterator[List[str]]:
+        return self.delegate.find_expired_hashes(now, page_size)
+
+    def find_outdated(self, segment: int = 0, total_segments: int = 1, page_size: int = 100) -> Iterator[List[UrlHash]]:
+        return self.delegate.find_outdated(segment, total_segments, page_size)
+
+    def find_all(self, segment: int = 0, total_segments: int = 1, page_size: int = 100) -> Iterator[List[UrlHash]]:
+        return self.delegate.find_all(segment, total_segments, page_size)
+
+    def migrate_many(self, url_hashes: List[UrlHash]) -> int:
+        # Migrating changes the layout, not the values, so cached entries are still valid
+        return self.delegate.migrate_many(url_hashes)
+
+    def add_access_counts(self, counts: Dict[str, int]) -> None:
+        self.delegate.add_access_counts(counts)
+
+    def find_most_accessed(self, limit: int, now: int) -> List[UrlHash]:
+        return self.delegate.find_most_accessed(limit, now)
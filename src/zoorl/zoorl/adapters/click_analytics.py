@@ -0,0 +1,228 @@
+"""Click analytics for the redirect function.
+
+Redirects are counted in memory (see 'AccessCounter'), by hash and time bucket.
+At the end of each invocation, once the counts are due, they are shipped to the
+configured sinks:
+  * "emf" - one CloudWatch Embedded Metric Format line per hash and bucket: the
+    "Clicks" metric (total clicks, per bucket) with the hash as a property, so
+    that per-link counts can be queried with Logs Insights without creating a
+    metric per hash;
+  * "function" - the totals by hash are handed to the function named by
+    CLICK_ANALYTICS_FUNCTION, with one asynchronous invocation per shipment of
+    CLICK_ANALYTICS_SHIPMENT_SIZE hashes (see 'record_clicks_handler'), which adds
+    them to their items for ranking the hashes of the redirect snapshot;
+  * "repository" - the same totals are added to the items right away (see
+    'UrlHashRepository.add_access_counts()'), one write per hash.
+
+Lambda only returns the response once the handler returns, so shipping is not
+free for the invocation that flushes: "emf" writes to the standard output, and
+"function" takes one Invoke request per shipment (plus the Lambda client, on the
+first flush of a container), while "repository" takes one sequential write on
+DynamoDB per clicked hash. "repository" is meant for local backends and
+long-running processes, and "function" for the deployed redirect function.
+
+Every total is shipped, the most clicked hashes first. Counts still in memory
+when the container is recycled are lost, and so are the shipments a sink fails to
+ship (with a warning counting the dropped hashes): the bound is the smaller of
+CLICK_ANALYTICS_MAX_EVENTS clicks and CLICK_ANALYTICS_FLUSH_INTERVAL seconds of
+clicks, per container. A last flush is attempted on SIGTERM, which Lambda only
+sends to functions running an extension.
+"""
+
+import json
+import os
+import signal
+import sys
+
+from collections import Counter
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from aws_lambda_powertools import Logger
+
+from zoorl.adapters.emf import write_lines, EMF_NAMESPACE
+from zoorl.core.access_counter import (
+    AccessCounter,
+    DEFAULT_BUCKET_SIZE,
+    DEFAULT_FLUSH_INTERVAL,
+    DEFAULT_MAX_EVENTS
+)
+from zoorl.ports.repository import UrlHashRepository
+
+# Default maximum number of hashes whose totals are shipped together: a flush takes one
+# shipment (e.g., one invocation of the "function" sink) per this many clicked hashes
+DEFAULT_SHIPMENT_SIZE = 1000
+
+
+def emf_lines(counts: Dict[Tuple[str, int], int], service: str, namespace: str = EMF_NAMESPACE) -> Iterator[str]:
+    """Returns the EMF log lines of the counts, one per (hash, bucket).
+
+    Args:
+        counts: the click counts, by (hash, bucket start epoch)
+        service: the value of the "service" dimension
+        namespace: the CloudWatch metrics namespace
+
+    Returns:
+        an iterator over JSON lines
+    """
+    for (hash, bucket), count in counts.items():
+        yield json.dumps({
+            "_aws": {
+                # Metrics are timestamped with their bucket, not with the flush
+                "Timestamp": bucket * 1000,
+                "CloudWatchMetrics": [{
+                    "Namespace": namespace,
+                    "Dimensions": [["service"]],
+                    "Metrics": [{"Name": "Clicks", "Unit": "Count"}]
+                }]
+            },
+            "service": service,
+            "Clicks": count,
+            "url_hash": hash,
+            "bucket": bucket
+        }, separators=(",", ":"))
+
+
+def totals_by_hash(counts: Dict[Tuple[str, int], int]) -> Dict[str, int]:
+    """Returns the click counts summed over the buckets, by hash."""
+    totals: Counter = Counter()
+    for (hash, _), count in counts.items():
+        totals[hash] += count
+    return dict(totals)
+
+
+def shipments(totals: Dict[str, int], size: int) -> List[Dict[str, int]]:
+    """Splits the totals into shipments of at most 'size' hashes, the most clicked hashes first."""
+    ranked = sorted(totals.items(), key=lambda total: total[1], reverse=True)
+    return [dict(ranked[start:start + size]) for start in range(0, len(ranked), size)]
+
+
+class ClickAnalytics:
+    """Aggregates clicks and ships them to the enabled sinks."""
+
+    def __init__(
+        self,
+        counter: AccessCounter,
+        logger: Logger,
+        repository_factory: Optional[Callable[[], UrlHashRepository]] = None,
+        emit: Optional[Callable[[Iterable[str]], None]] = None,
+        shipment_size: int = DEFAULT_SHIPMENT_SIZE,
+        forward: Optional[Callable[[Dict[str, int]], None]] = None
+    ) -> None:
+        self.counter = counter
+        self.logger = logger
+        self.repository_factory = repository_factory
+        self.emit = emit
+        self.shipment_size = shipment_size
+        self.forward = forward
+
+    @property
+    def enabled(self) -> bool:
+        return self.repository_factory is not None or self.emit is not None or self.forward is not None
+
+    def record(self, hash: str) -> None:
+        """Counts a click on the hash."""
+        if self.enabled:
+            self.counter.record(hash)
+
+    def flush_if_due(self) -> None:
+        """Ships the counts if they are due, as the end of an invocation."""
+        if self.counter.is_due():
+            self.flush()
+
+    def flush(self) -> None:
+        """Ships the counts to the sinks: counts that cannot be shipped are dropped, and never fail the caller."""
+        counts = self.counter.drain()
+        if not counts:
+            return
+
+        if self.emit is not None:
+            try:
+                self.emit(emf_lines(counts, os.getenv("POWERTOOLS_SERVICE_NAME", "zoorl")))
+            except Exception as ex:
+                self.logger.warning(f"Dropped the click metrics of {len(counts)} hashes and buckets: {ex}")
+
+        if self.repository_factory is None and self.forward is None:
+            return
+
+        for shipment in shipments(totals_by_hash(counts), self.shipment_size):
+            # A failed shipment only drops its own counts
+            if self.forward is not None:
+                try:
+                    self.forward(shipment)
+                except Exception as ex:
+                    self.logger.warning(f"Dropped the click counts of {len(shipment)} hashes: {ex}")
+
+            if self.repository_factory is not None:
+                try:
+                    self.repository_factory().add_access_counts(shipment)
+                except Exception as ex:
+                    self.logger.warning(f"Dropped the click counts of {len(shipment)} hashes: {ex}")
+
+    def flush_on_sigterm(self) -> None:
+        """Flushes the counts when the process is asked to terminate, and then exits.
+
+        Must be called from the main thread (e.g., at import time).
+        """
+        def handle_sigterm(signum: int, frame: object) -> None:
+            self.flush()
+            sys.exit(0)
+
+        signal.signal(signal.SIGTERM, handle_sigterm)
+
+
+def invoke_click_recorder(function_name: str) -> Callable[[Dict[str, int]], None]:
+    """Returns the sink handing click totals to the function, with asynchronous invocations.
+
+    The Lambda client is created on the first call, not to slow down cold starts.
+    """
+    @lru_cache(maxsize=None)
+    def lambda_client():
+        import boto3
+
+        return boto3.client("lambda")
+
+    def forward(totals: Dict[str, int]) -> None:
+        # "Event" invocations are queued by Lambda, which answers before running the function
+        lambda_client().invoke(
+            FunctionName=function_name,
+            InvocationType="Event",
+            Payload=json.dumps({"counts": totals}, separators=(",", ":")).encode("utf-8")
+        )
+
+    return forward
+
+
+def create_click_analytics(logger: Logger, repository_factory: Callable[[], UrlHashRepository]) -> ClickAnalytics:
+    """Creates the click analytics stage, configured through environment variables.
+
+    The variables are:
+      * CLICK_ANALYTICS_SINKS - comma-separated sinks among "emf", "function" and "repository"
+        (default "repository"), or an empty string for disabling analytics
+      * CLICK_ANALYTICS_FUNCTION - the name of the function recording the counts of the "function" sink
+      * CLICK_ANALYTICS_SHIPMENT_SIZE - hashes whose totals are shipped together (e.g., per invocation)
+      * CLICK_ANALYTICS_FLUSH_INTERVAL - seconds between two flushes
+      * CLICK_ANALYTICS_MAX_EVENTS - clicks counted before a flush, whatever the interval
+      * CLICK_ANALYTICS_BUCKET_SIZE - width of the time buckets, in seconds
+
+    Arguments:
+        logger: the logger for reporting dropped counts
+        repository_factory: returns the repository of the "repository" sink, called on flush
+
+    Returns:
+        the click analytics stage
+    """
+    sinks = {sink.strip() for sink in os.getenv("CLICK_ANALYTICS_SINKS", "repository").split(",") if sink.strip()}
+
+    return ClickAnalytics(
+        AccessCounter(
+            flush_interval=float(os.getenv("CLICK_ANALYTICS_FLUSH_INTERVAL", DEFAULT_FLUSH_INTERVAL)),
+            max_events=int(os.getenv("CLICK_ANALYTICS_MAX_EVENTS", DEFAULT_MAX_EVENTS)),
+            bucket_size=int(os.getenv("CLICK_ANALYTICS_BUCKET_SIZE", DEFAULT_BUCKET_SIZE))
+        ),
+        logger,
+        repository_factory=repository_factory if "repository" in sinks else None,
+        emit=write_lines if "emf" in sinks else None,
+        shipment_size=int(os.getenv("CLICK_ANALYTICS_SHIPMENT_SIZE", DEFAULT_SHIPMENT_SIZE)),
+        forward=invoke_click_recorder(os.environ["CLICK_ANALYTICS_FUNCTION"]) if "function" in sinks else None
+    )
@@ -0,0 +1,79 @@
+"""AWS Lambda adapter for executing the use case for creating a URL hash under a custom alias."""
+
+from functools import lru_cache
+from typing import Any
+
+from aws_lambda_powertools.utilities.typing import LambdaContext
+from aws_lambda_powertools.logging import correlation_paths
+
+from zoorl.adapters import http_response_codes
+from zoorl.adapters.lambda_support import app, tracer, logger, get_url_hash_repository, register_error_response, resolve
+
+from zoorl.core.usecases.create_url_alias import (
+    AliasTakenError,
+    CreateUrlAliasUseCase,
+    CreateUrlAliasUseCaseRequest,
+    InvalidAliasError
+)
+
+register_error_response(AliasTakenError, http_response_codes.CONFLICT)
+register_error_response(InvalidAliasError, http_response_codes.BAD_REQUEST)
+
+@lru_cache(maxsize=None)
+def get_usecase() -> CreateUrlAliasUseCase:
+    """Returns the use case, built on first use so that the repository is created lazily."""
+    return CreateUrlAliasUseCase(
+        url_hash_repository=get_url_hash_repository()
+    )
+
+@app.put("/u/<alias>")
+@tracer.capture_method
+def handle_alias(alias: str) -> dict:
+    """Wraps the use case for creating a URL hash under a custom alias.
+
+    API gateway has already validated the payload, so the "url" field is there.
+
+    Arguments:
+        alias: the alias to take
+
+    Returns:
+        the payload for URL redirection, including the expiration time and whether the alias was already taken by the same URL.
+
+    Raises:
+        InvalidAliasError: if the alias is malformed or reserved
+        AliasTakenError: if the alias is taken by another URL
+    """
+
+    payload: dict[str, Any] = app.current_event.json_body  # deserialize json str to dict
+
+    response = get_usecase().create(
+        CreateUrlAliasUseCaseRequest(
+            alias = alias,
+            url = payload.get("url", None),
+            ttl = payload.get("ttl", None)
+        )
+    )
+
+    return {
+        "url_hash": response.url_hash,
+        "url": response.url,
+        "ttl": response.ttl,
+        "reused": response.reused
+    }
+
+@logger.inject_lambda_context(correlation_id_path=correlation_paths.API_GATEWAY_REST)
+@tracer.capture_lambda_handler
+def handle(event: dict, context: LambdaContext) -> dict:
+    """AWS Lambda entry point function.
+
+    Arguments:
+        event: the APIGateway event payload 
+        context: Lambda context (e.g., environment variables)
+
+    Returns:
+        Response suitable for being processed by API Gateway.
+    """
+
+    logger.debug(f"Correlation ID => {logger.get_correlation_id()}")
+    
+    return resolve(event, context)
@@ -1,20 +1,45 @@
 """AWS Lambda adapter for executing the use case for creating a new URL hash."""
 
+import os
+
+from functools import lru_cache
 from typing import Any
 
 from aws_lambda_powertools.utilities.typing import LambdaContext
 from aws_lambda_powertools.logging import correlation_paths
 
-from zoorl.adapters.lambda_support import app, tracer, logger, url_hash_repository
+from zoorl.adapters import http_response_codes
+from zoorl.adapters.lambda_support import (
+    app,
+    tracer,
+    logger,
+    get_url_canonicalizer,
+    get_url_hash_repository,
+    register_error_response,
+    resolve
+)
 
+from zoorl.core.cache import LruCache, DEFAULT_MAX_SIZE
 from zoorl.core.usecases.create_url_hash import (
     CreateUrlHashUseCaseRequest,
-    CreateUrlHashUseCase
+    CreateUrlHashUseCase,
+    HashCollisionError
 )
 
-usecase = CreateUrlHashUseCase(
-    url_hash_repository=url_hash_repository
-)
+register_error_response(HashCollisionError, http_response_codes.CONFLICT)
+
+@lru_cache(maxsize=None)
+def get_usecase() -> CreateUrlHashUseCase:
+    """Returns the use case, built on first use so that the repository is created lazily.
+
+    The memo of recently created URL hashes is sized through the URL_HASH_MEMO_SIZE environment variable,
+    and URLs are canonicalized as configured for 'get_url_canonicalizer()'.
+    """
+    return CreateUrlHashUseCase(
+        url_hash_repository=get_url_hash_repository(),
+        url_hash_memo=LruCache(max_size=int(os.getenv("URL_HASH_MEMO_SIZE", DEFAULT_MAX_SIZE))),
+        url_canonicalizer=get_url_canonicalizer()
+    )
 
 @app.post("/u")
 @tracer.capture_method
@@ -25,23 +50,28 @@ def handle() -> dict:
     API gateway has already performed input validation so we guarenteed to have the required
     fields when this is executed.
 
+    With '"reuse": true', an unexpired URL hash for the same URL is returned without any write,
+    so that retrying clients do not pay for a write (nor extend the TTL) each time.
+
     Returns:
-        the payload for URL redirection, including the expiration time.
+        the payload for URL redirection, including the expiration time and whether it was reused.
     """
     
     payload: dict[str, Any] = app.current_event.json_body  # deserialize json str to dict
 
-    response = usecase.create(
+    response = get_usecase().create(
         CreateUrlHashUseCaseRequest(
             url = payload.get("url", None),
-            ttl = payload.get("ttl", None)
+            ttl = payload.get("ttl", None),
+            reuse = payload.get("reuse", False)
         )
     )
 
     return {
         "url_hash": response.url_hash,
         "url": response.url,
-        "ttl": response.ttl
+        "ttl": response.ttl,
+        "reused": response.reused
     }
 
 @logger.inject_lambda_context(correlation_id_path=correlation_paths.API_GATEWAY_REST)
@@ -62,4 +92,4 @@ def handle(event: dict, context: LambdaContext) -> dict:
 
     logger.debug(f"Correlation ID => {logger.get_correlation_id()}")
     
-    return app.resolve(event, context)
+    return resolve(event, context)
@@ -0,0 +1,91 @@
+"""AWS Lambda adapter for executing the use case for creating many URL hashes at once."""
+
+from functools import lru_cache
+from typing import Any
+
+from aws_lambda_powertools.utilities.typing import LambdaContext
+from aws_lambda_powertools.logging import correlation_paths
+
+from zoorl.adapters import http_response_codes
+from zoorl.adapters.lambda_support import (
+    app,
+    tracer,
+    logger,
+    get_url_canonicalizer,
+    get_url_hash_repository,
+    register_error_response,
+    resolve
+)
+
+from zoorl.core.usecases.create_url_hash import CreateUrlHashUseCaseRequest, HashCollisionError
+from zoorl.core.usecases.create_url_hashes import (
+    CreateUrlHashesUseCaseRequest,
+    CreateUrlHashesUseCase,
+    TooManyUrlsError
+)
+
+register_error_response(TooManyUrlsError, http_response_codes.BAD_REQUEST)
+register_error_response(HashCollisionError, http_response_codes.CONFLICT)
+
+@lru_cache(maxsize=None)
+def get_usecase() -> CreateUrlHashesUseCase:
+    """Returns the use case, built on first use so that the repository is created lazily."""
+    return CreateUrlHashesUseCase(
+        url_hash_repository=get_url_hash_repository(),
+        url_canonicalizer=get_url_canonicalizer()
+    )
+
+@app.post("/u/batch")
+@tracer.capture_method
+def handle_batch() -> dict:
+    """Wraps the use case for creating many URL hashes.
+
+    The payload is an object with an "items" array of {"url", "ttl"} objects: API gateway
+    has already performed input validation so we are guaranteed to have the required fields.
+
+    Returns:
+        the payload for each URL redirection, in the same order as the request items.
+    """
+
+    payload: dict[str, Any] = app.current_event.json_body  # deserialize json str to dict
+
+    response = get_usecase().create(
+        CreateUrlHashesUseCaseRequest(items=[
+            CreateUrlHashUseCaseRequest(
+                url = item.get("url", None),
+                ttl = item.get("ttl", None)
+            )
+            for item in payload.get("items", [])
+        ])
+    )
+
+    return {
+        "items": [
+            {
+                "url_hash": item.url_hash,
+                "url": item.url,
+                "ttl": item.ttl
+            }
+            for item in response.items
+        ]
+    }
+
+@logger.inject_lambda_context(correlation_id_path=correlation_paths.API_GATEWAY_REST)
+@tracer.capture_lambda_handler
+def handle(event: dict, context: LambdaContext) -> dict:
+    """AWS Lambda entry point function.
+
+    Note that we relay on AWS Lambda Powertools for Python to process our
+    response and set fields when needed.
+
+    Arguments:
+        event: the APIGateway event payload
+        context: Lambda context (e.g., environment variables)
+
+    Returns:
+        Response suitable for being processed by API Gateway.
+    """
+
+    logger.debug(f"Correlation ID => {logger.get_correlation_id()}")
+
+    return resolve(event, context)
@@ -0,0 +1,220 @@
+"""Asynchronous DynamoDB implementation of the UrlHash repository, on aiobotocore.
+
+The repository issues the same requests, on the same item layout (see
+'dynamodb_codec'), as 'DynamoDBClientUrlHashRepository', but every call is a
+coroutine: a single event loop can keep thousands of DynamoDB requests in
+flight, instead of blocking a thread on each of them.
+
+aiobotocore is not part of the AWS Lambda runtime, so it is only imported by
+'open_async_dynamodb_repository()', for the hosts that need it.
+"""
+
+import asyncio
+import os
+import time
+
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from botocore.exceptions import ClientError
+
+from zoorl.adapters.dynamodb_client_model import client_config
+from zoorl.adapters.dynamodb_codec import (
+    attribute_names,
+    decode,
+    encode,
+    now_values,
+    ABSENT_CONDITION,
+    AVAILABLE_CONDITION,
+    PROJECTION_EXPRESSION,
+    UNEXPIRED_FILTER
+)
+from zoorl.adapters.dynamodb_model import (
+    UnprocessedItemsError,
+    BATCH_GET_MAX_KEYS,
+    BATCH_MAX_ATTEMPTS,
+    BATCH_RETRY_BASE_DELAY,
+    BATCH_WRITE_MAX_ITEMS
+)
+from zoorl.core.aio import gather_bounded, DEFAULT_MAX_CONCURRENCY
+from zoorl.core.model import UrlHash
+from zoorl.ports.async_repository import AsyncUrlHashRepository
+
+# Expression names are computed once, since they are the same for every request
+_ABSENT_NAMES = attribute_names(ABSENT_CONDITION)
+_AVAILABLE_NAMES = attribute_names(AVAILABLE_CONDITION)
+_PROJECTION_NAMES = attribute_names(PROJECTION_EXPRESSION)
+_READ_NAMES = attribute_names(UNEXPIRED_FILTER, PROJECTION_EXPRESSION)
+
+
+def _is_conditional_check_failure(ex: ClientError) -> bool:
+    return ex.response.get("Error", {}).get("Code") == "ConditionalCheckFailedException"
+
+
+async def batch_write_with_retry(client: Any, table_name: str, write_requests: List[Dict[str, Any]]) -> None:
+    """Asynchronous version of 'dynamodb_model.batch_write_with_retry()'."""
+    for attempt in range(BATCH_MAX_ATTEMPTS):
+        response = await client.batch_write_item(
+            RequestItems={table_name: write_requests}
+        )
+
+        write_requests = response.get("UnprocessedItems", {}).get(table_name, [])
+        if not write_requests:
+            return
+
+        await asyncio.sleep(BATCH_RETRY_BASE_DELAY * (2 ** attempt))
+
+    raise UnprocessedItemsError(f"{len(write_requests)} items were not written after {BATCH_MAX_ATTEMPTS} attempts")
+
+
+async def batch_get_with_retry(client: Any, table_name: str, keys_and_attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Asynchronous version of 'dynamodb_model.batch_get_with_retry()'."""
+    items = []
+    for attempt in range(BATCH_MAX_ATTEMPTS):
+        response = await client.batch_get_item(
+            RequestItems={table_name: keys_and_attributes}
+        )
+
+        items.extend(response.get("Responses", {}).get(table_name, []))
+
+        keys_and_attributes = response.get("UnprocessedKeys", {}).get(table_name)
+        if not keys_and_attributes or not keys_and_attributes.get("Keys"):
+            return items
+
+        await asyncio.sleep(BATCH_RETRY_BASE_DELAY * (2 ** attempt))
+
+    raise UnprocessedItemsError(f"{len(keys_and_attributes['Keys'])} keys were not read after {BATCH_MAX_ATTEMPTS} attempts")
+
+
+class AsyncDynamoDBUrlHashRepository(AsyncUrlHashRepository):
+    """DynamoDB implementation of the asynchronous UrlHash repository, using an aiobotocore client.
+
+    Batch operations split their input in chunks that fit a single BatchWriteItem/BatchGetItem
+    request, and send up to 'max_concurrency' chunks at a time.
+    """
+
+    def __init__(self, client: Any, table_name: str, max_concurrency: int = DEFAULT_MAX_CONCURRENCY) -> None:
+        self.client = client
+        self.table_name = table_name
+        self.max_concurrency = max_concurrency
+
+    async def save(self, url_hash: UrlHash) -> None:
+        await self.client.put_item(
+            TableName=self.table_name,
+            Item=encode(url_hash)
+        )
+
+    async def save_if_available(self, url_hash: UrlHash) -> bool:
+        try:
+            await self.client.put_item(
+                TableName=self.table_name,
+                Item=encode(url_hash),
+                # Expired items may still be around, but their hash is free to take
+                ConditionExpression=AVAILABLE_CONDITION,
+                ExpressionAttributeNames=_AVAILABLE_NAMES,
+                ExpressionAttributeValues={":url": {"S": url_hash.url}, **now_values(int(time.time()))}
+            )
+        except ClientError as ex:
+            if _is_conditional_check_failure(ex):
+                return False
+            raise
+
+        return True
+
+    async def save_if_absent(self, url_hash: UrlHash) -> Optional[UrlHash]:
+        try:
+            await self.client.put_item(
+                TableName=self.table_name,
+                Item=encode(url_hash),
+                # Expired items may still be around, but their hash is free to take
+                ConditionExpression=ABSENT_CONDITION,
+                ExpressionAttributeNames=_ABSENT_NAMES,
+                ExpressionAttributeValues=now_values(int(time.time())),
+                # Saves a read for finding out who owns the hash
+                ReturnValuesOnConditionCheckFailure="ALL_OLD"
+            )
+        except ClientError as ex:
+            if _is_conditional_check_failure(ex):
+                return decode(ex.response["Item"])
+            raise
+
+        return None
+
+    async def save_many(self, url_hashes: List[UrlHash]) -> None:
+        # A batch cannot contain the same key twice, so the last write for a given hash wins
+        items = list({
+            url_hash.hash: encode(url_hash) for url_hash in url_hashes
+        }.values())
+
+        await gather_bounded(
+            lambda chunk: batch_write_with_retry(self.client, self.table_name, [
+                {"PutRequest": {"Item": item}} for item in chunk
+            ]),
+            [items[start:start + BATCH_WRITE_MAX_ITEMS] for start in range(0, len(items), BATCH_WRITE_MAX_ITEMS)],
+            self.max_concurrency
+        )
+
+    async def get_by_hash(self, hash: str) -> Optional[UrlHash]:
+        # GetItem cannot filter, so we query the single key in order not to ship expired items
+        response = await self.client.query(
+            TableName=self.table_name,
+            KeyConditionExpression="PK = :hash AND SK = :hash",
+            FilterExpression=UNEXPIRED_FILTER,
+            ProjectionExpression=PROJECTION_EXPRESSION,
+            ExpressionAttributeNames=_READ_NAMES,
+            ExpressionAttributeValues={":hash": {"S": hash}, **now_values(int(time.time()))}
+        )
+
+        items = response["Items"]
+        if not items:
+            return None
+
+        return decode(items[0])
+
+    async def get_by_hashes(self, hashes: List[str]) -> Dict[str, UrlHash]:
+        # A batch cannot contain the same key twice
+        unique_hashes = list(dict.fromkeys(hashes))
+
+        now = int(time.time())
+
+        chunks = await gather_bounded(
+            lambda chunk: batch_get_with_retry(self.client, self.table_name, {
+                "Keys": [{"PK": {"S": hash}, "SK": {"S": hash}} for hash in chunk],
+                "ProjectionExpression": PROJECTION_EXPRESSION,
+                "ExpressionAttributeNames": _PROJECTION_NAMES
+            }),
+            [unique_hashes[start:start + BATCH_GET_MAX_KEYS] for start in range(0, len(unique_hashes), BATCH_GET_MAX_KEYS)],
+            self.max_concurrency
+        )
+
+        found = {}
+        for items in chunks:
+            for item in items:
+                url_hash = decode(item)
+                # BatchGetItem cannot filter, so expired items are dropped here
+                if not url_hash.is_expired(now):
+                    found[url_hash.hash] = url_hash
+        return found
+
+
+@asynccontextmanager
+async def open_async_dynamodb_repository(table_name: Optional[str] = None) -> AsyncIterator[AsyncDynamoDBUrlHashRepository]:
+    """Opens an aiobotocore client and yields the repository using it.
+
+    The client (and its connection pool) is closed on exit, so the context should
+    span the lifetime of the host (e.g., the lifespan of an ASGI application).
+
+    Arguments:
+        table_name: the table name, defaulting to the URL_HASHES_TABLE environment variable
+
+    Returns:
+        the asynchronous repository, whose batch concurrency is set by DYNAMODB_MAX_CONCURRENCY
+    """
+    from aiobotocore.session import get_session
+
+    async with get_session().create_client("dynamodb", config=client_config()) as client:
+        yield AsyncDynamoDBUrlHashRepository(
+            client,
+            table_name or os.getenv("URL_HASHES_TABLE"),
+            max_concurrency=int(os.getenv("DYNAMODB_MAX_CONCURRENCY", DEFAULT_MAX_CONCURRENCY))
+        )
@@ -0,0 +1,310 @@
+"""DynamoDB implementation of the UrlHash repository on the low-level client.
+
+The boto3 resource layer runs every request and response through the
+TypeSerializer/TypeDeserializer and wraps the results into resource objects.
+Our items are tiny and have a fixed shape, so here the attribute-value
+dictionaries are built and parsed by hand (see 'dynamodb_codec'), and reads
+only project the attributes we actually need.
+
+Both DynamoDB repositories share the same table layout, so they can be used
+interchangeably on the same data.
+"""
+
+import heapq
+import os
+import time
+
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional
+
+from botocore.config import Config
+
+from zoorl.adapters.dynamodb_codec import (
+    attribute_names,
+    decode,
+    encode,
+    now_values,
+    ABSENT_CONDITION,
+    ACCESS_COUNT_ATTRIBUTE,
+    ACCESS_COUNT_CONDITION,
+    ACCESS_COUNT_UPDATE,
+    ACCESSED_FILTER,
+    ACCESSED_PROJECTION_EXPRESSION,
+    AVAILABLE_CONDITION,
+    EXPIRED_FILTER,
+    ITEM_VERSION,
+    MIGRATION_CONDITION,
+    OUTDATED_FILTER,
+    PROJECTION_EXPRESSION,
+    UNEXPIRED_FILTER
+)
+from zoorl.adapters.dynamodb_model import (
+    batch_get_with_retry,
+    batch_write_with_retry,
+    BATCH_GET_MAX_KEYS,
+    BATCH_WRITE_MAX_ITEMS
+)
+from zoorl.core.model import UrlHash
+from zoorl.ports.repository import UrlHashRepository
+
+if TYPE_CHECKING:
+    from mypy_boto3_dynamodb.client import DynamoDBClient
+
+# Expression names are computed once, since they are the same for every request
+_ABSENT_NAMES = attribute_names(ABSENT_CONDITION)
+_ACCESS_COUNT_NAMES = attribute_names(ACCESS_COUNT_UPDATE)
+_AVAILABLE_NAMES = attribute_names(AVAILABLE_CONDITION)
+_EXPIRED_NAMES = attribute_names(EXPIRED_FILTER)
+_PROJECTION_NAMES = attribute_names(PROJECTION_EXPRESSION)
+_READ_NAMES = attribute_names(UNEXPIRED_FILTER, PROJECTION_EXPRESSION)
+
+# Default attempts of a request, including the first one
+DEFAULT_SDK_MAX_ATTEMPTS = 3
+
+
+def sdk_max_attempts() -> int:
+    """Returns the attempts the DynamoDB clients make per request (DYNAMODB_MAX_ATTEMPTS), including the first one."""
+    return int(os.getenv("DYNAMODB_MAX_ATTEMPTS", DEFAULT_SDK_MAX_ATTEMPTS))
+
+
+def client_config() -> Config:
+    """Returns the botocore settings shared by the DynamoDB clients and resources.
+
+    Every setting can be tuned through an environment variable:
+      * DYNAMODB_MAX_POOL_CONNECTIONS - HTTP connection pool size (default 10)
+      * DYNAMODB_CONNECT_TIMEOUT - connect timeout in seconds (default 1)
+      * DYNAMODB_READ_TIMEOUT - read timeout in seconds (default 2)
+      * DYNAMODB_MAX_ATTEMPTS - attempts, including the first one (default 3)
+
+    Throttled requests are retried here as well: the throttling decorator accounts
+    for these attempts (see 'build_throttled_repository()'), so that an item write
+    costs at most its budget of requests, not the product of both.
+    """
+    return Config(
+        max_pool_connections=int(os.getenv("DYNAMODB_MAX_POOL_CONNECTIONS", 10)),
+        connect_timeout=float(os.getenv("DYNAMODB_CONNECT_TIMEOUT", 1)),
+        read_timeout=float(os.getenv("DYNAMODB_READ_TIMEOUT", 2)),
+        # Reuse connections across warm invocations instead of paying a new TLS handshake
+        tcp_keepalive=True,
+        retries={
+            "mode": "standard",
+            "max_attempts": sdk_max_attempts()
+        }
+    )
+
+
+class DynamoDBClientUrlHashRepository(UrlHashRepository):
+    """DynamoDB implementation of the UrlHash repository, using the low-level client."""
+
+    def __init__(self, client: "DynamoDBClient", table_name: str) -> None:
+        self.client = client
+        self.table_name = table_name
+
+    def save(self, url_hash: UrlHash) -> None:
+        self.client.put_item(
+            TableName=self.table_name,
+            Item=encode(url_hash)
+        )
+
+    def save_if_available(self, url_hash: UrlHash) -> bool:
+        try:
+            self.client.put_item(
+                TableName=self.table_name,
+                Item=encode(url_hash),
+                # Expired items may still be around, but their hash is free to take
+                ConditionExpression=AVAILABLE_CONDITION,
+                ExpressionAttributeNames=_AVAILABLE_NAMES,
+                ExpressionAttributeValues={":url": {"S": url_hash.url}, **now_values(int(time.time()))}
+            )
+        except self.client.exceptions.ConditionalCheckFailedException:
+            return False
+
+        return True
+
+    def save_if_absent(self, url_hash: UrlHash) -> Optional[UrlHash]:
+        try:
+            self.client.put_item(
+                TableName=self.table_name,
+                Item=encode(url_hash),
+                # Expired items may still be around, but their hash is free to take
+                ConditionExpression=ABSENT_CONDITION,
+                ExpressionAttributeNames=_ABSENT_NAMES,
+                ExpressionAttributeValues=now_values(int(time.time())),
+                # Saves a read for finding out who owns the hash
+                ReturnValuesOnConditionCheckFailure="ALL_OLD"
+            )
+        except self.client.exceptions.ConditionalCheckFailedException as ex:
+            return decode(ex.response["Item"])
+
+        return None
+
+    def save_many(self, url_hashes: List[UrlHash]) -> None:
+        # A batch cannot contain the same key twice, so the last write for a given hash wins
+        items = list({
+            url_hash.hash: encode(url_hash) for url_hash in url_hashes
+        }.values())
+
+        for start in range(0, len(items), BATCH_WRITE_MAX_ITEMS):
+            batch_write_with_retry(self.client, self.table_name, [
+                {"PutRequest": {"Item": item}} for item in items[start:start + BATCH_WRITE_MAX_ITEMS]
+            ])
+
+    def get_by_hash(self, hash: str) -> Optional[UrlHash]:
+        # GetItem cannot filter, so we query the single key in order not to ship expired items
+        response = self.client.query(
+            TableName=self.table_name,
+            KeyConditionExpression="PK = :hash AND SK = :hash",
+            FilterExpression=UNEXPIRED_FILTER,
+            ProjectionExpression=PROJECTION_EXPRESSION,
+            ExpressionAttributeNames=_READ_NAMES,
+            ExpressionAttributeValues={":hash": {"S": hash}, **now_values(int(time.time()))}
+        )
+
+        items = response["Items"]
+        if not items:
+            return None
+
+        return decode(items[0])
+
+    def get_by_hashes(self, hashes: List[str]) -> Dict[str, UrlHash]:
+        # A batch cannot contain the same key twice
+        unique_hashes = list(dict.fromkeys(hashes))
+
+        now = int(time.time())
+
+        found = {}
+        for start in range(0, len(unique_hashes), BATCH_GET_MAX_KEYS):
+            for item in batch_get_with_retry(self.client, self.table_name, {
+                "Keys": [
+                    {"PK": {"S": hash}, "SK": {"S": hash}} for hash in unique_hashes[start:start + BATCH_GET_MAX_KEYS]
+                ],
+                "ProjectionExpression": PROJECTION_EXPRESSION,
+                "ExpressionAttributeNames": _PROJECTION_NAMES
+            }):
+                url_hash = decode(item)
+                # BatchGetItem cannot filter, so expired items are dropped here
+                if not url_hash.is_expired(now):
+                    found[url_hash.hash] = url_hash
+        return found
+
+    def delete_many(self, hashes: List[str]) -> None:
+        unique_hashes = list(dict.fromkeys(hashes))
+
+        for start in range(0, len(unique_hashes), BATCH_WRITE_MAX_ITEMS):
+            batch_write_with_retry(self.client, self.table_name, [
+                {"DeleteRequest": {"Key": {"PK": {"S": hash}, "SK": {"S": hash}}}}
+                for hash in unique_hashes[start:start + BATCH_WRITE_MAX_ITEMS]
+            ])
+
+    def delete_expired(self, hashes: List[str], now: int) -> int:
+        # BatchWriteItem cannot have conditions, so each item is deleted on its own
+        deleted = 0
+        for hash in dict.fromkeys(hashes):
+            try:
+                self.client.delete_item(
+                    TableName=self.table_name,
+                    Key={"PK": {"S": hash}, "SK": {"S": hash}},
+                    ConditionExpression=EXPIRED_FILTER,
+                    ExpressionAttributeNames=_EXPIRED_NAMES,
+                    ExpressionAttributeValues=now_values(now)
+                )
+            except self.client.exceptions.ConditionalCheckFailedException:
+                # Taken again, refreshed or already deleted since it was found expired
+                continue
+            deleted += 1
+        return deleted
+
+    def find_expired_hashes(self, now: int, page_size: int = 100) -> Iterator[List[str]]:
+        paginator = self.client.get_paginator("scan")
+
+        for page in paginator.paginate(
+            TableName=self.table_name,
+            FilterExpression=EXPIRED_FILTER,
+            ProjectionExpression="PK",
+            ExpressionAttributeNames=_EXPIRED_NAMES,
+            ExpressionAttributeValues=now_values(now),
+            PaginationConfig={"PageSize": page_size}
+        ):
+            hashes = [item["PK"]["S"] for item in page["Items"]]
+            if hashes:
+                yield hashes
+
+    def find_outdated(self, segment: int = 0, total_segments: int = 1, page_size: int = 100) -> Iterator[List[UrlHash]]:
+        paginator = self.client.get_paginator("scan")
+
+        for page in paginator.paginate(
+            TableName=self.table_name,
+            FilterExpression=OUTDATED_FILTER,
+            ProjectionExpression=PROJECTION_EXPRESSION,
+            ExpressionAttributeNames=attribute_names(OUTDATED_FILTER, PROJECTION_EXPRESSION),
+            ExpressionAttributeValues={":version": {"N": str(ITEM_VERSION)}},
+            Segment=segment,
+            TotalSegments=total_segments,
+            PaginationConfig={"PageSize": page_size}
+        ):
+            url_hashes = [decode(item) for item in page["Items"]]
+            if url_hashes:
+                yield url_hashes
+
+    def find_all(self, segment: int = 0, total_segments: int = 1, page_size: int = 100) -> Iterator[List[UrlHash]]:
+        paginator = self.client.get_paginator("scan")
+
+        for page in paginator.paginate(
+            TableName=self.table_name,
+            ProjectionExpression=PROJECTION_EXPRESSION,
+            ExpressionAttributeNames=_PROJECTION_NAMES,
+            Segment=segment,
+            TotalSegments=total_segments,
+            PaginationConfig={"PageSize": page_size}
+        ):
+            url_hashes = [decode(item) for item in page["Items"]]
+            if url_hashes:
+                yield url_hashes
+
+    def migrate_many(self, url_hashes: List[UrlHash]) -> int:
+        migrated = 0
+        for url_hash in url_hashes:
+            try:
+                self.client.put_item(
+                    TableName=self.table_name,
+                    Item=encode(url_hash),
+                    # Skip items deleted or rewritten since they were read
+                    ConditionExpression=MIGRATION_CONDITION,
+                    ExpressionAttributeNames=attribute_names(MIGRATION_CONDITION),
+                    ExpressionAttributeValues={":version": {"N": str(ITEM_VERSION)}}
+                )
+                migrated += 1
+            except self.client.exceptions.ConditionalCheckFailedException:
+                pass
+        return migrated
+
+    def add_access_counts(self, counts: Dict[str, int]) -> None:
+        # There is no batch update, so each hash takes its own UpdateItem
+        for hash, count in counts.items():
+            try:
+                self.client.update_item(
+                    TableName=self.table_name,
+                    Key={"PK": {"S": hash}, "SK": {"S": hash}},
+                    UpdateExpression=ACCESS_COUNT_UPDATE,
+                    ConditionExpression=ACCESS_COUNT_CONDITION,
+                    ExpressionAttributeNames=_ACCESS_COUNT_NAMES,
+                    ExpressionAttributeValues={":count": {"N": str(count)}}
+                )
+            except self.client.exceptions.ConditionalCheckFailedException:
+                pass
+
+    def find_most_accessed(self, limit: int, now: int) -> List[UrlHash]:
+        paginator = self.client.get_paginator("scan")
+
+        accessed = (
+            (int(item[ACCESS_COUNT_ATTRIBUTE]["N"]), decode(item))
+            for page in paginator.paginate(
+                TableName=self.table_name,
+                FilterExpression=ACCESSED_FILTER,
+                ProjectionExpression=ACCESSED_PROJECTION_EXPRESSION,
+                ExpressionAttributeNames=attribute_names(ACCESSED_FILTER, ACCESSED_PROJECTION_EXPRESSION),
+                ExpressionAttributeValues=now_values(now)
+            )
+            for item in page["Items"]
+        )
+        # Only the 'limit' largest counts are kept while scanning
+        return [url_hash for _, url_hash in heapq.nlargest(limit, accessed, key=lambda accessed: accessed[0])]
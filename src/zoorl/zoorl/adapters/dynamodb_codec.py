@@ -0,0 +1,143 @@
+"""Versioned codec between UrlHash entities and DynamoDB items.
+
+Item layouts:
+  * version 1 (legacy) - {"PK", "SK", "url": S, "ttl": S}
+  * version 2 (current) - {"PK", "SK", "v": N, "u": S, "ttl": N}
+
+Version 2 stores the TTL as a Number, which is what DynamoDB TTL requires for
+deleting expired items, and it allows numeric range conditions. The URL gets a
+short attribute name, while "ttl" is kept since it is the table TTL attribute.
+
+Both layouts are decoded, so that the table can be migrated while in use (see
+'MigrateUrlHashesUseCase'). Conditions on the TTL must consider both types,
+since a Number never compares to a String.
+
+Items may also carry an access count ("h", a Number added to by the redirect
+path), used for ranking the most accessed hashes. It is not part of the UrlHash
+entity, so rewriting an item (e.g., saving or migrating it) resets the count.
+
+Functions come in two flavors: for the low-level client (typed attribute values,
+e.g. {"S": "..."}) and for the resource layer (plain Python values).
+"""
+
+import re
+
+from decimal import Decimal
+from typing import Any, Dict, Union
+
+from zoorl.core.model import UrlHash
+
+ITEM_VERSION = 2
+
+VERSION_ATTRIBUTE = "v"
+URL_ATTRIBUTE = "u"
+TTL_ATTRIBUTE = "ttl"
+ACCESS_COUNT_ATTRIBUTE = "h"
+
+LEGACY_URL_ATTRIBUTE = "url"
+
+# Placeholders for expressions ("url" and "ttl" are DynamoDB reserved words)
+EXPRESSION_ATTRIBUTE_NAMES = {
+    "#v": VERSION_ATTRIBUTE,
+    "#u": URL_ATTRIBUTE,
+    "#url": LEGACY_URL_ATTRIBUTE,
+    "#ttl": TTL_ATTRIBUTE,
+    "#h": ACCESS_COUNT_ATTRIBUTE
+}
+
+# Projection of every attribute needed for decoding an item, in any version
+PROJECTION_EXPRESSION = "PK, #u, #url, #ttl"
+
+# Expressions using the values returned by 'now_values()': each comparison is guarded by
+# the TTL type, so that no Number is ever compared to a String
+UNEXPIRED_FILTER = (
+    "(attribute_type(#ttl, :number) AND #ttl > :now_n) OR (attribute_type(#ttl, :string) AND #ttl > :now_s)"
+)
+EXPIRED_FILTER = (
+    "(attribute_type(#ttl, :number) AND #ttl <= :now_n) OR (attribute_type(#ttl, :string) AND #ttl <= :now_s)"
+)
+
+# Condition for taking a hash, using ":url" and the values returned by 'now_values()'
+AVAILABLE_CONDITION = f"attribute_not_exists(PK) OR #u = :url OR #url = :url OR {EXPIRED_FILTER}"
+
+# Condition for creating an item, using the values returned by 'now_values()'
+ABSENT_CONDITION = f"attribute_not_exists(PK) OR {EXPIRED_FILTER}"
+
+# Adding ":count" to the access count of an existing item (UpdateItem would create missing ones)
+ACCESS_COUNT_UPDATE = "ADD #h :count"
+ACCESS_COUNT_CONDITION = "attribute_exists(PK)"
+
+# Unexpired items that have been accessed, using the values returned by 'now_values()'
+ACCESSED_FILTER = f"attribute_exists(#h) AND ({UNEXPIRED_FILTER})"
+ACCESSED_PROJECTION_EXPRESSION = f"{PROJECTION_EXPRESSION}, #h"
+
+# Items without a version attribute are version 1
+OUTDATED_FILTER = "attribute_not_exists(#v) OR #v < :version"
+
+# Condition for rewriting an outdated item (using ":version" too), unless it has been deleted or rewritten in the meantime
+MIGRATION_CONDITION = f"attribute_exists(PK) AND ({OUTDATED_FILTER})"
+
+_VERSION_VALUE = {"N": str(ITEM_VERSION)}
+
+_PLACEHOLDER = re.compile(r"#\w+")
+
+
+def attribute_names(*expressions: str) -> Dict[str, str]:
+    """Returns the ExpressionAttributeNames for the placeholders used in the expressions.
+
+    DynamoDB rejects requests defining names that are not used, so we only pick the needed ones.
+    """
+    return {
+        placeholder: EXPRESSION_ATTRIBUTE_NAMES[placeholder]
+        for expression in expressions for placeholder in _PLACEHOLDER.findall(expression)
+    }
+
+
+def encode(url_hash: UrlHash) -> Dict[str, Dict[str, str]]:
+    """Returns the current item version for the low-level client."""
+    key = {"S": url_hash.hash}
+    return {
+        "PK": key,
+        "SK": key,
+        VERSION_ATTRIBUTE: _VERSION_VALUE,
+        URL_ATTRIBUTE: {"S": url_hash.url},
+        TTL_ATTRIBUTE: {"N": str(url_hash.ttl)}
+    }
+
+
+def decode(item: Dict[str, Dict[str, str]]) -> UrlHash:
+    """Returns the UrlHash for an item of any version, as returned by the low-level client."""
+    url = item.get(URL_ATTRIBUTE) or item[LEGACY_URL_ATTRIBUTE]
+    ttl = item[TTL_ATTRIBUTE]
+    return UrlHash(
+        hash=item["PK"]["S"], url=url["S"], ttl=int(ttl.get("N") or ttl["S"])
+    )
+
+
+def now_values(now: int) -> Dict[str, Dict[str, str]]:
+    """Returns the expression values of the TTL filters, for the low-level client."""
+    return {":now_n": {"N": str(now)}, ":now_s": {"S": str(now)}, ":number": {"S": "N"}, ":string": {"S": "S"}}
+
+
+def encode_plain(url_hash: UrlHash) -> Dict[str, Any]:
+    """Returns the current item version for the resource layer."""
+    return {
+        "PK": url_hash.hash,
+        "SK": url_hash.hash,
+        VERSION_ATTRIBUTE: ITEM_VERSION,
+        URL_ATTRIBUTE: url_hash.url,
+        TTL_ATTRIBUTE: url_hash.ttl
+    }
+
+
+def decode_plain(item: Dict[str, Any]) -> UrlHash:
+    """Returns the UrlHash for an item of any version, as returned by the resource layer."""
+    ttl: Union[Decimal, str] = item[TTL_ATTRIBUTE]
+    return UrlHash(
+        hash=item["PK"], url=item.get(URL_ATTRIBUTE) or item[LEGACY_URL_ATTRIBUTE], ttl=int(ttl)
+    )
+
+
+def now_plain_values(now: int) -> Dict[str, Any]:
+    """Returns the expression values of the TTL filters, for the resource layer."""
+    return {":now_n": now, ":now_s": str(now), ":number": "N", ":string": "S"}
@@ -1,39 +1,305 @@
-from typing import Any, Optional
-from mypy_boto3_dynamodb.service_resource import Table
+import heapq
+import time
 
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional
+
+from boto3.dynamodb.conditions import Key
+
+if TYPE_CHECKING:
+    # Type stubs are expensive to import, so we only need them for static type checking
+    from mypy_boto3_dynamodb.service_resource import Table
+
+from zoorl.adapters.dynamodb_codec import (
+    attribute_names,
+    decode,
+    decode_plain,
+    encode_plain,
+    now_plain_values,
+    ABSENT_CONDITION,
+    ACCESS_COUNT_ATTRIBUTE,
+    ACCESS_COUNT_CONDITION,
+    ACCESS_COUNT_UPDATE,
+    ACCESSED_FILTER,
+    ACCESSED_PROJECTION_EXPRESSION,
+    AVAILABLE_CONDITION,
+    EXPIRED_FILTER,
+    ITEM_VERSION,
+    MIGRATION_CONDITION,
+    OUTDATED_FILTER,
+    PROJECTION_EXPRESSION,
+    UNEXPIRED_FILTER
+)
 from zoorl.core.model import UrlHash
 from zoorl.ports.repository import UrlHashRepository
 
+# DynamoDB BatchWriteItem accepts at most 25 put/delete requests per call
+BATCH_WRITE_MAX_ITEMS = 25
+
+# DynamoDB BatchGetItem accepts at most 100 keys per call
+BATCH_GET_MAX_KEYS = 100
+
+# How many times we retry unprocessed items before giving up
+BATCH_MAX_ATTEMPTS = 8
+
+# Base delay (seconds) for the exponential backoff between retries
+BATCH_RETRY_BASE_DELAY = 0.05
+
+
+class UnprocessedItemsError(Exception):
+    """Exception thrown if DynamoDB keeps returning unprocessed items or keys after all retries."""
+    pass
+
+
+def batch_write_with_retry(client: Any, table_name: str, write_requests: List[Dict[str, Any]]) -> None:
+    """Writes up to 25 requests, retrying unprocessed items with exponential backoff.
+
+    Arguments:
+        client: a DynamoDB client (either low-level or the one backing a resource)
+        table_name: the target table
+        write_requests: the put/delete requests, in the format the client expects
+
+    Raises:
+        UnprocessedItemsError: if some items are still unprocessed after BATCH_MAX_ATTEMPTS
+    """
+    for attempt in range(BATCH_MAX_ATTEMPTS):
+        response = client.batch_write_item(
+            RequestItems={table_name: write_requests}
+        )
+
+        write_requests = response.get("UnprocessedItems", {}).get(table_name, [])
+        if not write_requests:
+            return
+
+        time.sleep(BATCH_RETRY_BASE_DELAY * (2 ** attempt))
+
+    raise UnprocessedItemsError(f"{len(write_requests)} items were not written after {BATCH_MAX_ATTEMPTS} attempts")
+
+
+def batch_get_with_retry(client: Any, table_name: str, keys_and_attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Reads up to 100 keys, retrying unprocessed keys with exponential backoff.
+
+    Arguments:
+        client: a DynamoDB client (either low-level or the one backing a resource)
+        table_name: the target table
+        keys_and_attributes: the "Keys" to read, with optional projection settings
+
+    Returns:
+        the found items, in no particular order
+
+    Raises:
+        UnprocessedItemsError: if some keys are still unprocessed after BATCH_MAX_ATTEMPTS
+    """
+    items = []
+    for attempt in range(BATCH_MAX_ATTEMPTS):
+        response = client.batch_get_item(
+            RequestItems={table_name: keys_and_attributes}
+        )
+
+        items.extend(response.get("Responses", {}).get(table_name, []))
+
+        keys_and_attributes = response.get("UnprocessedKeys", {}).get(table_name)
+        if not keys_and_attributes or not keys_and_attributes.get("Keys"):
+            return items
+
+        time.sleep(BATCH_RETRY_BASE_DELAY * (2 ** attempt))
+
+    raise UnprocessedItemsError(f"{len(keys_and_attributes['Keys'])} keys were not read after {BATCH_MAX_ATTEMPTS} attempts")
+
 
 class DynamoDBUrlHashRepository(UrlHashRepository):
-    """DynamoDB implementation of the UrlHash repository."""    
+    """DynamoDB implementation of the UrlHash repository."""
 
-    def __init__(self, url_hashes_table: Table) -> None:
+    def __init__(self, url_hashes_table: "Table") -> None:
         self.url_hashes_table = url_hashes_table
 
     def save(self, url_hash: UrlHash) -> None:
-        item = {
-            "PK": url_hash.hash,
-            "SK": url_hash.hash,
-            "url": url_hash.url,
-            "ttl": str(url_hash.ttl)
-        }
-
         self.url_hashes_table.put_item(
-            Item=item        
+            Item=encode_plain(url_hash)
         )
 
+    def save_if_available(self, url_hash: UrlHash) -> bool:
+        try:
+            self.url_hashes_table.put_item(
+                Item=encode_plain(url_hash),
+                # Expired items may still be around, but their hash is free to take
+                ConditionExpression=AVAILABLE_CONDITION,
+                ExpressionAttributeNames=attribute_names(AVAILABLE_CONDITION),
+                ExpressionAttributeValues={":url": url_hash.url, **now_plain_values(int(time.time()))}
+            )
+        except self.url_hashes_table.meta.client.exceptions.ConditionalCheckFailedException:
+            return False
+
+        return True
+
+    def save_if_absent(self, url_hash: UrlHash) -> Optional[UrlHash]:
+        try:
+            self.url_hashes_table.put_item(
+                Item=encode_plain(url_hash),
+                # Expired items may still be around, but their hash is free to take
+                ConditionExpression=ABSENT_CONDITION,
+                ExpressionAttributeNames=attribute_names(ABSENT_CONDITION),
+                ExpressionAttributeValues=now_plain_values(int(time.time())),
+                # Saves a read for finding out who owns the hash
+                ReturnValuesOnConditionCheckFailure="ALL_OLD"
+            )
+        except self.url_hashes_table.meta.client.exceptions.ConditionalCheckFailedException as ex:
+            # Error responses are not deserialized by the resource layer
+            return decode(ex.response["Item"])
+
+        return None
+
+    def save_many(self, url_hashes: List[UrlHash]) -> None:
+        # A batch cannot contain the same key twice, so the last write for a given hash wins
+        items = list({
+            url_hash.hash: encode_plain(url_hash) for url_hash in url_hashes
+        }.values())
+
+        for start in range(0, len(items), BATCH_WRITE_MAX_ITEMS):
+            # The resource client accepts plain Python values, as the Table does
+            batch_write_with_retry(self.url_hashes_table.meta.client, self.url_hashes_table.name, [
+                {"PutRequest": {"Item": item}} for item in items[start:start + BATCH_WRITE_MAX_ITEMS]
+            ])
+
     def get_by_hash(self, hash: str) -> Optional[UrlHash]:
-        response = self.url_hashes_table.get_item(
-            Key={
-                "PK": hash, "SK": hash
-            }
+        # GetItem cannot filter, so we query the single key in order not to ship expired items
+        response = self.url_hashes_table.query(
+            KeyConditionExpression=Key("PK").eq(hash) & Key("SK").eq(hash),
+            FilterExpression=UNEXPIRED_FILTER,
+            ExpressionAttributeNames=attribute_names(UNEXPIRED_FILTER),
+            ExpressionAttributeValues=now_plain_values(int(time.time()))
         )
 
-        if "Item" not in response:
+        items = response["Items"]
+        if not items:
             return None
-   
-        item = response["Item"]
-        return UrlHash(
-            hash=item["PK"], url=item["url"], ttl=int(item["ttl"])
+
+        return decode_plain(items[0])
+
+    def get_by_hashes(self, hashes: List[str]) -> Dict[str, UrlHash]:
+        # A batch cannot contain the same key twice
+        unique_hashes = list(dict.fromkeys(hashes))
+
+        now = int(time.time())
+
+        found = {}
+        for start in range(0, len(unique_hashes), BATCH_GET_MAX_KEYS):
+            for item in batch_get_with_retry(self.url_hashes_table.meta.client, self.url_hashes_table.name, {
+                "Keys": [{"PK": hash, "SK": hash} for hash in unique_hashes[start:start + BATCH_GET_MAX_KEYS]]
+            }):
+                # BatchGetItem cannot filter, so expired items are dropped here
+                url_hash = decode_plain(item)
+                if not url_hash.is_expired(now):
+                    found[url_hash.hash] = url_hash
+        return found
+
+    def delete_many(self, hashes: List[str]) -> None:
+        unique_hashes = list(dict.fromkeys(hashes))
+
+        for start in range(0, len(unique_hashes), BATCH_WRITE_MAX_ITEMS):
+            batch_write_with_retry(self.url_hashes_table.meta.client, self.url_hashes_table.name, [
+                {"DeleteRequest": {"Key": {"PK": hash, "SK": hash}}} for hash in unique_hashes[start:start + BATCH_WRITE_MAX_ITEMS]
+            ])
+
+    def delete_expired(self, hashes: List[str], now: int) -> int:
+        # BatchWriteItem cannot have conditions, so each item is deleted on its own
+        deleted = 0
+        for hash in dict.fromkeys(hashes):
+            try:
+                self.url_hashes_table.delete_item(
+                    Key={"PK": hash, "SK": hash},
+                    ConditionExpression=EXPIRED_FILTER,
+                    ExpressionAttributeNames=attribute_names(EXPIRED_FILTER),
+                    ExpressionAttributeValues=now_plain_values(now)
+                )
+            except self.url_hashes_table.meta.client.exceptions.ConditionalCheckFailedException:
+                # Taken again, refreshed or already deleted since it was found expired
+                continue
+            deleted += 1
+        return deleted
+
+    def find_expired_hashes(self, now: int, page_size: int = 100) -> Iterator[List[str]]:
+        for page in self._scan_pages({
+            "FilterExpression": EXPIRED_FILTER,
+            "ProjectionExpression": "PK",
+            "ExpressionAttributeNames": attribute_names(EXPIRED_FILTER),
+            "ExpressionAttributeValues": now_plain_values(now),
+            "Limit": page_size
+        }):
+            yield [item["PK"] for item in page]
+
+    def find_outdated(self, segment: int = 0, total_segments: int = 1, page_size: int = 100) -> Iterator[List[UrlHash]]:
+        for page in self._scan_pages({
+            "FilterExpression": OUTDATED_FILTER,
+            "ProjectionExpression": PROJECTION_EXPRESSION,
+            "ExpressionAttributeNames": attribute_names(OUTDATED_FILTER, PROJECTION_EXPRESSION),
+            "ExpressionAttributeValues": {":version": ITEM_VERSION},
+            "Segment": segment,
+            "TotalSegments": total_segments,
+            "Limit": page_size
+        }):
+            yield [decode_plain(item) for item in page]
+
+    def find_all(self, segment: int = 0, total_segments: int = 1, page_size: int = 100) -> Iterator[List[UrlHash]]:
+        for page in self._scan_pages({
+            "ProjectionExpression": PROJECTION_EXPRESSION,
+            "ExpressionAttributeNames": attribute_names(PROJECTION_EXPRESSION),
+            "Segment": segment,
+            "TotalSegments": total_segments,
+            "Limit": page_size
+        }):
+            yield [decode_plain(item) for item in page]
+
+    def migrate_many(self, url_hashes: List[UrlHash]) -> int:
+        migrated = 0
+        for url_hash in url_hashes:
+            try:
+                self.url_hashes_table.put_item(
+                    Item=encode_plain(url_hash),
+                    # Skip items deleted or rewritten since they were read
+                    ConditionExpression=MIGRATION_CONDITION,
+                    ExpressionAttributeNames=attribute_names(MIGRATION_CONDITION),
+                    ExpressionAttributeValues={":version": ITEM_VERSION}
+                )
+                migrated += 1
+            except self.url_hashes_table.meta.client.exceptions.ConditionalCheckFailedException:
+                pass
+        return migrated
+
+    def add_access_counts(self, counts: Dict[str, int]) -> None:
+        # There is no batch update, so each hash takes its own UpdateItem
+        for hash, count in counts.items():
+            try:
+                self.url_hashes_table.update_item(
+                    Key={"PK": hash, "SK": hash},
+                    UpdateExpression=ACCESS_COUNT_UPDATE,
+                    ConditionExpression=ACCESS_COUNT_CONDITION,
+                    ExpressionAttributeNames=attribute_names(ACCESS_COUNT_UPDATE),
+                    ExpressionAttributeValues={":count": count}
+                )
+            except self.url_hashes_table.meta.client.exceptions.ConditionalCheckFailedException:
+                pass
+
+    def find_most_accessed(self, limit: int, now: int) -> List[UrlHash]:
+        accessed = (
+            (item[ACCESS_COUNT_ATTRIBUTE], decode_plain(item))
+            for page in self._scan_pages({
+                "FilterExpression": ACCESSED_FILTER,
+                "ProjectionExpression": ACCESSED_PROJECTION_EXPRESSION,
+                "ExpressionAttributeNames": attribute_names(ACCESSED_FILTER, ACCESSED_PROJECTION_EXPRESSION),
+                "ExpressionAttributeValues": now_plain_values(now)
+            })
+            for item in page
         )
+        # Only the 'limit' largest counts are kept while scanning
+        return [url_hash for _, url_hash in heapq.nlargest(limit, accessed, key=lambda accessed: accessed[0])]
+
+    def _scan_pages(self, scan_arguments: Dict[str, Any]) -> Iterator[List[Dict[str, Any]]]:
+        while True:
+            response = self.url_hashes_table.scan(**scan_arguments)
+
+            if response["Items"]:
+                yield response["Items"]
+
+            if "LastEvaluatedKey" not in response:
+                return
+            scan_arguments["ExclusiveStartKey"] = response["LastEvaluatedKey"]
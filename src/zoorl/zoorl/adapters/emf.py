@@ -0,0 +1,98 @@
+"""CloudWatch Embedded Metric Format (EMF) output.
+
+Lambda ships the standard output to CloudWatch Logs, which extracts the metrics
+of the EMF lines asynchronously: emitting metrics only costs a write, instead of
+a PutMetricData round-trip.
+"""
+
+import json
+import sys
+import time
+
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from zoorl.core.instrumentation import MAX_SAMPLES_PER_STAGE
+
+EMF_NAMESPACE = "zoorl"
+
+
+def timing_lines(
+    samples: Dict[str, List[float]],
+    service: str,
+    namespace: str = EMF_NAMESPACE,
+    timestamp: Optional[float] = None
+) -> Iterator[str]:
+    """Returns the EMF log lines of the durations, one metric (in milliseconds) per stage.
+
+    Every value is sent, so that CloudWatch computes the percentiles: a line holds at
+    most MAX_SAMPLES_PER_STAGE values per metric, and the remaining ones go to the next lines.
+
+    Args:
+        samples: the durations, by stage (see 'Instrumentation.drain()')
+        service: the value of the "service" dimension
+        namespace: the CloudWatch metrics namespace
+        timestamp: the UNIX epoch time of the metrics, defaulting to now
+
+    Returns:
+        an iterator over JSON lines
+    """
+    timestamp_ms = int((time.time() if timestamp is None else timestamp) * 1000)
+
+    for start in range(0, max(map(len, samples.values()), default=0), MAX_SAMPLES_PER_STAGE):
+        values = {
+            # Microseconds are precise enough, and keep the lines short
+            stage: [round(duration, 3) for duration in durations[start:start + MAX_SAMPLES_PER_STAGE]]
+            for stage, durations in samples.items() if len(durations) > start
+        }
+        yield json.dumps({
+            "_aws": {
+                "Timestamp": timestamp_ms,
+                "CloudWatchMetrics": [{
+                    "Namespace": namespace,
+                    "Dimensions": [["service"]],
+                    "Metrics": [{"Name": stage, "Unit": "Milliseconds"} for stage in values]
+                }]
+            },
+            "service": service,
+            **values
+        }, separators=(",", ":"))
+
+
+def count_lines(
+    counts: Dict[str, int],
+    service: str,
+    namespace: str = EMF_NAMESPACE,
+    timestamp: Optional[float] = None
+) -> Iterator[str]:
+    """Returns the EMF log line of the counts, one metric (a Count) per name.
+
+    Args:
+        counts: the counts, by metric name
+        service: the value of the "service" dimension
+        namespace: the CloudWatch metrics namespace
+        timestamp: the UNIX epoch time of the metrics, defaulting to now
+
+    Returns:
+        an iterator over JSON lines (none if there are no counts)
+    """
+    if not counts:
+        return
+
+    yield json.dumps({
+        "_aws": {
+            "Timestamp": int((time.time() if timestamp is None else timestamp) * 1000),
+            "CloudWatchMetrics": [{
+                "Namespace": namespace,
+                "Dimensions": [["service"]],
+                "Metrics": [{"Name": name, "Unit": "Count"} for name in counts]
+            }]
+        },
+        "service": service,
+        **counts
+    }, separators=(",", ":"))
+
+
+def write_lines(lines: Iterable[str]) -> None:
+    """Writes the lines to the standard output, where Lambda collects them into CloudWatch Logs."""
+    sys.stdout.write("".join(f"{line}\n" for line in lines))
+    sys.stdout.flush()
@@ -14,4 +14,8 @@ BAD_REQUEST = 400
 
 NOT_FOUND = 404
 
+CONFLICT = 409
+
+PAYLOAD_TOO_LARGE = 413
+
 INTERNAL_SERVER_ERROR = 500
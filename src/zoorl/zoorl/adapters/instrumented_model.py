@@ -0,0 +1,73 @@
+"""Timing decorator for any UrlHash repository.
+
+Every call to the decorated repository is timed as the "Repository.<operation>"
+stage (see 'zoorl.core.instrumentation'). Wrapped around the innermost repository,
+it measures the store I/O alone: cache hits never reach it.
+"""
+
+from typing import Dict, Iterator, List, Optional
+
+from zoorl.core.instrumentation import timed
+from zoorl.core.model import UrlHash
+from zoorl.ports.repository import UrlHashRepository
+
+
+class InstrumentedUrlHashRepository(UrlHashRepository):
+    """Timing decorator for any UrlHash repository implementation."""
+
+    def __init__(self, delegate: UrlHashRepository) -> None:
+        self.delegate = delegate
+
+    @timed("Repository.save")
+    def save(self, url_hash: UrlHash) -> None:
+        self.delegate.save(url_hash)
+
+    @timed("Repository.save_if_available")
+    def save_if_available(self, url_hash: UrlHash) -> bool:
+        return self.delegate.save_if_available(url_hash)
+
+    @timed("Repository.save_if_absent")
+    def save_if_absent(self, url_hash: UrlHash) -> Optional[UrlHash]:
+        return self.delegate.save_if_absent(url_hash)
+
+    @timed("Repository.save_many")
+    def save_many(self, url_hashes: List[UrlHash]) -> None:
+        self.delegate.save_many(url_hashes)
+
+    @timed("Repository.get_by_hash")
+    def get_by_hash(self, hash: str) -> Optional[UrlHash]:
+        return self.delegate.get_by_hash(hash)
+
+    @timed("Repository.get_by_hashes")
+    def get_by_hashes(self, hashes: List[str]) -> Dict[str, UrlHash]:
+        return self.delegate.get_by_hashes(hashes)
+
+    @timed("Repository.delete_many")
+    def delete_many(self, hashes: List[str]) -> None:
+        self.delegate.delete_many(hashes)
+
+    @timed("Repository.delete_expired")
+    def delete_expired(self, hashes: List[str], now: int) -> int:
+        return self.delegate.delete_expired(hashes, now)
+
+    def find_expired_hashes(self, now: int, page_size: int = 100) -> Iterator[List[str]]:
+        # Generators run lazily, so there is no single call to time
+        return self.delegate.find_expired_hashes(now, page_size)
+
+    def find_outdated(self, segment: int = 0, total_segments: int = 1, page_size: int = 100) -> Iterator[List[UrlHash]]:
+        return self.delegate.find_outdated(segment, total_segments, page_size)
+
+    def find_all(self, segment: int = 0, total_segments: int = 1, page_size: int = 100) -> Iterator[List[UrlHash]]:
+        return self.delegate.find_all(segment, total_segments, page_size)
+
+    @timed("Repository.migrate_many")
+    def migrate_many(self, url_hashes: List[UrlHash]) -> int:
+        return self.delegate.migrate_many(url_hashes)
+
+    @timed("Repository.add_access_counts")
+    def add_access_counts(self, counts: Dict[str, int]) -> None:
+        self.delegate.add_access_counts(counts)
+
+    @timed("Repository.find_most_accessed")
+    def find_most_accessed(self, limit: int, now: int) -> List[UrlHash]:
+        return self.delegate.find_most_accessed(limit, now)
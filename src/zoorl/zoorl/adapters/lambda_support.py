@@ -1,94 +1,314 @@
-"""AWS Lambda adapter for implementing the redirection use case.
-
-This adapter will invoke the use case for reading the hash and 
-provide two different behaviors:
-  1. /u/{url_hash} - will return the JSON object associated to the 
-    URL hash or HTTP 404 if not found  
-  2. /r/{url_hash} - will perform HTTP 301 redirect by setting the 
-    location header in the repose
-
-Case 1 if for clients while case 2 actually performs the desired
-redirect behavior of inducing the client web browser to perform 
-redirection to the mapped site.
+"""Shared support for the AWS Lambda adapters.
+
+Every Lambda function imports this module, so it is kept cheap to import:
+  * the repository (and boto3 with it, for the DynamoDB backends) is built
+    lazily, on the first request, and then reused for the lifetime of the
+    container: URL_HASHES_BACKEND selects the backend;
+  * the X-Ray SDK is only loaded when tracing is enabled (it is disabled by
+    setting POWERTOOLS_TRACE_DISABLED to "true");
+  * error responses are registered by each handler module through
+    'register_error_response()', so a function only registers its own routes
+    and exception handlers;
+  * per-stage timings (resolver, use cases, repository) are only recorded when
+    INSTRUMENTATION_ENABLED is "true", and shipped as EMF lines by 'resolve()',
+    along with the counts of repository reads and coalesced ones (see 'read_flight');
+  * info-level request logs go through 'request_log', which only writes them for
+    a sample of the invocations (REQUEST_LOG_SAMPLE_RATE), while errors are
+    always logged.
 """
 
-import boto3  
 import json
+import logging
 import os
+import random
+
+from functools import lru_cache
+from typing import Any, Callable, Optional, Type
 
 from aws_lambda_powertools.utilities.typing import LambdaContext
 from aws_lambda_powertools.utilities.data_classes.api_gateway_authorizer_event import APIGatewayAuthorizerRequestEvent
-from aws_lambda_powertools import Logger, Tracer
+from aws_lambda_powertools import Logger
 from aws_lambda_powertools.event_handler import (
     APIGatewayRestResolver,
-    Response, 
+    Response,
     content_types
 )
 from aws_lambda_powertools.logging import correlation_paths
 
-from zoorl.adapters.dynamodb_model import DynamoDBUrlHashRepository
-from zoorl.core.usecases.read_url_hash import UrlHashNotFoundError
-from zoorl.adapters import http_response_codes
+from zoorl.adapters.cache_model import (
+    CachedUrlHashRepository,
+    LruCache,
+    DEFAULT_MAX_SIZE,
+    DEFAULT_NEGATIVE_TTL
+)
+from zoorl.adapters.emf import count_lines, timing_lines, write_lines
+from zoorl.adapters.instrumented_model import InstrumentedUrlHashRepository
+from zoorl.adapters.single_flight_model import SingleFlightUrlHashRepository
+from zoorl.core.canonical_url import UrlCanonicalizer, split_patterns
+from zoorl.core.instrumentation import instrumentation, timed
+from zoorl.core.single_flight import SingleFlight
+from zoorl.ports.repository import UrlHashRepository
+
+
+class NoOpTracer:
+    """Stand-in for the Powertools Tracer when tracing is disabled.
+
+    Creating a Tracer imports and patches the X-Ray SDK, which is the single most
+    expensive import of our functions: this class only provides the decorators we use.
+    """
+
+    def capture_method(self, method: Optional[Callable] = None, **kwargs: Any) -> Callable:
+        return method if method else lambda method: method
+
+    def capture_lambda_handler(self, lambda_handler: Optional[Callable] = None, **kwargs: Any) -> Callable:
+        return lambda_handler if lambda_handler else lambda lambda_handler: lambda_handler
+
+
+def is_tracing_disabled() -> bool:
+    """Returns True if tracing has been disabled through the Powertools environment variable."""
+    return os.getenv("POWERTOOLS_TRACE_DISABLED", "false").lower() in ("1", "true")
+
+
+if is_tracing_disabled():
+    tracer = NoOpTracer()
+else:
+    from aws_lambda_powertools import Tracer
+    tracer = Tracer()
+
+
+class SampledRequestLog:
+    """Structured info-level request logs, written for a sample of the invocations only.
+
+    The decision is taken once per invocation by 'start()', so that the logs of a sampled
+    request are complete. Fields are passed as keyword arguments and only serialized when
+    the invocation is sampled: no message is formatted for the others.
+    """
+
+    def __init__(self, logger: Logger, sample_rate: float = 1.0, draw: Callable[[], float] = random.random) -> None:
+        self.logger = logger
+        self.sample_rate = sample_rate
+        self.draw = draw
+        self.sampled = False
+
+    def start(self) -> None:
+        """Decides whether the logs of the current invocation are written."""
+        self.sampled = self.logger.isEnabledFor(logging.INFO) and (self.sample_rate >= 1 or self.draw() < self.sample_rate)
+
+    def info(self, message: str, **fields: Any) -> None:
+        """Logs the message with the fields as structured keys, if the invocation is sampled."""
+        if self.sampled:
+            # The location of the record is the caller's, not this method's
+            self.logger.info(message, extra=fields, stacklevel=2)
+
 
-tracer = Tracer()
 logger = Logger()
 app = APIGatewayRestResolver()
 
-dynamodb = boto3.resource("dynamodb")
+request_log = SampledRequestLog(logger, sample_rate=float(os.getenv("REQUEST_LOG_SAMPLE_RATE", "1")))
 
-url_hash_repository = DynamoDBUrlHashRepository(
-    dynamodb.Table(
-        os.getenv("URL_HASHES_TABLE")
-    )
+# The flag is checked on every timed call, so it can also be flipped at runtime
+instrumentation.enabled = os.getenv("INSTRUMENTATION_ENABLED", "false").lower() in ("1", "true")
+
+# The cache lives in module scope, so it is shared by all invocations served by a warm container
+url_hash_cache = LruCache(
+    max_size=int(os.getenv("URL_HASH_CACHE_SIZE", DEFAULT_MAX_SIZE))
 )
 
-@app.exception_handler(UrlHashNotFoundError)
-def handle_invalid_limit_qs(ex: UrlHashNotFoundError) -> Response:
-    """Returns a HTTP 404 response is the the requested URL hash is not found. 
-     
-    The use case will throw this exception if not such URL hash is found,
-    so we are only intercepting that exception and acting accordingly.
-    
+# Concurrent cache misses for the same hash share one repository read: a container serves one
+# invocation at a time, so only threads sharing the repository (e.g., of a local tool) coalesce
+read_flight: SingleFlight = SingleFlight()
+
+def build_dynamodb_repository(backend: str) -> UrlHashRepository:
+    """Builds the DynamoDB repository for the selected backend.
+
+    Arguments:
+        backend: "dynamodb" for the resource-based repository, "dynamodb-client" for the low-level client one
+
+    Returns:
+        the repository on the table named by the URL_HASHES_TABLE environment variable
+    """
+    import boto3
+    from zoorl.adapters.dynamodb_client_model import DynamoDBClientUrlHashRepository, client_config
+
+    table_name = os.getenv("URL_HASHES_TABLE")
+
+    if backend == "dynamodb-client":
+        return DynamoDBClientUrlHashRepository(
+            boto3.client("dynamodb", config=client_config()), table_name
+        )
+    elif backend == "dynamodb":
+        from zoorl.adapters.dynamodb_model import DynamoDBUrlHashRepository
+
+        return DynamoDBUrlHashRepository(
+            boto3.resource("dynamodb", config=client_config()).Table(table_name)
+        )
+
+    raise ValueError(f"Unsupported URL hashes backend: \"{backend}\"")
+
+def build_repository(backend: str) -> UrlHashRepository:
+    """Builds the repository for the selected backend.
+
+    Besides the DynamoDB ones (see 'build_dynamodb_repository()'), the local backends are:
+      * "sqlite" - the SQLite database file named by the URL_HASHES_SQLITE_PATH environment variable
+      * "mmap" - the read-only hash table file named by the URL_HASHES_MMAP_PATH environment variable
+
+    Arguments:
+        backend: the backend name
+
+    Returns:
+        the repository, not cached
+    """
+    if backend == "sqlite":
+        from zoorl.adapters.sqlite_model import SQLiteUrlHashRepository
+
+        return SQLiteUrlHashRepository.open(os.getenv("URL_HASHES_SQLITE_PATH", "/tmp/url_hashes.db"))
+    elif backend == "mmap":
+        from zoorl.adapters.mmap_model import MmapUrlHashRepository
+
+        return MmapUrlHashRepository(os.getenv("URL_HASHES_MMAP_PATH"))
+
+    return build_dynamodb_repository(backend)
+
+def build_throttled_repository(repository: UrlHashRepository, rate: float) -> UrlHashRepository:
+    """Wraps the repository so that its writes are paced (see 'throttling_model').
+
+    Besides the rate, the settings come from environment variables:
+      * WRITE_BURST - item writes allowed in a burst (default: one second worth of writes)
+      * WRITE_MAX_IN_FLIGHT - write requests sent at the same time
+
+    The DynamoDB clients retry throttled requests on their own (DYNAMODB_MAX_ATTEMPTS times, see
+    'client_config()'), so the decorator makes fewer calls: at most DEFAULT_MAX_ATTEMPTS requests
+    per write in the worst case, SDK retries included.
+
     Arguments:
-        ex: the exception
+        repository: the repository to wrap
+        rate: the item writes per second allowed to this process
 
     Returns:
-        The configured HTTP 404 'Response' object    
+        the throttled repository
     """
+    from zoorl.adapters.dynamodb_client_model import sdk_max_attempts
+    from zoorl.adapters.throttling_model import ThrottledUrlHashRepository, DEFAULT_MAX_IN_FLIGHT
+    from zoorl.core.token_bucket import TokenBucket
 
-    metadata = {"path": app.current_event.path, "query_strings": app.current_event.query_string_parameters}
-    logger.error(f"Malformed request: {ex}", extra=metadata)
+    return ThrottledUrlHashRepository(
+        repository,
+        TokenBucket(rate=rate, capacity=float(os.getenv("WRITE_BURST", rate))),
+        max_in_flight=int(os.getenv("WRITE_MAX_IN_FLIGHT", DEFAULT_MAX_IN_FLIGHT)),
+        sdk_attempts=sdk_max_attempts()
+    )
 
-    return Response(
-        status_code = http_response_codes.NOT_FOUND,
-        content_type = content_types.APPLICATION_JSON,
-        body = json.dumps({
-            "message": str(ex)
-        })
+@lru_cache(maxsize=None)
+def get_url_hash_repository() -> UrlHashRepository:
+    """Returns the repository shared by all invocations served by this container.
+
+    The repository (and the underlying boto3 session) is built on first use and then reused.
+    The URL_HASHES_BACKEND environment variable selects the implementation (default "dynamodb"),
+    and WRITE_RATE_LIMIT (item writes per second, unset for no limit) paces its writes.
+    """
+    backend = os.getenv("URL_HASHES_BACKEND", "dynamodb")
+    # Innermost, so that the repository timings are the ones of the store alone
+    repository: UrlHashRepository = InstrumentedUrlHashRepository(build_repository(backend))
+
+    write_rate_limit = os.getenv("WRITE_RATE_LIMIT")
+    if write_rate_limit:
+        repository = build_throttled_repository(repository, float(write_rate_limit))
+
+    # Lookups in the memory-mapped file are already cheaper than going through the cache
+    if backend == "mmap":
+        return repository
+
+    return CachedUrlHashRepository(
+        SingleFlightUrlHashRepository(repository, read_flight),
+        cache=url_hash_cache,
+        negative_ttl=int(os.getenv("URL_HASH_CACHE_NEGATIVE_TTL", DEFAULT_NEGATIVE_TTL))
     )
 
+@lru_cache(maxsize=None)
+def get_url_canonicalizer() -> Optional[UrlCanonicalizer]:
+    """Returns the URL canonicalizer of the use cases creating URL hashes, or None if they hash URLs as they are.
+
+    URL_CANONICALIZATION_ENABLED turns it on, and URL_STRIP_QUERY_PARAMS lists the (comma-separated)
+    patterns of the query parameters it removes, e.g., "utm_*,fbclid" (none by default).
+    """
+    if os.getenv("URL_CANONICALIZATION_ENABLED", "false").lower() not in ("1", "true"):
+        return None
+    return UrlCanonicalizer(split_patterns(os.getenv("URL_STRIP_QUERY_PARAMS", "")))
+
+@timed("Resolver")
+def _resolve(event: APIGatewayAuthorizerRequestEvent, context: LambdaContext) -> dict:
+    return app.resolve(event, context)
+
+def resolve(event: APIGatewayAuthorizerRequestEvent, context: LambdaContext) -> dict:
+    """Resolves the event with the registered routes, then ships the recorded timings when due.
+
+    Arguments:
+        event: the APIGateway event payload
+        context: Lambda context (e.g., environment variables)
+
+    Returns:
+        Response suitable for being processed by API Gateway.
+    """
+    response = _resolve(event, context)
+
+    ship_metrics_if_due()
+
+    return response
+
+def ship_metrics_if_due() -> None:
+    """Writes the recorded timings and read counts as EMF lines, if they are due (see 'Instrumentation.is_due()')."""
+    if instrumentation.is_due():
+        service = os.getenv("POWERTOOLS_SERVICE_NAME", "zoorl")
+        flight_counts = read_flight.drain()
+        write_lines([
+            *timing_lines(instrumentation.drain(), service),
+            *count_lines({"SingleFlight.calls": flight_counts["calls"], "SingleFlight.coalesced": flight_counts["coalesced"]}, service)
+        ])
+
+def register_error_response(exc_class: Type[Exception], status_code: int) -> None:
+    """Registers an exception handler returning a JSON error with the specified HTTP status code.
+
+    The body is '{"message": str(ex)}', as the 'Http404ResponseModel' API Gateway model expects.
+
+    Arguments:
+        exc_class: the exception (or base exception) to intercept
+        status_code: the HTTP status code of the response
+    """
+
+    @app.exception_handler(exc_class)
+    def handle_error(ex: Exception) -> Response:
+        metadata = {"path": app.current_event.path, "query_strings": app.current_event.query_string_parameters}
+        logger.error(f"Malformed request: {ex}", extra=metadata)
+
+        return Response(
+            status_code = status_code,
+            content_type = content_types.APPLICATION_JSON,
+            body = json.dumps({
+                "message": str(ex)
+            })
+        )
+
 @logger.inject_lambda_context(correlation_id_path=correlation_paths.API_GATEWAY_REST)
 @tracer.capture_lambda_handler
 def handle(event: APIGatewayAuthorizerRequestEvent, context: LambdaContext) -> dict:
     """AWS Lambda entry point function.
 
-    Note that we relay on AWS Lambda Powertools for Python to process our 
+    Note that we relay on AWS Lambda Powertools for Python to process our
     response and set fields when needed.
 
     Arguments:
-        event: the APIGateway event payload 
+        event: the APIGateway event payload
         context: Lambda context (e.g., environment variables)
 
     Returns:
         Response suitable for being processed by API Gateway.
     """
 
-    logger.info(f"Context \"{context}\" .")
+    request_log.start()
+    request_log.info("Request", path=event.get("path"), method=event.get("httpMethod"))
 
-    logger.debug(f"Correlation ID => {logger.get_correlation_id()}")
-    
-    response = app.resolve(event, context)
+    response = resolve(event, context)
 
-    logger.info(f"Response \"{response}\" .")
+    request_log.info("Response", status_code=response.get("statusCode"))
 
     return response
@@ -0,0 +1,51 @@
+"""AWS Lambda adapter for migrating the stored URL hashes to the current layout.
+
+This function is not exposed through API Gateway: it is meant to be invoked by
+hand after deploying a new item layout, until it reports no migrated items.
+"""
+
+import os
+
+from aws_lambda_powertools.utilities.typing import LambdaContext
+
+from zoorl.adapters.lambda_support import tracer, logger, get_url_hash_repository
+
+from zoorl.core.usecases.migrate_url_hashes import (
+    MigrateUrlHashesUseCase,
+    MigrateUrlHashesUseCaseRequest,
+    DEFAULT_TOTAL_SEGMENTS
+)
+
+@logger.inject_lambda_context
+@tracer.capture_lambda_handler
+def handle(event: dict, context: LambdaContext) -> dict:
+    """AWS Lambda entry point function.
+
+    The number of parallel segments is set through the MIGRATION_TOTAL_SEGMENTS
+    environment variable, and the maximum number of URL hashes migrated per segment
+    through MIGRATION_MAX_ITEMS_PER_SEGMENT, so that a run fits the function timeout.
+
+    Arguments:
+        event: the invocation payload (ignored)
+        context: Lambda context (e.g., environment variables)
+
+    Returns:
+        the number of migrated URL hashes.
+    """
+
+    max_items_per_segment = os.getenv("MIGRATION_MAX_ITEMS_PER_SEGMENT")
+
+    response = MigrateUrlHashesUseCase(
+        url_hash_repository=get_url_hash_repository(),
+        total_segments=int(os.getenv("MIGRATION_TOTAL_SEGMENTS", DEFAULT_TOTAL_SEGMENTS))
+    ).migrate(
+        MigrateUrlHashesUseCaseRequest(
+            max_items_per_segment=int(max_items_per_segment) if max_items_per_segment else None
+        )
+    )
+
+    logger.info(f"Migrated {response.migrated} URL hashes.")
+
+    return {
+        "migrated": response.migrated
+    }
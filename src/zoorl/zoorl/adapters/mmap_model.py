@@ -0,0 +1,192 @@
+"""Read-only, memory-mapped implementation of the UrlHash repository.
+
+The URL hashes are stored in an open-addressing hash table file, which is built
+once (e.g., from a table export) and then shipped with the function or the
+container. Opening the file only maps it and reads its header, whatever its size,
+and the operating system pages in the parts that lookups actually touch.
+
+File layout (little endian):
+  * header - magic b"ZHT1", slot count (a power of 2), entry count
+  * slots - one 8 bytes file offset per slot (0 for empty slots)
+  * records - for each URL hash: ttl (8 bytes), URL length (4 bytes),
+    hash length (1 byte), then the hash and the URL, both UTF-8 encoded
+
+Lookups probe the slots linearly from the CRC32 of the hash.
+"""
+
+import json
+import mmap
+import os
+import struct
+import time
+import zlib
+
+from typing import IO, Iterable, Iterator, List, Optional
+
+from zoorl.adapters.dynamodb_codec import decode
+from zoorl.core.model import UrlHash
+from zoorl.ports.repository import UrlHashRepository
+
+MAGIC = b"ZHT1"
+
+_HEADER = struct.Struct("<4sII")
+_SLOT = struct.Struct("<Q")
+_RECORD = struct.Struct("<qIB")
+
+
+class ReadOnlyRepositoryError(Exception):
+    """Exception thrown when writing to a read-only repository."""
+    pass
+
+
+class InvalidHashTableFileError(Exception):
+    """Exception thrown if a file is not a URL hash table file."""
+    pass
+
+
+def _slot_of(key: bytes, mask: int) -> int:
+    # CRC32 is stable across processes, unlike the built-in 'hash()'
+    return zlib.crc32(key) & mask
+
+
+def write_hash_table(path: str, url_hashes: Iterable[UrlHash], now: Optional[int] = None) -> int:
+    """Builds a hash table file with the URL hashes, replacing the file atomically.
+
+    Args:
+        path: the file to write
+        url_hashes: the URL hashes: for duplicated hashes, the last one wins
+        now: URL hashes expiring at this UNIX epoch time (or before) are skipped, if specified
+
+    Returns:
+        the number of URL hashes written
+    """
+    records = {}
+    for url_hash in url_hashes:
+        if now is None or not url_hash.is_expired(now):
+            records[url_hash.hash] = url_hash
+
+    # Keep the load factor at most 0.5, so that probe sequences stay short
+    slot_count = 1
+    while slot_count < 2 * len(records):
+        slot_count *= 2
+    mask = slot_count - 1
+
+    slots = [0] * slot_count
+    data = bytearray()
+    data_offset = _HEADER.size + slot_count * _SLOT.size
+
+    for url_hash in records.values():
+        key = url_hash.hash.encode("utf-8")
+        url = url_hash.url.encode("utf-8")
+
+        slot = _slot_of(key, mask)
+        while slots[slot]:
+            slot = (slot + 1) & mask
+        slots[slot] = data_offset + len(data)
+
+        data += _RECORD.pack(url_hash.ttl, len(url), len(key))
+        data += key
+        data += url
+
+    temporary_path = f"{path}.tmp"
+    with open(temporary_path, "wb") as file:
+        file.write(_HEADER.pack(MAGIC, slot_count, len(records)))
+        file.write(struct.pack(f"<{slot_count}Q", *slots))
+        file.write(data)
+    os.replace(temporary_path, path)
+
+    return len(records)
+
+
+def read_dynamodb_export(lines: IO[str]) -> Iterator[UrlHash]:
+    """Returns the URL hashes of a DynamoDB table export, in DynamoDB JSON format.
+
+    Args:
+        lines: the export file, one '{"Item": {...}}' object per line
+
+    Returns:
+        an iterator over the exported URL hashes
+    """
+    for line in lines:
+        if line.strip():
+            yield decode(json.loads(line)["Item"])
+
+
+class MmapUrlHashRepository(UrlHashRepository):
+    """Read-only UrlHash repository on a memory-mapped hash table file."""
+
+    def __init__(self, path: str) -> None:
+        with open(path, "rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self._mmap.size() < _HEADER.size:
+            raise InvalidHashTableFileError(f"\"{path}\" is not a URL hash table file")
+
+        magic, self.slot_count, self.entry_count = _HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise InvalidHashTableFileError(f"\"{path}\" is not a URL hash table file")
+
+        self._mask = self.slot_count - 1
+        # Slices of a memoryview are not copied, so comparing keys does not allocate
+        self._view = memoryview(self._mmap)
+
+    def save(self, url_hash: UrlHash) -> None:
+        raise ReadOnlyRepositoryError(f"{type(self).__name__} is read-only")
+
+    def save_if_available(self, url_hash: UrlHash) -> bool:
+        raise ReadOnlyRepositoryError(f"{type(self).__name__} is read-only")
+
+    def save_if_absent(self, url_hash: UrlHash) -> Optional[UrlHash]:
+        raise ReadOnlyRepositoryError(f"{type(self).__name__} is read-only")
+
+    def save_many(self, url_hashes: List[UrlHash]) -> None:
+        raise ReadOnlyRepositoryError(f"{type(self).__name__} is read-only")
+
+    def get_by_hash(self, hash: str) -> Optional[UrlHash]:
+        key = hash.encode("utf-8")
+        view = self._view
+        mask = self._mask
+
+        slot = _slot_of(key, mask)
+        while True:
+            offset, = _SLOT.unpack_from(view, _HEADER.size + slot * _SLOT.size)
+            if not offset:
+                return None
+
+            ttl, url_length, key_length = _RECORD.unpack_from(view, offset)
+            key_start = offset + _RECORD.size
+            if key_length == len(key) and view[key_start:key_start + key_length] == key:
+                if ttl <= int(time.time()):
+                    return None
+
+                url_start = key_start + key_length
+                return UrlHash(hash=hash, url=str(view[url_start:url_start + url_length], "utf-8"), ttl=ttl)
+
+            slot = (slot + 1) & mask
+
+    def __len__(self) -> int:
+        return self.entry_count
+
+    def close(self) -> None:
+        """Unmaps the file."""
+        self._view.release()
+        self._mmap.close()
+
+
+def main() -> None:
+    """Builds a hash table file from a DynamoDB table export (in DynamoDB JSON format)."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("export", help="the export file, one DynamoDB JSON item per line")
+    parser.add_argument("output", help="the hash table file to write")
+    args = parser.parse_args()
+
+    with open(args.export, encoding="utf-8") as lines:
+        count = write_hash_table(args.output, read_dynamodb_export(lines), now=int(time.time()))
+
+    print(f"Wrote {count} URL hashes to \"{args.output}\"")
+
+
+if __name__ == "__main__":
+    main()
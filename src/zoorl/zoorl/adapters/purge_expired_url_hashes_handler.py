@@ -0,0 +1,47 @@
+"""AWS Lambda adapter for purging expired URL hashes.
+
+This function is not exposed through API Gateway: it is meant to be triggered
+on a schedule (e.g., by an EventBridge rule), and it deletes the URL hashes that
+DynamoDB TTL has not deleted yet.
+"""
+
+import os
+
+from aws_lambda_powertools.utilities.typing import LambdaContext
+
+from zoorl.adapters.lambda_support import tracer, logger, get_url_hash_repository
+
+from zoorl.core.usecases.purge_expired_url_hashes import (
+    PurgeExpiredUrlHashesUseCase,
+    PurgeExpiredUrlHashesUseCaseRequest
+)
+
+@logger.inject_lambda_context
+@tracer.capture_lambda_handler
+def handle(event: dict, context: LambdaContext) -> dict:
+    """AWS Lambda entry point function.
+
+    The maximum number of URL hashes deleted per run can be bounded through the
+    PURGE_MAX_ITEMS environment variable, so that a run fits the function timeout.
+
+    Arguments:
+        event: the scheduled event payload (ignored)
+        context: Lambda context (e.g., environment variables)
+
+    Returns:
+        the number of deleted URL hashes.
+    """
+
+    max_items = os.getenv("PURGE_MAX_ITEMS")
+
+    response = PurgeExpiredUrlHashesUseCase(
+        url_hash_repository=get_url_hash_repository()
+    ).purge(
+        PurgeExpiredUrlHashesUseCaseRequest(max_items=int(max_items) if max_items else None)
+    )
+
+    logger.info(f"Purged {response.deleted} expired URL hashes.")
+
+    return {
+        "deleted": response.deleted
+    }
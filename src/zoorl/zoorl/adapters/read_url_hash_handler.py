@@ -4,46 +4,58 @@ This adapter will invoke the use case, and format the HTTP response to instruct
 the client web browser to perform redirection to the mapped site.
 """
 
+from functools import lru_cache
+
 from aws_lambda_powertools.utilities.typing import LambdaContext
 from aws_lambda_powertools.utilities.data_classes.api_gateway_authorizer_event import APIGatewayAuthorizerRequestEvent
+from aws_lambda_powertools.event_handler import (
+    Response,
+    content_types
+)
 from aws_lambda_powertools.logging import correlation_paths
 
 from zoorl.core.usecases.read_url_hash import (
     ReadUrlHashUseCase,
-    ReadUrlHashUseCaseRequest
+    ReadUrlHashUseCaseRequest,
+    UrlHashNotFoundError
 )
-from zoorl.adapters.lambda_support import app, tracer, logger, url_hash_repository
+from zoorl.adapters import http_response_codes
+from zoorl.adapters.http_bodies import url_hash_body
+from zoorl.adapters.lambda_support import app, tracer, logger, get_url_hash_repository, register_error_response, request_log, resolve
 
-usecase = ReadUrlHashUseCase(
-    url_hash_repository=url_hash_repository
-)
+register_error_response(UrlHashNotFoundError, http_response_codes.NOT_FOUND)
+
+@lru_cache(maxsize=None)
+def get_usecase() -> ReadUrlHashUseCase:
+    """Returns the use case, built on first use so that the repository is created lazily."""
+    return ReadUrlHashUseCase(
+        url_hash_repository=get_url_hash_repository()
+    )
 
 @app.get("/u/<url_hash>")
 @tracer.capture_method
-def handle(url_hash: str) -> dict:
+def handle(url_hash: str) -> Response:
     """Returns the URL Hash data for the specified resource.
     
     Arguments:
         url_hash: the desired URL hash
 
     Returns:
-        the URL hash information.   
+        the URL hash information, as a JSON body built without any intermediate dict.
     
     Raises:
         UrlHashNotFoundError: if the hash was not found
     """
     
-    logger.info(f"Returning URL for hash \"{url_hash}\" .")
-
-    response = usecase.read_url(ReadUrlHashUseCaseRequest(hash = url_hash))
+    response = get_usecase().read_url(ReadUrlHashUseCaseRequest(hash = url_hash))
 
-    logger.info(f"Got response for hash \"{url_hash}\": {response.url} .")
+    request_log.info("Read URL hash", url_hash=url_hash, url=response.url)
 
-    return {
-        "url_hash": response.url_hash,
-        "url": response.url,
-        "ttl": response.ttl
-    }
+    return Response(
+        status_code = http_response_codes.OK,
+        content_type = content_types.APPLICATION_JSON,
+        body = url_hash_body(response.url_hash, response.url, response.ttl)
+    )
 
 
 @logger.inject_lambda_context(correlation_id_path=correlation_paths.API_GATEWAY_REST)
@@ -62,12 +74,11 @@ def handle(event: APIGatewayAuthorizerRequestEvent, context: LambdaContext) -> d
         Response suitable for being processed by API Gateway.
     """
 
-    logger.info(f"Context \"{context}\" .")
+    request_log.start()
+    request_log.info("Request", path=event.get("path"), method=event.get("httpMethod"))
 
-    logger.debug(f"Correlation ID => {logger.get_correlation_id()}")
-    
-    response = app.resolve(event, context)
+    response = resolve(event, context)
 
-    logger.info(f"Response \"{response}\" .")
+    request_log.info("Response", status_code=response.get("statusCode"))
 
     return response
@@ -0,0 +1,81 @@
+"""AWS Lambda adapter for resolving many URL hashes at once.
+
+This adapter will invoke the use case and return both the found URL hashes
+and the ones that are missing (or expired), so that clients do not need
+one HTTP round-trip per hash.
+"""
+
+from functools import lru_cache
+from typing import Any
+
+from aws_lambda_powertools.utilities.typing import LambdaContext
+from aws_lambda_powertools.utilities.data_classes.api_gateway_authorizer_event import APIGatewayAuthorizerRequestEvent
+from aws_lambda_powertools.event_handler import (
+    Response,
+    content_types
+)
+from aws_lambda_powertools.logging import correlation_paths
+
+from zoorl.core.usecases.read_url_hashes import (
+    ReadUrlHashesUseCase,
+    ReadUrlHashesUseCaseRequest,
+    TooManyHashesError
+)
+from zoorl.adapters import http_response_codes
+from zoorl.adapters.http_bodies import resolved_url_hashes_body, url_hash_body
+from zoorl.adapters.lambda_support import app, tracer, logger, get_url_hash_repository, register_error_response, resolve
+
+register_error_response(TooManyHashesError, http_response_codes.BAD_REQUEST)
+
+@lru_cache(maxsize=None)
+def get_usecase() -> ReadUrlHashesUseCase:
+    """Returns the use case, built on first use so that the repository is created lazily."""
+    return ReadUrlHashesUseCase(
+        url_hash_repository=get_url_hash_repository()
+    )
+
+@app.post("/u/resolve")
+@tracer.capture_method
+def handle_resolve() -> Response:
+    """Returns the URL Hash data for the requested resources.
+
+    The payload is an object with a "hashes" array of strings: API gateway has
+    already performed input validation so we are guaranteed to have it.
+
+    Returns:
+        the found URL hashes and the list of missing ones.
+    """
+
+    payload: dict[str, Any] = app.current_event.json_body  # deserialize json str to dict
+
+    response = get_usecase().read_urls(ReadUrlHashesUseCaseRequest(hashes = payload.get("hashes", [])))
+
+    return Response(
+        status_code = http_response_codes.OK,
+        content_type = content_types.APPLICATION_JSON,
+        body = resolved_url_hashes_body(
+            (url_hash_body(item.url_hash, item.url, item.ttl) for item in response.found),
+            response.missing
+        )
+    )
+
+
+@logger.inject_lambda_context(correlation_id_path=correlation_paths.API_GATEWAY_REST)
+@tracer.capture_lambda_handler
+def handle(event: APIGatewayAuthorizerRequestEvent, context: LambdaContext) -> dict:
+    """AWS Lambda entry point function.
+
+    Note that we relay on AWS Lambda Powertools for Python to process our
+    response and set fields when needed.
+
+    Arguments:
+        event: the APIGateway event payload
+        context: Lambda context (e.g., environment variables)
+
+    Returns:
+        Response suitable for being processed by API Gateway.
+    """
+
+    logger.debug(f"Correlation ID => {logger.get_correlation_id()}")
+
+    return resolve(event, context)
@@ -0,0 +1,39 @@
+"""AWS Lambda adapter for recording the click counts of the redirect function.
+
+This function is not exposed through API Gateway: the redirect function hands it
+the totals of its clicked hashes with asynchronous invocations (see the
+"function" sink of 'click_analytics'), so that the writes happen here instead of
+delaying a redirection. The totals are added to the items of their hashes, for
+ranking the hashes of the redirect snapshot.
+
+Adding counts is not idempotent, so the function must not be retried by Lambda:
+counts that fail to be recorded are dropped, as the other sinks do.
+"""
+
+from aws_lambda_powertools.utilities.typing import LambdaContext
+
+from zoorl.adapters.lambda_support import tracer, logger, get_url_hash_repository
+
+@logger.inject_lambda_context
+@tracer.capture_lambda_handler
+def handle(event: dict, context: LambdaContext) -> dict:
+    """AWS Lambda entry point function.
+
+    Arguments:
+        event: the click totals by hash, as '{"counts": {"<hash>": <clicks>, ...}}'
+        context: Lambda context (e.g., environment variables)
+
+    Returns:
+        the number of hashes whose counts were recorded.
+    """
+
+    counts = {
+        hash: count for hash, count in (event.get("counts") or {}).items()
+        if isinstance(hash, str) and isinstance(count, int) and count > 0
+    }
+
+    get_url_hash_repository().add_access_counts(counts)
+
+    return {
+        "recorded": len(counts)
+    }
@@ -6,8 +6,27 @@ in the reponse.
 
 This will trigger the client web browser to perform redirection 
 to the mapped site.
+
+The most accessed hashes may be served from a snapshot file (see
+'redirect_snapshot'), named by the REDIRECT_SNAPSHOT_PATH environment variable:
+hashes missing from the snapshot are read through the use case. Redirects are
+counted in memory and shipped at the end of the invocations, once due (see
+'click_analytics'), for metrics and for building the next snapshot: shipping
+delays the response of the invocation that does it.
+
+The function has a single route, so 'handle_fast()' serves it without the
+Powertools resolver (route matching, exception handler dispatch, 'Response'
+objects): the hash is taken straight from the path parameters, and the API
+Gateway response is returned as a plain dict. Events of any other shape go
+through 'handle()', which stays the entry point for everything else.
 """
 
+import json
+import os
+
+from functools import lru_cache
+from typing import Any, Dict, Optional, Union
+
 from aws_lambda_powertools.utilities.typing import LambdaContext
 from aws_lambda_powertools.utilities.data_classes.api_gateway_authorizer_event import APIGatewayAuthorizerRequestEvent
 from aws_lambda_powertools.event_handler import (
@@ -16,16 +35,72 @@ from aws_lambda_powertools.event_handler import (
 )
 from aws_lambda_powertools.logging import correlation_paths
 
+from zoorl.core.instrumentation import timed
+from zoorl.core.model import UrlHash
 from zoorl.core.usecases.read_url_hash import (
     ReadUrlHashUseCase,
-    ReadUrlHashUseCaseRequest
+    ReadUrlHashUseCaseRequest,
+    ReadUrlHashUseCaseResponse,
+    UrlHashNotFoundError
 )
 from zoorl.adapters import http_response_codes
-from zoorl.adapters.lambda_support import app, tracer, logger, url_hash_repository
-
-usecase = ReadUrlHashUseCase(
-    url_hash_repository=url_hash_repository
+from zoorl.adapters.click_analytics import create_click_analytics
+from zoorl.adapters.lambda_support import (
+    app,
+    tracer,
+    logger,
+    get_url_hash_repository,
+    register_error_response,
+    request_log,
+    resolve,
+    ship_metrics_if_due
 )
+from zoorl.adapters.redirect_snapshot import RedirectSnapshot, open_redirect_snapshot
+
+# The resource of the route, as API Gateway names it in the events
+REDIRECT_RESOURCE = "/r/{url_hash}"
+
+register_error_response(UrlHashNotFoundError, http_response_codes.NOT_FOUND)
+
+# The clicks are aggregated in module scope, across all invocations served by a warm container
+click_analytics = create_click_analytics(logger, get_url_hash_repository)
+if click_analytics.enabled:
+    click_analytics.flush_on_sigterm()
+
+@lru_cache(maxsize=None)
+def get_usecase() -> ReadUrlHashUseCase:
+    """Returns the use case, built on first use so that the repository is created lazily."""
+    return ReadUrlHashUseCase(
+        url_hash_repository=get_url_hash_repository()
+    )
+
+@lru_cache(maxsize=None)
+def get_redirect_snapshot() -> Optional[RedirectSnapshot]:
+    """Returns the snapshot of the most accessed hashes, if configured, opened on first use.
+
+    A missing or invalid snapshot only makes every hash go through the use case.
+    """
+    location = os.getenv("REDIRECT_SNAPSHOT_PATH")
+    if not location:
+        return None
+
+    try:
+        return open_redirect_snapshot(location)
+    except Exception as ex:
+        logger.warning(f"Cannot open the redirect snapshot \"{location}\": {ex}")
+        return None
+
+def find_redirection(url_hash: str) -> Union[UrlHash, ReadUrlHashUseCaseResponse]:
+    """Returns the URL hash from the snapshot, or else through the use case.
+
+    Raises:
+        UrlHashNotFoundError: if the hash was not found
+    """
+    snapshot = get_redirect_snapshot()
+    response = snapshot.get_by_hash(url_hash) if snapshot else None
+    if response is None:
+        response = get_usecase().read_url(ReadUrlHashUseCaseRequest(hash = url_hash))
+    return response
 
 @app.get("/r/<url_hash>")
 @tracer.capture_method
@@ -44,12 +119,12 @@ def handle_redirect(url_hash: str) -> Response:
     Raises:
         UrlHashNotFoundError: if the hash was not found
     """
-    
-    logger.info(f"Returning URL for hash \"{url_hash}\" .")
 
-    response = usecase.read_url(ReadUrlHashUseCaseRequest(hash = url_hash))
+    response = find_redirection(url_hash)
+
+    request_log.info("Redirecting", url_hash=url_hash, url=response.url)
 
-    logger.info(f"Got response for hash \"{url_hash}\": {response.url} .")
+    click_analytics.record(url_hash)
 
     return Response(
         status_code = http_response_codes.MOVED_PERMANENTLY,
@@ -76,12 +151,93 @@ def handle(event: APIGatewayAuthorizerRequestEvent, context: LambdaContext) -> d
         Response suitable for being processed by API Gateway.
     """
 
-    logger.info(f"Context \"{context}\" .")
+    request_log.start()
+    request_log.info("Request", path=event.get("path"), method=event.get("httpMethod"))
 
-    logger.debug(f"Correlation ID => {logger.get_correlation_id()}")
-    
-    response = app.resolve(event, context)
+    response = resolve(event, context)
+
+    request_log.info("Response", status_code=response.get("statusCode"))
+
+    # API Gateway only gets the response once the handler returns: the invocation that flushes pays for
+    # the shipping (see 'click_analytics'), so the deployed function hands the counts to another one
+    click_analytics.flush_if_due()
+
+    return response
+
+@timed("FastRedirect")
+def redirect(event: Dict[str, Any], url_hash: str) -> Dict[str, Any]:
+    """Returns the API Gateway response redirecting to the URL of the hash, as 'handle_redirect()' does.
+
+    The responses are the ones the resolver builds for the route (and for the not found
+    error, see 'register_error_response()'), as dict literals.
+
+    Arguments:
+        event: the APIGateway event payload
+        url_hash: the desired URL hash
+
+    Returns:
+        Response suitable for being processed by API Gateway.
+    """
+    try:
+        response = find_redirection(url_hash)
+    except UrlHashNotFoundError as ex:
+        logger.error(f"Malformed request: {ex}", extra={"path": event.get("path"), "query_strings": event.get("queryStringParameters")})
+        return {
+            "statusCode": http_response_codes.NOT_FOUND,
+            "headers": {"Content-Type": content_types.APPLICATION_JSON},
+            "body": json.dumps({"message": str(ex)}),
+            "isBase64Encoded": False
+        }
+
+    request_log.info("Redirecting", url_hash=url_hash, url=response.url)
+
+    click_analytics.record(url_hash)
+
+    return {
+        "statusCode": http_response_codes.MOVED_PERMANENTLY,
+        "headers": {"Location": response.url, "Content-Type": content_types.TEXT_HTML},
+        "body": None,
+        "isBase64Encoded": False
+    }
+
+@logger.inject_lambda_context(correlation_id_path=correlation_paths.API_GATEWAY_REST)
+def redirect_with_logs(event: Dict[str, Any], context: LambdaContext, url_hash: str) -> Dict[str, Any]:
+    """Same as 'redirect()', with the request logs, which carry the Lambda context and the correlation id."""
+    request_log.info("Request", path=event.get("path"), method=event.get("httpMethod"))
+
+    response = redirect(event, url_hash)
 
-    logger.info(f"Response \"{response}\" .")
+    request_log.info("Response", status_code=response["statusCode"])
+
+    return response
+
+@tracer.capture_lambda_handler
+def handle_fast(event: Dict[str, Any], context: LambdaContext) -> dict:
+    """AWS Lambda entry point function, for the 'GET /r/{url_hash}' events.
+
+    The Lambda context is only injected into the logger for the invocations whose
+    request logs are sampled (see 'request_log'): looking up the correlation ID in
+    the event is the most expensive part of the injection.
+
+    Arguments:
+        event: the APIGateway event payload
+        context: Lambda context (e.g., environment variables)
+
+    Returns:
+        Response suitable for being processed by API Gateway.
+    """
+    path_parameters = event.get("pathParameters")
+    url_hash = path_parameters.get("url_hash") if path_parameters else None
+    if not url_hash or event.get("resource") != REDIRECT_RESOURCE or event.get("httpMethod") != "GET":
+        return handle(event, context)
+
+    request_log.start()
+    if request_log.sampled:
+        response = redirect_with_logs(event, context, url_hash)
+    else:
+        response = redirect(event, url_hash)
+
+    ship_metrics_if_due()
+    click_analytics.flush_if_due()
 
     return response
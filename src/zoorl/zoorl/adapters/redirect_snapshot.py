@@ -0,0 +1,270 @@
+"""Pre-compiled snapshot of the most accessed redirections.
+
+A handful of hashes get most of the redirect traffic. The snapshot is a small
+read-only file holding them, which is bundled with the redirect function (or
+downloaded from S3 on cold start) and memory-mapped: redirecting a hash of the
+snapshot does not take any network round-trip, nor any cache warm-up.
+
+The hashes are placed with a minimal perfect hash function (CHD, "compress,
+hash and displace"): a lookup reads one bucket, one slot and one record, then
+compares the key without copying it, whatever the number of hashes.
+
+File layout (little endian):
+  * header - magic b"ZRS2", entry count, bucket count, slot count, seed
+  * buckets - the two displacements of each bucket (4 bytes each)
+  * slots - one 4 bytes file offset per slot (0 for empty slots)
+  * records - for each URL hash: ttl (8 bytes), URL length (4 bytes),
+    hash length (1 byte), then the hash and the URL, both UTF-8 encoded
+
+A key goes to bucket 'h1 % bucket count', and to slot '(h1 + d0 * h2 + d1) % slot count',
+where h1 and h2 are the CRC32 of the key and of the reversed key (both starting from the
+seed, and h2 forced odd) and (d0, d1) are the displacements of its bucket, chosen when
+building the file so that no two keys share a slot. When some bucket cannot be placed,
+the build starts over with another seed, and with more slots every few seeds.
+
+Snapshot entries stay valid until their TTL, since a hash cannot be taken by another
+URL before it expires: expired entries are ignored, and looked up in the repository.
+"""
+
+import mmap
+import os
+import struct
+import time
+import zlib
+
+from typing import Iterable, List, Optional, Tuple
+
+from zoorl.core.instrumentation import timed
+from zoorl.core.model import UrlHash
+
+MAGIC = b"ZRS2"
+
+# Average number of keys per bucket: larger buckets make the file smaller, and slower to build
+KEYS_PER_BUCKET = 4
+
+# Ratio of slots to keys: some empty slots make displacements much quicker to find
+SLOTS_PER_KEY = 1.25
+
+# Seeds tried with the same number of slots, before growing it by SLOT_GROWTH
+SEEDS_PER_SLOT_COUNT = 4
+SLOT_GROWTH = 1.25
+
+# Builds given up after that many seeds (it takes a few at most, in practice)
+MAX_SEEDS = 64
+
+_HEADER = struct.Struct("<4sIIII")
+_BUCKET = struct.Struct("<II")
+_SLOT = struct.Struct("<I")
+_RECORD = struct.Struct("<qIB")
+
+
+class InvalidSnapshotFileError(Exception):
+    """Exception thrown if a file is not a redirect snapshot file."""
+    pass
+
+
+def _hashes_of(key: bytes, seed: int) -> Tuple[int, int]:
+    # CRC32 is stable across processes, unlike the built-in 'hash()'. An odd h2 is coprime with
+    # power of two slot counts, and rarely shares a factor with the others: 'd0 * h2' then spans
+    # most slots, instead of a few of them
+    return zlib.crc32(key, seed), zlib.crc32(key[::-1], seed) | 1
+
+
+def _displace(buckets: List[List[Tuple[int, int]]], slot_count: int) -> Optional[List[Tuple[Tuple[int, int], List[int]]]]:
+    """Returns the displacements and the slots of the keys of each bucket (by their (h1, h2) hashes).
+
+    Returns None if some bucket cannot be placed, for trying again with another seed.
+    """
+    taken = bytearray(slot_count)
+    placements: List[Tuple[Tuple[int, int], List[int]]] = [((0, 0), [])] * len(buckets)
+
+    # The largest buckets are the hardest to place, so they go first, while most slots are free
+    for index in sorted(range(len(buckets)), key=lambda index: -len(buckets[index])):
+        keys = buckets[index]
+        if not keys:
+            break
+
+        for trial in range(slot_count * slot_count):
+            d0, d1 = divmod(trial, slot_count)
+            slots = [(h1 + d0 * h2 + d1) % slot_count for h1, h2 in keys]
+            if len(set(slots)) == len(slots) and not any(taken[slot] for slot in slots):
+                break
+        else:
+            return None
+
+        for slot in slots:
+            taken[slot] = 1
+        placements[index] = ((d0, d1), slots)
+
+    return placements
+
+
+def write_redirect_snapshot(path: str, url_hashes: Iterable[UrlHash], now: Optional[int] = None) -> int:
+    """Builds a snapshot file with the URL hashes, replacing the file atomically.
+
+    Args:
+        path: the file to write
+        url_hashes: the URL hashes: for duplicated hashes, the last one wins
+        now: URL hashes expiring at this UNIX epoch time (or before) are skipped, if specified
+
+    Returns:
+        the number of URL hashes written
+    """
+    records = {}
+    for url_hash in url_hashes:
+        if now is None or not url_hash.is_expired(now):
+            records[url_hash.hash.encode("utf-8")] = url_hash
+
+    bucket_count = len(records) // KEYS_PER_BUCKET + 1 if records else 0
+    slot_count = int(len(records) * SLOTS_PER_KEY) + 1 if records else 0
+
+    for seed in range(MAX_SEEDS):
+        if seed and not seed % SEEDS_PER_SLOT_COUNT:
+            slot_count = int(slot_count * SLOT_GROWTH) + 1
+
+        buckets: List[List[Tuple[int, int]]] = [[] for _ in range(bucket_count)]
+        bucket_keys: List[List[bytes]] = [[] for _ in range(bucket_count)]
+        for key in records:
+            h1, h2 = _hashes_of(key, seed)
+            buckets[h1 % bucket_count].append((h1, h2))
+            bucket_keys[h1 % bucket_count].append(key)
+
+        placements = _displace(buckets, slot_count)
+        if placements is not None:
+            break
+    else:
+        raise ValueError(f"Cannot find a perfect hash function for the keys after {MAX_SEEDS} seeds")
+
+    displacements = bytearray()
+    slots = [0] * slot_count
+    data = bytearray()
+    data_offset = _HEADER.size + bucket_count * _BUCKET.size + slot_count * _SLOT.size
+
+    for keys, ((d0, d1), key_slots) in zip(bucket_keys, placements):
+        displacements += _BUCKET.pack(d0, d1)
+
+        for key, slot in zip(keys, key_slots):
+            url_hash = records[key]
+            url = url_hash.url.encode("utf-8")
+
+            slots[slot] = data_offset + len(data)
+            data += _RECORD.pack(url_hash.ttl, len(url), len(key))
+            data += key
+            data += url
+
+    if data_offset + len(data) > 0xFFFFFFFF:
+        raise ValueError("The snapshot exceeds 4 GB: it is meant for the most accessed hashes only")
+
+    temporary_path = f"{path}.tmp"
+    with open(temporary_path, "wb") as file:
+        file.write(_HEADER.pack(MAGIC, len(records), bucket_count, slot_count, seed if records else 0))
+        file.write(displacements)
+        file.write(struct.pack(f"<{slot_count}I", *slots))
+        file.write(data)
+    os.replace(temporary_path, path)
+
+    return len(records)
+
+
+class RedirectSnapshot:
+    """Read-only lookups in a memory-mapped snapshot file."""
+
+    def __init__(self, path: str) -> None:
+        with open(path, "rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self._mmap.size() < _HEADER.size:
+            raise InvalidSnapshotFileError(f"\"{path}\" is not a redirect snapshot file")
+
+        magic, self.entry_count, self.bucket_count, self.slot_count, self.seed = _HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise InvalidSnapshotFileError(f"\"{path}\" is not a redirect snapshot file")
+
+        self._slots_offset = _HEADER.size + self.bucket_count * _BUCKET.size
+        # Slices of a memoryview are not copied, so comparing keys does not allocate
+        self._view = memoryview(self._mmap)
+
+    @timed("RedirectSnapshot.get_by_hash")
+    def get_by_hash(self, hash: str) -> Optional[UrlHash]:
+        """Returns the UrlHash, if present in the snapshot and not expired.
+
+        Args:
+            hash: the required hash
+
+        Returns:
+            the requested UrlHash or None if the snapshot has no (unexpired) entry for it
+        """
+        if not self.entry_count:
+            return None
+
+        key = hash.encode("utf-8")
+        view = self._view
+        h1, h2 = _hashes_of(key, self.seed)
+
+        d0, d1 = _BUCKET.unpack_from(view, _HEADER.size + (h1 % self.bucket_count) * _BUCKET.size)
+        offset, = _SLOT.unpack_from(view, self._slots_offset + ((h1 + d0 * h2 + d1) % self.slot_count) * _SLOT.size)
+        if not offset:
+            return None
+
+        # Any key maps to some slot, so the one found must be checked
+        ttl, url_length, key_length = _RECORD.unpack_from(view, offset)
+        key_start = offset + _RECORD.size
+        if key_length != len(key) or view[key_start:key_start + key_length] != key or ttl <= int(time.time()):
+            return None
+
+        url_start = key_start + key_length
+        return UrlHash(hash=hash, url=str(view[url_start:url_start + url_length], "utf-8"), ttl=ttl)
+
+    def __len__(self) -> int:
+        return self.entry_count
+
+    def close(self) -> None:
+        """Unmaps the file."""
+        self._view.release()
+        self._mmap.close()
+
+
+def open_redirect_snapshot(location: str) -> RedirectSnapshot:
+    """Opens a snapshot file, downloading it first if it is stored on S3.
+
+    Args:
+        location: a local path, or an "s3://<bucket>/<key>" URI (downloaded to /tmp)
+
+    Returns:
+        the snapshot
+    """
+    if location.startswith("s3://"):
+        import boto3
+
+        bucket, _, key = location[len("s3://"):].partition("/")
+        path = os.path.join("/tmp", os.path.basename(key))
+        boto3.client("s3").download_file(bucket, key, path)
+        location = path
+
+    return RedirectSnapshot(location)
+
+
+def main() -> None:
+    """Builds a snapshot file of the most accessed URL hashes of the configured repository."""
+    import argparse
+
+    from zoorl.adapters.lambda_support import build_repository
+
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("output", help="the snapshot file to write")
+    parser.add_argument("--top", type=int, default=10000, help="number of URL hashes to include")
+    parser.add_argument(
+        "--backend", default=os.getenv("URL_HASHES_BACKEND", "dynamodb"),
+        help="the repository backend (see 'build_repository()'), configured by the same environment variables"
+    )
+    args = parser.parse_args()
+
+    now = int(time.time())
+    url_hashes = build_repository(args.backend).find_most_accessed(args.top, now)
+    count = write_redirect_snapshot(args.output, url_hashes, now=now)
+
+    print(f"Wrote {count} URL hashes to \"{args.output}\"")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""Single-flight decorator for the asynchronous UrlHash repositories (see 'single_flight_model')."""
+
+from typing import Dict, List, Optional
+
+from zoorl.core.async_single_flight import AsyncSingleFlight
+from zoorl.core.model import UrlHash
+from zoorl.ports.async_repository import AsyncUrlHashRepository
+
+
+class AsyncSingleFlightUrlHashRepository(AsyncUrlHashRepository):
+    """Single-flight decorator for any asynchronous UrlHash repository, on one event loop."""
+
+    def __init__(self, delegate: AsyncUrlHashRepository, flight: Optional[AsyncSingleFlight[Optional[UrlHash]]] = None) -> None:
+        self.delegate = delegate
+        self.flight = flight if flight is not None else AsyncSingleFlight()
+        self.max_concurrency = delegate.max_concurrency
+
+    async def save(self, url_hash: UrlHash) -> None:
+        await self.delegate.save(url_hash)
+        self.flight.forget(url_hash.hash)
+
+    async def save_if_available(self, url_hash: UrlHash) -> bool:
+        saved = await self.delegate.save_if_available(url_hash)
+        self.flight.forget(url_hash.hash)
+        return saved
+
+    async def save_if_absent(self, url_hash: UrlHash) -> Optional[UrlHash]:
+        existing = await self.delegate.save_if_absent(url_hash)
+        self.flight.forget(url_hash.hash)
+        return existing
+
+    async def save_many(self, url_hashes: List[UrlHash]) -> None:
+        await self.delegate.save_many(url_hashes)
+        for url_hash in url_hashes:
+            self.flight.forget(url_hash.hash)
+
+    async def get_by_hash(self, hash: str) -> Optional[UrlHash]:
+        return await self.flight.do(hash, lambda: self.delegate.get_by_hash(hash))
+
+    async def get_by_hashes(self, hashes: List[str]) -> Dict[str, UrlHash]:
+        return await self.delegate.get_by_hashes(hashes)
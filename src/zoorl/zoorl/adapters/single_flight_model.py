@@ -0,0 +1,83 @@
+"""Single-flight decorators for the UrlHash repositories.
+
+Concurrent 'get_by_hash()' calls for the same hash share a single call to the
+decorated repository (see 'zoorl.core.single_flight'): when a link goes viral
+and is not cached yet, its partition gets one read per process instead of one
+per request. Placed under the cache, the flight only sees cache misses.
+
+Writes go straight to the decorated repository, and then detach the read in
+flight for their hashes, so that reads starting after a write do not share a
+result read before it. Batch reads are not coalesced.
+
+The decorator of the asynchronous repositories is in 'single_flight_async_model',
+so that the Lambda functions do not import asyncio.
+"""
+
+from typing import Dict, Iterator, List, Optional
+
+from zoorl.core.model import UrlHash
+from zoorl.core.single_flight import SingleFlight
+from zoorl.ports.repository import UrlHashRepository
+
+
+class SingleFlightUrlHashRepository(UrlHashRepository):
+    """Single-flight decorator for any UrlHash repository implementation, shared by threads."""
+
+    def __init__(self, delegate: UrlHashRepository, flight: Optional[SingleFlight[Optional[UrlHash]]] = None) -> None:
+        self.delegate = delegate
+        self.flight = flight if flight is not None else SingleFlight()
+
+    def save(self, url_hash: UrlHash) -> None:
+        self.delegate.save(url_hash)
+        self.flight.forget(url_hash.hash)
+
+    def save_if_available(self, url_hash: UrlHash) -> bool:
+        saved = self.delegate.save_if_available(url_hash)
+        self.flight.forget(url_hash.hash)
+        return saved
+
+    def save_if_absent(self, url_hash: UrlHash) -> Optional[UrlHash]:
+        existing = self.delegate.save_if_absent(url_hash)
+        self.flight.forget(url_hash.hash)
+        return existing
+
+    def save_many(self, url_hashes: List[UrlHash]) -> None:
+        self.delegate.save_many(url_hashes)
+        for url_hash in url_hashes:
+            self.flight.forget(url_hash.hash)
+
+    def get_by_hash(self, hash: str) -> Optional[UrlHash]:
+        return self.flight.do(hash, lambda: self.delegate.get_by_hash(hash))
+
+    def get_by_hashes(self, hashes: List[str]) -> Dict[str, UrlHash]:
+        return self.delegate.get_by_hashes(hashes)
+
+    def delete_many(self, hashes: List[str]) -> None:
+        self.delegate.delete_many(hashes)
+        for hash in hashes:
+            self.flight.forget(hash)
+
+    def delete_expired(self, hashes: List[str], now: int) -> int:
+        deleted = self.delegate.delete_expired(hashes, now)
+        for hash in hashes:
+            self.flight.forget(hash)
+        return deleted
+
+    def find_expired_hashes(self, now: int, page_size: int = 100) -> Iterator[List[str]]:
+        return self.delegate.find_expired_hashes(now, page_size)
+
+    def find_outdated(self, segment: int = 0, total_segments: int = 1, page_size: int = 100) -> Iterator[List[UrlHash]]:
+        return self.delegate.find_outdated(segment, total_segments, page_size)
+
+    def find_all(self, segment: int = 0, total_segments: int = 1, page_size: int = 100) -> Iterator[List[UrlHash]]:
+        return self.delegate.find_all(segment, total_segments, page_size)
+
+    def migrate_many(self, url_hashes: List[UrlHash]) -> int:
+        # Migrating changes the layout, not the values, so reads in flight are still valid
+        return self.delegate.migrate_many(url_hashes)
+
+    def add_access_counts(self, counts: Dict[str, int]) -> None:
+        self.delegate.add_access_counts(counts)
+
+    def find_most_accessed(self, limit: int, now: int) -> List[UrlHash]:
+        return self.delegate.find_most_accessed(limit, now)
@@ -0,0 +1,202 @@
+"""SQLite implementation of the UrlHash repository.
+
+Meant for running Zoorl without DynamoDB (e.g., CI load tests, or a single
+node at the edge), on a local database file:
+  * the database runs in WAL mode, so readers never block on the writer;
+  * every statement is a module constant, so the sqlite3 statement cache
+    prepares it once per connection;
+  * the TTL is indexed, for purging expired URL hashes without a full scan.
+
+Only long-established SQLite features are used (no UPSERT, no row values), so
+the repository also works on the old SQLite library of some Lambda runtimes.
+"""
+
+import sqlite3
+import time
+
+from threading import Lock
+from typing import Dict, Iterator, List, Optional
+
+from zoorl.core.model import UrlHash
+from zoorl.ports.repository import UrlHashRepository
+
+# Number of prepared statements kept per connection
+STATEMENT_CACHE_SIZE = 64
+
+# SQLite limits the number of parameters per statement (999 in older versions)
+MAX_PARAMETERS = 500
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS url_hashes ("
+    " hash TEXT PRIMARY KEY, url TEXT NOT NULL, ttl INTEGER NOT NULL, hits INTEGER NOT NULL DEFAULT 0"
+    ") WITHOUT ROWID",
+    "CREATE INDEX IF NOT EXISTS url_hashes_ttl ON url_hashes (ttl)"
+)
+
+_UPSERT = "INSERT OR REPLACE INTO url_hashes (hash, url, ttl) VALUES (?, ?, ?)"
+_SELECT = "SELECT url, ttl FROM url_hashes WHERE hash = ?"
+_SELECT_UNEXPIRED = "SELECT url, ttl FROM url_hashes WHERE hash = ? AND ttl > ?"
+_ADD_ACCESS_COUNT = "UPDATE url_hashes SET hits = hits + ? WHERE hash = ?"
+_SELECT_MOST_ACCESSED = "SELECT hash, url, ttl FROM url_hashes WHERE ttl > ? AND hits > 0 ORDER BY hits DESC LIMIT ?"
+_DELETE = "DELETE FROM url_hashes WHERE hash = ?"
+_DELETE_EXPIRED = "DELETE FROM url_hashes WHERE hash = ? AND ttl <= ?"
+# Pages are keyed on (ttl, hash), so that they are not affected by deleting the previous ones
+_SELECT_EXPIRED_PAGE = (
+    "SELECT hash, ttl FROM url_hashes WHERE ttl <= ? AND (ttl > ? OR (ttl = ? AND hash > ?))"
+    " ORDER BY ttl, hash LIMIT ?"
+)
+# Segments are split on the last character of the hash, the most evenly spread one (for computed hashes)
+_SELECT_SEGMENT_PAGE = (
+    "SELECT hash, url, ttl FROM url_hashes WHERE hash > ? AND unicode(substr(hash, -1)) % ? = ?"
+    " ORDER BY hash LIMIT ?"
+)
+
+
+class SQLiteUrlHashRepository(UrlHashRepository):
+    """SQLite implementation of the UrlHash repository.
+
+    A single connection is shared by all threads, and serialized by a lock.
+    """
+
+    def __init__(self, connection: sqlite3.Connection) -> None:
+        self.connection = connection
+        self._lock = Lock()
+
+        with self._lock, self.connection:
+            for statement in _SCHEMA:
+                self.connection.execute(statement)
+
+    @classmethod
+    def open(cls, path: str) -> "SQLiteUrlHashRepository":
+        """Opens (or creates) the database file, in WAL mode.
+
+        Args:
+            path: the database file, or ":memory:" for a private in-memory database
+
+        Returns:
+            the repository on the database
+        """
+        connection = sqlite3.connect(
+            path,
+            cached_statements=STATEMENT_CACHE_SIZE,
+            check_same_thread=False,
+            # Transactions are started explicitly, when needed
+            isolation_level=None
+        )
+        connection.execute("PRAGMA journal_mode=WAL")
+        # Safe in WAL mode: a power loss may only lose the last transactions, never corrupt the database
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return cls(connection)
+
+    def save(self, url_hash: UrlHash) -> None:
+        with self._lock:
+            self.connection.execute(_UPSERT, (url_hash.hash, url_hash.url, url_hash.ttl))
+
+    def save_if_available(self, url_hash: UrlHash) -> bool:
+        with self._lock, self._write_transaction():
+            row = self.connection.execute(_SELECT, (url_hash.hash,)).fetchone()
+            # Expired rows may still be around, but their hash is free to take
+            if row and row[0] != url_hash.url and row[1] > int(time.time()):
+                return False
+
+            self.connection.execute(_UPSERT, (url_hash.hash, url_hash.url, url_hash.ttl))
+            return True
+
+    def save_if_absent(self, url_hash: UrlHash) -> Optional[UrlHash]:
+        with self._lock, self._write_transaction():
+            row = self.connection.execute(_SELECT, (url_hash.hash,)).fetchone()
+            if row and row[1] > int(time.time()):
+                return UrlHash(hash=url_hash.hash, url=row[0], ttl=row[1])
+
+            self.connection.execute(_UPSERT, (url_hash.hash, url_hash.url, url_hash.ttl))
+            return None
+
+    def save_many(self, url_hashes: List[UrlHash]) -> None:
+        # A single transaction, instead of one per row
+        with self._lock, self._write_transaction():
+            self.connection.executemany(_UPSERT, [
+                (url_hash.hash, url_hash.url, url_hash.ttl) for url_hash in url_hashes
+            ])
+
+    def get_by_hash(self, hash: str) -> Optional[UrlHash]:
+        with self._lock:
+            row = self.connection.execute(_SELECT_UNEXPIRED, (hash, int(time.time()))).fetchone()
+
+        if not row:
+            return None
+
+        return UrlHash(hash=hash, url=row[0], ttl=row[1])
+
+    def get_by_hashes(self, hashes: List[str]) -> Dict[str, UrlHash]:
+        unique_hashes = list(dict.fromkeys(hashes))
+
+        now = int(time.time())
+
+        found = {}
+        for start in range(0, len(unique_hashes), MAX_PARAMETERS):
+            chunk = unique_hashes[start:start + MAX_PARAMETERS]
+            # One statement per chunk size, so that they are all cached as well
+            statement = f"SELECT hash, url, ttl FROM url_hashes WHERE ttl > ? AND hash IN ({', '.join('?' * len(chunk))})"
+            with self._lock:
+                rows = self.connection.execute(statement, (now, *chunk)).fetchall()
+
+            for hash, url, ttl in rows:
+                found[hash] = UrlHash(hash=hash, url=url, ttl=ttl)
+        return found
+
+    def delete_many(self, hashes: List[str]) -> None:
+        with self._lock, self._write_transaction():
+            self.connection.executemany(_DELETE, [(hash,) for hash in hashes])
+
+    def delete_expired(self, hashes: List[str], now: int) -> int:
+        with self._lock, self._write_transaction():
+            return self.connection.executemany(_DELETE_EXPIRED, [(hash, now) for hash in dict.fromkeys(hashes)]).rowcount
+
+    def find_expired_hashes(self, now: int, page_size: int = 100) -> Iterator[List[str]]:
+        # Start before any possible (ttl, hash) key
+        last_ttl, last_hash = -1, ""
+        while True:
+            with self._lock:
+                rows = self.connection.execute(
+                    _SELECT_EXPIRED_PAGE, (now, last_ttl, last_ttl, last_hash, page_size)
+                ).fetchall()
+
+            if not rows:
+                return
+
+            yield [hash for hash, _ in rows]
+            last_hash, last_ttl = rows[-1]
+
+    def find_all(self, segment: int = 0, total_segments: int = 1, page_size: int = 100) -> Iterator[List[UrlHash]]:
+        # Pages are keyed on the hash, so that no statement stays open between them
+        last_hash = ""
+        while True:
+            with self._lock:
+                rows = self.connection.execute(
+                    _SELECT_SEGMENT_PAGE, (last_hash, total_segments, segment, page_size)
+                ).fetchall()
+
+            if not rows:
+                return
+
+            yield [UrlHash(hash=hash, url=url, ttl=ttl) for hash, url, ttl in rows]
+            last_hash = rows[-1][0]
+
+    def add_access_counts(self, counts: Dict[str, int]) -> None:
+        with self._lock, self._write_transaction():
+            self.connection.executemany(_ADD_ACCESS_COUNT, [(count, hash) for hash, count in counts.items()])
+
+    def find_most_accessed(self, limit: int, now: int) -> List[UrlHash]:
+        with self._lock:
+            rows = self.connection.execute(_SELECT_MOST_ACCESSED, (now, limit)).fetchall()
+
+        return [UrlHash(hash=hash, url=url, ttl=ttl) for hash, url, ttl in rows]
+
+    def close(self) -> None:
+        """Closes the underlying connection."""
+        self.connection.close()
+
+    def _write_transaction(self) -> sqlite3.Connection:
+        # Take the write lock upfront, so that the read-then-write sequences are atomic across processes too
+        self.connection.execute("BEGIN IMMEDIATE")
+        return self.connection
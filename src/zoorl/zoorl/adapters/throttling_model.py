@@ -0,0 +1,173 @@
+"""Backpressure decorator for the write path of the UrlHash repository.
+
+Hashes are uniformly distributed, so the table partitions share the writes
+evenly; but a burst of creates (e.g., a bulk import) can still exceed the
+table capacity before adaptive capacity kicks in, and every throttled request
+is a wasted round-trip. The decorator paces the writes on the client side:
+  * a token bucket caps the item writes per second (one bucket per repository,
+    so per table, shared by all the threads of the process);
+  * at most 'max_in_flight' write requests are sent at the same time;
+  * requests throttled anyway are retried with exponential backoff and full
+    jitter, so that throttled clients do not retry in lockstep.
+
+The SDK client retries throttled requests too (botocore "standard" mode, see
+'client_config()'), before the decorator sees the error: each of its calls may
+then cost up to 'sdk_attempts' requests. The decorator's budget counts requests,
+so it makes 'max_attempts // sdk_attempts' calls (at least one): the worst case
+per item (or chunk) is that many calls times 'sdk_attempts' requests, e.g. 2 x 3
+= 6 requests with the defaults, instead of 6 x 3 = 18.
+
+Batch writes are split into chunks that fit a single BatchWriteItem request,
+so that a throttled chunk is retried on its own. Calls writing items one by one
+(migrations and access counts) are split into single items: retrying a whole call
+throttled halfway through would write its first items again, and adding access
+counts twice counts the clicks twice.
+
+Reads are not throttled, since the create path is the one producing bursts.
+"""
+
+import random
+import time
+
+from threading import BoundedSemaphore, Lock
+from typing import Callable, Dict, Iterator, List, Optional, TypeVar
+
+from botocore.exceptions import ClientError
+
+from zoorl.adapters.dynamodb_model import BATCH_WRITE_MAX_ITEMS
+from zoorl.core.model import UrlHash
+from zoorl.core.token_bucket import TokenBucket
+from zoorl.ports.repository import UrlHashRepository
+
+# Default number of write requests sent at the same time
+DEFAULT_MAX_IN_FLIGHT = 16
+
+# Default number of requests for a throttled write, including the first one and the SDK retries
+DEFAULT_MAX_ATTEMPTS = 6
+
+# Base and maximum delays (seconds) of the exponential backoff between attempts
+DEFAULT_BASE_DELAY = 0.025
+DEFAULT_MAX_DELAY = 2.0
+
+# Error codes of the requests rejected because of the table (or account) throughput
+THROTTLING_ERROR_CODES = frozenset([
+    "ProvisionedThroughputExceededException",
+    "ThrottlingException",
+    "RequestLimitExceeded"
+])
+
+T = TypeVar("T")
+
+
+def is_throttling_error(ex: Exception) -> bool:
+    """Returns True if the exception is a DynamoDB throttling error."""
+    return isinstance(ex, ClientError) and ex.response.get("Error", {}).get("Code") in THROTTLING_ERROR_CODES
+
+
+class ThrottledUrlHashRepository(UrlHashRepository):
+    """Rate limiting and retrying decorator for the writes of any UrlHash repository."""
+
+    def __init__(
+        self,
+        delegate: UrlHashRepository,
+        token_bucket: TokenBucket,
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        base_delay: float = DEFAULT_BASE_DELAY,
+        max_delay: float = DEFAULT_MAX_DELAY,
+        sdk_attempts: int = 1
+    ) -> None:
+        """
+        Args:
+            delegate: the repository whose writes are paced
+            token_bucket: the item writes allowed per second
+            max_in_flight: write requests sent at the same time
+            max_attempts: requests for a throttled write, including the first one and the SDK retries
+            base_delay: base delay (seconds) of the backoff between the calls
+            max_delay: maximum delay (seconds) of the backoff between the calls
+            sdk_attempts: requests the SDK client makes per call, including its own retries
+        """
+        self.delegate = delegate
+        self.token_bucket = token_bucket
+        self.max_in_flight = max_in_flight
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.sdk_attempts = sdk_attempts
+        # Calls of a throttled write, so that their requests stay within 'max_attempts'
+        self.max_calls = max(1, max_attempts // sdk_attempts)
+        # Number of attempts rejected by DynamoDB, for monitoring
+        self.throttled = 0
+        self._in_flight = BoundedSemaphore(max_in_flight)
+        self._lock = Lock()
+
+    def save(self, url_hash: UrlHash) -> None:
+        self._write(1, lambda: self.delegate.save(url_hash))
+
+    def save_if_available(self, url_hash: UrlHash) -> bool:
+        return self._write(1, lambda: self.delegate.save_if_available(url_hash))
+
+    def save_if_absent(self, url_hash: UrlHash) -> Optional[UrlHash]:
+        return self._write(1, lambda: self.delegate.save_if_absent(url_hash))
+
+    def save_many(self, url_hashes: List[UrlHash]) -> None:
+        for start in range(0, len(url_hashes), BATCH_WRITE_MAX_ITEMS):
+            chunk = url_hashes[start:start + BATCH_WRITE_MAX_ITEMS]
+            self._write(len(chunk), lambda: self.delegate.save_many(chunk))
+
+    def get_by_hash(self, hash: str) -> Optional[UrlHash]:
+        return self.delegate.get_by_hash(hash)
+
+    def get_by_hashes(self, hashes: List[str]) -> Dict[str, UrlHash]:
+        return self.delegate.get_by_hashes(hashes)
+
+    def delete_many(self, hashes: List[str]) -> None:
+        for start in range(0, len(hashes), BATCH_WRITE_MAX_ITEMS):
+            chunk = hashes[start:start + BATCH_WRITE_MAX_ITEMS]
+            self._write(len(chunk), lambda: self.delegate.delete_many(chunk))
+
+    def delete_expired(self, hashes: List[str], now: int) -> int:
+        # One conditional delete per item, as the repositories perform them
+        return sum(self._write(1, lambda: self.delegate.delete_expired([hash], now)) for hash in hashes)
+
+    def find_expired_hashes(self, now: int, page_size: int = 100) -> Iterator[List[str]]:
+        return self.delegate.find_expired_hashes(now, page_size)
+
+    def find_outdated(self, segment: int = 0, total_segments: int = 1, page_size: int = 100) -> Iterator[List[UrlHash]]:
+        return self.delegate.find_outdated(segment, total_segments, page_size)
+
+    def find_all(self, segment: int = 0, total_segments: int = 1, page_size: int = 100) -> Iterator[List[UrlHash]]:
+        return self.delegate.find_all(segment, total_segments, page_size)
+
+    def migrate_many(self, url_hashes: List[UrlHash]) -> int:
+        # One item per call, so that the items migrated before a throttled one are neither rewritten nor uncounted
+        return sum(self._write(1, lambda: self.delegate.migrate_many([url_hash])) for url_hash in url_hashes)
+
+    def add_access_counts(self, counts: Dict[str, int]) -> None:
+        # Adding is not idempotent: only the throttled update is retried, never the ones already applied
+        for hash, count in counts.items():
+            self._write(1, lambda: self.delegate.add_access_counts({hash: count}))
+
+    def find_most_accessed(self, limit: int, now: int) -> List[UrlHash]:
+        return self.delegate.find_most_accessed(limit, now)
+
+    def _write(self, tokens: int, write: Callable[[], T]) -> T:
+        attempt = 0
+        while True:
+            self.token_bucket.acquire(tokens)
+            with self._in_flight:
+                try:
+                    return write()
+                except ClientError as ex:
+                    if not is_throttling_error(ex):
+                        raise
+
+                    with self._lock:
+                        self.throttled += 1
+
+                    attempt += 1
+                    if attempt >= self.max_calls:
+                        raise
+
+            # Full jitter, waited outside of the in-flight slot
+            time.sleep(random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt))))
@@ -0,0 +1,72 @@
+"""In-process counter of URL hash accesses, by time bucket.
+
+Counting every redirect with its own write would double the cost of the hottest
+path, so accesses are counted in memory, keyed by hash and time bucket, and
+handed over in bulk: the owner of the counter drains it once it is due, and
+ships the counts (e.g., to the repository or to metrics).
+
+Counts that are never drained (e.g., when the container is recycled) are lost.
+A counter is due as soon as it holds 'max_events' accesses or its oldest access
+is 'flush_interval' seconds old, so the loss is bounded by the smaller of the
+two, per process.
+"""
+
+import time
+
+from threading import Lock
+from typing import Callable, Dict, Tuple
+
+# Default amount of seconds between two flushes
+DEFAULT_FLUSH_INTERVAL = 60
+
+# Default number of accesses counted before a flush is due, whatever the interval
+DEFAULT_MAX_EVENTS = 10000
+
+# Default width (seconds) of the time buckets
+DEFAULT_BUCKET_SIZE = 60
+
+
+class AccessCounter:
+    """Thread-safe counter of accesses, by (hash, bucket start epoch)."""
+
+    def __init__(
+        self,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        max_events: int = DEFAULT_MAX_EVENTS,
+        bucket_size: int = DEFAULT_BUCKET_SIZE,
+        clock: Callable[[], float] = time.time
+    ) -> None:
+        self.flush_interval = flush_interval
+        self.max_events = max_events
+        self.bucket_size = bucket_size
+        self.clock = clock
+        self._counts: Dict[Tuple[str, int], int] = {}
+        self._events = 0
+        self._first_event = 0.0
+        self._lock = Lock()
+
+    def record(self, hash: str) -> None:
+        """Counts one access to the hash, in the current time bucket."""
+        now = self.clock()
+        key = (hash, int(now) // self.bucket_size * self.bucket_size)
+        with self._lock:
+            if not self._events:
+                self._first_event = now
+            self._counts[key] = self._counts.get(key, 0) + 1
+            self._events += 1
+
+    def is_due(self) -> bool:
+        """Returns True if the counts should be drained, either because of their age or of their number."""
+        return bool(self._events) and (
+            self._events >= self.max_events or self.clock() - self._first_event >= self.flush_interval
+        )
+
+    def drain(self) -> Dict[Tuple[str, int], int]:
+        """Returns the counts recorded since the previous drain, and resets them."""
+        with self._lock:
+            counts, self._counts = self._counts, {}
+            self._events = 0
+        return counts
+
+    def __len__(self) -> int:
+        return self._events
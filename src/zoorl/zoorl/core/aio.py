@@ -0,0 +1,35 @@
+"""Helpers for running the use cases on asyncio."""
+
+import asyncio
+
+from typing import Awaitable, Callable, Iterable, List, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# Default number of calls a single fan-out keeps in flight
+DEFAULT_MAX_CONCURRENCY = 16
+
+
+async def gather_bounded(
+    function: Callable[[T], Awaitable[R]],
+    items: Iterable[T],
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY
+) -> List[R]:
+    """Calls an async function for every item, with at most 'max_concurrency' calls in flight.
+
+    Args:
+        function: the coroutine function to call
+        items: the arguments, one per call
+        max_concurrency: the maximum number of concurrent calls
+
+    Returns:
+        the results, in the same order as the items
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def call(item: T) -> R:
+        async with semaphore:
+            return await function(item)
+
+    return await asyncio.gather(*(call(item) for item in items))
@@ -0,0 +1,53 @@
+"""Coalescing of concurrent calls for the same key, for coroutines (see 'zoorl.core.single_flight')."""
+
+import asyncio
+
+from typing import Any, Awaitable, Callable, Dict, Generic
+
+from zoorl.core.single_flight import R, _FlightCounts
+
+
+class AsyncSingleFlight(_FlightCounts, Generic[R]):
+    """Single flight for coroutines, on one event loop (it is not thread-safe).
+
+    The call runs in its own task, which every caller awaits through 'asyncio.shield()':
+    a cancelled caller (e.g., a client that went away) does not cancel the call of the others.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._tasks: Dict[str, "asyncio.Future[R]"] = {}
+
+    async def do(self, key: str, function: Callable[[], Awaitable[R]]) -> R:
+        """Awaits the coroutine function, unless a call for the key is already in flight, and returns its result.
+
+        Args:
+            key: the key of the call (e.g., a hash)
+            function: the call to make, if none is in flight for the key
+
+        Returns:
+            the result of the call, shared by the callers that arrived while it was in flight
+
+        Raises:
+            the error of the call, raised to each of the callers that shared it
+        """
+        self.calls += 1
+        task = self._tasks.get(key)
+        if task is None:
+            task = self._tasks[key] = asyncio.ensure_future(function())
+            task.add_done_callback(lambda done: self._complete(key, done))
+        else:
+            self.coalesced += 1
+
+        return await asyncio.shield(task)
+
+    def forget(self, key: str) -> None:
+        """Detaches the call in flight for the key (if any): later callers start a new one."""
+        self._tasks.pop(key, None)
+
+    def _complete(self, key: str, task: "asyncio.Future[Any]") -> None:
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        # Marks the error as retrieved, in case every caller has been cancelled in the meantime
+        if not task.cancelled():
+            task.exception()
@@ -0,0 +1,69 @@
+"""Bounded in-memory cache for UrlHash entities (or values derived from them)."""
+
+import time
+
+from collections import OrderedDict
+from threading import Lock
+from typing import Callable, Generic, Optional, Tuple, TypeVar
+
+# Default number of URL hashes kept in memory per container
+DEFAULT_MAX_SIZE = 1024
+
+V = TypeVar("V")
+
+
+class LruCache(Generic[V]):
+    """Bounded LRU cache where every entry carries its own expiration epoch."""
+
+    def __init__(self, max_size: int = DEFAULT_MAX_SIZE, clock: Callable[[], float] = time.time) -> None:
+        self.max_size = max_size
+        self.clock = clock
+        self._entries: "OrderedDict[str, Tuple[Optional[V], float]]" = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: str) -> Tuple[bool, Optional[V]]:
+        """Returns the cached value for the key.
+
+        Args:
+            key: the cache key
+
+        Returns:
+            a (hit, value) tuple: 'hit' is False if the key is absent or expired
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+
+            value, expires_at = entry
+            if expires_at <= self.clock():
+                del self._entries[key]
+                return False, None
+
+            self._entries.move_to_end(key)
+            return True, value
+
+    def put(self, key: str, value: Optional[V], expires_at: float) -> None:
+        """Stores a value until the specified epoch time, evicting the least recently used entry if needed."""
+        if self.max_size <= 0 or expires_at <= self.clock():
+            return
+
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: str) -> None:
+        """Removes the key from the cache, if present."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Removes every entry from the cache."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
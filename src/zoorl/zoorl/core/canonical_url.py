@@ -0,0 +1,116 @@
+"""Canonicalization of URLs before they are hashed.
+
+Hashes are computed from the URL string, so that equivalent spellings of the same
+URL (e.g., 'http://Example.com:80/a?b=1&a=2' and 'http://example.com/a?a=2&b=1')
+would be stored as separate items, with separate cache entries. Canonicalizing
+the URL first makes them share one hash, one item and one cache entry.
+
+The canonical form of an absolute URL ('scheme://authority/path?query#fragment'):
+  * the scheme and the host are lowercased (user information is left as is)
+  * the default port of the scheme is removed, as is an empty one
+  * an empty path becomes "/" for HTTP(S)
+  * empty query parameters are removed, and the others are sorted by name (parameters
+    with the same name keep their order, which may matter to the target)
+  * parameters whose name matches one of the 'strip_params' patterns (e.g., "utm_*")
+    are removed, and so is the "?" if nothing is left (or if the query was empty)
+
+Percent-encodings, the path and the fragment are not touched: decoding them could
+change the meaning of the URL. Anything but an absolute URL is returned unchanged.
+"""
+
+import fnmatch
+import re
+
+from typing import Dict, Iterable, List, Tuple
+
+# Tracking parameters that do not change the target of a URL, for 'strip_params'
+TRACKING_PARAMS = ("utm_*", "fbclid", "gclid", "msclkid")
+
+DEFAULT_PORTS = {"http": "80", "https": "443", "ws": "80", "wss": "443", "ftp": "21"}
+
+_URL = re.compile(r"([A-Za-z][A-Za-z0-9+.-]*)://([^/?#]*)([^?#]*)(?:\?([^#]*))?(#.*)?", re.DOTALL)
+
+# The host is either an IP literal in brackets, or anything up to the port
+_HOST_PORT = re.compile(r"(\[[^\]]*\]|[^:]*)(?::([0-9]*))?")
+
+
+class UrlCanonicalizer:
+    """Rewrites URLs into their canonical form, with rules compiled once per instance."""
+
+    def __init__(self, strip_params: Iterable[str] = ()) -> None:
+        """
+        Args:
+            strip_params: names of the query parameters to remove, as shell-style patterns (e.g., "utm_*"),
+                matched regardless of their case
+        """
+        patterns = [fnmatch.translate(pattern) for pattern in strip_params]
+        # A single alternation, matched once per parameter
+        self._is_stripped = re.compile("|".join(patterns), re.IGNORECASE).match if patterns else None
+
+    def canonicalize(self, url: str) -> str:
+        """Returns the canonical form of the URL (or the URL itself, if it is not absolute)."""
+        return self._canonicalize(url, {})
+
+    def canonicalize_many(self, urls: Iterable[str]) -> List[str]:
+        """Returns the canonical forms of many URLs, in the same order.
+
+        Duplicate URLs are canonicalized once, and so are the authorities (e.g., hosts) they share.
+        """
+        canonicalize = self._canonicalize
+        authorities: Dict[Tuple[str, str], str] = {}
+        canonical: Dict[str, str] = {}
+
+        results = []
+        for url in urls:
+            result = canonical.get(url)
+            if result is None:
+                result = canonical[url] = canonicalize(url, authorities)
+            results.append(result)
+        return results
+
+    def _canonicalize(self, url: str, authorities: Dict[Tuple[str, str], str]) -> str:
+        match = _URL.fullmatch(url)
+        if match is None:
+            return url
+        scheme, authority, path, query, fragment = match.groups()
+        scheme = scheme.lower()
+
+        canonical_authority = authorities.get((scheme, authority))
+        if canonical_authority is None:
+            canonical_authority = authorities[scheme, authority] = _canonical_authority(scheme, authority)
+
+        if not path and scheme in ("http", "https"):
+            path = "/"
+
+        canonical = f"{scheme}://{canonical_authority}{path}"
+        if query:
+            query = self._canonical_query(query)
+            if query:
+                canonical += "?" + query
+
+        return canonical + fragment if fragment else canonical
+
+    def _canonical_query(self, query: str) -> str:
+        is_stripped = self._is_stripped
+        params = [
+            param for param in query.split("&")
+            if param and not (is_stripped and is_stripped(param.partition("=")[0]))
+        ]
+        # Stable: the values of a repeated parameter keep their order
+        params.sort(key=lambda param: param.partition("=")[0])
+        return "&".join(params)
+
+
+def _canonical_authority(scheme: str, authority: str) -> str:
+    user_info, at, host_port = authority.rpartition("@")
+    match = _HOST_PORT.fullmatch(host_port)
+    if match is None:
+        return authority
+    host, port = match.groups()
+    host = host.lower()
+    return f"{user_info}{at}{host}" if not port or DEFAULT_PORTS.get(scheme) == port else f"{user_info}{at}{host}:{port}"
+
+
+def split_patterns(patterns: str) -> List[str]:
+    """Returns the patterns of a comma-separated list (e.g., "utm_*,fbclid"), as configured by environment variables or options."""
+    return [pattern.strip() for pattern in patterns.split(",") if pattern.strip()]
@@ -0,0 +1,106 @@
+"""Lightweight per-stage timers for the hot paths.
+
+Functions decorated with 'timed(stage)' record their duration (monotonic clock,
+in milliseconds) into the process-wide 'instrumentation' recorder, which the
+adapters drain periodically and ship as metrics (e.g., CloudWatch EMF).
+
+The recorder can be switched on and off at any time through its 'enabled'
+attribute: when disabled, a timed call only costs the wrapper call and a flag
+check, and nothing is recorded.
+"""
+
+import functools
+import inspect
+import time
+
+from threading import Lock
+from typing import Any, Callable, Dict, List, TypeVar
+
+# Default amount of seconds between two drains
+DEFAULT_FLUSH_INTERVAL = 60
+
+# Samples per stage before a drain is due (CloudWatch EMF accepts up to 100 values per metric)
+MAX_SAMPLES_PER_STAGE = 100
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class Instrumentation:
+    """Thread-safe recorder of durations, by stage."""
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self.enabled = enabled
+        self.flush_interval = flush_interval
+        self.clock = clock
+        self._samples: Dict[str, List[float]] = {}
+        self._full = False
+        self._last_drain = clock()
+        self._lock = Lock()
+
+    def record(self, stage: str, milliseconds: float) -> None:
+        """Records a duration of the stage."""
+        with self._lock:
+            samples = self._samples.setdefault(stage, [])
+            samples.append(milliseconds)
+            if len(samples) >= MAX_SAMPLES_PER_STAGE:
+                self._full = True
+
+    def is_due(self) -> bool:
+        """Returns True if the samples should be drained, either because of their age or of their number."""
+        return bool(self._samples) and (self._full or self.clock() - self._last_drain >= self.flush_interval)
+
+    def drain(self) -> Dict[str, List[float]]:
+        """Returns the samples recorded since the previous drain (in milliseconds, by stage), and resets them."""
+        with self._lock:
+            samples, self._samples = self._samples, {}
+            self._full = False
+            self._last_drain = self.clock()
+        return samples
+
+
+# The recorder shared by all timed functions of the process
+instrumentation = Instrumentation()
+
+
+def timed(stage: str) -> Callable[[F], F]:
+    """Decorator recording the duration of every call of a function (or coroutine function) as the stage.
+
+    Calls that raise are recorded as well.
+
+    Args:
+        stage: the stage name, used as the metric name
+    """
+    def decorate(function: F) -> F:
+        if inspect.iscoroutinefunction(function):
+            @functools.wraps(function)
+            async def timed_coroutine(*args: Any, **kwargs: Any) -> Any:
+                if not instrumentation.enabled:
+                    return await function(*args, **kwargs)
+
+                start = time.perf_counter()
+                try:
+                    return await function(*args, **kwargs)
+                finally:
+                    instrumentation.record(stage, (time.perf_counter() - start) * 1000)
+
+            return timed_coroutine  # type: ignore
+
+        @functools.wraps(function)
+        def timed_function(*args: Any, **kwargs: Any) -> Any:
+            if not instrumentation.enabled:
+                return function(*args, **kwargs)
+
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                instrumentation.record(stage, (time.perf_counter() - start) * 1000)
+
+        return timed_function  # type: ignore
+
+    return decorate
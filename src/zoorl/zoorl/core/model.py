@@ -3,9 +3,23 @@
 from dataclasses import dataclass
 
 
-@dataclass
+@dataclass(frozen=True)
 class UrlHash:
-    """A URL hash in our datastore."""
+    """A URL hash in our datastore.
+
+    Caches and snapshots may hold millions of them, so instances have no '__dict__'
+    (see '__slots__'), and are immutable: they can be shared by any number of holders.
+    """
+    __slots__ = ("hash", "url", "ttl")
+
     hash: str
     url: str
     ttl: int
+
+    def __reduce__(self) -> tuple:
+        # The default protocol restores slots with setattr(), which frozen instances refuse
+        return UrlHash, (self.hash, self.url, self.ttl)
+
+    def is_expired(self, now: int) -> bool:
+        """Returns True if the TTL (UNIX epoch time) is not after 'now'."""
+        return self.ttl <= now
@@ -0,0 +1,107 @@
+"""Coalescing of concurrent calls for the same key ("single flight").
+
+When a popular hash is missing from the caches, every concurrent request for it
+would fetch it from the store at once, and they would all hit the same partition.
+A single flight lets the first caller for a key run the fetch, while the callers
+arriving before it completes wait for it and share its result, or its error.
+
+Nothing is cached: once the call completes, the next caller for the key starts a
+new one. 'forget()' detaches the call in flight for a key (e.g., after a write to
+it), so that later callers do not get a result read before the write.
+
+Both flavors count the calls and the coalesced ones (those that shared the call
+of another caller), for monitoring: 'drain()' returns and resets the counts. The
+asyncio flavor is in 'zoorl.core.async_single_flight', since importing asyncio
+slows down the cold starts of the Lambda functions, which do not need it.
+"""
+
+from threading import Lock
+from typing import Callable, Dict, Generic, Optional, TypeVar
+
+R = TypeVar("R")
+
+
+class _FlightCounts:
+    """Counters shared by both flavors."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.coalesced = 0
+
+    def drain(self) -> Dict[str, int]:
+        """Returns the number of calls and of coalesced calls since the previous drain, and resets them."""
+        counts = {"calls": self.calls, "coalesced": self.coalesced}
+        self.calls = self.coalesced = 0
+        return counts
+
+
+class _Call(Generic[R]):
+    """A call in flight, and its outcome once 'done' is released."""
+
+    def __init__(self) -> None:
+        # Held by the caller making the call: a bare lock is much cheaper to create than an Event
+        self.done = Lock()
+        self.done.acquire()
+        self.result: Optional[R] = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight(_FlightCounts, Generic[R]):
+    """Thread-safe single flight: waiters block until the call of the first caller completes."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._calls: Dict[str, _Call[R]] = {}
+        self._lock = Lock()
+
+    def do(self, key: str, function: Callable[[], R]) -> R:
+        """Calls the function, unless a call for the key is already in flight, and returns its result.
+
+        Args:
+            key: the key of the call (e.g., a hash)
+            function: the call to make, if none is in flight for the key
+
+        Returns:
+            the result of the call, shared by the callers that arrived while it was in flight
+
+        Raises:
+            the error of the call, raised to each of the callers that shared it
+        """
+        with self._lock:
+            self.calls += 1
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = _Call()
+                leader = True
+            else:
+                self.coalesced += 1
+                leader = False
+
+        if not leader:
+            with call.done:
+                pass
+            if call.error is not None:
+                raise call.error
+            return call.result  # type: ignore
+
+        try:
+            call.result = function()
+            return call.result
+        except BaseException as ex:
+            call.error = ex
+            raise
+        finally:
+            with self._lock:
+                # Unless it has been forgotten, and replaced by a newer call
+                if self._calls.get(key) is call:
+                    del self._calls[key]
+            call.done.release()
+
+    def forget(self, key: str) -> None:
+        """Detaches the call in flight for the key (if any): later callers start a new one."""
+        with self._lock:
+            self._calls.pop(key, None)
+
+    def drain(self) -> Dict[str, int]:
+        with self._lock:
+            return super().drain()
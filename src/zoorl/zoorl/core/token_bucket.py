@@ -0,0 +1,73 @@
+"""Token bucket rate limiter."""
+
+import time
+
+from threading import Lock
+from typing import Callable
+
+
+class TokenBucket:
+    """Thread-safe token bucket, refilled at 'rate' tokens per second up to 'capacity'.
+
+    Tokens are reserved rather than waited for: a caller takes its tokens right away,
+    possibly leaving the bucket in debt, and sleeps for the time the debt takes to be
+    refilled. Concurrent callers are thus served in order, and a request for more
+    tokens than the capacity (e.g., a large batch) still goes through.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep
+    ) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.sleep = sleep
+        self._tokens = capacity
+        self._last_refill = clock()
+        self._lock = Lock()
+
+    def acquire(self, tokens: float = 1) -> float:
+        """Takes tokens from the bucket, waiting until they are available.
+
+        Args:
+            tokens: the number of tokens to take
+
+        Returns:
+            the number of seconds waited
+        """
+        with self._lock:
+            self._refill()
+
+            self._tokens -= tokens
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+        if wait > 0:
+            self.sleep(wait)
+        return wait
+
+    def try_acquire(self, tokens: float = 1) -> bool:
+        """Takes tokens from the bucket only if they are available right away.
+
+        Args:
+            tokens: the number of tokens to take
+
+        Returns:
+            True if the tokens were taken
+        """
+        with self._lock:
+            self._refill()
+
+            if self._tokens < tokens:
+                return False
+
+            self._tokens -= tokens
+            return True
+
+    def _refill(self) -> None:
+        now = self.clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
@@ -0,0 +1,131 @@
+"""Create a URL hash under a custom alias, chosen by the client instead of computed from the URL."""
+import re
+
+from dataclasses import dataclass, field
+from typing import List, Optional
+from zoorl.core.instrumentation import timed
+from zoorl.core.model import UrlHash
+from zoorl.ports.repository import UrlHashRepository
+from zoorl.core.usecases.create_url_hash import CreateUrlHashUseCaseResponse, DEFAULT_TTL
+from zoorl.core.utils import compute_epoch_time_from_ttl
+
+# Aliases are stored as hashes, so they are read (and redirected) like any other hash,
+# and they appear in the paths of the API
+ALIAS_PATTERN = re.compile(r"[A-Za-z0-9_-]{3,64}")
+
+# Paths under "/u" that are routes of their own, and cannot be taken by an alias
+RESERVED_ALIASES = frozenset({"batch", "resolve"})
+
+@dataclass(frozen=True)
+class CreateUrlAliasUseCaseRequest:
+    """The alias to take for the URL, with an (optional) TTL in hours."""
+    alias: str
+    url: str
+    ttl: Optional[int] = None
+
+@dataclass
+class CreateUrlAliasesUseCaseRequest:
+    items: List[CreateUrlAliasUseCaseRequest] = field(default_factory=list)
+
+@dataclass
+class CreateUrlAliasesUseCaseResponse:
+    """The aliases created (or already taken by the same URL), in request order, and the ones taken by other URLs."""
+    created: List[CreateUrlHashUseCaseResponse] = field(default_factory=list)
+    taken: List[str] = field(default_factory=list)
+
+class InvalidAliasError(Exception):
+    """Exception thrown if an alias does not match ALIAS_PATTERN, or is reserved."""
+    pass
+
+class AliasTakenError(Exception):
+    """Exception thrown if the alias is already taken by another (unexpired) URL."""
+    pass
+
+def validate_alias(alias: str) -> None:
+    """Raises InvalidAliasError if the alias cannot be taken."""
+    if not ALIAS_PATTERN.fullmatch(alias) or alias in RESERVED_ALIASES:
+        raise InvalidAliasError(
+            f"Invalid alias \"{alias}\": 3 to 64 letters, digits, '-' or '_' are expected (except for reserved words)!"
+        )
+
+class CreateUrlAliasUseCase:
+    """Use case for creating URL hashes under custom aliases.
+
+    An alias is taken with a conditional write (see 'UrlHashRepository.save_if_absent()'),
+    so that two clients cannot take the same alias: the write itself tells whether the
+    alias was free, and who owns it otherwise, so no read is performed before writing.
+    """
+    def __init__(self, url_hash_repository: UrlHashRepository) -> None:
+        self.url_hash_repository = url_hash_repository
+
+    @timed("CreateUrlAlias")
+    def create(self, request: CreateUrlAliasUseCaseRequest) -> CreateUrlHashUseCaseResponse:
+        """Create a URL hash under the alias.
+
+        Taking an alias again for the same URL succeeds (with 'reused' set), without writing
+        anything: the TTL of the existing URL hash is not extended.
+
+        Args:
+            request: alias, URL and (optional) TTL
+
+        Returns:
+            the URL hash information.
+
+        Raises:
+            InvalidAliasError: if the alias is malformed or reserved
+            AliasTakenError: if the alias is taken by another URL
+        """
+        validate_alias(request.alias)
+
+        response = self._take(request)
+        if response is None:
+            raise AliasTakenError(f"The alias \"{request.alias}\" is already taken!")
+
+        return response
+
+    @timed("CreateUrlAliases")
+    def create_many(self, request: CreateUrlAliasesUseCaseRequest) -> CreateUrlAliasesUseCaseResponse:
+        """Create many URL hashes under their aliases, as a bulk import would.
+
+        Aliases are validated before anything is written. Taken aliases are reported
+        rather than raised, so that the other items of the batch are still created.
+
+        Args:
+            request: list of aliases, URLs and (optional) TTLs
+
+        Returns:
+            the created aliases and the taken ones.
+
+        Raises:
+            InvalidAliasError: if any alias is malformed or reserved
+        """
+        for item in request.items:
+            validate_alias(item.alias)
+
+        response = CreateUrlAliasesUseCaseResponse()
+        for item in request.items:
+            created = self._take(item)
+            if created is None:
+                response.taken.append(item.alias)
+            else:
+                response.created.append(created)
+
+        return response
+
+    def _take(self, request: CreateUrlAliasUseCaseRequest) -> Optional[CreateUrlHashUseCaseResponse]:
+        """Returns the URL hash of the alias, or None if the alias belongs to another URL."""
+        url_hash = UrlHash(
+            hash = request.alias,
+            url = request.url,
+            ttl = compute_epoch_time_from_ttl(request.ttl or DEFAULT_TTL)
+        )
+
+        existing = self.url_hash_repository.save_if_absent(url_hash)
+        if existing is None:
+            reused = False
+        elif existing.url == request.url:
+            url_hash, reused = existing, True
+        else:
+            return None
+
+        return CreateUrlHashUseCaseResponse(url_hash=url_hash.hash, url=url_hash.url, ttl=url_hash.ttl, reused=reused)
@@ -1,47 +1,175 @@
 """Create an hash for a given URL."""
 from dataclasses import dataclass
-from typing import Optional
+from typing import TYPE_CHECKING, Iterator, Optional, Tuple
+from zoorl.core.cache import LruCache
+from zoorl.core.canonical_url import UrlCanonicalizer
+from zoorl.core.instrumentation import timed
 from zoorl.core.model import UrlHash
 from zoorl.ports.repository import UrlHashRepository
 from zoorl.core.utils import compute_epoch_time_from_ttl
 from zoorl.core.utils import compute_hash
 
+if TYPE_CHECKING:
+    # The asynchronous port imports asyncio, which the Lambda functions do not need
+    from zoorl.ports.async_repository import AsyncUrlHashRepository
+
 # Default TTL is 1 day (24 hours)
 DEFAULT_TTL = 24
 
-@dataclass
+# How many salted hashes we try before giving up on a URL
+MAX_SALT_ATTEMPTS = 5
+
+# Frozen, but not slotted: dataclass fields with defaults can only be slotted from Python 3.10
+@dataclass(frozen=True)
 class CreateUrlHashUseCaseRequest:
+    """If 'reuse' is set, an unexpired URL hash for the same URL is returned as it is."""
     url: str
     ttl: Optional[int] = None
+    reuse: bool = False
 
-@dataclass
+@dataclass(frozen=True)
 class CreateUrlHashUseCaseResponse:
+    """'reused' is True if an existing URL hash was returned, and nothing was written."""
     url_hash: str
     url: str
     ttl: int
+    reused: bool = False
+
+class HashCollisionError(Exception):
+    """Exception thrown if every salted hash for the URL is already taken by other URLs."""
+    pass
+
+class _CreateUrlHashUseCaseBase:
+    """What the synchronous and asynchronous use cases share: only their repository calls differ.
+
+    An optional memo of the URL hashes recently created (or found) by the use case,
+    keyed by URL, lets the 'reuse' mode answer repeated requests without any round-trip.
+
+    With a canonicalizer, URLs are canonicalized before anything else (see 'zoorl.core.canonical_url'):
+    equivalent spellings of a URL get the same hash, and the canonical URL is the one stored.
+    """
+    def __init__(self, url_hash_memo: Optional[LruCache], url_canonicalizer: Optional[UrlCanonicalizer]) -> None:
+        self.url_hash_memo = url_hash_memo
+        self.url_canonicalizer = url_canonicalizer
+
+    def _prepare(self, request: CreateUrlHashUseCaseRequest) -> Tuple[str, Optional[CreateUrlHashUseCaseResponse]]:
+        """Returns the URL to hash, and the response memoized for it (if it can be reused)."""
+        url = self.url_canonicalizer.canonicalize(request.url) if self.url_canonicalizer is not None else request.url
+
+        if request.reuse and self.url_hash_memo is not None:
+            hit, url_hash = self.url_hash_memo.get(url)
+            if hit:
+                return url, self._to_response(url_hash, reused=True)
+
+        return url, None
+
+    def _candidates(self, url: str, ttl: Optional[int]) -> Iterator[UrlHash]:
+        """Returns the URL hashes to try in turn, one per salt."""
+        expires_at = compute_epoch_time_from_ttl(ttl or DEFAULT_TTL)
+
+        # Salts are tried in the same order every time, so the same URL always lands on the same hash
+        for salt in range(MAX_SALT_ATTEMPTS):
+            yield UrlHash(
+                hash = compute_hash(url, salt),
+                url = url,
+                ttl = expires_at
+            )
+
+    def _complete(self, url_hash: UrlHash, reused: bool) -> CreateUrlHashUseCaseResponse:
+        """Memoizes the URL hash created (or found), and returns the response."""
+        if self.url_hash_memo is not None:
+            self.url_hash_memo.put(url_hash.url, url_hash, url_hash.ttl)
+
+        return self._to_response(url_hash, reused)
+
+    def _collision_error(self) -> HashCollisionError:
+        return HashCollisionError(f"Could not find a free hash for the URL after {MAX_SALT_ATTEMPTS} attempts!")
+
+    def _to_response(self, url_hash: UrlHash, reused: bool) -> CreateUrlHashUseCaseResponse:
+        return CreateUrlHashUseCaseResponse(url_hash=url_hash.hash, url=url_hash.url, ttl=url_hash.ttl, reused=reused)
 
-class CreateUrlHashUseCase:
-    """Use case for creating a new URL hash."""
-    def __init__(self, url_hash_repository: UrlHashRepository) -> None:
+class CreateUrlHashUseCase(_CreateUrlHashUseCaseBase):
+    """Use case for creating a new URL hash (see '_CreateUrlHashUseCaseBase' for the memo and the canonicalizer)."""
+    def __init__(
+        self,
+        url_hash_repository: UrlHashRepository,
+        url_hash_memo: Optional[LruCache] = None,
+        url_canonicalizer: Optional[UrlCanonicalizer] = None
+    ) -> None:
+        super().__init__(url_hash_memo, url_canonicalizer)
         self.url_hash_repository = url_hash_repository
     
+    @timed("CreateUrlHash")
     def create(self, request: CreateUrlHashUseCaseRequest) -> CreateUrlHashUseCaseResponse:
         """Create a URL hash.
+
+        In 'reuse' mode, an unexpired URL hash for the same URL is returned with its own TTL
+        (which is not extended), otherwise the URL hash is saved again with the requested TTL.
         
         Args:
-            request: URL and (optional) TTL
+            request: URL, (optional) TTL and whether an existing URL hash can be reused
         
         Returns:
             the URL hash information.
+
+        Raises:
+            HashCollisionError: if no collision-free hash could be found for the URL
         """
-        ttl = request.ttl or DEFAULT_TTL
+        url, memoized = self._prepare(request)
+        if memoized is not None:
+            return memoized
+
+        for url_hash in self._candidates(url, request.ttl):
+            if request.reuse:
+                existing = self.url_hash_repository.save_if_absent(url_hash)
+                if existing is None:
+                    return self._complete(url_hash, reused=False)
+                if existing.url == url:
+                    return self._complete(existing, reused=True)
+            elif self.url_hash_repository.save_if_available(url_hash):
+                return self._complete(url_hash, reused=False)
+
+        raise self._collision_error()
 
-        url_hash = UrlHash(
-            hash = compute_hash(request.url),
-            url = request.url,
-            ttl = compute_epoch_time_from_ttl(ttl)
-        )
+class AsyncCreateUrlHashUseCase(_CreateUrlHashUseCaseBase):
+    """Use case for creating a new URL hash, on an asynchronous repository.
+
+    The behavior is the same as 'CreateUrlHashUseCase', including the 'reuse' mode and the memo.
+    """
+    def __init__(
+        self,
+        url_hash_repository: "AsyncUrlHashRepository",
+        url_hash_memo: Optional[LruCache] = None,
+        url_canonicalizer: Optional[UrlCanonicalizer] = None
+    ) -> None:
+        super().__init__(url_hash_memo, url_canonicalizer)
+        self.url_hash_repository = url_hash_repository
+
+    @timed("CreateUrlHash")
+    async def create(self, request: CreateUrlHashUseCaseRequest) -> CreateUrlHashUseCaseResponse:
+        """Create a URL hash.
+
+        Args:
+            request: URL, (optional) TTL and whether an existing URL hash can be reused
+
+        Returns:
+            the URL hash information.
+
+        Raises:
+            HashCollisionError: if no collision-free hash could be found for the URL
+        """
+        url, memoized = self._prepare(request)
+        if memoized is not None:
+            return memoized
 
-        self.url_hash_repository.save(url_hash)
+        for url_hash in self._candidates(url, request.ttl):
+            if request.reuse:
+                existing = await self.url_hash_repository.save_if_absent(url_hash)
+                if existing is None:
+                    return self._complete(url_hash, reused=False)
+                if existing.url == url:
+                    return self._complete(existing, reused=True)
+            elif await self.url_hash_repository.save_if_available(url_hash):
+                return self._complete(url_hash, reused=False)
 
-        return CreateUrlHashUseCaseResponse(url_hash=url_hash.hash, url=url_hash.url, ttl=url_hash.ttl)
+        raise self._collision_error()
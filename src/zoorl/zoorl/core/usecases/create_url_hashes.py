@@ -0,0 +1,106 @@
+"""Create hashes for many URLs at once."""
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+from zoorl.core.canonical_url import UrlCanonicalizer
+from zoorl.core.model import UrlHash
+from zoorl.ports.repository import UrlHashRepository
+from zoorl.core.usecases.create_url_hash import (
+    CreateUrlHashUseCase,
+    CreateUrlHashUseCaseRequest,
+    CreateUrlHashUseCaseResponse,
+    DEFAULT_TTL
+)
+from zoorl.core.utils import compute_epoch_time_from_ttl
+from zoorl.core.utils import compute_hashes
+
+# Upper bound for the number of URLs in a single request
+MAX_BATCH_SIZE = 1000
+
+@dataclass
+class CreateUrlHashesUseCaseRequest:
+    items: List[CreateUrlHashUseCaseRequest] = field(default_factory=list)
+
+@dataclass
+class CreateUrlHashesUseCaseResponse:
+    """Per-item results, in the same order as the request items."""
+    items: List[CreateUrlHashUseCaseResponse] = field(default_factory=list)
+
+class TooManyUrlsError(Exception):
+    """Exception thrown if the request contains more than MAX_BATCH_SIZE URLs."""
+    pass
+
+class CreateUrlHashesUseCase:
+    """Use case for creating many URL hashes with bulk writes.
+
+    The hashes of the batch are looked up first, with one bulk read: those that are free (or
+    already taken by the same URL) are written with one bulk write, while those taken by another
+    URL (or by an alias) are created one at a time with the salted conditional writes of
+    'CreateUrlHashUseCase'. A hash taken by another request between the bulk read and the bulk
+    write is not detected, as for 'zoorl.adapters.bulk_import'.
+
+    With a canonicalizer, the URLs are canonicalized in one batch before being hashed, as 'CreateUrlHashUseCase' does.
+    """
+    def __init__(self, url_hash_repository: UrlHashRepository, url_canonicalizer: Optional[UrlCanonicalizer] = None) -> None:
+        self.url_hash_repository = url_hash_repository
+        self.url_canonicalizer = url_canonicalizer
+        # For the colliding URLs, which are already canonical
+        self.create_url_hash = CreateUrlHashUseCase(url_hash_repository)
+
+    def create(self, request: CreateUrlHashesUseCaseRequest) -> CreateUrlHashesUseCaseResponse:
+        """Create many URL hashes.
+
+        As for 'CreateUrlHashUseCase', an item in 'reuse' mode gets the unexpired URL hash
+        of its URL as it is, while the others are saved again with the requested TTL.
+
+        Args:
+            request: list of URLs, (optional) TTLs and whether existing URL hashes can be reused
+
+        Returns:
+            the URL hash information for each URL, in request order.
+
+        Raises:
+            TooManyUrlsError: if the request exceeds MAX_BATCH_SIZE items
+            HashCollisionError: if no collision-free hash could be found for one of the URLs
+        """
+        if len(request.items) > MAX_BATCH_SIZE:
+            raise TooManyUrlsError(f"At most {MAX_BATCH_SIZE} URLs can be shortened in a single request!")
+
+        urls = [item.url for item in request.items]
+        if self.url_canonicalizer is not None:
+            urls = self.url_canonicalizer.canonicalize_many(urls)
+
+        hashes = compute_hashes(urls)
+        existing = self.url_hash_repository.get_by_hashes(list(dict.fromkeys(hashes)))
+
+        url_hashes: Dict[str, UrlHash] = {}
+        responses: Dict[int, CreateUrlHashUseCaseResponse] = {}
+        collisions: List[int] = []
+
+        for index, (hash, url, item) in enumerate(zip(hashes, urls, request.items)):
+            owner = url_hashes.get(hash) or existing.get(hash)
+            if owner is not None and owner.url != url:
+                collisions.append(index)
+            elif item.reuse and owner is not None and hash not in url_hashes:
+                responses[index] = CreateUrlHashUseCaseResponse(url_hash=hash, url=url, ttl=owner.ttl, reused=True)
+            else:
+                url_hashes[hash] = UrlHash(
+                    hash = hash,
+                    url = url,
+                    ttl = compute_epoch_time_from_ttl(item.ttl or DEFAULT_TTL)
+                )
+
+        self.url_hash_repository.save_many(list(url_hashes.values()))
+
+        for index in collisions:
+            item = request.items[index]
+            responses[index] = self.create_url_hash.create(
+                CreateUrlHashUseCaseRequest(url=urls[index], ttl=item.ttl, reuse=item.reuse)
+            )
+
+        return CreateUrlHashesUseCaseResponse(items=[
+            responses.get(index) or self._to_response(url_hashes[hash])
+            for index, hash in enumerate(hashes)
+        ])
+
+    def _to_response(self, url_hash: UrlHash) -> CreateUrlHashUseCaseResponse:
+        return CreateUrlHashUseCaseResponse(url_hash=url_hash.hash, url=url_hash.url, ttl=url_hash.ttl)
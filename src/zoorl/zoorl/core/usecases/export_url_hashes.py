@@ -0,0 +1,139 @@
+"""Export the stored URL hashes, reading the store in parallel segments."""
+
+import queue
+import threading
+
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+from zoorl.core.instrumentation import timed
+from zoorl.core.model import UrlHash
+from zoorl.core.utils import compute_epoch_now
+from zoorl.ports.repository import UrlHashRepository
+
+# Number of items read per page
+DEFAULT_PAGE_SIZE = 500
+
+# Number of segments read in parallel
+DEFAULT_TOTAL_SEGMENTS = 4
+
+# Pages read ahead of the sink, per segment: this bounds the memory, whatever the store size
+PENDING_PAGES_PER_SEGMENT = 2
+
+# Seconds between two checks of the cancellation flag, while a reader waits for room in the queue
+_PUT_TIMEOUT = 0.1
+
+
+@dataclass
+class ExportUrlHashesUseCaseRequest:
+    """Whether expired URL hashes (not yet deleted) are exported too."""
+    include_expired: bool = False
+
+
+@dataclass
+class ExportUrlHashesUseCaseResponse:
+    """How many URL hashes were exported, and how many were skipped for being expired."""
+    exported: int
+    expired: int
+
+
+class _SegmentDone:
+    """Marks the end of a segment in the queue, with the error that ended it (if any)."""
+
+    def __init__(self, error: Optional[BaseException] = None) -> None:
+        self.error = error
+
+
+class ExportUrlHashesUseCase:
+    """Use case for streaming every stored URL hash to a sink (e.g., an export file writer).
+
+    The store is split into segments, and each segment is read by its own thread, which
+    puts its pages into a bounded queue: the sink is called from the calling thread only,
+    one page at a time, so it does not need to be thread-safe. Readers wait while the
+    queue is full, so a slow sink slows the reads down instead of piling pages up.
+    """
+
+    def __init__(
+        self,
+        url_hash_repository: UrlHashRepository,
+        total_segments: int = DEFAULT_TOTAL_SEGMENTS,
+        page_size: int = DEFAULT_PAGE_SIZE
+    ) -> None:
+        self.url_hash_repository = url_hash_repository
+        self.total_segments = total_segments
+        self.page_size = page_size
+
+    @timed("ExportUrlHashes")
+    def export(self, request: ExportUrlHashesUseCaseRequest, sink: Callable[[List[UrlHash]], None]) -> ExportUrlHashesUseCaseResponse:
+        """Reads all segments in parallel, and passes every page of URL hashes to the sink.
+
+        Pages come in no particular order. If a segment cannot be read, or the sink raises,
+        the other readers are stopped and the error is raised once they are done.
+
+        Args:
+            request: whether expired URL hashes are exported
+            sink: called with each (non-empty) page of URL hashes to export
+
+        Returns:
+            the number of exported and skipped URL hashes
+        """
+        pages: "queue.Queue[object]" = queue.Queue(maxsize=self.total_segments * PENDING_PAGES_PER_SEGMENT)
+        cancelled = threading.Event()
+
+        readers = [
+            threading.Thread(target=self._read_segment, args=(segment, pages, cancelled), daemon=True)
+            for segment in range(self.total_segments)
+        ]
+        for reader in readers:
+            reader.start()
+
+        now = compute_epoch_now()
+        exported = expired = 0
+        running = len(readers)
+        try:
+            while running:
+                page = pages.get()
+                if isinstance(page, _SegmentDone):
+                    if page.error is not None:
+                        raise page.error
+                    running -= 1
+                    continue
+
+                if not request.include_expired:
+                    unexpired = [url_hash for url_hash in page if not url_hash.is_expired(now)]
+                    expired += len(page) - len(unexpired)
+                    page = unexpired
+
+                if page:
+                    sink(page)
+                    exported += len(page)
+        except BaseException:
+            # Readers waiting for room in the queue give up, the others stop after their current page
+            cancelled.set()
+            raise
+        finally:
+            for reader in readers:
+                reader.join()
+
+        return ExportUrlHashesUseCaseResponse(exported=exported, expired=expired)
+
+    def _read_segment(self, segment: int, pages: "queue.Queue[object]", cancelled: threading.Event) -> None:
+        error: Optional[BaseException] = None
+        try:
+            for page in self.url_hash_repository.find_all(segment, self.total_segments, self.page_size):
+                if not self._put(pages, page, cancelled):
+                    return
+        except Exception as ex:
+            error = ex
+
+        self._put(pages, _SegmentDone(error), cancelled)
+
+    @staticmethod
+    def _put(pages: "queue.Queue[object]", item: object, cancelled: threading.Event) -> bool:
+        # Once cancelled, nobody may be reading the queue anymore
+        while not cancelled.is_set():
+            try:
+                pages.put(item, timeout=_PUT_TIMEOUT)
+                return True
+            except queue.Full:
+                pass
+        return False
@@ -0,0 +1,72 @@
+"""Migrate the stored URL hashes to the current storage layout."""
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Optional
+from zoorl.ports.repository import UrlHashRepository
+
+# Number of items examined per page while looking for outdated URL hashes
+DEFAULT_PAGE_SIZE = 500
+
+# Number of segments read (and rewritten) in parallel
+DEFAULT_TOTAL_SEGMENTS = 4
+
+
+@dataclass
+class MigrateUrlHashesUseCaseRequest:
+    """Optionally bounds how many URL hashes each segment migrates in a single run."""
+    max_items_per_segment: Optional[int] = None
+
+
+@dataclass
+class MigrateUrlHashesUseCaseResponse:
+    """How many URL hashes were migrated."""
+    migrated: int
+
+
+class MigrateUrlHashesUseCase:
+    """Use case for rewriting outdated URL hashes in the current storage layout.
+
+    Reads keep decoding every layout, so the migration can run while the service is in use:
+    the store is split into segments, and each segment is read and rewritten by its own thread.
+    """
+
+    def __init__(
+        self,
+        url_hash_repository: UrlHashRepository,
+        total_segments: int = DEFAULT_TOTAL_SEGMENTS,
+        page_size: int = DEFAULT_PAGE_SIZE
+    ) -> None:
+        self.url_hash_repository = url_hash_repository
+        self.total_segments = total_segments
+        self.page_size = page_size
+
+    def migrate(self, request: MigrateUrlHashesUseCaseRequest) -> MigrateUrlHashesUseCaseResponse:
+        """Rewrites the outdated URL hashes, processing all segments in parallel.
+
+        Args:
+            request: contains the optional maximum number of URL hashes to migrate per segment
+
+        Returns:
+            the number of migrated URL hashes
+        """
+        with ThreadPoolExecutor(max_workers=self.total_segments) as executor:
+            migrated = sum(executor.map(
+                lambda segment: self._migrate_segment(segment, request.max_items_per_segment),
+                range(self.total_segments)
+            ))
+
+        return MigrateUrlHashesUseCaseResponse(migrated=migrated)
+
+    def _migrate_segment(self, segment: int, max_items: Optional[int]) -> int:
+        migrated = 0
+        for url_hashes in self.url_hash_repository.find_outdated(segment, self.total_segments, self.page_size):
+            if max_items is not None:
+                url_hashes = url_hashes[:max_items - migrated]
+
+            migrated += self.url_hash_repository.migrate_many(url_hashes)
+
+            if max_items is not None and migrated >= max_items:
+                break
+
+        return migrated
@@ -0,0 +1,59 @@
+"""Purge the URL hashes whose TTL has passed."""
+
+from dataclasses import dataclass
+from typing import Optional
+from zoorl.ports.repository import UrlHashRepository
+from zoorl.core.utils import compute_epoch_now
+
+# Number of items examined per page while looking for expired URL hashes
+DEFAULT_PAGE_SIZE = 500
+
+
+@dataclass
+class PurgeExpiredUrlHashesUseCaseRequest:
+    """Optionally bounds how many URL hashes are deleted in a single run."""
+    max_items: Optional[int] = None
+
+
+@dataclass
+class PurgeExpiredUrlHashesUseCaseResponse:
+    """How many expired URL hashes were deleted."""
+    deleted: int
+
+
+class PurgeExpiredUrlHashesUseCase:
+    """Use case for deleting expired URL hashes in bulk.
+
+    DynamoDB TTL deletion is lazy and may lag behind by days: until then expired items
+    keep taking space and read capacity (e.g., in scans), so we can delete them ourselves.
+
+    The TTL is checked again by each delete: a hash taken again (or refreshed) after the
+    scan found it expired is a live link, and is left alone.
+    """
+
+    def __init__(self, url_hash_repository: UrlHashRepository, page_size: int = DEFAULT_PAGE_SIZE) -> None:
+        self.url_hash_repository = url_hash_repository
+        self.page_size = page_size
+
+    def purge(self, request: PurgeExpiredUrlHashesUseCaseRequest) -> PurgeExpiredUrlHashesUseCaseResponse:
+        """Deletes the URL hashes that are expired at the time of the call.
+
+        Args:
+            request: contains the optional maximum number of URL hashes to delete
+
+        Returns:
+            the number of deleted URL hashes (which were still expired when deleted)
+        """
+        now = compute_epoch_now()
+
+        deleted = 0
+        for hashes in self.url_hash_repository.find_expired_hashes(now, self.page_size):
+            if request.max_items is not None:
+                hashes = hashes[:request.max_items - deleted]
+
+            deleted += self.url_hash_repository.delete_expired(hashes, now)
+
+            if request.max_items is not None and deleted >= request.max_items:
+                break
+
+        return PurgeExpiredUrlHashesUseCaseResponse(deleted=deleted)
@@ -1,21 +1,40 @@
 """Read an hash for a given URL."""
 
 from dataclasses import dataclass
+from typing import TYPE_CHECKING
 from zoorl.ports.repository import UrlHashRepository
+from zoorl.core.instrumentation import timed
+from zoorl.core.utils import compute_epoch_now
 
-@dataclass
+if TYPE_CHECKING:
+    # The asynchronous port imports asyncio, which the Lambda functions do not need
+    from zoorl.ports.async_repository import AsyncUrlHashRepository
+
+@dataclass(frozen=True)
 class ReadUrlHashUseCaseRequest:
     """Contains the desired hash to lookup."""
+    __slots__ = ("hash",)
+
     hash: str
 
+    def __reduce__(self) -> tuple:
+        # See 'UrlHash.__reduce__()'
+        return ReadUrlHashUseCaseRequest, (self.hash,)
 
-@dataclass
+
+@dataclass(frozen=True)
 class ReadUrlHashUseCaseResponse:
-    """The response contains every information associated to the hash."""
+    """The response contains every information associated to the hash (shared with the UrlHash, not copied)."""
+    __slots__ = ("url_hash", "url", "ttl")
+
     url_hash: str
     url: str
     ttl: int
 
+    def __reduce__(self) -> tuple:
+        # See 'UrlHash.__reduce__()'
+        return ReadUrlHashUseCaseResponse, (self.url_hash, self.url, self.ttl)
+
 
 class UrlHashNotFoundError(Exception):
     """Exception thrown if the requested URL hash is not found."""
@@ -28,6 +47,7 @@ class ReadUrlHashUseCase:
     def __init__(self, url_hash_repository: UrlHashRepository) -> None:
         self.url_hash_repository = url_hash_repository
     
+    @timed("ReadUrlHash")
     def read_url(self, request: ReadUrlHashUseCaseRequest) -> ReadUrlHashUseCaseResponse:
         """Finds the URL associated to the requested hash.
         
@@ -42,7 +62,35 @@ class ReadUrlHashUseCase:
         """
         url_hash = self.url_hash_repository.get_by_hash(request.hash)
 
-        if not url_hash:
+        # DynamoDB TTL deletion may lag behind, so expired items may still be around
+        if not url_hash or url_hash.is_expired(compute_epoch_now()):
+            raise UrlHashNotFoundError("The specified URL hash is invalid or expired!")
+
+        return ReadUrlHashUseCaseResponse(url_hash=url_hash.hash, url=url_hash.url, ttl=url_hash.ttl)
+
+
+class AsyncReadUrlHashUseCase:
+    """Use case for reading a URL hash, on an asynchronous repository."""
+
+    def __init__(self, url_hash_repository: "AsyncUrlHashRepository") -> None:
+        self.url_hash_repository = url_hash_repository
+
+    @timed("ReadUrlHash")
+    async def read_url(self, request: ReadUrlHashUseCaseRequest) -> ReadUrlHashUseCaseResponse:
+        """Finds the URL associated to the requested hash.
+
+        Args:
+            request: contains the desired URL hash to lookup
+
+        Returns:
+            the URL, hash, and TTL, if the hash is present
+
+        Raises:
+            UrlHashNotFoundError: if no such hash was found
+        """
+        url_hash = await self.url_hash_repository.get_by_hash(request.hash)
+
+        if not url_hash or url_hash.is_expired(compute_epoch_now()):
             raise UrlHashNotFoundError("The specified URL hash is invalid or expired!")
 
         return ReadUrlHashUseCaseResponse(url_hash=url_hash.hash, url=url_hash.url, ttl=url_hash.ttl)
@@ -0,0 +1,69 @@
+"""Read the URLs for many hashes at once."""
+
+from dataclasses import dataclass, field
+from typing import List
+from zoorl.ports.repository import UrlHashRepository
+from zoorl.core.usecases.read_url_hash import ReadUrlHashUseCaseResponse
+from zoorl.core.utils import compute_epoch_now
+
+# Upper bound for the number of hashes in a single request
+MAX_BATCH_SIZE = 500
+
+
+@dataclass
+class ReadUrlHashesUseCaseRequest:
+    """Contains the desired hashes to lookup."""
+    hashes: List[str] = field(default_factory=list)
+
+
+@dataclass
+class ReadUrlHashesUseCaseResponse:
+    """The found hashes (in request order) and the missing (or expired) ones."""
+    found: List[ReadUrlHashUseCaseResponse] = field(default_factory=list)
+    missing: List[str] = field(default_factory=list)
+
+
+class TooManyHashesError(Exception):
+    """Exception thrown if the request contains more than MAX_BATCH_SIZE hashes."""
+    pass
+
+
+class ReadUrlHashesUseCase:
+    """Use case for reading many URL hashes with bulk reads."""
+
+    def __init__(self, url_hash_repository: UrlHashRepository) -> None:
+        self.url_hash_repository = url_hash_repository
+
+    def read_urls(self, request: ReadUrlHashesUseCaseRequest) -> ReadUrlHashesUseCaseResponse:
+        """Finds the URLs associated to the requested hashes.
+
+        Args:
+            request: contains the desired URL hashes to lookup
+
+        Returns:
+            the URL, hash, and TTL for each found hash, and the list of missing hashes
+
+        Raises:
+            TooManyHashesError: if the request exceeds MAX_BATCH_SIZE hashes
+        """
+        if len(request.hashes) > MAX_BATCH_SIZE:
+            raise TooManyHashesError(f"At most {MAX_BATCH_SIZE} hashes can be resolved in a single request!")
+
+        # Duplicated hashes are resolved (and reported) only once
+        hashes = list(dict.fromkeys(request.hashes))
+
+        url_hashes = self.url_hash_repository.get_by_hashes(hashes)
+
+        now = compute_epoch_now()
+
+        response = ReadUrlHashesUseCaseResponse()
+        for hash in hashes:
+            url_hash = url_hashes.get(hash)
+            if url_hash and not url_hash.is_expired(now):
+                response.found.append(
+                    ReadUrlHashUseCaseResponse(url_hash=url_hash.hash, url=url_hash.url, ttl=url_hash.ttl)
+                )
+            else:
+                response.missing.append(hash)
+
+        return response
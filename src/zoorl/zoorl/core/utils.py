@@ -1,6 +1,7 @@
 import hashlib
 
 from datetime import datetime, timedelta
+from typing import Iterable, List
 
 def compute_epoch_time_from_ttl(hours_from_now: int) -> int:
     """Compute the UNIX epoch time from 'now' up to the specified amount of hours"""
@@ -10,15 +11,69 @@ def compute_epoch_time_from_ttl(hours_from_now: int) -> int:
     ttl_date = now + time_delta
     return int(ttl_date.timestamp())
 
-def compute_hash(url: str) -> str:
-    """Compute the hash of a given URL as Base62-encoded string"""
-    hash = int(hashlib.sha256(url.encode('utf-8')).hexdigest(), 16) % 10**12
-
-    return to_base_62(hash)
+def compute_epoch_now() -> int:
+    """Compute the UNIX epoch time of 'now', for comparing it with TTLs"""
+    return int(get_now().timestamp())
 
 
 BASE62_ENCODING_CHARS = "0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ"
 
+# Hashes are reduced to this space, so they always fit HASH_LENGTH Base62 characters
+HASH_SPACE = 10**12
+
+# 62^7 > 10^12, so every hash is exactly 7 characters long
+HASH_LENGTH = 7
+
+# Every pair of Base62 characters, so that the encoder emits two characters per division
+_BASE62_PAIRS = [a + b for a in BASE62_ENCODING_CHARS for b in BASE62_ENCODING_CHARS]
+_BASE62_PAIRS_DIVISOR = 62 * 62
+
+def compute_hash(url: str, salt: int = 0) -> str:
+    """Compute the hash of a given URL as fixed-width Base62-encoded string.
+
+    A non-zero salt yields a different (but still deterministic) hash for the same URL,
+    and it is used for resolving collisions between different URLs.
+    """
+    data = url.encode('utf-8')
+    if salt:
+        data += b"#" + str(salt).encode('ascii')
+
+    hash = int.from_bytes(hashlib.sha256(data).digest(), "big") % HASH_SPACE
+
+    # Unrolled version of 'to_base_62_fixed(hash, HASH_LENGTH)', since this is on the hot path
+    hash, r3 = divmod(hash, _BASE62_PAIRS_DIVISOR)
+    hash, r2 = divmod(hash, _BASE62_PAIRS_DIVISOR)
+    hash, r1 = divmod(hash, _BASE62_PAIRS_DIVISOR)
+    return (_BASE62_PAIRS[hash] + _BASE62_PAIRS[r1] + _BASE62_PAIRS[r2] + _BASE62_PAIRS[r3])[1:]
+
+def compute_hashes(urls: Iterable[str]) -> List[str]:
+    """Compute the (unsalted) hashes for many URLs, in the same order."""
+    # Local bindings avoid global and attribute lookups in the loop
+    sha256 = hashlib.sha256
+    from_bytes = int.from_bytes
+    pairs = _BASE62_PAIRS
+    divisor = _BASE62_PAIRS_DIVISOR
+    space = HASH_SPACE
+
+    hashes = []
+    for url in urls:
+        number = from_bytes(sha256(url.encode('utf-8')).digest(), "big") % space
+
+        number, r3 = divmod(number, divisor)
+        number, r2 = divmod(number, divisor)
+        number, r1 = divmod(number, divisor)
+        hashes.append((pairs[number] + pairs[r1] + pairs[r2] + pairs[r3])[1:])
+    return hashes
+
+def to_base_62_fixed(some_number: int, width: int = HASH_LENGTH) -> str:
+    """Encode a number into its Base62 representation, left-padded with '0' up to 'width' characters"""
+    chunks = []
+    for _ in range((width + 1) // 2):
+        some_number, remainder = divmod(some_number, _BASE62_PAIRS_DIVISOR)
+        chunks.append(_BASE62_PAIRS[remainder])
+
+    return "".join(reversed(chunks))[-width:]
+
 def to_base_62(some_number: int) -> str:
     """Encode a number into its Base62 representation"""
     hash_str = ""
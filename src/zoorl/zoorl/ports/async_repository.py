@@ -0,0 +1,109 @@
+"""Asynchronous repository port for accessing URL Hash model entities.
+
+This is the asyncio counterpart of 'UrlHashRepository', for hosts serving many
+concurrent requests per process (e.g., an ASGI server) instead of one request
+per Lambda container.
+"""
+
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+
+from zoorl.core.aio import gather_bounded, DEFAULT_MAX_CONCURRENCY
+from zoorl.core.model import UrlHash
+from zoorl.core.utils import compute_epoch_now
+
+class AsyncUrlHashRepository(ABC):
+    """Interface for manipulating Url hashes, with coroutines."""
+
+    # Upper bound for the concurrent calls of the default batch implementations
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY
+
+    @abstractmethod
+    async def save(self, url_hash: UrlHash) -> None:
+        """Save a URL hash within the repository.
+
+        Arguments:
+            url_hash: the Url Hash to save.
+
+        """
+        pass
+
+    async def save_if_available(self, url_hash: UrlHash) -> bool:
+        """Save a URL hash unless its hash is already taken by a different URL.
+
+        Implementations should override this with an atomic conditional write:
+        the default implementation reads the current value before saving.
+
+        Arguments:
+            url_hash: the Url Hash to save.
+
+        Returns:
+            True if the URL hash was saved, False if the hash belongs to another (unexpired) URL
+        """
+        existing = await self.get_by_hash(url_hash.hash)
+        if existing and existing.url != url_hash.url and not existing.is_expired(compute_epoch_now()):
+            return False
+
+        await self.save(url_hash)
+        return True
+
+    async def save_if_absent(self, url_hash: UrlHash) -> Optional[UrlHash]:
+        """Save a URL hash unless its hash is already taken by an unexpired URL hash.
+
+        Implementations should override this with an atomic conditional write:
+        the default implementation reads the current value before saving.
+
+        Arguments:
+            url_hash: the Url Hash to save.
+
+        Returns:
+            None if the URL hash was saved, otherwise the unexpired URL hash (for any URL) taking its hash
+        """
+        existing = await self.get_by_hash(url_hash.hash)
+        if existing and not existing.is_expired(compute_epoch_now()):
+            return existing
+
+        await self.save(url_hash)
+        return None
+
+    async def save_many(self, url_hashes: List[UrlHash]) -> None:
+        """Save many URL hashes within the repository.
+
+        Implementations should override this when the backing store supports
+        bulk writes: the default implementation saves up to 'max_concurrency'
+        URL hashes at a time.
+
+        Arguments:
+            url_hashes: the Url Hashes to save.
+
+        """
+        await gather_bounded(self.save, url_hashes, self.max_concurrency)
+
+    @abstractmethod
+    async def get_by_hash(self, hash: str) -> Optional[UrlHash]:
+        """Returns the UrlHash, if present.
+
+        Args:
+            hash: the required hash
+
+        Returns:
+            the requested UrlHash or None if no such hash was found (implementations
+            may also return None for expired URL hashes not yet deleted)
+        """
+        pass
+
+    async def get_by_hashes(self, hashes: List[str]) -> Dict[str, UrlHash]:
+        """Returns the UrlHashes that are present among the requested ones.
+
+        Implementations should override this when the backing store supports
+        bulk reads: the default implementation looks up to 'max_concurrency'
+        hashes at a time.
+
+        Args:
+            hashes: the required hashes
+
+        Returns:
+            the found UrlHashes, keyed by hash: missing hashes are not included
+        """
+        url_hashes = await gather_bounded(self.get_by_hash, list(dict.fromkeys(hashes)), self.max_concurrency)
+        return {url_hash.hash: url_hash for url_hash in url_hashes if url_hash}
@@ -1,9 +1,10 @@
 """Repository port for accessing URL Hash model entities."""
 
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import Dict, Iterator, List, Optional
 
 from zoorl.core.model import UrlHash
+from zoorl.core.utils import compute_epoch_now
 
 class UrlHashRepository(ABC):
     """Interface for manipulating Url hashes."""
@@ -18,6 +19,59 @@ class UrlHashRepository(ABC):
         """
         pass
 
+    def save_if_available(self, url_hash: UrlHash) -> bool:
+        """Save a URL hash unless its hash is already taken by a different URL.
+
+        Implementations should override this with an atomic conditional write:
+        the default implementation reads the current value before saving.
+
+        Arguments:
+            url_hash: the Url Hash to save.
+
+        Returns:
+            True if the URL hash was saved, False if the hash belongs to another (unexpired) URL
+        """
+        existing = self.get_by_hash(url_hash.hash)
+        if existing and existing.url != url_hash.url and not existing.is_expired(compute_epoch_now()):
+            return False
+
+        self.save(url_hash)
+        return True
+
+    def save_if_absent(self, url_hash: UrlHash) -> Optional[UrlHash]:
+        """Save a URL hash unless its hash is already taken by an unexpired URL hash.
+
+        Unlike 'save_if_available()', an existing URL hash for the same URL is not
+        overwritten (so its TTL is not reset, and no write is performed).
+        Implementations should override this with an atomic conditional write:
+        the default implementation reads the current value before saving.
+
+        Arguments:
+            url_hash: the Url Hash to save.
+
+        Returns:
+            None if the URL hash was saved, otherwise the unexpired URL hash (for any URL) taking its hash
+        """
+        existing = self.get_by_hash(url_hash.hash)
+        if existing and not existing.is_expired(compute_epoch_now()):
+            return existing
+
+        self.save(url_hash)
+        return None
+
+    def save_many(self, url_hashes: List[UrlHash]) -> None:
+        """Save many URL hashes within the repository.
+
+        Implementations should override this when the backing store supports
+        bulk writes: the default implementation saves one URL hash at a time.
+
+        Arguments:
+            url_hashes: the Url Hashes to save.
+
+        """
+        for url_hash in url_hashes:
+            self.save(url_hash)
+
     @abstractmethod
     def get_by_hash(self, hash: str) -> Optional[UrlHash]:
         """Returns the UrlHash, if present.
@@ -26,6 +80,137 @@ class UrlHashRepository(ABC):
             hash: the required hash  
 
         Returns:
-            the requested UrlHash or None if no such hash was found
+            the requested UrlHash or None if no such hash was found (implementations
+            may also return None for expired URL hashes not yet deleted)
         """
         pass
+
+    def get_by_hashes(self, hashes: List[str]) -> Dict[str, UrlHash]:
+        """Returns the UrlHashes that are present among the requested ones.
+
+        Implementations should override this when the backing store supports
+        bulk reads: the default implementation looks up one hash at a time.
+
+        Args:
+            hashes: the required hashes
+
+        Returns:
+            the found UrlHashes, keyed by hash: missing hashes are not included
+        """
+        found = {}
+        for hash in hashes:
+            url_hash = self.get_by_hash(hash)
+            if url_hash:
+                found[hash] = url_hash
+        return found
+
+    def delete_many(self, hashes: List[str]) -> None:
+        """Delete many URL hashes from the repository.
+
+        This is an optional operation, used for purging expired URL hashes.
+
+        Args:
+            hashes: the hashes to delete
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support deletion")
+
+    def delete_expired(self, hashes: List[str], now: int) -> int:
+        """Delete the URL hashes that are still expired at 'now'.
+
+        This is an optional operation, used for purging expired URL hashes: unlike
+        'delete_many()', a hash taken again (or refreshed) since it was found expired
+        is left alone, so implementations must check the TTL as part of the delete.
+
+        Args:
+            hashes: the hashes to delete
+            now: the UNIX epoch time to compare TTLs with
+
+        Returns:
+            the number of deleted URL hashes
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support deletion")
+
+    def find_expired_hashes(self, now: int, page_size: int = 100) -> Iterator[List[str]]:
+        """Returns the hashes whose TTL is not after 'now', one page at a time.
+
+        This is an optional operation, used for purging expired URL hashes.
+
+        Args:
+            now: the UNIX epoch time to compare TTLs with
+            page_size: the (approximate) number of items to examine per page
+
+        Returns:
+            an iterator over pages of expired hashes
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support finding expired hashes")
+
+    def find_outdated(self, segment: int = 0, total_segments: int = 1, page_size: int = 100) -> Iterator[List[UrlHash]]:
+        """Returns the URL hashes stored in an outdated layout, one page at a time.
+
+        This is an optional operation, used for migrating the stored items: the
+        store is split into 'total_segments' parts that can be read in parallel.
+
+        Args:
+            segment: the part of the store to read, from 0 to total_segments - 1
+            total_segments: the number of parts the store is split into
+            page_size: the (approximate) number of items to examine per page
+
+        Returns:
+            an iterator over pages of outdated URL hashes
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support finding outdated items")
+
+    def find_all(self, segment: int = 0, total_segments: int = 1, page_size: int = 100) -> Iterator[List[UrlHash]]:
+        """Returns every stored URL hash, expired or not, one page at a time.
+
+        This is an optional operation, used for exporting the stored items: the
+        store is split into 'total_segments' parts that can be read in parallel.
+
+        Args:
+            segment: the part of the store to read, from 0 to total_segments - 1
+            total_segments: the number of parts the store is split into
+            page_size: the (approximate) number of items to read per page
+
+        Returns:
+            an iterator over pages of URL hashes
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support reading all items")
+
+    def migrate_many(self, url_hashes: List[UrlHash]) -> int:
+        """Rewrite many URL hashes in the current layout.
+
+        This is an optional operation, used for migrating the stored items: URL
+        hashes that have been rewritten in the meantime are left untouched.
+
+        Args:
+            url_hashes: the Url Hashes to rewrite, as returned by 'find_outdated()'
+
+        Returns:
+            the number of URL hashes actually rewritten
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support migrating items")
+
+    def add_access_counts(self, counts: Dict[str, int]) -> None:
+        """Add to the access counts of many URL hashes.
+
+        This is an optional operation, used for ranking the most accessed URL
+        hashes: hashes that are not in the repository (anymore) are skipped.
+
+        Args:
+            counts: the number of accesses to add, by hash
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support access counts")
+
+    def find_most_accessed(self, limit: int, now: int) -> List[UrlHash]:
+        """Returns the unexpired URL hashes with the highest access counts.
+
+        This is an optional operation, used for building redirect snapshots.
+
+        Args:
+            limit: the maximum number of URL hashes to return
+            now: the UNIX epoch time to compare TTLs with
+
+        Returns:
+            the URL hashes that have been accessed, most accessed first
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support access counts")